@@ -37,6 +37,21 @@ if config.config_file_name is not None:
 # add your model's MetaData object here for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Tablas creadas con SQL crudo por las migraciones, sin modelo ORM: la
+# tabla virtual FTS5 de búsqueda y sus tablas internas (productos_fts_data,
+# _idx, _docsize, _config). Sin excluirlas, autogenerate propone borrarlas.
+EXCLUDED_TABLE_PREFIXES = ("productos_fts",)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Filtro de autogenerate / alembic check: omite EXCLUDED_TABLE_PREFIXES"""
+    if type_ == "table":
+        return not name.startswith(EXCLUDED_TABLE_PREFIXES)
+    table = getattr(object, "table", None)
+    if table is not None:
+        return not table.name.startswith(EXCLUDED_TABLE_PREFIXES)
+    return True
+
 
 def run_migrations_offline() -> None:
     """
@@ -54,6 +69,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,  # Detectar cambios en tipos de datos
@@ -81,6 +97,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
             compare_type=True,  # Detectar cambios en tipos de datos
             compare_server_default=True,  # Detectar cambios en defaults
             render_as_batch=True,  # Para SQLite (permite ALTER TABLE)
@@ -0,0 +1,28 @@
+"""Índices para paginación keyset de productos
+
+Revision ID: 3b7d9c1e4a52
+Revises: 0f02e2716db6
+Create Date: 2025-11-12 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d9c1e4a52'
+down_revision = '0f02e2716db6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('productos', schema=None) as batch_op:
+        batch_op.create_index('ix_productos_precio_id', ['precio', 'id_producto'], unique=False)
+        batch_op.create_index('ix_productos_categoria_precio_id', ['categoria', 'precio', 'id_producto'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('productos', schema=None) as batch_op:
+        batch_op.drop_index('ix_productos_categoria_precio_id')
+        batch_op.drop_index('ix_productos_precio_id')
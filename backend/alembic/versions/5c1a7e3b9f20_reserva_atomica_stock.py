@@ -0,0 +1,56 @@
+"""Reserva atómica de stock: elimina el trigger validar_stock_disponible
+
+La validación de stock pasa a la aplicación (app/services/stock.py): un
+UPDATE condicional reserva el stock al agregar al carrito. El trigger de
+PostgreSQL validaba con un SELECT separado (con carrera) y, con la reserva,
+rechazaría items válidos (productos.stock ya no incluye lo reservado).
+
+Revision ID: 5c1a7e3b9f20
+Revises: 8e4f2a6c1d93
+Create Date: 2025-11-20 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1a7e3b9f20'
+down_revision = '8e4f2a6c1d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS tr_items_validar_stock ON items_carrito")
+        op.execute("DROP FUNCTION IF EXISTS validar_stock_disponible()")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION validar_stock_disponible()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                stock_actual INTEGER;
+            BEGIN
+                SELECT stock INTO stock_actual
+                FROM productos
+                WHERE id_producto = NEW.producto_id;
+
+                IF stock_actual < NEW.cantidad THEN
+                    RAISE EXCEPTION 'Stock insuficiente. Disponible: %, Solicitado: %',
+                        stock_actual, NEW.cantidad;
+                END IF;
+
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER tr_items_validar_stock
+                BEFORE INSERT OR UPDATE OF cantidad ON items_carrito
+                FOR EACH ROW
+                EXECUTE FUNCTION validar_stock_disponible()
+        """)
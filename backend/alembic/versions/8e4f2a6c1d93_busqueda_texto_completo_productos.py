@@ -0,0 +1,46 @@
+"""Búsqueda de texto completo: FTS5 en SQLite, índices GIN en PostgreSQL
+
+Revision ID: 8e4f2a6c1d93
+Revises: 3b7d9c1e4a52
+Create Date: 2025-11-14 11:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.producto import (
+    POSTGRES_SEARCH_DDL,
+    POSTGRES_SEARCH_DROP,
+    SQLITE_FTS_DDL,
+    SQLITE_FTS_DROP,
+    SQLITE_FTS_REBUILD,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f2a6c1d93'
+down_revision = '3b7d9c1e4a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        # Indexar los productos que ya existen
+        op.execute(SQLITE_FTS_REBUILD)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_FTS_DROP:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DROP:
+            op.execute(statement)
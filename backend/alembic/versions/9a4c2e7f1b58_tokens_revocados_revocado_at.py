@@ -0,0 +1,29 @@
+"""Revocación de tokens: índice sobre revocado_at
+
+El sync incremental del filtro de Bloom (app/services/revocation.py)
+lee las filas por revocado_at en lugar de por id_revocacion.
+
+Revision ID: 9a4c2e7f1b58
+Revises: c8f2d5a1e7b4
+Create Date: 2025-11-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c2e7f1b58'
+down_revision = 'c8f2d5a1e7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.create_index('ix_tokens_revocados_revocado_at', ['revocado_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.drop_index('ix_tokens_revocados_revocado_at')
@@ -0,0 +1,42 @@
+"""Tabla flash_sale_lotes: stock asignado a cada worker en una flash sale
+
+Revision ID: a7d3e9f14b26
+Revises: 5c1a7e3b9f20
+Create Date: 2025-11-21 16:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9f14b26'
+down_revision = '5c1a7e3b9f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'flash_sale_lotes',
+        sa.Column('id_lote', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('producto_id', sa.Integer(), nullable=False),
+        sa.Column('worker_id', sa.String(length=100), nullable=False),
+        sa.Column('asignado', sa.Integer(), nullable=False),
+        sa.Column('vendido', sa.Integer(), nullable=False),
+        sa.Column('cerrado', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.CheckConstraint('vendido >= 0 AND vendido <= asignado', name='ck_flash_lotes_vendido_rango'),
+        sa.ForeignKeyConstraint(['producto_id'], ['productos.id_producto'], onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id_lote')
+    )
+    with op.batch_alter_table('flash_sale_lotes', schema=None) as batch_op:
+        batch_op.create_index('ix_flash_lotes_abiertos', ['cerrado', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('flash_sale_lotes', schema=None) as batch_op:
+        batch_op.drop_index('ix_flash_lotes_abiertos')
+
+    op.drop_table('flash_sale_lotes')
@@ -0,0 +1,42 @@
+"""Revocación de tokens: tabla tokens_revocados
+
+jti de los JWT revocados por logout; cada worker los refleja en un
+filtro de Bloom (app/services/revocation.py).
+
+Revision ID: b4e7a1d9c360
+Revises: f1c6d8a2e934
+Create Date: 2025-11-24 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e7a1d9c360'
+down_revision = 'f1c6d8a2e934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tokens_revocados',
+        sa.Column('id_revocacion', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('jti', sa.String(length=64), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('revocado_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id_usuario'], onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id_revocacion'),
+        sa.UniqueConstraint('jti')
+    )
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.create_index('ix_tokens_revocados_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.drop_index('ix_tokens_revocados_expires_at')
+
+    op.drop_table('tokens_revocados')
@@ -0,0 +1,39 @@
+"""Límite de intentos de login: tabla intentos_login
+
+Contadores de ventana deslizante por cuenta e IP, compartidos entre
+workers con LOGIN_LIMITER_BACKEND=database (app/services/login_limiter.py).
+
+Revision ID: c8f2d5a1e7b4
+Revises: b4e7a1d9c360
+Create Date: 2025-11-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f2d5a1e7b4'
+down_revision = 'b4e7a1d9c360'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'intentos_login',
+        sa.Column('clave', sa.String(length=320), nullable=False),
+        sa.Column('ventana', sa.Integer(), nullable=False),
+        sa.Column('actual', sa.Integer(), nullable=False),
+        sa.Column('anterior', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('clave')
+    )
+    with op.batch_alter_table('intentos_login', schema=None) as batch_op:
+        batch_op.create_index('ix_intentos_login_ventana', ['ventana'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('intentos_login', schema=None) as batch_op:
+        batch_op.drop_index('ix_intentos_login_ventana')
+
+    op.drop_table('intentos_login')
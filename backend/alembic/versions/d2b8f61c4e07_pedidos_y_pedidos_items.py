@@ -0,0 +1,102 @@
+"""Pedidos: tablas pedidos/pedidos_items y carrito activo único parcial
+
+Al hacer checkout el carrito queda inactivo y el usuario necesita uno
+nuevo: el índice ux_carritos_usuario_activo pasa a cubrir solo los
+carritos activos también en SQLite (índice parcial) y en MySQL (índice
+funcional). En PostgreSQL ya era parcial.
+
+Revision ID: d2b8f61c4e07
+Revises: a7d3e9f14b26
+Create Date: 2025-11-22 10:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.carrito import MYSQL_CARRITO_ACTIVO_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b8f61c4e07'
+down_revision = 'a7d3e9f14b26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pedidos',
+        sa.Column('id_pedido', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('carrito_id', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(length=20), server_default='pendiente', nullable=False),
+        sa.Column('total_items', sa.Integer(), nullable=False),
+        sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('impuesto', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('envio', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.CheckConstraint('total_items >= 1', name='ck_pedidos_con_items'),
+        sa.CheckConstraint('subtotal >= 0 AND impuesto >= 0 AND envio >= 0', name='ck_pedidos_montos_no_negativos'),
+        sa.CheckConstraint(
+            "estado IN ('pendiente', 'pagado', 'entregado', 'cancelado')",
+            name='ck_pedidos_estado_valido'
+        ),
+        sa.ForeignKeyConstraint(['carrito_id'], ['carritos.id_carrito'], onupdate='CASCADE', ondelete='RESTRICT'),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id_usuario'], onupdate='CASCADE', ondelete='RESTRICT'),
+        sa.PrimaryKeyConstraint('id_pedido'),
+        sa.UniqueConstraint('carrito_id')
+    )
+    with op.batch_alter_table('pedidos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pedidos_usuario_id'), ['usuario_id'], unique=False)
+
+    op.create_table(
+        'pedidos_items',
+        sa.Column('id_item_pedido', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('pedido_id', sa.Integer(), nullable=False),
+        sa.Column('producto_id', sa.Integer(), nullable=False),
+        sa.Column('titulo', sa.String(length=200), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('precio_unitario', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.CheckConstraint('cantidad >= 1', name='ck_pedidos_items_cantidad_positiva'),
+        sa.CheckConstraint('precio_unitario >= 0', name='ck_pedidos_items_precio_no_negativo'),
+        sa.ForeignKeyConstraint(['pedido_id'], ['pedidos.id_pedido'], onupdate='CASCADE', ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['producto_id'], ['productos.id_producto'], onupdate='CASCADE', ondelete='RESTRICT'),
+        sa.PrimaryKeyConstraint('id_item_pedido')
+    )
+    with op.batch_alter_table('pedidos_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pedidos_items_pedido_id'), ['pedido_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_pedidos_items_producto_id'), ['producto_id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP INDEX IF EXISTS ux_carritos_usuario_activo")
+        op.execute("CREATE UNIQUE INDEX ux_carritos_usuario_activo ON carritos (usuario_id) WHERE is_active = 1")
+    elif dialect == 'mysql':
+        op.execute("DROP INDEX ux_carritos_usuario_activo ON carritos")
+        op.execute(MYSQL_CARRITO_ACTIVO_DDL)
+
+
+def downgrade() -> None:
+    # Vuelve al índice único por usuario: falla si un usuario ya tiene
+    # carritos convertidos en pedido además del activo
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP INDEX IF EXISTS ux_carritos_usuario_activo")
+        op.execute("CREATE UNIQUE INDEX ux_carritos_usuario_activo ON carritos (usuario_id)")
+    elif dialect == 'mysql':
+        op.execute("DROP INDEX ux_carritos_usuario_activo ON carritos")
+        op.execute("CREATE UNIQUE INDEX ux_carritos_usuario_activo ON carritos (usuario_id)")
+
+    with op.batch_alter_table('pedidos_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pedidos_items_producto_id'))
+        batch_op.drop_index(batch_op.f('ix_pedidos_items_pedido_id'))
+
+    op.drop_table('pedidos_items')
+    with op.batch_alter_table('pedidos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pedidos_usuario_id'))
+
+    op.drop_table('pedidos')
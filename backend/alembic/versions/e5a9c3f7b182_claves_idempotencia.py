@@ -0,0 +1,45 @@
+"""Claves de idempotencia: tabla claves_idempotencia
+
+Respuesta guardada de cada request mutante del carrito y del checkout
+enviado con Idempotency-Key (app/idempotency.py).
+
+Revision ID: e5a9c3f7b182
+Revises: d2b8f61c4e07
+Create Date: 2025-11-23 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3f7b182'
+down_revision = 'd2b8f61c4e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'claves_idempotencia',
+        sa.Column('id_clave', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('clave', sa.String(length=255), nullable=False),
+        sa.Column('huella', sa.String(length=64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('respuesta', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id_usuario'], onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id_clave'),
+        sa.UniqueConstraint('usuario_id', 'clave', name='ux_claves_idempotencia_usuario_clave')
+    )
+    with op.batch_alter_table('claves_idempotencia', schema=None) as batch_op:
+        batch_op.create_index('ix_claves_idempotencia_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('claves_idempotencia', schema=None) as batch_op:
+        batch_op.drop_index('ix_claves_idempotencia_expires_at')
+
+    op.drop_table('claves_idempotencia')
@@ -0,0 +1,63 @@
+"""Archivo de carritos: tablas carritos_archivados/items_carrito_archivados
+
+Destino del sweeper de carritos abandonados (app/services/cart_sweeper.py).
+Sin foreign keys: son historial.
+
+Revision ID: f1c6d8a2e934
+Revises: e5a9c3f7b182
+Create Date: 2025-11-23 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c6d8a2e934'
+down_revision = 'e5a9c3f7b182'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'carritos_archivados',
+        sa.Column('id_carrito', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('impuesto', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('envio', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archivado_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.PrimaryKeyConstraint('id_carrito')
+    )
+    with op.batch_alter_table('carritos_archivados', schema=None) as batch_op:
+        batch_op.create_index('ix_carritos_archivados_usuario_id', ['usuario_id'], unique=False)
+
+    op.create_table(
+        'items_carrito_archivados',
+        sa.Column('id_item', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('carrito_id', sa.Integer(), nullable=False),
+        sa.Column('producto_id', sa.Integer(), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('precio_unitario', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archivado_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.PrimaryKeyConstraint('id_item')
+    )
+    with op.batch_alter_table('items_carrito_archivados', schema=None) as batch_op:
+        batch_op.create_index('ix_items_carrito_archivados_carrito_id', ['carrito_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('items_carrito_archivados', schema=None) as batch_op:
+        batch_op.drop_index('ix_items_carrito_archivados_carrito_id')
+
+    op.drop_table('items_carrito_archivados')
+    with op.batch_alter_table('carritos_archivados', schema=None) as batch_op:
+        batch_op.drop_index('ix_carritos_archivados_usuario_id')
+
+    op.drop_table('carritos_archivados')
@@ -0,0 +1,347 @@
+"""
+Control de admisión y descarte de carga (load shedding) por clase de ruta
+
+Con el pool de conexiones saturado, cada request extra espera dentro de
+SQLAlchemy hasta DB_POOL_TIMEOUT y la latencia sube para todos por igual.
+Este middleware ASGI limita los requests en curso del worker ANTES de
+llegar a la ruta y decide a quién atender primero:
+
+- cada prefijo de ADMISSION_ROUTE_CLASSES pertenece a una clase; cada
+  clase de ADMISSION_CLASSES tiene [fracción del límite, espera máx. ms]
+- una clase admite requests mientras los requests en curso del worker
+  estén por debajo de límite · fracción: con fracción 1.0 el checkout
+  usa todo el límite y el catálogo (0.6) deja de entrar antes
+- sin lugar, el request espera en la cola de su clase hasta su espera
+  máxima (las clases con más fracción se atienden primero al liberarse
+  un lugar); pasado ese tiempo, o con la cola llena, responde 503 con
+  Retry-After sin tocar la base
+- las rutas sin clase (/health, /docs, /internal) no se limitan
+
+Espera antes del worker: bajo sobrecarga la cola real está delante del
+middleware (backlog del socket, event loop saturado) y el límite de
+concurrencia no la ve. Si el proxy manda ADMISSION_REQUEST_START_HEADER
+(nginx: proxy_set_header X-Request-Start "t=${msec}"), esa espera cuenta
+como parte de la espera en cola de la clase: un request de catálogo que
+ya esperó más que su máximo se descarta sin ejecutarlo (ya no le sirve a
+nadie). Viene desactivado (""): activarlo solo si un proxy de confianza
+pone el header en TODOS los requests y reemplaza el del cliente; si no,
+un cliente con un "t=" viejo hace descartar sus requests o, peor,
+cualquiera puede enviarlo y el worker lo cree.
+
+El límite es adaptativo (AIMD) y se ajusta solo con la latencia de
+servicio (desde que el request entra a la ruta hasta que termina), sin la
+espera en cola: si la contara, una cola larga bajaría el límite, eso
+alargaría la cola y el límite seguiría bajando aunque la base esté
+ociosa. La espera se registra aparte por clase (wait_p50_ms/wait_p99_ms).
+Cada request que tardó más que ADMISSION_TARGET_LATENCY_MS en la ruta
+multiplica el límite por ADMISSION_DECREASE_FACTOR (a lo sumo una vez
+por ese mismo intervalo, así una ráfaga de respuestas lentas cuenta como
+una sola señal); cada request rápido que terminó con su clase al tope lo
+sube en 1/límite (≈ +1 por cada "límite" requests). Así el límite sigue
+la concurrencia que la base aguanta sin que la cola interna del pool
+crezca.
+
+Todo corre en el event loop del worker: sin locks. Cada worker tiene su
+propio límite.
+
+Uso:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission.controller,
+        request_start_header=settings.ADMISSION_REQUEST_START_HEADER,
+    )
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from .config import settings
+from .rate_limit import matches_prefix
+from .responses import send_retry_later
+
+# Esperas en cola guardadas por clase para los percentiles
+WAIT_SAMPLES = 1024
+
+
+class AdmissionRejectedError(Exception):
+    """Request descartado: sin lugar en el límite ni en la cola de su clase"""
+
+    def __init__(self, route_class: str, reason: str):
+        self.route_class = route_class
+        self.reason = reason
+        super().__init__(f"Servicio sobrecargado ({route_class}: {reason}); reintenta en unos segundos")
+
+
+def request_start_wait(scope: dict, header: bytes, now: float) -> float:
+    """
+    Segundos desde el header de inicio del proxy ("t=<epoch>" en segundos
+    con decimales o en milisegundos); 0 si no viene o no se entiende
+    """
+    for name, value in scope["headers"]:
+        if name == header:
+            try:
+                started = float(value.decode("latin-1").strip().removeprefix("t="))
+            except ValueError:
+                return 0.0
+            if started > 1e11:  # milisegundos
+                started /= 1000
+            return max(0.0, now - started)
+    return 0.0
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class RouteClass:
+    """Una clase de ruta: su parte del límite, su cola y sus contadores"""
+
+    def __init__(self, name: str, share: float, max_wait_ms: float):
+        self.name = name
+        self.share = share
+        self.max_wait = max_wait_ms / 1000
+        self.waiters: deque = deque()
+        self.waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.timeouts = 0
+
+    def stats(self) -> dict:
+        waits = list(self.waits)
+        return {
+            "name": self.name,
+            "share": self.share,
+            "max_wait_ms": self.max_wait * 1000,
+            "in_flight": self.in_flight,
+            "queued_now": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "timeouts": self.timeouts,
+            "wait_p50_ms": round(_percentile(waits, 0.50) * 1000, 2),
+            "wait_p99_ms": round(_percentile(waits, 0.99) * 1000, 2),
+        }
+
+
+class AdmissionController:
+    """
+    Límite de concurrencia adaptativo del worker + colas por clase.
+    acquire(clase) admite, encola o lanza AdmissionRejectedError;
+    release(clase, latencia) libera el lugar y ajusta el límite.
+    """
+
+    def __init__(
+        self,
+        route_classes: Dict[str, str],
+        classes: Dict[str, List[float]],
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        target_latency_ms: float,
+        decrease_factor: float,
+        max_queue: int,
+        enabled: bool = True,
+        clock=time.monotonic,
+    ):
+        self.enabled = enabled
+        self.classes = {name: RouteClass(name, share, max_wait_ms) for name, (share, max_wait_ms) in classes.items()}
+        # Prioridad al liberar un lugar: mayor fracción primero
+        self.by_priority = sorted(self.classes.values(), key=lambda route_class: -route_class.share)
+        self.routes = sorted(
+            ((prefix, self.classes[name]) for prefix, name in route_classes.items()),
+            key=lambda route: len(route[0]),
+            reverse=True,
+        )
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency_ms / 1000
+        self.decrease_factor = decrease_factor
+        self.max_queue = max_queue
+        self._clock = clock
+        self._decreased_at = float("-inf")
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+
+    def class_for(self, path: str) -> Optional[RouteClass]:
+        """Clase del prefijo más largo que contiene a `path` (por segmentos)"""
+        for prefix, route_class in self.routes:
+            if matches_prefix(path, prefix):
+                return route_class
+        return None
+
+    def _threshold(self, route_class: RouteClass) -> float:
+        return max(1.0, self.limit * route_class.share)
+
+    def _has_room(self, route_class: RouteClass) -> bool:
+        """Hay lugar y nadie de igual o mayor prioridad está esperando"""
+        if self.in_flight >= self._threshold(route_class):
+            return False
+        for other in self.by_priority:
+            if other.waiters:
+                return False
+            if other is route_class:
+                return True
+        return True
+
+    def _admit(self, route_class: RouteClass) -> None:
+        self.in_flight += 1
+        route_class.in_flight += 1
+        route_class.admitted += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+
+    async def acquire(self, route_class: RouteClass, waited: float = 0.0) -> float:
+        """
+        Espera un lugar para un request de `route_class` que ya esperó
+        `waited` segundos antes del worker; retorna la espera total.
+
+        Raises:
+            AdmissionRejectedError: cola llena o espera máxima cumplida
+        """
+        if waited and waited >= route_class.max_wait:
+            route_class.timeouts += 1
+            route_class.shed += 1
+            route_class.waits.append(waited)
+            raise AdmissionRejectedError(route_class.name, "espera máxima antes del worker")
+        if self._has_room(route_class):
+            self._admit(route_class)
+            route_class.waits.append(waited)
+            return waited
+        budget = route_class.max_wait - waited
+        if budget <= 0 or len(route_class.waiters) >= self.max_queue:
+            route_class.shed += 1
+            raise AdmissionRejectedError(route_class.name, "sin lugar")
+        future = asyncio.get_running_loop().create_future()
+        route_class.waiters.append(future)
+        route_class.queued += 1
+        start = self._clock()
+        try:
+            await asyncio.wait_for(future, budget)
+        except asyncio.TimeoutError:
+            # _wake pudo darle el lugar justo al vencer la espera: devolverlo
+            if future.done() and not future.cancelled():
+                self._leave(route_class)
+            route_class.timeouts += 1
+            route_class.shed += 1
+            raise AdmissionRejectedError(route_class.name, "espera máxima en cola")
+        except asyncio.CancelledError:
+            # Cliente desconectado: si _wake ya le había dado el lugar, devolverlo
+            if future.done() and not future.cancelled():
+                self._leave(route_class)
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                try:
+                    route_class.waiters.remove(future)
+                except ValueError:
+                    pass
+        waited += self._clock() - start
+        route_class.waits.append(waited)
+        return waited
+
+    def _leave(self, route_class: RouteClass) -> None:
+        self.in_flight -= 1
+        route_class.in_flight -= 1
+        self._wake()
+
+    def release(self, route_class: RouteClass, latency: float) -> None:
+        """
+        Fin del request: ajusta el límite con su latencia de servicio (sin
+        la espera en cola) y despierta a la cola
+        """
+        at_cap = self.in_flight >= self._threshold(route_class) - 1
+        self._adapt(latency, at_cap)
+        self._leave(route_class)
+
+    def _adapt(self, latency: float, at_cap: bool) -> None:
+        """AIMD sobre la latencia observada"""
+        if latency > self.target_latency:
+            now = self._clock()
+            if now - self._decreased_at >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._decreased_at = now
+                self.decreases += 1
+        elif at_cap and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.increases += 1
+
+    def _wake(self) -> None:
+        """Da los lugares libres a la cola, de mayor a menor prioridad"""
+        for route_class in self.by_priority:
+            waiters = route_class.waiters
+            while waiters and self.in_flight < self._threshold(route_class):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                future.set_result(None)
+                self._admit(route_class)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "target_latency_ms": self.target_latency * 1000,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "classes": [route_class.stats() for route_class in self.by_priority],
+        }
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI: aplica `controller` a los requests HTTP"""
+
+    def __init__(self, app, controller: AdmissionController, request_start_header: str = ""):
+        self.app = app
+        self.controller = controller
+        self.request_start_header = request_start_header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled:
+            return await self.app(scope, receive, send)
+        route_class = controller.class_for(scope["path"])
+        if route_class is None:
+            return await self.app(scope, receive, send)
+        upstream = 0.0
+        if self.request_start_header:
+            upstream = request_start_wait(scope, self.request_start_header, time.time())
+        try:
+            await controller.acquire(route_class, upstream)
+        except AdmissionRejectedError as error:
+            return await send_retry_later(send, 503, str(error), settings.ADMISSION_RETRY_AFTER_SECONDS)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(route_class, time.perf_counter() - start)
+
+
+controller = AdmissionController(
+    settings.ADMISSION_ROUTE_CLASSES,
+    settings.ADMISSION_CLASSES,
+    settings.ADMISSION_INITIAL_LIMIT,
+    settings.ADMISSION_MIN_LIMIT,
+    settings.ADMISSION_MAX_LIMIT,
+    settings.ADMISSION_TARGET_LATENCY_MS,
+    settings.ADMISSION_DECREASE_FACTOR,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_ENABLED,
+)
+
+
+def admission_stats() -> dict:
+    return controller.stats()
@@ -2,6 +2,8 @@
 Configuración de la aplicación
 """
 import os
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -29,6 +31,145 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # bcrypt en un pool de procesos (ver app/services/passwords.py)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # costo: cada +1 duplica el tiempo (~250 ms con 12)
+    PASSWORD_POOL_WORKERS: int = 0  # 0 = un proceso por núcleo
+    PASSWORD_QUEUE_MAX: int = 32  # operaciones en curso antes de responder 503
+    
+    # Autenticación por request (ver app/security.py): claims de tokens ya
+    # verificados hasta su exp y (id, is_admin, is_active) del usuario con
+    # TTL corto, así un request autenticado no consulta 'usuarios'
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CLAIMS_CACHE_MAX_ENTRIES: int = 10_000
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+    AUTH_PRINCIPAL_TTL_SECONDS: int = 30  # cuánto puede tardar otro worker en ver un usuario desactivado
+    # Rutas del carrito/pedidos sin token: aceptar ?user_id= (solo benchmarks
+    # y desarrollo local; permite actuar como cualquier usuario)
+    AUTH_ALLOW_USER_ID_PARAM: bool = False
+    
+    # Revocación de tokens (logout): jti en 'tokens_revocados' + filtro de
+    # Bloom por worker (ver app/services/revocation.py)
+    REVOCATION_BLOOM_CAPACITY: int = 100_000  # se reconstruye más grande si se llena
+    REVOCATION_BLOOM_FP_RATE: float = 0.001  # falsos positivos → un SELECT por jti
+    REVOCATION_SYNC_SECONDS: float = 5.0  # cuánto tarda un worker en ver el logout hecho en otro
+    REVOCATION_SYNC_OVERLAP_SECONDS: float = 60.0  # cada sync relee lo revocado en este tiempo (filas confirmadas tarde)
+    
+    # Límite de intentos de login por ventana deslizante, antes de buscar
+    # el usuario o correr bcrypt (ver app/services/login_limiter.py)
+    LOGIN_WINDOW_SECONDS: int = 300
+    LOGIN_MAX_ATTEMPTS_PER_ACCOUNT: int = 10
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 50
+    LOGIN_LIMITER_BACKEND: str = "memory"  # "memory" (por worker) o "database" (tabla intentos_login)
+    LOGIN_LIMITER_MAX_KEYS: int = 100_000  # tope del backend en memoria
+    LOGIN_LIMITER_COMPACT_SECONDS: int = 60
+    
+    # Token buckets por cliente (usuario del token o IP) y prefijo de ruta
+    # (ver app/rate_limit.py): prefijo → [tokens por segundo, ráfaga]
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BUDGETS: Dict[str, List[float]] = {
+        "/api/products": [20, 40],  # catálogo y búsqueda
+        "/api/cart": [10, 20],
+        "/api/orders": [1, 5],  # checkout
+        "/api/auth": [2, 10],  # registro, login, logout
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # clientes por prefijo y por worker
+    # Proxies (IPs o CIDR) cuyo X-Forwarded-For se usa como IP del cliente.
+    # Vacío = IP de la conexión (o uvicorn --proxy-headers --forwarded-allow-ips)
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    
+    # Control de admisión por clase de ruta con límite de concurrencia
+    # adaptativo (AIMD) por worker (ver app/admission.py)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_ROUTE_CLASSES: Dict[str, str] = {
+        "/api/orders": "checkout",
+        "/api/cart": "cart",
+        "/api/auth": "cart",
+        "/api/products": "catalog",
+    }
+    # clase → [fracción del límite que puede usar, espera máxima en cola en ms]
+    ADMISSION_CLASSES: Dict[str, List[float]] = {
+        "checkout": [1.0, 2000],
+        "cart": [0.8, 500],
+        "catalog": [0.6, 50],  # el primero en descartarse
+    }
+    ADMISSION_INITIAL_LIMIT: int = 32  # requests en curso por worker
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_LIMIT: int = 256
+    ADMISSION_TARGET_LATENCY_MS: float = 250  # por encima, el límite baja
+    ADMISSION_DECREASE_FACTOR: float = 0.9
+    ADMISSION_MAX_QUEUE: int = 128  # requests esperando por clase
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Header con la hora en que el proxy recibió el request ("t=<epoch>");
+    # esa espera cuenta en la cola de la clase. "" = ignorarlo. Solo si un
+    # proxy de confianza lo pone siempre (el cliente puede enviarlo)
+    ADMISSION_REQUEST_START_HEADER: str = ""
+    
+    # Pool de conexiones (por engine y por worker; ver /internal/metrics)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # reabrir conexiones más viejas (-1 = nunca)
+    # Verificación al hacer checkout: "always" (ping en cada checkout),
+    # "idle" (solo si la conexión estuvo inactiva DB_POOL_PING_IDLE_SECONDS)
+    # o "never" (confiar en DB_POOL_RECYCLE y en la invalidación por error)
+    DB_POOL_PRE_PING: str = "idle"
+    DB_POOL_PING_IDLE_SECONDS: float = 30.0
+    
+    # SQLite en archivo, modo producción: WAL + PRAGMAs en cada conexión y
+    # una conexión writer única (las lecturas usan el pool normal). Opt-in:
+    # cambia el archivo a WAL (deja -wal/-shm al lado) y enruta las sesiones
+    SQLITE_PRODUCTION_MODE: bool = False
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # con WAL, NORMAL es seguro ante caídas del proceso
+    SQLITE_MMAP_SIZE: int = 268_435_456  # 256 MB
+    SQLITE_CACHE_SIZE_KB: int = 65_536  # 64 MB por conexión
+    SQLITE_BUSY_TIMEOUT_MS: int = 5_000
+    
+    # Sesiones de las rutas async: "driver" usa el driver async (asyncpg,
+    # aiomysql, aiosqlite); "threadpool" corre la Session sync en el
+    # threadpool; "auto" = driver salvo en SQLite (aiosqlite agrega un salto
+    # de hilo por operación y es más lento que sqlite3 en el threadpool)
+    DB_ASYNC_MODE: str = "auto"
+    
+    # Caché del catálogo (en memoria, por worker)
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_MAX_ENTRIES: int = 2048
+    CATALOG_CACHE_TTL_SECONDS: int = 60
+    
+    # Respuestas JSON rápidas (orjson, sin re-validar response_model) en
+    # catálogo y carrito; False vuelve al camino estándar de FastAPI
+    FAST_JSON_RESPONSES: bool = True
+    
+    # Carrito: agregar un producto reserva su stock; la reserva se libera si
+    # el carrito pasa este tiempo sin actividad
+    CART_RESERVATION_TTL_MINUTES: int = 60
+    
+    # Sweeper de carritos (ver app/services/cart_sweeper.py): archiva
+    # carritos sin actividad en CART_ARCHIVE_AFTER_DAYS, en lotes cortos
+    CART_ARCHIVE_AFTER_DAYS: float = 30
+    CART_SWEEP_BATCH_SIZE: int = 500
+    CART_SWEEP_INTERVAL_MINUTES: float = 0  # 0 = solo por cron (POST /internal/carts/sweep)
+    
+    # Flash sale: estos productos se venden desde un contador en memoria por
+    # worker (bloques de FLASH_SALE_ALLOCATION_SIZE tomados de la base) y
+    # se escriben por tandas de hasta FLASH_SALE_FLUSH_BATCH ventas antes de
+    # responder; vacío = desactivado (ver services/flash_sale.py)
+    FLASH_SALE_PRODUCT_IDS: List[int] = []
+    FLASH_SALE_ALLOCATION_SIZE: int = 100
+    FLASH_SALE_FLUSH_INTERVAL_MS: int = 200  # ciclo del hilo de heartbeat y reconciliación
+    FLASH_SALE_FLUSH_BATCH: int = 500
+    FLASH_SALE_LEASE_SECONDS: int = 30  # sin heartbeat en este tiempo, el lote se reconcilia
+    
+    # Idempotency-Key en rutas del carrito y checkout (ver app/idempotency.py)
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 10_000  # LRU en memoria por worker
+    IDEMPOTENCY_PENDING_SECONDS: int = 60  # un reclamo "en proceso" más viejo se considera abandonado
+    
+    # Carrito de invitado en cookie firmada con SECRET_KEY (ver app/services/guest_cart.py)
+    GUEST_CART_COOKIE_NAME: str = "guest_cart"
+    GUEST_CART_TTL_DAYS: int = 30
+    GUEST_CART_MAX_ITEMS: int = 50
+    GUEST_CART_COOKIE_SECURE: bool = False  # True en producción (solo HTTPS)
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -3,14 +3,198 @@ Configuración de la base de datos con SQLAlchemy
 
 Este módulo maneja:
 - Conexión a la base de datos (MySQL/PostgreSQL/SQLite)
-- Creación de la sesión de base de datos
+- Creación de la sesión de base de datos (sync y async)
+- SQLite en modo producción: WAL, PRAGMAs y una conexión writer única
 - Base declarativa para los modelos ORM
+- Helpers por dialecto compartidos por los servicios (upserts)
 """
 
-from sqlalchemy import create_engine
+import re
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
 from .config import settings
+from .services import pool_metrics
+
+# Driver async equivalente a cada driver sync soportado
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+# INSERT con ON CONFLICT ... DO UPDATE por dialecto; MySQL usa ON DUPLICATE KEY UPDATE
+ON_CONFLICT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def pool_options(url: str, async_engine: bool = False) -> dict:
+    """
+    Opciones del pool de conexiones desde settings.DB_POOL_*.
+    SQLite en memoria y aiosqlite (una conexión = un hilo, NullPool) usan
+    el pool por defecto del dialecto y no las reciben.
+    """
+    parsed = make_url(url)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING == "always"}
+    if parsed.get_backend_name() == "sqlite" and (
+        async_engine or parsed.database in (None, "", ":memory:")
+    ):
+        return options
+    options.update(
+        poolclass=pool_metrics.TimedAsyncQueuePool if async_engine else pool_metrics.TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def is_sqlite_file(url: str) -> bool:
+    """¿La URL es una base SQLite en archivo (no en memoria)?"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas() -> list:
+    """PRAGMAs de SQLite en modo producción (settings.SQLITE_*)"""
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+
+
+def configure_sqlite(engine: Engine, writer: bool = False) -> None:
+    """
+    Aplica los PRAGMAs de producción a cada conexión nueva de `engine`.
+
+    Con WAL los lectores no bloquean al writer ni viceversa. En el writer
+    las transacciones empiezan con BEGIN IMMEDIATE: toma el lock de
+    escritura al inicio (esperando busy_timeout) en vez de fallar con
+    "database is locked" al intentar escalar un lock de lectura.
+    """
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+        if writer:
+            # pysqlite no debe abrir transacciones por su cuenta
+            dbapi_connection.isolation_level = None
+
+    if writer:
+        @event.listens_for(engine, "begin")
+        def begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_sqlite_writer(url: str) -> Engine:
+    """
+    Engine con UNA conexión (pool_size=1, sin overflow) para las escrituras:
+    el pool serializa a los writers del worker sin competir por el lock.
+    """
+    writer = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=pool_metrics.TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        echo=False
+    )
+    configure_sqlite(writer, writer=True)
+    return writer
+
+
+# Palabras de un text() que escribe, en cualquier posición: "WITH x AS
+# (...) INSERT ..." escribe aunque empiece como una lectura. Un falso
+# positivo (la palabra en un literal o comentario) solo manda la lectura
+# al writer; un falso negativo escribiría por un lector.
+_TEXT_WRITE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|REPLACE|UPSERT|CREATE|DROP|ALTER|ANALYZE|VACUUM|REINDEX)\b",
+    re.IGNORECASE
+)
+
+
+def _is_write(clause) -> bool:
+    """
+    ¿La sentencia escribe? INSERT/UPDATE/DELETE ORM o Core (también con
+    WITH: siguen siendo DML), SELECT ... FOR UPDATE (quien bloquea filas
+    va a escribirlas) y text() con alguna palabra de _TEXT_WRITE. Un
+    SELECT de Core con un CTE que escribe no existe en SQLite (los CTE
+    solo pueden ser SELECT), y este enrutamiento es solo de SQLite.
+    """
+    if clause is None:
+        return False
+    if getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None:
+        return True
+    if isinstance(clause, TextClause):
+        return _TEXT_WRITE.search(clause.text) is not None
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Session de SQLite en modo producción: lecturas por el pool de lectores
+    (`bind`) y escrituras (flush, UPDATE/DELETE/INSERT) por el `writer`.
+
+    Desde la primera escritura (un flush o una sentencia que escribe), el
+    resto de la transacción también usa el writer: así se leen los cambios
+    propios aún no confirmados. `writing` es ese estado de la transacción:
+    lo activan get_bind y before_flush, y lo apaga el fin de la
+    transacción raíz.
+    """
+
+    def __init__(self, *args, writer: Engine = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.writing = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writer is not None and (self.writing or _is_write(clause)):
+            self.writing = True
+            return self.writer
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _flush_to_writer(session, flush_context, instances):
+    """Un flush escribe: él y el resto de la transacción van por el writer"""
+    if session.writer is not None:
+        session.writing = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    """Al terminar la transacción raíz, las lecturas vuelven a los lectores"""
+    if transaction.parent is None:
+        session.writing = False
+
+
+def make_session_factory(bind: Engine, writer: Engine = None) -> sessionmaker:
+    """sessionmaker de la app; con `writer` enruta las escrituras (SQLite)"""
+    if writer is None:
+        return sessionmaker(autocommit=False, autoflush=False, bind=bind)
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=bind,
+        class_=RoutingSession,
+        writer=writer
+    )
+
 
 # Crear engine de SQLAlchemy
 # El engine maneja la conexión pool y la comunicación con la BD
@@ -18,17 +202,76 @@ engine = create_engine(
     settings.DATABASE_URL,
     # Opciones para SQLite (comentar si usas MySQL/PostgreSQL)
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    # Pool de conexiones (para producción con MySQL/PostgreSQL)
-    pool_pre_ping=True,  # Verifica conexiones antes de usarlas
+    # Pool de conexiones: tamaño, overflow, timeout, recycle y pre-ping
+    **pool_options(settings.DATABASE_URL),
     echo=False  # True para debug SQL (muestra queries en consola)
 )
+pool_metrics.instrument(
+    engine,
+    "sync",
+    ping=settings.DB_POOL_PRE_PING,
+    ping_idle_seconds=settings.DB_POOL_PING_IDLE_SECONDS
+)
+
+# SQLite en archivo (modo producción): `engine` queda como pool de
+# lectores y las escrituras van por writer_engine (una conexión)
+writer_engine = None
+if settings.SQLITE_PRODUCTION_MODE and is_sqlite_file(settings.DATABASE_URL):
+    configure_sqlite(engine)
+    writer_engine = create_sqlite_writer(settings.DATABASE_URL)
+    pool_metrics.instrument(writer_engine, "sqlite_writer", ping="never")
 
 # Crear SessionLocal class
 # Cada instancia será una sesión de base de datos
-SessionLocal = sessionmaker(
-    autocommit=False,
+SessionLocal = make_session_factory(engine, writer=writer_engine)
+
+
+def async_database_url(url: str) -> str:
+    """
+    Traduce una URL sync (ej: mysql+pymysql://...) a su driver async
+    (mysql+aiomysql://...). Las URLs que ya son async se respetan.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg", "aiomysql"):
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver async para la base de datos '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def use_async_driver(url: str = None) -> bool:
+    """¿Las rutas async usan el driver async? (ver settings.DB_ASYNC_MODE)"""
+    mode = settings.DB_ASYNC_MODE
+    if mode == "auto":
+        return make_url(url or settings.DATABASE_URL).get_backend_name() != "sqlite"
+    if mode not in ("driver", "threadpool"):
+        raise ValueError(f"DB_ASYNC_MODE inválido: {mode}")
+    return mode == "driver"
+
+
+# Engine async para las rutas calientes (async def): la I/O de la BD no
+# bloquea el event loop. Comparte URL, modelos y servicios con el sync.
+# Solo se crea si DB_ASYNC_MODE lo usa (así el driver async es opcional)
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, async_engine=True),
+    echo=False
+) if use_async_driver() else None
+if async_engine is not None:
+    if settings.SQLITE_PRODUCTION_MODE and is_sqlite_file(settings.DATABASE_URL):
+        configure_sqlite(async_engine.sync_engine)
+    pool_metrics.instrument(
+        async_engine.sync_engine,
+        "async",
+        ping=settings.DB_POOL_PRE_PING,
+        ping_idle_seconds=settings.DB_POOL_PING_IDLE_SECONDS
+    )
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False
 )
 
 # Base declarativa para los modelos ORM
@@ -55,6 +298,60 @@ def get_db():
         db.close()
 
 
+def commit_or_flush(db: Session, commit: bool = True) -> None:
+    """
+    Cierra la escritura de un servicio. Con commit=False la transacción
+    la confirma quien llama (ver app/idempotency.py): solo flush, y
+    expire_all como haría el commit, para que las lecturas siguientes vean
+    los UPDATE hechos con Core.
+    """
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+        db.expire_all()
+
+
+class ThreadpoolSession:
+    """
+    Adaptador con la interfaz run_sync de AsyncSession sobre una Session
+    sync: cada llamada corre en el threadpool de FastAPI (DB_ASYNC_MODE).
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+# Dependency async (rutas async def)
+async def get_async_db():
+    """
+    Dependency que proporciona una AsyncSession.
+
+    Uso en rutas:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            return await db.run_sync(lambda session: session.query(Item).all())
+
+    Los servicios existentes (db.query(...)) se reutilizan con
+    `await db.run_sync(servicio, ...)`: reciben una Session sync cuya
+    I/O pasa por el driver async. Si DB_ASYNC_MODE resolvió a
+    "threadpool" al iniciar se entrega un ThreadpoolSession con la misma
+    interfaz.
+    """
+    if async_engine is None:
+        db = SessionLocal()
+        try:
+            yield ThreadpoolSession(db)
+        finally:
+            await run_in_threadpool(db.close)
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Función para crear todas las tablas (útil para desarrollo)
 def create_tables():
     """
@@ -63,7 +360,7 @@ def create_tables():
     IMPORTANTE: En producción, usar Alembic migrations en lugar de esto.
     Esta función es útil solo para desarrollo y testing rápido.
     """
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=writer_engine or engine)
 
 
 # Función para eliminar todas las tablas (útil para testing)
@@ -74,4 +371,4 @@ def drop_tables():
     CUIDADO: Esta función borra TODOS los datos.
     Usar solo en desarrollo/testing.
     """
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=writer_engine or engine)
@@ -0,0 +1,236 @@
+"""
+Idempotency-Key para rutas que modifican el carrito y el checkout
+
+Los clientes móviles reintentan POST /api/cart/items y el checkout cuando
+la red falla después de que el servidor ya procesó el request. Con el
+header Idempotency-Key, el primer request se ejecuta y su respuesta se
+guarda; los reintentos con la misma clave reciben esa misma respuesta
+(header Idempotent-Replayed: true) sin volver a tocar carritos ni items.
+
+Almacenamiento:
+- LRU en memoria por worker (services/cache.py): los reintentos al mismo
+  worker no van a la base
+- Tabla 'claves_idempotencia': compartida entre workers; la fila se crea
+  ("reclamo") ANTES de ejecutar el request, así dos requests simultáneos
+  con la misma clave no se ejecutan ambos (el segundo recibe 409)
+- Los cambios del handler y la respuesta guardada se confirman en el MISMO
+  commit: el handler recibe commit=False y lo pasa a los servicios, que
+  entonces solo hacen flush (ver database.commit_or_flush). Si el worker
+  muere antes de ese commit no quedó nada; después, el reintento recibe la
+  respuesta guardada. Nunca se ejecuta dos veces.
+
+Fuera de alcance: lo que un handler escribe con sus propias sesiones no
+entra en esa transacción. Por eso POST /api/cart/items de un producto en
+flash sale (202, escrito por las tandas de services/flash_sale.py) no usa
+Idempotency-Key.
+
+Solo se guardan respuestas exitosas (< 400): un error no cambió nada y el
+cliente puede reintentar con la misma clave. Las claves expiran a las
+IDEMPOTENCY_TTL_HOURS; purge_expired() borra las vencidas.
+
+Uso en rutas:
+    def handler(commit: bool):
+        cart_service.add_item(db, user_id, producto_id, cantidad, commit=commit)
+        return ...
+
+    return idempotency.run(db, request, user_id, idempotency_key, handler, payload=item)
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import ClaveIdempotencia
+from .responses import FastJSONResponse
+from .services.cache import MISSING, TTLCache
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+# Respuesta guardada de una clave
+StoredResponse = namedtuple("StoredResponse", "huella status_code body")
+
+# Frente en memoria: (usuario_id, clave) → StoredResponse
+response_cache = TTLCache(
+    "idempotency",
+    maxsize=settings.IDEMPOTENCY_CACHE_MAX_ENTRIES,
+    ttl=settings.IDEMPOTENCY_TTL_HOURS * 3600
+)
+
+
+def fingerprint(request: Request, payload: Any = None) -> str:
+    """SHA-256 de método + ruta + body validado (orden de claves normalizado)"""
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump(mode="json")
+    raw = json.dumps([request.method, request.url.path, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _replay(stored: StoredResponse, huella: str) -> Response:
+    if stored.huella != huella:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key ya usada con un request distinto"
+        )
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json" if stored.body else None,
+        headers={REPLAY_HEADER: "true"}
+    )
+
+
+def _claim(db: Session, usuario_id: int, clave: str, huella: str) -> Optional[StoredResponse]:
+    """
+    Reclama la clave insertando su fila (commit inmediato). Retorna None si
+    el reclamo es nuestro, o la respuesta guardada si la clave ya se usó.
+
+    Una fila vencida, o "en proceso" por más de IDEMPOTENCY_PENDING_SECONDS
+    (el worker murió a mitad del request), se borra y se reclama de nuevo.
+    """
+    key = and_(ClaveIdempotencia.usuario_id == usuario_id, ClaveIdempotencia.clave == clave)
+    for _ in range(3):
+        now = datetime.now(timezone.utc)
+        try:
+            db.add(ClaveIdempotencia(
+                usuario_id=usuario_id,
+                clave=clave,
+                huella=huella,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+            ))
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+        stale = db.execute(
+            delete(ClaveIdempotencia)
+            .where(key, or_(
+                ClaveIdempotencia.expires_at < now,
+                and_(
+                    ClaveIdempotencia.status_code.is_(None),
+                    ClaveIdempotencia.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_PENDING_SECONDS)
+                )
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if stale.rowcount:
+            continue
+
+        row = db.execute(
+            select(ClaveIdempotencia.huella, ClaveIdempotencia.status_code, ClaveIdempotencia.respuesta).where(key)
+        ).one_or_none()
+        db.rollback()
+        if row is None:
+            continue  # borrada entre el INSERT y el SELECT: reintentar
+        if row.status_code is None:
+            if row.huella != huella:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key ya usada con un request distinto"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Un request con esta Idempotency-Key todavía está en proceso"
+            )
+        return StoredResponse(row.huella, row.status_code, row.respuesta or b"")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="No se pudo reservar la Idempotency-Key, reintente"
+    )
+
+
+def _release(db: Session, usuario_id: int, clave: str) -> None:
+    """Libera el reclamo de un request que falló (se puede reintentar)"""
+    db.rollback()
+    db.execute(
+        delete(ClaveIdempotencia)
+        .where(
+            ClaveIdempotencia.usuario_id == usuario_id,
+            ClaveIdempotencia.clave == clave,
+            ClaveIdempotencia.status_code.is_(None)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def run(
+    db: Session,
+    request: Request,
+    usuario_id: int,
+    clave: Optional[str],
+    handler: Callable[[bool], Any],
+    payload: Any = None,
+    status_code: int = status.HTTP_200_OK,
+) -> Any:
+    """
+    Ejecuta `handler()` una sola vez por (usuario, Idempotency-Key).
+
+    Sin clave, solo ejecuta handler(commit=True). Con clave: replay desde
+    el LRU o la tabla si ya existe, y si no, reclamo → handler(commit=False)
+    + guardar respuesta en una sola transacción.
+    `status_code` es el de la ruta cuando el handler retorna un dict.
+    """
+    if clave is None:
+        return handler(True)
+    huella = fingerprint(request, payload)
+    cache_key = (usuario_id, clave)
+    stored = response_cache.get(cache_key)
+    if stored is not MISSING:
+        return _replay(stored, huella)
+
+    stored = _claim(db, usuario_id, clave, huella)
+    if stored is not None:
+        response_cache.set(cache_key, stored)
+        return _replay(stored, huella)
+
+    try:
+        response = handler(False)
+        if not isinstance(response, Response):
+            response = FastJSONResponse(content=response, status_code=status_code)
+        if response.status_code >= 400:
+            _release(db, usuario_id, clave)
+            return response
+        stored = StoredResponse(huella, response.status_code, bytes(response.body))
+        db.execute(
+            update(ClaveIdempotencia)
+            .where(ClaveIdempotencia.usuario_id == usuario_id, ClaveIdempotencia.clave == clave)
+            .values(status_code=stored.status_code, respuesta=stored.body)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except BaseException:
+        _release(db, usuario_id, clave)
+        raise
+    response_cache.set(cache_key, stored)
+    return response
+
+
+def purge_expired(db: Session, batch_size: int = 1000) -> int:
+    """Borra las claves vencidas en lotes (un commit por lote). Retorna cuántas"""
+    purged = 0
+    while True:
+        ids = db.execute(
+            select(ClaveIdempotencia.id_clave)
+            .where(ClaveIdempotencia.expires_at < datetime.now(timezone.utc))
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            db.rollback()
+            return purged
+        db.execute(
+            delete(ClaveIdempotencia)
+            .where(ClaveIdempotencia.id_clave.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        purged += len(ids)
@@ -4,15 +4,44 @@ FastAPI - Web Mini Market Universitario Backend
 Este es el punto de entrada principal de la API.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import admission, rate_limit
+from app.admission import AdmissionMiddleware
+from app.config import settings
+from app.database import SessionLocal
+from app.rate_limit import RateLimitMiddleware
+from app.services import cart_sweeper, flash_sale, passwords
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicio/cierre del worker: el modo flash sale (si hay productos
+    configurados) reconcilia lotes huérfanos al iniciar y, al cerrar,
+    escribe las ventas pendientes y devuelve el stock no vendido. El
+    sweeper de carritos corre en un hilo si CART_SWEEP_INTERVAL_MINUTES > 0.
+    El pool de procesos de bcrypt se levanta al iniciar y se cierra al final.
+    """
+    flash_sale.start(SessionLocal)
+    cart_sweeper.start(SessionLocal)
+    passwords.start()
+    yield
+    passwords.stop()
+    cart_sweeper.stop()
+    flash_sale.stop()
+
+
 app = FastAPI(
     title="Web Mini Market API",
     description="API para el e-commerce universitario",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configuración de CORS
@@ -22,6 +51,18 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
+# Middlewares: el último agregado es el más externo. Orden de un request:
+# CORS → token buckets por cliente (app/rate_limit.py) → control de
+# admisión por clase de ruta (app/admission.py) → rutas. Así los 429/503
+# llevan los headers de CORS y un cliente abusivo se corta antes de
+# ocupar un lugar del límite de concurrencia
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission.controller,
+    request_start_header=settings.ADMISSION_REQUEST_START_HEADER,
+)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limit.limiter)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -50,8 +91,11 @@ async def health_check():
     """
     return {"status": "healthy"}
 
-# Aquí se importarán los routers cuando se creen
-# from app.routes import products, cart, auth
-# app.include_router(products.router, prefix="/api/products", tags=["products"])
-# app.include_router(cart.router, prefix="/api/cart", tags=["cart"])
-# app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
+# Routers de la API
+from app.routes import products, cart, orders, metrics, auth
+
+app.include_router(products.router, prefix="/api/products", tags=["products"])
+app.include_router(cart.router, prefix="/api/cart", tags=["cart"])
+app.include_router(orders.router, prefix="/api/orders", tags=["orders"])
+app.include_router(metrics.router, prefix="/internal", tags=["internal"])
+app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -8,6 +8,14 @@ from .usuario import Usuario
 from .producto import Producto
 from .carrito import Carrito
 from .item_carrito import ItemCarrito
+from .lote_flash_sale import LoteFlashSale
+from .pedido import Pedido
+from .pedido_item import PedidoItem
+from .clave_idempotencia import ClaveIdempotencia
+from .carrito_archivado import CarritoArchivado
+from .item_carrito_archivado import ItemCarritoArchivado
+from .token_revocado import TokenRevocado
+from .intento_login import IntentoLogin
 
 # Exportar todos los modelos
 __all__ = [
@@ -15,4 +23,12 @@ __all__ = [
     "Producto",
     "Carrito",
     "ItemCarrito",
+    "LoteFlashSale",
+    "Pedido",
+    "PedidoItem",
+    "ClaveIdempotencia",
+    "CarritoArchivado",
+    "ItemCarritoArchivado",
+    "TokenRevocado",
+    "IntentoLogin",
 ]
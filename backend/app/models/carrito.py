@@ -4,7 +4,7 @@ Modelo ORM para Carrito
 Mapea la tabla 'carritos' de la base de datos.
 """
 
-from sqlalchemy import Column, Integer, Numeric, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, Numeric, Boolean, DateTime, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -55,14 +55,26 @@ class Carrito(Base):
         lazy="dynamic"  # Cargar items on-demand
     )
     
-    # Índice único: un usuario solo puede tener un carrito activo
+    # Misma relación pero cargable con eager loading (joinedload/selectinload).
+    # Solo lectura: las escrituras siguen pasando por 'items'.
+    items_detalle = relationship(
+        "ItemCarrito",
+        viewonly=True,
+        order_by="ItemCarrito.id_item"
+    )
+    
+    # Índice único: un usuario solo puede tener un carrito activo. Parcial
+    # (WHERE is_active) para que los carritos ya convertidos en pedido no
+    # impidan crear uno nuevo; MySQL no tiene índices parciales y usa un
+    # índice funcional equivalente (MYSQL_CARRITO_ACTIVO_DDL)
     __table_args__ = (
         Index(
             'ux_carritos_usuario_activo',
             'usuario_id',
             unique=True,
-            postgresql_where=(is_active == True)  # Índice parcial (solo para PostgreSQL)
-        ),
+            postgresql_where=(is_active == True),
+            sqlite_where=(is_active == True)
+        ).ddl_if(dialect=("postgresql", "sqlite")),
     )
     
     def __repr__(self):
@@ -91,3 +103,14 @@ class Carrito(Base):
     def total_productos(self):
         """Suma la cantidad total de productos (considerando cantidades)"""
         return sum(item.cantidad for item in self.items)
+
+
+# Unicidad del carrito activo en MySQL: índice funcional sobre una expresión
+# que es NULL para los carritos inactivos (los NULL no chocan entre sí).
+# Usado por create_tables() y por la migración d2b8f61c4e07
+MYSQL_CARRITO_ACTIVO_DDL = (
+    "CREATE UNIQUE INDEX ux_carritos_usuario_activo "
+    "ON carritos ((CASE WHEN is_active THEN usuario_id END))"
+)
+
+event.listen(Carrito.__table__, "after_create", DDL(MYSQL_CARRITO_ACTIVO_DDL).execute_if(dialect="mysql"))
@@ -0,0 +1,42 @@
+"""
+Modelo ORM para CarritoArchivado
+
+Mapea la tabla 'carritos_archivados': carritos abandonados que el sweeper
+(app/services/cart_sweeper.py) sacó de 'carritos' para que la tabla y sus
+índices solo tengan carritos vigentes.
+"""
+
+from sqlalchemy import Column, Integer, Numeric, Boolean, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class CarritoArchivado(Base):
+    """
+    Modelo de CarritoArchivado (mapea a tabla 'carritos_archivados')
+
+    Copia de la fila de 'carritos' con su id original. Sin foreign keys:
+    es historial y no debe bloquear borrados de usuarios.
+    """
+    __tablename__ = "carritos_archivados"
+
+    # Clave primaria (id original en 'carritos')
+    id_carrito = Column(Integer, primary_key=True, autoincrement=False)
+    usuario_id = Column(Integer, nullable=False)
+
+    # Datos del carrito al archivarlo
+    impuesto = Column(Numeric(10, 2), nullable=False)
+    envio = Column(Numeric(10, 2), nullable=False)
+    is_active = Column(Boolean, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Auditoría
+    archivado_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_carritos_archivados_usuario_id', 'usuario_id'),
+    )
+
+    def __repr__(self):
+        return f"<CarritoArchivado(id={self.id_carrito}, usuario_id={self.usuario_id})>"
@@ -0,0 +1,52 @@
+"""
+Modelo ORM para ClaveIdempotencia
+
+Mapea la tabla 'claves_idempotencia': respuesta guardada de cada request
+mutante enviado con el header Idempotency-Key (ver app/idempotency.py).
+"""
+
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ClaveIdempotencia(Base):
+    """
+    Modelo de ClaveIdempotencia (mapea a tabla 'claves_idempotencia')
+
+    status_code NULL = el request original sigue en proceso.
+
+    Relaciones:
+    - usuarios (1) ← claves_idempotencia (N)
+    """
+    __tablename__ = "claves_idempotencia"
+
+    # Clave primaria
+    id_clave = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Las claves son por usuario (dos clientes pueden generar la misma)
+    usuario_id = Column(
+        Integer,
+        ForeignKey('usuarios.id_usuario', ondelete='CASCADE', onupdate='CASCADE'),
+        nullable=False
+    )
+    clave = Column(String(255), nullable=False)
+
+    # SHA-256 de método + ruta + body: la misma clave con otro request es un error
+    huella = Column(String(64), nullable=False)
+
+    # Respuesta guardada (JSON ya serializado)
+    status_code = Column(Integer, nullable=True)
+    respuesta = Column(LargeBinary, nullable=True)
+
+    # Auditoría y expiración
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('usuario_id', 'clave', name='ux_claves_idempotencia_usuario_clave'),
+        Index('ix_claves_idempotencia_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<ClaveIdempotencia(usuario_id={self.usuario_id}, clave='{self.clave}', status={self.status_code})>"
@@ -0,0 +1,37 @@
+"""
+Modelo ORM para IntentoLogin
+
+Mapea la tabla 'intentos_login': contadores de ventana deslizante del
+limitador de login cuando LOGIN_LIMITER_BACKEND = "database" (ver
+app/services/login_limiter.py), compartidos entre workers.
+"""
+
+from sqlalchemy import Column, Integer, String, Index
+from ..database import Base
+
+
+class IntentoLogin(Base):
+    """
+    Modelo de IntentoLogin (mapea a tabla 'intentos_login')
+
+    Una fila por clave ("ip:<dirección>" o "cuenta:<email>"): intentos en
+    la ventana actual y en la anterior. Sin foreign keys: la cuenta puede
+    no existir.
+    """
+    __tablename__ = "intentos_login"
+
+    # Clave primaria
+    clave = Column(String(320), primary_key=True)
+
+    # Número de ventana (epoch // LOGIN_WINDOW_SECONDS) y contadores
+    ventana = Column(Integer, nullable=False)
+    actual = Column(Integer, nullable=False, default=0)
+    anterior = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Compactación: borrar claves sin intentos en las dos últimas ventanas
+        Index('ix_intentos_login_ventana', 'ventana'),
+    )
+
+    def __repr__(self):
+        return f"<IntentoLogin(clave='{self.clave}', ventana={self.ventana}, actual={self.actual})>"
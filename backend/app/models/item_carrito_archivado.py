@@ -0,0 +1,43 @@
+"""
+Modelo ORM para ItemCarritoArchivado
+
+Mapea la tabla 'items_carrito_archivados': items de carritos abandonados
+o ya convertidos en pedido que el sweeper sacó de 'items_carrito'.
+"""
+
+from sqlalchemy import Column, Integer, Numeric, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ItemCarritoArchivado(Base):
+    """
+    Modelo de ItemCarritoArchivado (mapea a tabla 'items_carrito_archivados')
+
+    Copia de la fila de 'items_carrito' con su id original. Sin foreign
+    keys (historial). El carrito puede seguir en 'carritos' si tiene un
+    pedido (pedidos.carrito_id lo referencia).
+    """
+    __tablename__ = "items_carrito_archivados"
+
+    # Clave primaria (id original en 'items_carrito')
+    id_item = Column(Integer, primary_key=True, autoincrement=False)
+    carrito_id = Column(Integer, nullable=False)
+    producto_id = Column(Integer, nullable=False)
+
+    # Datos del item al archivarlo
+    cantidad = Column(Integer, nullable=False)
+    precio_unitario = Column(Numeric(10, 2), nullable=False)
+    subtotal = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Auditoría
+    archivado_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_items_carrito_archivados_carrito_id', 'carrito_id'),
+    )
+
+    def __repr__(self):
+        return f"<ItemCarritoArchivado(id={self.id_item}, carrito_id={self.carrito_id})>"
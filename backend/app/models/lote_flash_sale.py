@@ -0,0 +1,61 @@
+"""
+Modelo ORM para LoteFlashSale
+
+Mapea la tabla 'flash_sale_lotes': bloques de stock que cada worker toma
+de 'productos' para venderlos desde su contador en memoria durante una
+flash sale (ver app/services/flash_sale.py).
+"""
+
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, CheckConstraint, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class LoteFlashSale(Base):
+    """
+    Modelo de LoteFlashSale (mapea a tabla 'flash_sale_lotes')
+
+    Invariante: las unidades ya descontadas de productos.stock y aún no
+    vendidas son asignado - vendido de cada lote abierto. Si el worker
+    muere, la reconciliación devuelve ese resto a productos.stock.
+
+    Relaciones:
+    - productos (1) ← flash_sale_lotes (N)
+    """
+    __tablename__ = "flash_sale_lotes"
+
+    # Clave primaria
+    id_lote = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign key a productos
+    producto_id = Column(
+        Integer,
+        ForeignKey('productos.id_producto', ondelete='CASCADE', onupdate='CASCADE'),
+        nullable=False
+    )
+
+    # Worker dueño del lote (hostname-pid)
+    worker_id = Column(String(100), nullable=False)
+
+    # Unidades tomadas de productos.stock y unidades ya vendidas (flush)
+    asignado = Column(Integer, default=0, nullable=False)
+    vendido = Column(Integer, default=0, nullable=False)
+
+    # Control: cerrado = el resto ya volvió a productos.stock
+    cerrado = Column(Boolean, default=False, nullable=False)
+
+    # Auditoría (updated_at es además el heartbeat del worker)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint('vendido >= 0 AND vendido <= asignado', name='ck_flash_lotes_vendido_rango'),
+        # Reconciliación: lotes abiertos sin heartbeat reciente
+        Index('ix_flash_lotes_abiertos', 'cerrado', 'updated_at'),
+    )
+
+    def __repr__(self):
+        return (
+            f"<LoteFlashSale(id={self.id_lote}, producto_id={self.producto_id}, "
+            f"asignado={self.asignado}, vendido={self.vendido}, cerrado={self.cerrado})>"
+        )
@@ -0,0 +1,79 @@
+"""
+Modelo ORM para Pedido
+
+Mapea la tabla 'pedidos': snapshot de un carrito al hacer checkout.
+"""
+
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class Pedido(Base):
+    """
+    Modelo de Pedido (mapea a tabla 'pedidos')
+
+    Los montos se copian del carrito al confirmar: cambios posteriores de
+    precios o del carrito no alteran el pedido.
+
+    Relaciones:
+    - usuarios (1) ← pedidos (N)
+    - carritos (1) ← pedidos (1)
+    - pedidos (1) → pedidos_items (N)
+    """
+    __tablename__ = "pedidos"
+
+    # Clave primaria
+    id_pedido = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign keys
+    usuario_id = Column(
+        Integer,
+        ForeignKey('usuarios.id_usuario', ondelete='RESTRICT', onupdate='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    # Carrito de origen (único: un carrito se convierte en a lo más un pedido)
+    carrito_id = Column(
+        Integer,
+        ForeignKey('carritos.id_carrito', ondelete='RESTRICT', onupdate='CASCADE'),
+        nullable=False,
+        unique=True
+    )
+
+    # Estado del pedido
+    estado = Column(String(20), default="pendiente", server_default="pendiente", nullable=False)
+
+    # Montos (snapshot del carrito)
+    total_items = Column(Integer, nullable=False)
+    subtotal = Column(Numeric(12, 2), nullable=False)
+    impuesto = Column(Numeric(10, 2), default=0.00, nullable=False)
+    envio = Column(Numeric(10, 2), default=0.00, nullable=False)
+    total = Column(Numeric(12, 2), nullable=False)
+
+    # Auditoría
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('total_items >= 1', name='ck_pedidos_con_items'),
+        CheckConstraint('subtotal >= 0 AND impuesto >= 0 AND envio >= 0', name='ck_pedidos_montos_no_negativos'),
+        CheckConstraint(
+            "estado IN ('pendiente', 'pagado', 'entregado', 'cancelado')",
+            name='ck_pedidos_estado_valido'
+        ),
+    )
+
+    # Relaciones ORM
+    items = relationship(
+        "PedidoItem",
+        back_populates="pedido",
+        cascade="all, delete-orphan",
+        order_by="PedidoItem.id_item_pedido"
+    )
+
+    def __repr__(self):
+        return f"<Pedido(id={self.id_pedido}, usuario_id={self.usuario_id}, total={self.total}, estado={self.estado})>"
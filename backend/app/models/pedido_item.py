@@ -0,0 +1,65 @@
+"""
+Modelo ORM para PedidoItem
+
+Mapea la tabla 'pedidos_items': líneas de un pedido (histórico de compras).
+"""
+
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class PedidoItem(Base):
+    """
+    Modelo de PedidoItem (mapea a tabla 'pedidos_items')
+
+    Guarda el título y el precio del producto al momento de la compra.
+
+    Relaciones:
+    - pedidos (1) ← pedidos_items (N)
+    - productos (1) ← pedidos_items (N)
+    """
+    __tablename__ = "pedidos_items"
+
+    # Clave primaria
+    id_item_pedido = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign keys
+    pedido_id = Column(
+        Integer,
+        ForeignKey('pedidos.id_pedido', ondelete='CASCADE', onupdate='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    producto_id = Column(
+        Integer,
+        ForeignKey('productos.id_producto', ondelete='RESTRICT', onupdate='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    # Snapshot del producto y de la línea del carrito
+    titulo = Column(String(200), nullable=False)
+    cantidad = Column(Integer, nullable=False)
+    precio_unitario = Column(Numeric(10, 2), nullable=False)
+    subtotal = Column(Numeric(12, 2), nullable=False)
+
+    # Auditoría
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('cantidad >= 1', name='ck_pedidos_items_cantidad_positiva'),
+        CheckConstraint('precio_unitario >= 0', name='ck_pedidos_items_precio_no_negativo'),
+    )
+
+    # Relaciones ORM
+    pedido = relationship(
+        "Pedido",
+        back_populates="items"
+    )
+
+    def __repr__(self):
+        return f"<PedidoItem(id={self.id_item_pedido}, pedido_id={self.pedido_id}, producto_id={self.producto_id})>"
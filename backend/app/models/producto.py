@@ -4,7 +4,7 @@ Modelo ORM para Producto
 Mapea la tabla 'productos' de la base de datos.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, CheckConstraint, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -56,6 +56,9 @@ class Producto(Base):
             name='ck_productos_rating_range'
         ),
         CheckConstraint('rating_count >= 0', name='ck_productos_rating_count_no_negativo'),
+        # Índices para paginación keyset (seek) ordenada por precio
+        Index('ix_productos_precio_id', 'precio', 'id_producto'),
+        Index('ix_productos_categoria_precio_id', 'categoria', 'precio', 'id_producto'),
     )
     
     # Relaciones ORM
@@ -77,3 +80,79 @@ class Producto(Base):
                 "count": self.rating_count or 0
             }
         return None
+
+
+# ==================== BÚSQUEDA DE TEXTO COMPLETO ====================
+# Usado por app/services/search.py y por la migración 8e4f2a6c1d93
+
+# Config de idioma para tsvector (coincide con database_schema.sql)
+PG_TS_CONFIG = "spanish"
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+        titulo,
+        descripcion,
+        content='productos',
+        content_rowid='id_producto',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_fts_insert AFTER INSERT ON productos BEGIN
+        INSERT INTO productos_fts(rowid, titulo, descripcion)
+        VALUES (new.id_producto, new.titulo, new.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_fts_delete AFTER DELETE ON productos BEGIN
+        INSERT INTO productos_fts(productos_fts, rowid, titulo, descripcion)
+        VALUES ('delete', old.id_producto, old.titulo, old.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_fts_update AFTER UPDATE OF titulo, descripcion ON productos BEGIN
+        INSERT INTO productos_fts(productos_fts, rowid, titulo, descripcion)
+        VALUES ('delete', old.id_producto, old.titulo, old.descripcion);
+        INSERT INTO productos_fts(rowid, titulo, descripcion)
+        VALUES (new.id_producto, new.titulo, new.descripcion);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS tr_productos_fts_update",
+    "DROP TRIGGER IF EXISTS tr_productos_fts_delete",
+    "DROP TRIGGER IF EXISTS tr_productos_fts_insert",
+    "DROP TABLE IF EXISTS productos_fts",
+]
+
+# Reconstruye el índice FTS5 desde 'productos' (para tablas con datos previos)
+SQLITE_FTS_REBUILD = "INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')"
+
+POSTGRES_SEARCH_DDL = [
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_productos_titulo_busqueda
+    ON productos USING gin(to_tsvector('{PG_TS_CONFIG}', titulo))
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_productos_descripcion_busqueda
+    ON productos USING gin(to_tsvector('{PG_TS_CONFIG}', coalesce(descripcion, '')))
+    """,
+]
+
+POSTGRES_SEARCH_DROP = [
+    "DROP INDEX IF EXISTS idx_productos_descripcion_busqueda",
+    "DROP INDEX IF EXISTS idx_productos_titulo_busqueda",
+]
+
+# Event listeners: create_tables()/create_all también crean el índice de búsqueda
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Producto.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Producto.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Producto.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS productos_fts").execute_if(dialect="sqlite")
+)
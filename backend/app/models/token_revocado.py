@@ -0,0 +1,47 @@
+"""
+Modelo ORM para TokenRevocado
+
+Mapea la tabla 'tokens_revocados': jti de los JWT revocados por logout
+(ver app/services/revocation.py). Cada worker los refleja en un filtro
+de Bloom en memoria.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class TokenRevocado(Base):
+    """
+    Modelo de TokenRevocado (mapea a tabla 'tokens_revocados')
+
+    revocado_at lo pone la base: los workers leen solo las filas
+    revocadas desde el último sync (con un solape) para actualizar su filtro.
+
+    Relaciones:
+    - usuarios (1) ← tokens_revocados (N)
+    """
+    __tablename__ = "tokens_revocados"
+
+    # Clave primaria
+    id_revocacion = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Claim 'jti' del token
+    jti = Column(String(64), nullable=False, unique=True)
+    usuario_id = Column(
+        Integer,
+        ForeignKey('usuarios.id_usuario', ondelete='CASCADE', onupdate='CASCADE'),
+        nullable=False
+    )
+
+    # Auditoría y expiración ('exp' del token: después ya no hace falta la fila)
+    revocado_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_tokens_revocados_expires_at', 'expires_at'),
+        Index('ix_tokens_revocados_revocado_at', 'revocado_at'),
+    )
+
+    def __repr__(self):
+        return f"<TokenRevocado(jti='{self.jti}', usuario_id={self.usuario_id})>"
@@ -0,0 +1,218 @@
+"""
+Límite de requests por cliente con token buckets, por prefijo de ruta
+
+Middleware ASGI puro (sin BaseHTTPMiddleware, que agrega una tarea y
+copias del body por request). Cada prefijo de RATE_LIMIT_BUDGETS tiene
+su propio presupuesto: `rate` tokens por segundo y una ráfaga máxima de
+`burst`. Cada request a una ruta con ese prefijo gasta un token del
+bucket de su cliente; sin tokens responde 429 con Retry-After (segundos
+hasta que se recargue uno) sin llegar a la ruta.
+
+Cliente: el usuario del Bearer token ("u:<id>", claims desde la caché de
+services/auth.py) o, sin token válido, la IP ("ip:<dirección>").
+
+IP detrás de un proxy: por defecto es la de la conexión (scope["client"]),
+que detrás de nginx o un balanceador es la del proxy para todos. Dos
+opciones:
+- uvicorn --proxy-headers --forwarded-allow-ips=<IP del proxy>: uvicorn
+  reescribe scope["client"] con X-Forwarded-For y aquí no hay que
+  configurar nada.
+- RATE_LIMIT_TRUSTED_PROXIES (IPs o redes CIDR): si la conexión viene de
+  uno de ellos se usa la última dirección de X-Forwarded-For que no sea
+  otro proxy de confianza. El resto del header lo puede escribir el
+  cliente, así que nunca se lee si la conexión no viene de un proxy de
+  confianza.
+
+Estado: por presupuesto, un OrderedDict cliente → [tokens, último
+request] en orden LRU (cada request mueve su cliente al final). La
+recarga es perezosa: se calcula al llegar el siguiente request, sin
+timers. Un bucket que pasó burst/rate segundos sin requests está lleno y
+equivale a no tenerlo, así que al superar RATE_LIMIT_MAX_KEYS se
+descartan esos primero y luego los de uso menos reciente. Cada worker cuenta
+aparte: con N workers el límite efectivo es hasta N veces el configurado.
+
+Uso:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limit.limiter)
+"""
+
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from .config import settings
+from .responses import send_retry_later
+from .services import auth as auth_service
+
+
+class TokenBucketBudget:
+    """Buckets de un prefijo de ruta: `rate` tokens/s con ráfaga de `burst`"""
+
+    def __init__(self, prefix: str, rate: float, burst: float, max_keys: int, clock=time.monotonic):
+        self.prefix = prefix
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, List[float]] = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def take(self, client: str) -> float:
+        """Gasta un token de `client`: retorna 0 o los segundos a esperar"""
+        now = self._clock()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            self._buckets[client] = [self.burst - 1, now]
+            self.allowed += 1
+            return 0.0
+        self._buckets.move_to_end(client)
+        tokens = bucket[0] + (now - bucket[1]) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            self.allowed += 1
+            return 0.0
+        bucket[0] = tokens
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def _evict(self, now: float) -> None:
+        """
+        Descarta los buckets ya llenos; si no alcanza, los de uso menos
+        reciente hasta dejar un 10% libre (así el recorrido no se repite en
+        cada cliente nuevo)
+        """
+        full_after = self.burst / self.rate
+        stale = [client for client, (_, last) in self._buckets.items() if now - last >= full_after]
+        for client in stale:
+            del self._buckets[client]
+        excess = len(self._buckets) - (self.max_keys - max(1, self.max_keys // 10))
+        for _ in range(excess):
+            self._buckets.popitem(last=False)
+        self.evictions += len(stale) + max(0, excess)
+
+    def stats(self) -> dict:
+        return {
+            "prefix": self.prefix,
+            "rate": self.rate,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "max_keys": self.max_keys,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
+
+
+def matches_prefix(path: str, prefix: str) -> bool:
+    """¿`path` está bajo `prefix`? Por segmentos: /api/cartX no es /api/cart"""
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
+
+
+class RateLimiter:
+    """Presupuestos por prefijo (el más largo que coincide gana)"""
+
+    def __init__(self, budgets: Dict[str, List[float]], max_keys: int, enabled: bool = True, clock=time.monotonic):
+        self.enabled = enabled
+        self.budgets: List[TokenBucketBudget] = sorted(
+            (TokenBucketBudget(prefix, rate, burst, max_keys, clock) for prefix, (rate, burst) in budgets.items()),
+            key=lambda budget: len(budget.prefix),
+            reverse=True,
+        )
+
+    def budget_for(self, path: str) -> Optional[TokenBucketBudget]:
+        for budget in self.budgets:
+            if matches_prefix(path, budget.prefix):
+                return budget
+        return None
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "budgets": [budget.stats() for budget in self.budgets]}
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(entries: List[str]) -> List[Network]:
+    """IPs o redes CIDR de la configuración ("10.0.0.0/8", "127.0.0.1")"""
+    return [ipaddress.ip_network(entry, strict=False) for entry in entries]
+
+
+def _is_trusted(address: str, networks: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+trusted_proxies = parse_networks(settings.RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def client_ip(scope: dict) -> str:
+    """
+    IP del cliente: la de la conexión o, si la conexión viene de un proxy
+    de confianza, la última de X-Forwarded-For que no sea otro proxy de
+    confianza (la que agregó nuestro proxy; las anteriores las controla
+    el cliente)
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not trusted_proxies or not _is_trusted(peer, trusted_proxies):
+        return peer
+    forwarded = b",".join(value for name, value in scope["headers"] if name == b"x-forwarded-for")
+    for address in reversed(forwarded.decode("latin-1").split(",")):
+        address = address.strip()
+        if address and not _is_trusted(address, trusted_proxies):
+            return address
+    return peer
+
+
+def client_key(scope: dict) -> str:
+    """Usuario del Bearer token si es válido; si no, IP del cliente"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            if value[:7].lower() == b"bearer ":
+                try:
+                    claims = auth_service.decode_access_token(value[7:].decode("latin-1"))
+                    return "u:" + claims["sub"]
+                except auth_service.InvalidTokenError:
+                    pass
+            break
+    return "ip:" + client_ip(scope)
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI: aplica `limiter` a los requests HTTP"""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            return await self.app(scope, receive, send)
+        budget = self.limiter.budget_for(scope["path"])
+        if budget is None:
+            return await self.app(scope, receive, send)
+        wait = budget.take(client_key(scope))
+        if not wait:
+            return await self.app(scope, receive, send)
+        retry_after = max(1, math.ceil(wait))
+        await send_retry_later(
+            send, 429, f"Demasiados requests a {budget.prefix}; reintenta en {retry_after} s", retry_after
+        )
+
+
+limiter = RateLimiter(settings.RATE_LIMIT_BUDGETS, settings.RATE_LIMIT_MAX_KEYS, settings.RATE_LIMIT_ENABLED)
+
+
+def rate_limit_stats() -> dict:
+    return limiter.stats()
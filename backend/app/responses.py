@@ -0,0 +1,118 @@
+"""
+Respuestas JSON rápidas para endpoints calientes
+
+El camino por defecto de FastAPI valida el dict de la ruta contra el
+response_model (Pydantic), lo pasa por jsonable_encoder y luego por
+json.dumps. Para páginas de 100 productos ese doble trabajo domina el CPU.
+
+Las rutas del catálogo y del carrito ya construyen dicts con la forma
+exacta del schema (ver services/catalog.py y services/cart.py), así que
+pueden serializarlos directamente con orjson y devolver la respuesta sin
+pasar por response_model (el schema sigue documentando la ruta en /docs).
+
+orjson es opcional: sin él se usa json.dumps con un encoder mínimo.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Hashable, Mapping, Optional
+
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .services.cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _default(value: Any):
+    """Tipos que json.dumps no conoce (mismo formato que orjson)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa a JSON (bytes) con orjson si está instalado"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse que serializa con orjson y acepta bytes ya serializados.
+
+    Uso en rutas:
+        return FastJSONResponse(content=data, headers={"ETag": etag})
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+def fast_response(
+    content: Any,
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200
+) -> Any:
+    """
+    Devuelve FastJSONResponse si FAST_JSON_RESPONSES está activo; si no,
+    retorna el contenido tal cual para el camino estándar de FastAPI.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+    return FastJSONResponse(content=content, headers=headers, status_code=status_code)
+
+
+def cached_fast_response(
+    cache: TTLCache,
+    key: Hashable,
+    loader: Callable[[], Any],
+    headers: Optional[Mapping[str, str]] = None
+) -> Any:
+    """
+    Igual que fast_response pero guarda los bytes serializados en `cache`.
+    Usar con una clave que identifique exactamente el contenido (ej: el
+    ETag): los requests siguientes no vuelven a serializar.
+    Respeta CATALOG_CACHE_ENABLED (sin caché se serializa cada vez).
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return loader()
+    if settings.CATALOG_CACHE_ENABLED:
+        body = cache.get_or_load(key, lambda: dumps(loader()))
+    else:
+        body = dumps(loader())
+    return FastJSONResponse(content=body, headers=headers)
+
+
+async def send_retry_later(send: Callable, status_code: int, detail: str, retry_after: int) -> None:
+    """
+    Respuesta de error con Retry-After enviada directamente por ASGI, para
+    los middlewares que rechazan un request antes de llegar a la app
+    (app/rate_limit.py, app/admission.py).
+    """
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(retry_after).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,171 @@
+"""
+Rutas de autenticación
+
+Registro y login con JWT. Son async def: el bcrypt de cada contraseña
+corre en el pool de procesos de app/services/passwords.py, así un pico
+de logins no congela el event loop para el resto de las rutas. Si el
+pool ya tiene PASSWORD_QUEUE_MAX operaciones en curso responden 503 con
+Retry-After en vez de encolar. Antes de buscar el usuario, cada login
+pasa por el limitador de intentos por cuenta e IP (ver
+app/services/login_limiter.py): superado el límite responde 429 sin
+tocar la base ni bcrypt.
+
+Registro y login fusionan el carrito de invitado de la cookie (si la
+hay) con el carrito del usuario y borran la cookie (ver
+app/services/guest_cart.py), así no se pierde lo agregado sin sesión.
+
+GET /me resuelve el token por las cachés de app/security.py; POST /logout
+revoca el token (ver app/services/revocation.py).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import rate_limit
+from ..config import settings
+from ..database import get_async_db
+from ..schemas import Token, UserCreate, UserLogin
+from ..security import bearer_scheme, get_current_user
+from ..services import auth as auth_service
+from ..services import guest_cart, login_limiter, passwords, revocation
+from ..services.auth import Principal
+
+router = APIRouter()
+
+# Segundos sugeridos al cliente cuando el pool de contraseñas está lleno
+BUSY_RETRY_AFTER_SECONDS = 1
+
+
+def _busy(error: passwords.PasswordServiceBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(BUSY_RETRY_AFTER_SECONDS)}
+    )
+
+
+async def _merge_guest_cart(request: Request, response: Response, db: AsyncSession, usuario_id: int) -> None:
+    """
+    Fusiona el carrito de invitado de la cookie con el del usuario y borra
+    la cookie; X-Guest-Cart-Skipped lista los productos omitidos
+    """
+    token = request.cookies.get(settings.GUEST_CART_COOKIE_NAME)
+    if token is None:
+        return
+    items = guest_cart.decode(token)
+    if items:
+        skipped = await db.run_sync(guest_cart.merge_into_cart, usuario_id, items)
+        if skipped:
+            response.headers["X-Guest-Cart-Skipped"] = ",".join(map(str, skipped))
+    response.delete_cookie(settings.GUEST_CART_COOKIE_NAME)
+
+
+@router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
+async def register(
+    request: Request,
+    response: Response,
+    user: UserCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Registrar un usuario y retornar su token de acceso
+
+    - **user**: email, username, password (mín. 8) y nombre opcional; la
+      cuenta se identifica por email (username no se guarda)
+    - **Retorna**: el token; fusiona el carrito de invitado igual que /login
+    - **Error 409**: Si el email ya está registrado
+    - **Error 503**: Si hay demasiados logins/registros en curso
+    """
+    if await db.run_sync(auth_service.get_user_by_email, user.email) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"El email {user.email} ya está registrado")
+    try:
+        password_hash = await passwords.hash_password(user.password)
+    except passwords.PasswordServiceBusyError as error:
+        raise _busy(error)
+    try:
+        usuario = await db.run_sync(auth_service.create_user, user.email, password_hash, user.full_name)
+    except auth_service.EmailAlreadyRegisteredError as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+    await _merge_guest_cart(request, response, db, usuario.id_usuario)
+    return {"access_token": auth_service.create_access_token(usuario), "token_type": "bearer"}
+
+
+async def _limit(call, db: AsyncSession, *args):
+    """Corre una operación del limitador, en el hilo de la sesión si usa la base"""
+    if login_limiter.limiter.uses_database:
+        return await db.run_sync(call, *args)
+    return call(None, *args)
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    request: Request,
+    response: Response,
+    credentials: UserLogin,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Autenticar con email y contraseña y generar un token JWT
+
+    - **credentials**: username (email) y password
+    - **Retorna**: el token; si llegó la cookie del carrito de invitado, lo
+      fusiona con el carrito del usuario (header X-Guest-Cart-Skipped con
+      los productos omitidos) y borra la cookie
+    - **Error 401**: Credenciales incorrectas o cuenta desactivada
+    - **Error 429**: Demasiados intentos para la cuenta o la IP (header Retry-After)
+    - **Error 503**: Si hay demasiados logins en curso (header Retry-After)
+    """
+    ip = rate_limit.client_ip(request.scope)
+    try:
+        await _limit(login_limiter.limiter.hit, db, ip, credentials.username)
+    except login_limiter.LoginThrottledError as error:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    usuario = await db.run_sync(auth_service.get_user_by_email, credentials.username)
+    try:
+        valid = await passwords.verify_password(
+            credentials.password, usuario.password_hash if usuario is not None else None
+        )
+    except passwords.PasswordServiceBusyError as error:
+        raise _busy(error)
+    if not valid or not usuario.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales incorrectas",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    await _limit(login_limiter.limiter.succeeded, db, ip, credentials.username)
+    await _merge_guest_cart(request, response, db, usuario.id_usuario)
+    return {"access_token": auth_service.create_access_token(usuario), "token_type": "bearer"}
+
+
+@router.get("/me")
+async def me(user: Principal = Depends(get_current_user)):
+    """
+    Usuario del token: id, is_admin e is_active
+
+    - **Error 401**: Sin token, token inválido o vencido, o usuario desactivado
+    """
+    return user._asdict()
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Revocar el token actual: los requests siguientes con él reciben 401
+    (en otros workers, a lo sumo REVOCATION_SYNC_SECONDS después)
+
+    - **Error 401**: Sin token, token inválido, vencido o ya revocado
+    """
+    claims = auth_service.decode_access_token(credentials.credentials)
+    if "jti" in claims:
+        await db.run_sync(revocation.revoke, claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,358 @@
+"""
+Rutas del carrito de compras
+
+Endpoints del carrito activo del usuario respaldados por la base de datos.
+Las lecturas son async def sobre AsyncSession y reutilizan el servicio
+sync con `db.run_sync(...)` (ver app/database.py).
+
+Agregar/cambiar/quitar items reserva o libera stock en la misma
+transacción (ver app/services/stock.py): 409 si no hay stock suficiente.
+Los productos en flash sale se reservan en memoria y se escriben al
+carrito por tandas (ver app/services/flash_sale.py): 202 con un cuerpo
+corto en lugar del carrito completo, enviado cuando la venta ya está
+escrita.
+
+Las rutas que modifican el carrito aceptan el header Idempotency-Key: un
+reintento con la misma clave repite la respuesta original sin volver a
+escribir (ver app/idempotency.py). Excepción: agregar un producto en
+flash sale, que se escribe en las tandas de flash_sale y no en la
+transacción del request.
+
+/guest/*: carrito de invitado en una cookie firmada, sin escribir en la
+base; /api/auth/login y /register lo fusionan con el carrito del usuario
+(también /guest/merge, para un cliente que ya tiene token; ver
+app/services/guest_cart.py).
+
+El usuario sale del token Bearer (ver app/security.py): con las cachés
+de autenticación calientes no se consulta 'usuarios'.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import idempotency
+from ..config import settings
+from ..database import get_async_db, get_db
+from ..responses import fast_response
+from ..schemas import CartBatchRequest, CartItemCreate, CartItemUpdate, CartResponse, CartSummaryResponse
+from ..security import current_user_id
+from ..services import cart as cart_service
+from ..services import flash_sale
+from ..services import guest_cart
+from ..services import stock as stock_service
+
+router = APIRouter()
+
+
+def _raise_http(error: Exception):
+    """Traduce los errores del servicio de carrito/stock a HTTPException"""
+    if isinstance(error, stock_service.InsufficientStockError):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+    if isinstance(error, (stock_service.ProductNotFoundError, cart_service.CartItemNotFoundError)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error))
+    if isinstance(error, guest_cart.GuestCartLimitError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    raise error
+
+
+def _guest_items(request: Request) -> dict:
+    return guest_cart.decode(request.cookies.get(settings.GUEST_CART_COOKIE_NAME))
+
+
+def _guest_response(content: dict, items: dict, response: Response):
+    """Respuesta del carrito de invitado con la cookie actualizada (o borrada si quedó vacío)"""
+    result = fast_response(content)
+    target = result if isinstance(result, Response) else response
+    if items:
+        target.set_cookie(
+            settings.GUEST_CART_COOKIE_NAME,
+            guest_cart.encode(items),
+            max_age=settings.GUEST_CART_TTL_DAYS * 86400,
+            httponly=True,
+            secure=settings.GUEST_CART_COOKIE_SECURE,
+            samesite="lax",
+        )
+    else:
+        target.delete_cookie(settings.GUEST_CART_COOKIE_NAME)
+    return result
+
+
+@router.get("/", response_model=CartResponse)
+async def get_cart(
+    user_id: int = Depends(current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener el carrito activo del usuario
+
+    - **user_id**: ID del usuario (del token Bearer; sin token, query param en desarrollo)
+    - **Retorna**: CartResponse con todos los items (1 query)
+    """
+    return fast_response(await db.run_sync(cart_service.get_cart_response, user_id))
+
+
+@router.get("/summary", response_model=CartSummaryResponse)
+async def get_cart_summary(
+    user_id: int = Depends(current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener solo los totales del carrito activo (1 query)
+
+    - **user_id**: ID del usuario (del token Bearer; sin token, query param en desarrollo)
+    - **Error 404**: Si el usuario no tiene carrito activo
+    """
+    summary = await db.run_sync(cart_service.get_cart_summary, user_id)
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El usuario no tiene un carrito activo"
+        )
+    return fast_response(summary)
+
+
+@router.post(
+    "/items",
+    response_model=CartResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"description": "Producto en flash sale: venta confirmada y escrita en el carrito (sin el carrito en el cuerpo)"}}
+)
+def add_item(
+    item: CartItemCreate,
+    request: Request,
+    user_id: int = Depends(current_user_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Agregar un producto al carrito (reserva el stock)
+
+    - **item**: producto y cantidad; si ya está en el carrito se suma
+    - **Idempotency-Key**: opcional; los reintentos repiten la respuesta
+      (no aplica a productos en flash sale: se ignora)
+    - **202**: Producto en flash sale; la venta está confirmada y el item ya
+      está en el carrito (la respuesta no lo incluye: pedir GET /api/cart)
+    - **Error 404**: Si el producto no existe o está inactivo
+    - **Error 409**: Si no hay stock suficiente
+    """
+    if flash_sale.handles(item.product_id):
+        # La venta la escribe una tanda de flash_sale con su propia sesión,
+        # fuera de la transacción donde idempotency guarda la respuesta
+        try:
+            precio = flash_sale.reserve(user_id, item.product_id, item.quantity)
+        except (LookupError, ValueError) as error:
+            _raise_http(error)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": "reserved",
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "product_price": float(precio),
+            }
+        )
+
+    def handler(commit: bool):
+        try:
+            cart_service.add_item(db, user_id, item.product_id, item.quantity, commit=commit)
+        except (LookupError, ValueError) as error:
+            _raise_http(error)
+        return fast_response(cart_service.get_cart_response(db, user_id), status_code=status.HTTP_201_CREATED)
+
+    return idempotency.run(
+        db, request, user_id, idempotency_key, handler, payload=item, status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.patch("/items:batch", response_model=CartResponse)
+def apply_batch(
+    batch: CartBatchRequest,
+    request: Request,
+    user_id: int = Depends(current_user_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Aplicar varias operaciones al carrito en una transacción
+
+    Reemplaza una secuencia de POST/PUT/DELETE de items por un solo request
+    (por ejemplo, al sincronizar una sesión de edición del carrito).
+
+    - **operations**: lista ordenada de `add` (product_id, quantity),
+      `update` (item_id, quantity) y `remove` (item_id)
+    - **Retorna**: el CartResponse recalculado, una vez
+    - **Idempotency-Key**: opcional; los reintentos repiten la respuesta
+    - **Error 404**: Si un producto o item no existe (no se aplica nada)
+    - **Error 409**: Si no hay stock suficiente (no se aplica nada)
+    """
+    def handler(commit: bool):
+        try:
+            cart_service.apply_batch(db, user_id, batch.operations, commit=commit)
+        except (LookupError, ValueError) as error:
+            _raise_http(error)
+        return fast_response(cart_service.get_cart_response(db, user_id))
+
+    return idempotency.run(db, request, user_id, idempotency_key, handler, payload=batch)
+
+
+@router.put("/items/{item_id}", response_model=CartResponse)
+def update_item(
+    item_id: int,
+    item: CartItemUpdate,
+    request: Request,
+    user_id: int = Depends(current_user_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Cambiar la cantidad de un item (reserva o libera la diferencia)
+
+    - **Idempotency-Key**: opcional; los reintentos repiten la respuesta
+    - **Error 404**: Si el item no está en el carrito activo
+    - **Error 409**: Si no hay stock para la nueva cantidad
+    """
+    def handler(commit: bool):
+        try:
+            cart_service.update_item_quantity(db, user_id, item_id, item.quantity, commit=commit)
+        except (LookupError, ValueError) as error:
+            _raise_http(error)
+        return fast_response(cart_service.get_cart_response(db, user_id))
+
+    return idempotency.run(db, request, user_id, idempotency_key, handler, payload=item)
+
+
+@router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_item(
+    item_id: int,
+    request: Request,
+    user_id: int = Depends(current_user_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Quitar un item del carrito (libera su stock)
+
+    - **Idempotency-Key**: opcional; un reintento responde 204 otra vez en
+      lugar de 404
+    - **Error 404**: Si el item no está en el carrito activo
+    """
+    def handler(commit: bool):
+        try:
+            cart_service.remove_item(db, user_id, item_id, commit=commit)
+        except LookupError as error:
+            _raise_http(error)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    return idempotency.run(db, request, user_id, idempotency_key, handler)
+
+
+# ==================== CARRITO DE INVITADO ====================
+
+@router.get("/guest", response_model=CartResponse)
+async def get_guest_cart(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Obtener el carrito de invitado (cookie firmada; solo lecturas cacheadas)
+
+    - **Retorna**: CartResponse con user_id 0 y precios actuales; el id de
+      cada item es el id del producto
+    """
+    items = _guest_items(request)
+    return fast_response(await db.run_sync(guest_cart.guest_cart_response, items))
+
+
+@router.post("/guest/items", response_model=CartResponse)
+async def add_guest_item(
+    item: CartItemCreate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Agregar un producto al carrito de invitado (suma si ya está)
+
+    No escribe en la base ni reserva stock: la reserva ocurre en /guest/merge.
+
+    - **Error 404**: Si el producto no existe o está inactivo
+    - **Error 409**: Si no hay stock suficiente (según el catálogo)
+    - **Error 400**: Si se supera GUEST_CART_MAX_ITEMS productos
+    """
+    items = _guest_items(request)
+    cantidad = items.get(item.product_id, 0) + item.quantity
+    try:
+        await db.run_sync(guest_cart.check_product, item.product_id, cantidad)
+        items = guest_cart.set_quantity(items, item.product_id, cantidad)
+    except (LookupError, ValueError) as error:
+        _raise_http(error)
+    return _guest_response(await db.run_sync(guest_cart.guest_cart_response, items), items, response)
+
+
+@router.put("/guest/items/{product_id}", response_model=CartResponse)
+async def update_guest_item(
+    product_id: int,
+    item: CartItemUpdate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cambiar la cantidad de un producto del carrito de invitado
+
+    - **Error 404**: Si el producto no está en el carrito de invitado
+    - **Error 409**: Si no hay stock suficiente (según el catálogo)
+    """
+    items = _guest_items(request)
+    if product_id not in items:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no está en el carrito")
+    try:
+        await db.run_sync(guest_cart.check_product, product_id, item.quantity)
+    except (LookupError, ValueError) as error:
+        _raise_http(error)
+    items = guest_cart.set_quantity(items, product_id, item.quantity)
+    return _guest_response(await db.run_sync(guest_cart.guest_cart_response, items), items, response)
+
+
+@router.delete("/guest/items/{product_id}", response_model=CartResponse)
+async def remove_guest_item(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Quitar un producto del carrito de invitado (idempotente)
+
+    - **Retorna**: el carrito de invitado actualizado
+    """
+    items = guest_cart.set_quantity(_guest_items(request), product_id, 0)
+    return _guest_response(await db.run_sync(guest_cart.guest_cart_response, items), items, response)
+
+
+@router.post("/guest/merge", response_model=CartResponse)
+def merge_guest_cart(
+    request: Request,
+    response: Response,
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Fusionar el carrito de invitado con el carrito activo del usuario
+
+    Login y registro ya lo hacen; esta ruta es para un cliente que ya
+    tiene token cuando llega la cookie. Reserva el stock y agrega todo con
+    un solo upsert; borra la cookie del invitado.
+
+    - **user_id**: ID del usuario (del token Bearer; sin token, query param en desarrollo)
+    - **Retorna**: el CartResponse del usuario; el header
+      X-Guest-Cart-Skipped lista los productos omitidos (inexistentes o
+      agotados). Si había menos stock que lo pedido se agrega lo disponible
+    """
+    skipped = guest_cart.merge_into_cart(db, user_id, _guest_items(request))
+    result = _guest_response(cart_service.get_cart_response(db, user_id), {}, response)
+    if skipped:
+        target = result if isinstance(result, Response) else response
+        target.headers["X-Guest-Cart-Skipped"] = ",".join(map(str, skipped))
+    return result
@@ -0,0 +1,113 @@
+"""
+Rutas internas de monitoreo
+
+Expone contadores del proceso (cachés, pools de conexiones) para
+dashboards y para dimensionar cada worker, y tareas de mantenimiento
+(liberar reservas de stock vencidas, archivar carritos abandonados,
+borrar claves de idempotencia y revocaciones vencidas) para un cron. No
+se publica en la documentación OpenAPI. Todas las rutas requieren el
+token de un usuario administrador: las métricas exponen estado interno
+(stock de flash sale, clientes limitados, tamaño de los pools).
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from .. import admission, idempotency, rate_limit
+from ..config import settings
+from ..database import get_db
+from ..security import get_current_admin
+from ..services import auth, cart_sweeper, catalog, flash_sale, login_limiter, passwords, pool_metrics, revocation, stock
+from ..services.auth import Principal
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(admin: Principal = Depends(get_current_admin)):
+    """
+    Métricas del worker actual
+
+    - **caches**: hits/misses/evictions de las cachés en memoria
+    - **pools**: conexiones en uso, overflow, timeouts y espera de checkout
+      (p50/p99/max) de cada engine
+    - **flash_sale**: stock en memoria, ventas pendientes de escritura y
+      asignaciones (null si el modo está desactivado)
+    - **cart_sweeper**: última pasada del sweeper de carritos de este
+      worker (null si solo corre por cron)
+    - **passwords**: pool de bcrypt (operaciones en curso, pico,
+      rechazadas con 503 y latencia media)
+    - **revocation**: filtro de Bloom de tokens revocados (memoria,
+      tasa de falsos positivos esperada y observada, consultas a la base)
+    - **login_limiter**: intentos de login admitidos y rechazados con 429,
+      claves en memoria y compactaciones
+    - **rate_limit**: token buckets por prefijo de ruta (clientes,
+      requests admitidos y rechazados con 429)
+    - **admission**: límite de concurrencia adaptativo, requests en curso
+      y, por clase de ruta, admitidos, encolados, descartados con 503 y
+      espera en cola (p50/p99)
+    """
+    return {
+        "caches": catalog.cache_stats() + [idempotency.response_cache.stats()] + auth.cache_stats(),
+        "pools": pool_metrics.pool_stats(),
+        "flash_sale": flash_sale.flash_sale_stats(),
+        "cart_sweeper": cart_sweeper.sweeper_stats(),
+        "passwords": passwords.password_stats(),
+        "revocation": revocation.revocation_stats(),
+        "login_limiter": login_limiter.limiter_stats(),
+        "rate_limit": rate_limit.rate_limit_stats(),
+        "admission": admission.admission_stats(),
+    }
+
+
+@router.post("/stock/release-expired", include_in_schema=False)
+def release_expired_reservations(
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """
+    Libera las reservas de stock de carritos sin actividad en
+    CART_RESERVATION_TTL_MINUTES (pensado para un cron cada pocos minutos)
+    """
+    released = stock.release_expired_reservations(db, settings.CART_RESERVATION_TTL_MINUTES)
+    return {"released_items": released}
+
+
+@router.post("/carts/sweep", include_in_schema=False)
+def sweep_abandoned_carts(
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """
+    Archiva por lotes los carritos sin actividad en CART_ARCHIVE_AFTER_DAYS
+    (libera su stock) y los items de carritos ya convertidos en pedido.
+    Retorna filas archivadas y filas por segundo.
+    """
+    return cart_sweeper.sweep(db)
+
+
+@router.post("/idempotency/purge", include_in_schema=False)
+def purge_idempotency_keys(
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """Borra las Idempotency-Key vencidas (IDEMPOTENCY_TTL_HOURS)"""
+    return {"purged_keys": idempotency.purge_expired(db)}
+
+
+@router.post("/revocations/purge", include_in_schema=False)
+def purge_revocations(
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """Borra las revocaciones de tokens ya vencidos (el filtro de este worker se reconstruye)"""
+    return {"purged_revocations": revocation.purge_expired(db)}
+
+
+@router.post("/login-attempts/compact", include_in_schema=False)
+def compact_login_attempts(
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """Descarta los contadores de login sin intentos en las dos últimas ventanas"""
+    return {"removed_keys": login_limiter.limiter.compact(db)}
@@ -0,0 +1,73 @@
+"""
+Rutas de pedidos
+
+Checkout del carrito activo (lo convierte en pedido en una transacción,
+ver app/services/orders.py) y consulta de pedidos. El checkout acepta el
+header Idempotency-Key (ver app/idempotency.py).
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from .. import idempotency
+from ..database import get_db
+from ..responses import fast_response
+from ..schemas import OrderResponse
+from ..security import current_user_id
+from ..services import orders as order_service
+
+router = APIRouter()
+
+
+@router.post("/checkout", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+def checkout(
+    request: Request,
+    user_id: int = Depends(current_user_id),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    """
+    Confirmar el carrito activo como pedido
+
+    Copia los items con su precio actual del carrito, calcula los totales y
+    desactiva el carrito (el stock ya estaba reservado).
+
+    - **user_id**: ID del usuario (del token Bearer; sin token, query param en desarrollo)
+    - **Idempotency-Key**: opcional; un reintento devuelve el mismo pedido
+      en lugar de 404 (el carrito ya no está activo)
+    - **Error 404**: Si el usuario no tiene carrito activo
+    - **Error 400**: Si el carrito está vacío
+    """
+    def handler(commit: bool):
+        try:
+            pedido_id = order_service.checkout(db, user_id, commit=commit)
+        except order_service.CartNotFoundError as error:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error))
+        except order_service.EmptyCartError as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+        return fast_response(
+            order_service.get_order_response(db, user_id, pedido_id),
+            status_code=status.HTTP_201_CREATED
+        )
+
+    return idempotency.run(
+        db, request, user_id, idempotency_key, handler, status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
+def get_order(order_id: int, user_id: int = Depends(current_user_id), db: Session = Depends(get_db)):
+    """
+    Obtener un pedido del usuario
+
+    - **Error 404**: Si el pedido no existe o es de otro usuario
+    """
+    pedido = order_service.get_order_response(db, user_id, order_id)
+    if pedido is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Pedido con ID {order_id} no encontrado"
+        )
+    return fast_response(pedido)
@@ -0,0 +1,228 @@
+"""
+Rutas de productos (catálogo)
+
+Endpoints de lectura del catálogo respaldados por la base de datos.
+Las lecturas responden con FastJSONResponse (ver app/responses.py): el
+response_model documenta la forma pero no se vuelve a validar.
+
+Las lecturas calientes (listado, búsqueda y detalle) son async def sobre
+AsyncSession: la lógica es sync (servicios con db.query) y corre con
+`db.run_sync(...)`, así la I/O de la BD no bloquea el event loop ni ocupa
+un hilo del threadpool por request.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import get_async_db, get_db
+from ..responses import cached_fast_response, fast_response
+from ..schemas import ProductFilters, ProductPage, ProductResponse, ProductUpdate
+from ..security import get_current_admin
+from ..services import catalog, search
+from ..services.auth import Principal
+
+router = APIRouter()
+
+# Los clientes pueden guardar la respuesta pero deben revalidarla (If-None-Match)
+CACHE_CONTROL = "no-cache"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """¿El If-None-Match del cliente coincide con el ETag actual?"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def _not_modified(etag: str) -> Response:
+    """304 sin cuerpo: no se cargan entidades ni se serializa ProductResponse"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=_cache_headers(etag)
+    )
+
+
+@router.get("/", response_model=ProductPage)
+async def list_products(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior"),
+    page_size: int = Query(20, ge=1, le=100, description="Productos por página"),
+    category: Optional[str] = Query(None, description="Filtrar por categoría"),
+    search: Optional[str] = Query(None, max_length=100, description="Texto a buscar"),
+    min_price: Optional[float] = Query(None, ge=0, alias="minPrice"),
+    max_price: Optional[float] = Query(None, ge=0, alias="maxPrice"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, alias="minRating"),
+    sort: str = Query("id", pattern="^(id|price)$", description="Orden: id | price"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Listar productos activos con filtros y paginación keyset
+
+    - **cursor**: `next_cursor` de la respuesta anterior (omitir en la primera página)
+    - **page_size**: Productos por página (default: 20, max: 100)
+    - **category**: Filtrar por categoría (opcional)
+    - **search**: Texto en título o descripción (opcional)
+    - **minPrice** / **maxPrice**: Rango de precio (opcional)
+    - **minRating**: Rating mínimo (opcional)
+    - **sort**: `id` o `price` (precio ascendente, desempate por id)
+
+    Los filtros se aplican en la base de datos: solo viaja la página pedida.
+    Soporta GET condicional: con `If-None-Match` igual al ETag responde 304.
+    """
+    filters = ProductFilters(
+        category=category,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        min_rating=min_rating
+    )
+    return await db.run_sync(
+        list_products_response,
+        request,
+        response,
+        filters,
+        page_size=page_size,
+        cursor=cursor,
+        sort=sort
+    )
+
+
+def list_products_response(
+    db: Session,
+    request: Request,
+    response: Response,
+    filters: ProductFilters,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    sort: str = "id"
+):
+    """
+    Cuerpo sync del listado (ETag, 304 y página serializada).
+    Lo usa list_products vía run_sync; recibe una Session sync.
+    """
+    try:
+        etag = catalog.list_etag(db, page_size=page_size, cursor=cursor, filters=filters, sort=sort)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+    except catalog.InvalidCursorError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+    headers = _cache_headers(etag)
+    response.headers.update(headers)
+    # El ETag identifica la página exacta: se serializa una vez por versión
+    return cached_fast_response(
+        catalog.json_cache,
+        etag,
+        lambda: catalog.list_products_keyset(
+            db,
+            page_size=page_size,
+            cursor=cursor,
+            filters=filters,
+            sort=sort
+        ),
+        headers=headers
+    )
+
+
+@router.get("/categories", response_model=List[str])
+def list_categories(db: Session = Depends(get_db)):
+    """
+    Listar las categorías que tienen productos activos
+    """
+    return catalog.list_categories(db)
+
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar"),
+    limit: int = Query(20, ge=1, le=100, description="Máximo de resultados"),
+    category: Optional[str] = Query(None, description="Filtrar por categoría"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Buscar productos por texto (título y descripción)
+
+    Usa el índice de texto completo del motor (GIN en PostgreSQL, FTS5 en
+    SQLite) y retorna los resultados ordenados por relevancia.
+    """
+    def load(session: Session) -> list:
+        productos = search.search_products(session, q, limit=limit, category=category)
+        return [catalog.product_to_dict(p) for p in productos]
+
+    return fast_response(await db.run_sync(load))
+
+
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener un producto por ID
+
+    - **Error 404**: Si el producto no existe o está inactivo
+    - **304**: Si `If-None-Match` coincide con el ETag actual
+    """
+    return await db.run_sync(get_product_response, product_id, request, response)
+
+
+def get_product_response(db: Session, product_id: int, request: Request, response: Response):
+    """Cuerpo sync del detalle (ETag, 304, 404); lo usa get_product vía run_sync"""
+    etag = catalog.product_etag(db, product_id)
+    if etag is not None and _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    producto = catalog.get_product_detail(db, product_id)
+    if producto is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Producto con ID {product_id} no encontrado"
+        )
+    if etag is None:
+        return fast_response(producto)
+    headers = _cache_headers(etag)
+    response.headers.update(headers)
+    return cached_fast_response(catalog.json_cache, etag, lambda: producto, headers=headers)
+
+
+@router.put("/{product_id}", response_model=ProductResponse)
+def update_product(
+    product_id: int,
+    product: ProductUpdate,
+    db: Session = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """
+    Actualizar un producto (partial update, solo administradores)
+
+    - **product_id**: ID del producto a actualizar
+    - **product**: Campos a actualizar (todos opcionales)
+    - **Error 401/403**: Sin token de administrador
+
+    La caché del catálogo se invalida al guardar: la próxima lectura ya
+    ve los cambios.
+    """
+    producto = catalog.update_product(db, product_id, product)
+    if producto is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Producto con ID {product_id} no encontrado"
+        )
+    return catalog.product_to_dict(producto)
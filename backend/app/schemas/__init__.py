@@ -12,15 +12,27 @@ from .product import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
-    ProductList
+    ProductList,
+    ProductFilters,
+    ProductPage
 )
 
 from .cart import (
     CartItemBase,
     CartItemCreate,
     CartItemUpdate,
+    CartBatchAdd,
+    CartBatchUpdate,
+    CartBatchRemove,
+    CartBatchRequest,
     CartItemResponse,
-    CartResponse
+    CartResponse,
+    CartSummaryResponse
+)
+
+from .order import (
+    OrderItemResponse,
+    OrderResponse
 )
 
 from .user import (
@@ -28,7 +40,9 @@ from .user import (
     UserCreate,
     UserUpdate,
     UserResponse,
-    UserLogin
+    UserLogin,
+    Token,
+    TokenData
 )
 
 __all__ = [
@@ -38,16 +52,28 @@ __all__ = [
     "ProductUpdate",
     "ProductResponse",
     "ProductList",
+    "ProductFilters",
+    "ProductPage",
     # Cart schemas
     "CartItemBase",
     "CartItemCreate",
     "CartItemUpdate",
+    "CartBatchAdd",
+    "CartBatchUpdate",
+    "CartBatchRemove",
+    "CartBatchRequest",
     "CartItemResponse",
     "CartResponse",
+    "CartSummaryResponse",
+    # Order schemas
+    "OrderItemResponse",
+    "OrderResponse",
     # User schemas
     "UserBase",
     "UserCreate",
     "UserUpdate",
     "UserResponse",
     "UserLogin",
+    "Token",
+    "TokenData",
 ]
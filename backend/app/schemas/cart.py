@@ -3,14 +3,17 @@ Schemas para Carrito de Compras
 
 Define la estructura de datos para el carrito:
 - Items del carrito
-- Operaciones de agregar/actualizar/eliminar
+- Operaciones de agregar/actualizar/eliminar (una a una o en batch)
 - Respuestas del carrito completo
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional, Union
 from datetime import datetime
 
+# Máximo de operaciones por PATCH /api/cart/items:batch
+CART_BATCH_MAX_OPERATIONS = 100
+
 
 class CartItemBase(BaseModel):
     """
@@ -43,6 +46,59 @@ class CartItemUpdate(BaseModel):
     )
 
 
+class CartBatchAdd(CartItemCreate):
+    """
+    Operación del batch: agregar un producto (si ya está, suma la cantidad)
+    """
+    op: Literal["add"]
+
+
+class CartBatchUpdate(CartItemUpdate):
+    """
+    Operación del batch: cambiar la cantidad de un item
+    """
+    op: Literal["update"]
+    item_id: int = Field(..., gt=0, description="ID del item en el carrito")
+
+
+class CartBatchRemove(BaseModel):
+    """
+    Operación del batch: quitar un item
+    """
+    op: Literal["remove"]
+    item_id: int = Field(..., gt=0, description="ID del item en el carrito")
+
+
+CartBatchOperation = Annotated[
+    Union[CartBatchAdd, CartBatchUpdate, CartBatchRemove],
+    Field(discriminator="op")
+]
+
+
+class CartBatchRequest(BaseModel):
+    """
+    Schema para aplicar varias operaciones al carrito en una transacción
+    (se aplican en orden; si una falla no se aplica ninguna)
+    """
+    operations: List[CartBatchOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=CART_BATCH_MAX_OPERATIONS,
+        description="Operaciones add/update/remove en orden"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "operations": [
+                    {"op": "add", "product_id": 5, "quantity": 1},
+                    {"op": "update", "item_id": 2, "quantity": 3},
+                    {"op": "remove", "item_id": 7}
+                ]
+            }
+        }
+
+
 class CartItemResponse(CartItemBase):
     """
     Schema para respuesta de un item del carrito
@@ -117,6 +173,39 @@ class CartResponse(BaseModel):
         }
 
 
+class CartSummaryResponse(BaseModel):
+    """
+    Schema para el resumen del carrito (totales sin el detalle de items)
+    Equivalente a la vista 'vista_carritos_resumen'
+    """
+    cart_id: int = Field(..., description="ID del carrito")
+    user_id: int = Field(..., description="ID del usuario")
+    total_items: int = Field(..., description="Cantidad de items (líneas) distintos")
+    total_quantity: int = Field(..., description="Suma de las cantidades de todos los items")
+    subtotal: float = Field(..., description="Suma de todos los items")
+    tax: float = Field(default=0.0, description="Impuestos")
+    shipping: float = Field(default=0.0, description="Costo de envío")
+    total: float = Field(..., description="Total a pagar (subtotal + tax + shipping)")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "cart_id": 1,
+                "user_id": 1,
+                "total_items": 2,
+                "total_quantity": 3,
+                "subtotal": 1059.97,
+                "tax": 84.80,
+                "shipping": 15.00,
+                "total": 1159.77,
+                "created_at": "2025-11-05T10:00:00",
+                "updated_at": "2025-11-05T15:30:00"
+            }
+        }
+
+
 class CartClearResponse(BaseModel):
     """
     Schema para respuesta al vaciar el carrito
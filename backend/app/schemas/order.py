@@ -0,0 +1,62 @@
+"""
+Schemas para Pedidos
+
+Define la estructura de datos de los pedidos creados en el checkout:
+- Items del pedido (snapshot del carrito)
+- Respuesta del pedido completo
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+
+class OrderItemResponse(BaseModel):
+    """
+    Schema para una línea del pedido (precio y título al momento de comprar)
+    """
+    product_id: int = Field(..., description="ID del producto")
+    product_title: str = Field(..., description="Nombre del producto al comprar")
+    quantity: int = Field(..., ge=1, description="Cantidad comprada")
+    unit_price: float = Field(..., description="Precio unitario al comprar")
+    subtotal: float = Field(..., description="Subtotal (precio × cantidad)")
+
+
+class OrderResponse(BaseModel):
+    """
+    Schema para respuesta de un pedido
+    """
+    id: int = Field(..., description="ID del pedido")
+    user_id: int = Field(..., description="ID del usuario")
+    status: str = Field(..., description="Estado: pendiente, pagado, entregado o cancelado")
+    items: List[OrderItemResponse] = Field(..., description="Líneas del pedido")
+    total_items: int = Field(..., description="Cantidad total de unidades")
+    subtotal: float = Field(..., description="Suma de todas las líneas")
+    tax: float = Field(default=0.0, description="Impuestos")
+    shipping: float = Field(default=0.0, description="Costo de envío")
+    total: float = Field(..., description="Total pagado (subtotal + tax + shipping)")
+    created_at: datetime = Field(..., description="Fecha del checkout")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": 1,
+                "user_id": 1,
+                "status": "pendiente",
+                "items": [
+                    {
+                        "product_id": 5,
+                        "product_title": "Laptop Dell XPS",
+                        "quantity": 1,
+                        "unit_price": 999.99,
+                        "subtotal": 999.99
+                    }
+                ],
+                "total_items": 1,
+                "subtotal": 999.99,
+                "tax": 84.80,
+                "shipping": 15.00,
+                "total": 1099.79,
+                "created_at": "2025-11-21T18:00:00"
+            }
+        }
@@ -136,3 +136,47 @@ class ProductList(BaseModel):
                 "total_pages": 10
             }
         }
+
+
+class ProductFilters(BaseModel):
+    """
+    Schema de filtros del catálogo (los mismos que usa el frontend)
+    Se compilan a una sola consulta SQL sobre 'productos'
+    """
+    category: Optional[str] = Field(None, description="Categoría exacta")
+    search: Optional[str] = Field(None, max_length=100, description="Texto a buscar")
+    min_price: Optional[float] = Field(None, ge=0, description="Precio mínimo")
+    max_price: Optional[float] = Field(None, ge=0, description="Precio máximo")
+    min_rating: Optional[float] = Field(None, ge=0, le=5, description="Rating mínimo")
+
+
+class ProductPage(BaseModel):
+    """
+    Schema para página de productos con paginación keyset (cursor)
+    """
+    products: List[ProductResponse]
+    page_size: int = Field(..., ge=1, le=100, description="Productos por página")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor opaco para pedir la página siguiente (null si no hay más)"
+    )
+    has_more: bool = Field(..., description="¿Existe una página siguiente?")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "products": [
+                    {
+                        "id": 1,
+                        "title": "Producto 1",
+                        "price": 29.99,
+                        "category": "electronics",
+                        "stock": 10,
+                        "created_at": "2025-11-05T10:30:00"
+                    }
+                ],
+                "page_size": 20,
+                "next_cursor": "eyJzIjoiaWQiLCJrIjpbMjBdfQ",
+                "has_more": True
+            }
+        }
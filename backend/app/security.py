@@ -0,0 +1,110 @@
+"""
+Autenticación de las rutas: header Authorization: Bearer <JWT>
+
+get_current_user resuelve el token a un Principal (id, is_admin,
+is_active) por el camino rápido de services/auth.py: claims cacheados por
+digest del token hasta su exp y principal cacheado con TTL corto. Con
+ambos en caché el request no verifica la firma ni consulta 'usuarios';
+solo en un fallo de caché se usa la sesión (db.run_sync). La revocación
+(logout) se consulta en el filtro de Bloom de services/revocation.py: la
+base solo se toca si el filtro da positivo.
+
+current_user_id es la dependencia de las rutas del carrito y pedidos: el
+usuario del token; sin token, 401. Solo con AUTH_ALLOW_USER_ID_PARAM
+(apagado por defecto; lo activan los benchmarks) acepta el query param
+user_id en lugar del token.
+
+Uso en rutas:
+    @router.get("/me")
+    async def me(user: Principal = Depends(get_current_user)): ...
+
+    def add_item(..., user_id: int = Depends(current_user_id)): ...
+
+    def update_product(..., admin: Principal = Depends(get_current_admin)): ...
+"""
+
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import get_async_db
+from .services import auth as auth_service
+from .services import revocation
+from .services.auth import Principal
+from .services.cache import MISSING
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def _resolve(token: str, db: AsyncSession) -> Principal:
+    try:
+        claims = auth_service.decode_access_token(token)
+    except auth_service.InvalidTokenError as error:
+        raise _unauthorized(str(error))
+    jti = claims.get("jti")
+    if jti is not None:
+        if revocation.needs_sync():
+            await db.run_sync(revocation.sync)
+        if revocation.might_be_revoked(jti) and await db.run_sync(revocation.is_revoked, jti):
+            raise _unauthorized("Token revocado")
+    usuario_id = int(claims["sub"])
+    principal = auth_service.cached_principal(usuario_id)
+    if principal is MISSING:
+        principal = await db.run_sync(auth_service.fetch_principal, usuario_id)
+    if principal is None or not principal.is_active:
+        raise _unauthorized("Usuario inexistente o desactivado")
+    return principal
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Principal del token Bearer
+
+    - **Error 401**: Sin token, token inválido o vencido, o usuario
+      inexistente/desactivado
+    """
+    if credentials is None:
+        raise _unauthorized("Falta el token de acceso")
+    return await _resolve(credentials.credentials, db)
+
+
+async def get_current_admin(user: Principal = Depends(get_current_user)) -> Principal:
+    """
+    Principal del token, solo si es administrador
+
+    - **Error 401**: Igual que get_current_user
+    - **Error 403**: El usuario no es administrador
+    """
+    if not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Requiere un usuario administrador")
+    return user
+
+
+async def current_user_id(
+    user_id: Optional[int] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> int:
+    """
+    ID del usuario del token. Sin token: el query param user_id si
+    AUTH_ALLOW_USER_ID_PARAM está activo y viene; si no, 401.
+    """
+    if credentials is not None:
+        return (await _resolve(credentials.credentials, db)).id
+    if not settings.AUTH_ALLOW_USER_ID_PARAM or user_id is None:
+        raise _unauthorized("Falta el token de acceso")
+    return user_id
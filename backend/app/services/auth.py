@@ -0,0 +1,152 @@
+"""
+Servicio de autenticación: usuarios y tokens JWT
+
+El hash y la verificación de contraseñas NO están aquí: corren en el pool
+de procesos de services/passwords.py para no bloquear el event loop.
+
+Camino rápido de cada request autenticado (ver app/security.py):
+- claims_cache: claims ya verificados por SHA-256 del token, hasta su
+  'exp' (LRU acotado). Un token repetido no vuelve a verificar la firma.
+- principal_cache: (id, is_admin, is_active) del usuario con TTL corto;
+  las escrituras ORM sobre Usuario lo invalidan en este worker y el TTL
+  acota cuánto tarda en verlo otro worker. Con ambos en caché el request
+  no consulta 'usuarios'.
+"""
+
+import hashlib
+import secrets
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from jose import JWTError, jwt
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Usuario
+from .cache import MISSING, TTLCache
+
+# Lo mínimo del usuario que necesitan las rutas autenticadas
+Principal = namedtuple("Principal", "id is_admin is_active")
+
+# SHA-256 del token → claims verificados (vencen por su 'exp', no por TTL)
+claims_cache = TTLCache("auth_claims", maxsize=settings.AUTH_CLAIMS_CACHE_MAX_ENTRIES, ttl=0)
+
+# id_usuario → Principal
+principal_cache = TTLCache(
+    "auth_principals",
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_PRINCIPAL_TTL_SECONDS
+)
+
+
+class EmailAlreadyRegisteredError(ValueError):
+    """Ya existe un usuario con ese email"""
+
+
+class InvalidTokenError(ValueError):
+    """Token con firma inválida, vencido o sin 'sub' numérico"""
+
+
+def get_user_by_email(db: Session, email: str) -> Optional[Usuario]:
+    return db.execute(select(Usuario).where(Usuario.email == email.lower())).scalar_one_or_none()
+
+
+def create_user(db: Session, email: str, password_hash: str, nombre: Optional[str] = None) -> Usuario:
+    """
+    Inserta el usuario (email en minúsculas).
+
+    Raises:
+        EmailAlreadyRegisteredError: el email ya existe
+    """
+    usuario = Usuario(email=email.lower(), password_hash=password_hash, nombre=nombre)
+    db.add(usuario)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise EmailAlreadyRegisteredError(f"El email {email} ya está registrado")
+    return usuario
+
+
+def create_access_token(usuario: Usuario) -> str:
+    """JWT firmado con SECRET_KEY; sub = id del usuario, jti = id del token (revocación)"""
+    expires = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {
+        "sub": str(usuario.id_usuario),
+        "email": usuario.email,
+        "exp": expires,
+        "jti": secrets.token_urlsafe(16),
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Claims verificados del token (firma y 'exp'), desde claims_cache si
+    el mismo token ya se verificó. Los tokens inválidos no se cachean.
+
+    Raises:
+        InvalidTokenError
+    """
+    use_cache = settings.AUTH_CACHE_ENABLED
+    if use_cache:
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = claims_cache.get(key)
+        if claims is not MISSING:
+            if claims["exp"] > time.time():
+                return claims
+            claims_cache.invalidate(key)
+            raise InvalidTokenError("Token vencido")
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        int(claims["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise InvalidTokenError("Token inválido o vencido")
+    if "exp" not in claims:
+        raise InvalidTokenError("Token sin vencimiento")
+    if use_cache:
+        claims_cache.set(key, claims)
+    return claims
+
+
+def load_principal(db: Session, usuario_id: int) -> Optional[Principal]:
+    row = db.execute(
+        select(Usuario.id_usuario, Usuario.is_admin, Usuario.is_active).where(Usuario.id_usuario == usuario_id)
+    ).first()
+    return Principal(*row) if row is not None else None
+
+
+def cached_principal(usuario_id: int):
+    """Principal desde principal_cache, sin tocar la base; MISSING si no está"""
+    if not settings.AUTH_CACHE_ENABLED:
+        return MISSING
+    return principal_cache.get(usuario_id)
+
+
+def fetch_principal(db: Session, usuario_id: int) -> Optional[Principal]:
+    """Carga el principal y lo guarda en caché (None si no existe; no se cachea)"""
+    generation = principal_cache.generation
+    principal = load_principal(db, usuario_id)
+    if principal is not None and settings.AUTH_CACHE_ENABLED:
+        principal_cache.set(usuario_id, principal, generation=generation)
+    return principal
+
+
+def invalidate_principal(usuario_id: int) -> None:
+    """Para escrituras fuera del ORM (UPDATE masivos) sobre 'usuarios'"""
+    principal_cache.invalidate(usuario_id)
+
+
+def cache_stats() -> list:
+    return [claims_cache.stats(), principal_cache.stats()]
+
+
+# Event listeners: desactivar, promover o borrar un usuario se ve en el próximo request
+@event.listens_for(Usuario, 'after_update')
+@event.listens_for(Usuario, 'after_delete')
+def invalidar_principal(mapper, connection, target):
+    invalidate_principal(target.id_usuario)
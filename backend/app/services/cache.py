@@ -0,0 +1,131 @@
+"""
+Caché en memoria del proceso (LRU acotado + TTL)
+
+Uso:
+    cache = TTLCache("productos", maxsize=1000, ttl=60)
+    value = cache.get_or_load(key, lambda: cargar_desde_bd())
+    cache.invalidate(key)
+
+Cada worker de uvicorn tiene su propia instancia: las invalidaciones se
+hacen con eventos de SQLAlchemy en el mismo proceso que escribe, y el TTL
+acota cuánto puede quedar desactualizado otro worker.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# Marcador de "no encontrado" (None es un valor cacheable válido)
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Caché LRU con expiración por TTL y contadores para monitoreo.
+
+    - **maxsize**: máximo de entradas; al superarlo se expulsa la menos usada
+    - **ttl**: segundos de vida de cada entrada (0 = sin expiración)
+
+    Thread-safe: las rutas síncronas de FastAPI corren en un threadpool.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Se incrementa en cada invalidación: una carga que empezó antes de una
+        # invalidación no debe guardar su resultado (podría estar desactualizado)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def generation(self) -> int:
+        """Para set(..., generation=...) cuando la carga no pasa por get_or_load"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna el valor cacheado o MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at = entry
+            if expires_at and expires_at <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int = None) -> None:
+        """
+        Guarda un valor. Si se pasa `generation` y hubo una invalidación
+        desde entonces, el valor se descarta.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            expires_at = self._clock() + self.ttl if self.ttl else 0
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], cache_none: bool = True) -> Any:
+        """
+        Retorna el valor cacheado o lo carga con `loader()` y lo guarda.
+        Con cache_none=False un resultado None no se guarda (ej: 404).
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        generation = self._generation
+        value = loader()
+        if value is not None or cache_none:
+            self.set(key, value, generation=generation)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Elimina una entrada (si existe)"""
+        with self._lock:
+            self._generation += 1
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Elimina todas las entradas"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Contadores para el endpoint de métricas"""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
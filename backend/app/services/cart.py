@@ -0,0 +1,491 @@
+"""
+Servicio de carrito de compras
+
+Lecturas del carrito activo de un usuario con un número fijo de queries:
+- Resumen (conteo, cantidades, subtotal y total) en un solo aggregate,
+  equivalente a la vista 'vista_carritos_resumen'
+- Carrito + items + productos en una sola query con eager loading,
+  equivalente a la vista 'vista_carritos_detallados'
+- Respuesta completa del carrito (CartResponse) en 1 query
+
+Escrituras (agregar, cambiar cantidad, quitar) con reserva de stock
+atómica (ver services/stock.py): cada una es una transacción y bumpea
+carritos.updated_at (la expiración de reservas se basa en esa columna).
+Agregar es un upsert por dialecto (INSERT ... ON CONFLICT / ON DUPLICATE
+KEY UPDATE) con el subtotal calculado en SQL: 3 sentencias en total.
+apply_batch aplica muchas operaciones en una transacción con SQL en bloque.
+
+Las propiedades Carrito.subtotal/total_items/total_productos ejecutan una
+query cada una (items es lazy="dynamic"); en endpoints usar este servicio.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session, joinedload
+
+from ..database import ON_CONFLICT_INSERTS, commit_or_flush
+from ..models import Carrito, ItemCarrito
+from . import stock as stock_service
+
+
+class CartItemNotFoundError(LookupError):
+    """El item no existe o no pertenece al carrito activo del usuario"""
+
+
+def _money(value) -> float:
+    """Normaliza Decimal/float/None de la BD a float con 2 decimales"""
+    if value is None:
+        return 0.0
+    return round(float(value), 2)
+
+
+def _summary_statement():
+    """SELECT del resumen del carrito (LEFT JOIN + GROUP BY, como la vista)"""
+    subtotal = func.coalesce(func.sum(ItemCarrito.subtotal), 0)
+    return (
+        select(
+            Carrito.id_carrito,
+            Carrito.usuario_id,
+            Carrito.impuesto,
+            Carrito.envio,
+            Carrito.created_at,
+            Carrito.updated_at,
+            func.count(ItemCarrito.id_item).label("total_items"),
+            func.coalesce(func.sum(ItemCarrito.cantidad), 0).label("total_productos"),
+            subtotal.label("subtotal"),
+            (subtotal + Carrito.impuesto + Carrito.envio).label("total"),
+        )
+        .outerjoin(ItemCarrito, ItemCarrito.carrito_id == Carrito.id_carrito)
+        .group_by(
+            Carrito.id_carrito,
+            Carrito.usuario_id,
+            Carrito.impuesto,
+            Carrito.envio,
+            Carrito.created_at,
+            Carrito.updated_at,
+        )
+    )
+
+
+def _summary_to_dict(row) -> dict:
+    return {
+        "cart_id": row.id_carrito,
+        "user_id": row.usuario_id,
+        "total_items": row.total_items,
+        "total_quantity": int(row.total_productos),
+        "subtotal": _money(row.subtotal),
+        "tax": _money(row.impuesto),
+        "shipping": _money(row.envio),
+        "total": _money(row.total),
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+def get_cart_summary(db: Session, usuario_id: int) -> Optional[dict]:
+    """
+    Resumen del carrito activo del usuario en UNA query.
+
+    Retorna None si el usuario no tiene carrito activo.
+    """
+    statement = _summary_statement().where(
+        Carrito.usuario_id == usuario_id,
+        Carrito.is_active == True  # noqa: E712
+    )
+    row = db.execute(statement).first()
+    return _summary_to_dict(row) if row is not None else None
+
+
+def empty_cart_response(usuario_id: int) -> dict:
+    """CartResponse de un usuario sin carrito activo (no escribe en la BD)"""
+    now = datetime.now(timezone.utc)
+    return {
+        "user_id": usuario_id,
+        "items": [],
+        "total_items": 0,
+        "subtotal": 0.0,
+        "tax": 0.0,
+        "shipping": 0.0,
+        "total": 0.0,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def load_active_cart(db: Session, usuario_id: int) -> Optional[Carrito]:
+    """
+    Carga el carrito activo con sus items y el producto de cada item en UNA
+    query (LEFT OUTER JOIN carritos → items_carrito → productos).
+
+    Evita el N+1 de acceder a item.producto en un loop: los productos ya
+    vienen cargados en Carrito.items_detalle.
+    """
+    return (
+        db.query(Carrito)
+        .options(joinedload(Carrito.items_detalle).joinedload(ItemCarrito.producto))
+        .filter(Carrito.usuario_id == usuario_id, Carrito.is_active == True)  # noqa: E712
+        .first()
+    )
+
+
+def cart_to_response(carrito: Carrito) -> dict:
+    """
+    Mapea un Carrito cargado con load_active_cart() a CartResponse.
+    Los totales se calculan sobre los items ya cargados (sin queries extra).
+    """
+    items = []
+    subtotal = Decimal("0")
+    total_quantity = 0
+    for item in carrito.items_detalle:
+        producto = item.producto
+        items.append({
+            "id": item.id_item,
+            "product_id": item.producto_id,
+            "quantity": item.cantidad,
+            "product_title": producto.titulo,
+            "product_price": _money(item.precio_unitario),
+            "product_image": producto.imagen,
+            "subtotal": _money(item.subtotal),
+        })
+        subtotal += Decimal(item.subtotal)
+        total_quantity += item.cantidad
+
+    tax = Decimal(carrito.impuesto or 0)
+    shipping = Decimal(carrito.envio or 0)
+    return {
+        "user_id": carrito.usuario_id,
+        "items": items,
+        "total_items": total_quantity,
+        "subtotal": _money(subtotal),
+        "tax": _money(tax),
+        "shipping": _money(shipping),
+        "total": _money(subtotal + tax + shipping),
+        "created_at": carrito.created_at,
+        "updated_at": carrito.updated_at,
+    }
+
+
+def get_cart_response(db: Session, usuario_id: int) -> dict:
+    """
+    Construye el CartResponse del carrito activo en 1 query
+    (load_active_cart + cart_to_response).
+    """
+    carrito = load_active_cart(db, usuario_id)
+    if carrito is None:
+        return empty_cart_response(usuario_id)
+    return cart_to_response(carrito)
+
+
+def get_or_create_active_cart(db: Session, usuario_id: int) -> Carrito:
+    """
+    Carrito activo del usuario bloqueado (FOR UPDATE); lo crea (flush, sin
+    commit) si no existe. El lock serializa los cambios con el checkout:
+    nada se agrega a un carrito que se está convirtiendo en pedido.
+    """
+    carrito = (
+        db.query(Carrito)
+        .filter(Carrito.usuario_id == usuario_id, Carrito.is_active == True)  # noqa: E712
+        .with_for_update()
+        .first()
+    )
+    if carrito is None:
+        carrito = Carrito(usuario_id=usuario_id)
+        db.add(carrito)
+        db.flush()
+    return carrito
+
+
+def _locked_item(db: Session, usuario_id: int, item_id: int) -> ItemCarrito:
+    """
+    Item del carrito activo del usuario con SELECT ... FOR UPDATE del item
+    y de su carrito: dos cambios simultáneos del mismo item no pueden
+    reservar/liberar sobre la misma cantidad vieja, ni cambiar un carrito
+    durante su checkout (en SQLite el FOR UPDATE va al writer único).
+    """
+    item = (
+        db.query(ItemCarrito)
+        .join(Carrito, Carrito.id_carrito == ItemCarrito.carrito_id)
+        .filter(
+            ItemCarrito.id_item == item_id,
+            Carrito.usuario_id == usuario_id,
+            Carrito.is_active == True  # noqa: E712
+        )
+        .with_for_update()
+        .first()
+    )
+    if item is None:
+        raise CartItemNotFoundError(f"Item con ID {item_id} no encontrado en el carrito")
+    return item
+
+
+def _touch(db: Session, carrito_id: int) -> None:
+    """Marca actividad en el carrito (bumpea updated_at)"""
+    db.query(Carrito).filter(Carrito.id_carrito == carrito_id).update(
+        {Carrito.updated_at: func.now()},
+        synchronize_session=False
+    )
+
+
+def lock_active_cart(db: Session, usuario_id: int) -> int:
+    """
+    Bloquea el carrito activo del usuario y bumpea su updated_at; lo crea
+    (flush, sin commit) si no existe. Retorna el id del carrito.
+
+    Donde el motor soporta UPDATE ... RETURNING (PostgreSQL, SQLite) es UNA
+    sentencia: el UPDATE toma el lock de la fila igual que un FOR UPDATE.
+    En MySQL: get_or_create_active_cart + _touch.
+    """
+    if not db.get_bind().dialect.update_returning:
+        carrito = get_or_create_active_cart(db, usuario_id)
+        _touch(db, carrito.id_carrito)
+        return carrito.id_carrito
+    carrito_id = db.execute(
+        update(Carrito)
+        .where(Carrito.usuario_id == usuario_id, Carrito.is_active == True)  # noqa: E712
+        .values(updated_at=func.now())
+        .returning(Carrito.id_carrito)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if carrito_id is None:
+        carrito = Carrito(usuario_id=usuario_id)
+        db.add(carrito)
+        db.flush()
+        carrito_id = carrito.id_carrito
+    return carrito_id
+
+
+def upsert_items(db: Session, rows: Iterable[Tuple[int, int, int, Decimal]]) -> None:
+    """
+    Agrega items [(carrito_id, producto_id, cantidad, precio_unitario), ...]
+    en UN INSERT multi-fila: si el producto ya está en el carrito suma la
+    cantidad y recalcula el subtotal en SQL con el precio ya guardado del
+    item (no pasa por el listener calcular_subtotal_automatico).
+    Cada (carrito_id, producto_id) debe venir una sola vez. No hace commit.
+    """
+    values = [
+        {
+            "carrito_id": carrito_id,
+            "producto_id": producto_id,
+            "cantidad": cantidad,
+            "precio_unitario": precio,
+            "subtotal": precio * cantidad,
+        }
+        for carrito_id, producto_id, cantidad, precio in rows
+    ]
+    if not values:
+        return
+    table = ItemCarrito.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(table).values(values)
+        cantidad = table.c.cantidad + statement.inserted.cantidad
+        # MySQL asigna en orden y ve los valores ya actualizados: subtotal antes que cantidad
+        statement = statement.on_duplicate_key_update([
+            ("subtotal", table.c.precio_unitario * cantidad),
+            ("cantidad", cantidad),
+            ("updated_at", func.now()),
+        ])
+    else:
+        statement = ON_CONFLICT_INSERTS[dialect](table).values(values)
+        cantidad = table.c.cantidad + statement.excluded.cantidad
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.carrito_id, table.c.producto_id],
+            set_={
+                "cantidad": cantidad,
+                "subtotal": table.c.precio_unitario * cantidad,
+                "updated_at": func.now(),
+            }
+        )
+    db.execute(statement)
+
+
+def add_item(db: Session, usuario_id: int, producto_id: int, cantidad: int, commit: bool = True) -> None:
+    """
+    Agrega `cantidad` unidades de un producto al carrito activo (lo crea si
+    no existe), reservando el stock en la misma transacción. Tres
+    sentencias, sin leer el item antes:
+
+    1. lock_active_cart: UPDATE carritos ... RETURNING (lock + updated_at)
+    2. reserva: UPDATE condicional de productos ... RETURNING precio
+    3. upsert_items: INSERT ... ON CONFLICT DO UPDATE del item
+
+    Si el producto ya estaba en el carrito conserva su precio_unitario.
+    Con commit=False no confirma la transacción (ver commit_or_flush).
+
+    Raises:
+        stock.InsufficientStockError / stock.ProductNotFoundError
+    """
+    try:
+        carrito_id = lock_active_cart(db, usuario_id)
+        precio = stock_service.reserve(db, producto_id, cantidad)
+        upsert_items(db, [(carrito_id, producto_id, cantidad, precio)])
+        commit_or_flush(db, commit)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def add_reserved_items(db: Session, items: Iterable[Tuple[int, int, int, Decimal]]) -> None:
+    """
+    Agrega en bloque items cuyo stock YA está reservado (flush de la flash
+    sale): [(usuario_id, producto_id, cantidad, precio_unitario), ...].
+
+    Cantidad constante de queries sin importar cuántos items sean: carritos
+    activos existentes, INSERT de los que faltan, upsert de los items, y un
+    UPDATE de updated_at. No hace commit.
+    """
+    totals = {}
+    for usuario_id, producto_id, cantidad, precio in items:
+        cantidad_actual, _ = totals.get((usuario_id, producto_id), (0, precio))
+        totals[(usuario_id, producto_id)] = (cantidad_actual + cantidad, precio)
+    if not totals:
+        return
+
+    usuario_ids = {usuario_id for usuario_id, _ in totals}
+    carritos = dict(db.execute(
+        select(Carrito.usuario_id, Carrito.id_carrito)
+        .where(Carrito.usuario_id.in_(usuario_ids), Carrito.is_active == True)  # noqa: E712
+        .with_for_update()
+    ).all())
+    nuevos = [Carrito(usuario_id=usuario_id) for usuario_id in usuario_ids - carritos.keys()]
+    if nuevos:
+        db.add_all(nuevos)
+        db.flush()
+        carritos.update((carrito.usuario_id, carrito.id_carrito) for carrito in nuevos)
+
+    upsert_items(db, [
+        (carritos[usuario_id], producto_id, cantidad, precio)
+        for (usuario_id, producto_id), (cantidad, precio) in totals.items()
+    ])
+    db.query(Carrito).filter(Carrito.id_carrito.in_(set(carritos.values()))).update(
+        {Carrito.updated_at: func.now()},
+        synchronize_session=False
+    )
+
+
+def update_item_quantity(db: Session, usuario_id: int, item_id: int, cantidad: int, commit: bool = True) -> None:
+    """
+    Cambia la cantidad de un item: reserva la diferencia si sube y la
+    libera si baja. Con commit=False no confirma la transacción.
+    """
+    try:
+        item = _locked_item(db, usuario_id, item_id)
+        delta = cantidad - item.cantidad
+        if delta > 0:
+            stock_service.reserve(db, item.producto_id, delta)
+        elif delta < 0:
+            stock_service.release(db, item.producto_id, -delta)
+        item.cantidad = cantidad
+        _touch(db, item.carrito_id)
+        commit_or_flush(db, commit)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def remove_item(db: Session, usuario_id: int, item_id: int, commit: bool = True) -> None:
+    """Quita un item del carrito y libera su reserva de stock (commit=False: sin confirmar)"""
+    try:
+        item = _locked_item(db, usuario_id, item_id)
+        stock_service.release(db, item.producto_id, item.cantidad)
+        carrito_id = item.carrito_id
+        db.delete(item)
+        _touch(db, carrito_id)
+        commit_or_flush(db, commit)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def apply_batch(db: Session, usuario_id: int, operations: Sequence, commit: bool = True) -> None:
+    """
+    Aplica en orden las operaciones add/update/remove de un
+    CartBatchRequest en UNA transacción, con una cantidad constante de
+    sentencias sin importar cuántas operaciones sean:
+
+    1. lock_active_cart (lock + updated_at)
+    2. SELECT ... FOR UPDATE de los items que nombran update/remove
+    3. reserve_many / release_many de la diferencia neta por producto
+    4. DELETE de los items quitados, UPDATE (CASE por item) de los
+       cambiados y upsert_items de los productos agregados
+
+    Las operaciones se combinan primero en memoria, con el mismo resultado
+    que aplicarlas una a una: un "add" de un producto que ya tiene item en
+    el batch suma sobre ese item. Si una falla no se aplica ninguna.
+    Con commit=False no confirma la transacción.
+
+    Raises:
+        CartItemNotFoundError, stock.InsufficientStockError, stock.ProductNotFoundError
+    """
+    try:
+        carrito_id = lock_active_cart(db, usuario_id)
+        item_ids = {operation.item_id for operation in operations if operation.op != "add"}
+        items = {}
+        if item_ids:
+            items = {
+                row.id_item: row
+                for row in db.execute(
+                    select(ItemCarrito.id_item, ItemCarrito.producto_id, ItemCarrito.cantidad)
+                    .where(ItemCarrito.carrito_id == carrito_id, ItemCarrito.id_item.in_(item_ids))
+                    .with_for_update()
+                )
+            }
+
+        # Cantidad final de cada item leído (None = quitado) y unidades
+        # agregadas de productos sin item leído
+        final = {item_id: row.cantidad for item_id, row in items.items()}
+        item_of_product = {row.producto_id: item_id for item_id, row in items.items()}
+        added = {}
+        for operation in operations:
+            if operation.op == "add":
+                item_id = item_of_product.get(operation.product_id)
+                if item_id is None:
+                    added[operation.product_id] = added.get(operation.product_id, 0) + operation.quantity
+                else:
+                    final[item_id] = (final[item_id] or 0) + operation.quantity
+                continue
+            if final.get(operation.item_id) is None:
+                raise CartItemNotFoundError(f"Item con ID {operation.item_id} no encontrado en el carrito")
+            final[operation.item_id] = operation.quantity if operation.op == "update" else None
+
+        delta = dict(added)
+        for item_id, cantidad in final.items():
+            row = items[item_id]
+            delta[row.producto_id] = (cantidad or 0) - row.cantidad
+        precios = stock_service.reserve_many(
+            db, [(producto_id, n) for producto_id, n in delta.items() if n > 0]
+        )
+        stock_service.release_many(db, [(producto_id, -n) for producto_id, n in delta.items() if n < 0])
+
+        removed = [item_id for item_id, cantidad in final.items() if cantidad is None]
+        if removed:
+            db.execute(
+                delete(ItemCarrito)
+                .where(ItemCarrito.id_item.in_(removed))
+                .execution_options(synchronize_session=False)
+            )
+        changed = {
+            item_id: cantidad
+            for item_id, cantidad in final.items()
+            if cantidad is not None and cantidad != items[item_id].cantidad
+        }
+        if changed:
+            cantidad = case(changed, value=ItemCarrito.id_item)
+            db.execute(
+                update(ItemCarrito)
+                .where(ItemCarrito.id_item.in_(changed))
+                .values(cantidad=cantidad, subtotal=ItemCarrito.precio_unitario * cantidad, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        upsert_items(db, [
+            (carrito_id, producto_id, cantidad, precios[producto_id])
+            for producto_id, cantidad in added.items()
+        ])
+        commit_or_flush(db, commit)
+    except Exception:
+        db.rollback()
+        raise
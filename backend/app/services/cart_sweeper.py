@@ -0,0 +1,225 @@
+"""
+Sweeper de carritos abandonados: archivado por lotes
+
+'carritos' e 'items_carrito' crecen sin límite y los carritos viejos
+inflan los índices que usa cada consulta del carrito. El sweeper mueve a
+'carritos_archivados' / 'items_carrito_archivados':
+
+- Carritos activos sin actividad (updated_at) en CART_ARCHIVE_AFTER_DAYS:
+  libera el stock reservado de sus items y archiva carrito e items
+- Carritos ya convertidos en pedido (inactivos) con la misma antigüedad:
+  archiva solo sus items (pedidos_items ya tiene el snapshot); la fila del
+  carrito queda porque pedidos.carrito_id la referencia
+
+Cada lote (CART_SWEEP_BATCH_SIZE carritos) es una transacción corta con
+una cantidad fija de sentencias (SELECT ... FOR UPDATE SKIP LOCKED,
+INSERT ... SELECT al archivo, DELETE), así nunca retiene locks largos y
+se salta los carritos que otro request tiene bloqueados.
+
+Se ejecuta desde POST /internal/carts/sweep (cron) o en un hilo del worker
+si CART_SWEEP_INTERVAL_MINUTES > 0. Reporta filas por segundo.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Carrito, CarritoArchivado, ItemCarrito, ItemCarritoArchivado
+from . import stock as stock_service
+
+logger = logging.getLogger(__name__)
+
+CART_COLUMNS = ["id_carrito", "usuario_id", "impuesto", "envio", "is_active", "created_at", "updated_at"]
+ITEM_COLUMNS = [
+    "id_item", "carrito_id", "producto_id", "cantidad", "precio_unitario", "subtotal", "created_at", "updated_at"
+]
+
+
+def _archive_items(db: Session, carrito_ids: list) -> int:
+    """INSERT ... SELECT de los items al archivo y DELETE; retorna cuántos"""
+    db.execute(
+        insert(ItemCarritoArchivado).from_select(
+            ITEM_COLUMNS,
+            select(*(getattr(ItemCarrito, column) for column in ITEM_COLUMNS))
+            .where(ItemCarrito.carrito_id.in_(carrito_ids))
+        )
+    )
+    return db.execute(
+        delete(ItemCarrito)
+        .where(ItemCarrito.carrito_id.in_(carrito_ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _sweep_abandoned_batch(db: Session, cutoff: datetime, batch_size: int) -> tuple:
+    """Un lote de carritos activos abandonados → (carritos, items)"""
+    carrito_ids = db.execute(
+        select(Carrito.id_carrito)
+        .where(Carrito.is_active == True, Carrito.updated_at < cutoff)  # noqa: E712
+        .order_by(Carrito.id_carrito)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not carrito_ids:
+        return 0, 0
+    reserved = db.execute(
+        select(ItemCarrito.producto_id, func.sum(ItemCarrito.cantidad))
+        .where(ItemCarrito.carrito_id.in_(carrito_ids))
+        .group_by(ItemCarrito.producto_id)
+    ).all()
+    stock_service.release_many(db, reserved)
+    items = _archive_items(db, carrito_ids)
+    db.execute(
+        insert(CarritoArchivado).from_select(
+            CART_COLUMNS,
+            select(*(getattr(Carrito, column) for column in CART_COLUMNS))
+            .where(Carrito.id_carrito.in_(carrito_ids))
+        )
+    )
+    db.execute(
+        delete(Carrito)
+        .where(Carrito.id_carrito.in_(carrito_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return len(carrito_ids), items
+
+
+def _sweep_checked_out_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Un lote de carritos con pedido que aún tienen items → items archivados"""
+    carrito_ids = db.execute(
+        select(Carrito.id_carrito)
+        .where(
+            Carrito.is_active == False,  # noqa: E712
+            Carrito.updated_at < cutoff,
+            exists().where(ItemCarrito.carrito_id == Carrito.id_carrito)
+        )
+        .order_by(Carrito.id_carrito)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not carrito_ids:
+        return 0
+    return _archive_items(db, carrito_ids)
+
+
+def sweep(
+    db: Session,
+    max_age_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+) -> dict:
+    """
+    Archiva todos los carritos sin actividad en `max_age_days`, un commit
+    por lote. Retorna carritos e items archivados, lotes, segundos, filas
+    por segundo y la duración del lote más largo (tiempo máximo con locks).
+    """
+    max_age_days = settings.CART_ARCHIVE_AFTER_DAYS if max_age_days is None else max_age_days
+    batch_size = batch_size or settings.CART_SWEEP_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    carts = items = batches = 0
+    max_batch = 0.0
+    start = time.perf_counter()
+    try:
+        for phase in ("abandoned", "checked_out"):
+            while True:
+                batch_start = time.perf_counter()
+                if phase == "abandoned":
+                    batch_carts, batch_items = _sweep_abandoned_batch(db, cutoff, batch_size)
+                else:
+                    batch_carts, batch_items = 0, _sweep_checked_out_batch(db, cutoff, batch_size)
+                db.commit()
+                max_batch = max(max_batch, time.perf_counter() - batch_start)
+                if not batch_carts and not batch_items:
+                    break
+                carts += batch_carts
+                items += batch_items
+                batches += 1
+    except Exception:
+        db.rollback()
+        raise
+    elapsed = time.perf_counter() - start
+    return {
+        "archived_carts": carts,
+        "archived_items": items,
+        "batches": batches,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round((carts + items) / elapsed, 1) if elapsed > 0 else 0.0,
+        "max_batch_ms": round(max_batch * 1000, 1),
+    }
+
+
+class CartSweeper:
+    """
+    Hilo del worker que cada `interval_minutes` libera reservas vencidas
+    (stock.release_expired_reservations) y archiva carritos (sweep).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], interval_minutes: float):
+        self.session_factory = session_factory
+        self.interval = interval_minutes * 60
+        self.last_run: Optional[dict] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> dict:
+        db = self.session_factory()
+        try:
+            released = stock_service.release_expired_reservations(db, settings.CART_RESERVATION_TTL_MINUTES)
+            result = sweep(db)
+        finally:
+            db.close()
+        result["released_items"] = released
+        self.last_run = result
+        return result
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="cart-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                result = self.run_once()
+                logger.info("Sweeper de carritos: %s", result)
+            except Exception:
+                logger.exception("Sweeper de carritos: pasada fallida, se reintenta en el próximo intervalo")
+
+
+# Sweeper del worker (None = solo por cron en /internal/carts/sweep)
+_sweeper: Optional[CartSweeper] = None
+
+
+def start(session_factory: Callable[[], Session]) -> Optional[CartSweeper]:
+    """Inicia el hilo si CART_SWEEP_INTERVAL_MINUTES > 0"""
+    global _sweeper
+    if settings.CART_SWEEP_INTERVAL_MINUTES <= 0:
+        return None
+    _sweeper = CartSweeper(session_factory, settings.CART_SWEEP_INTERVAL_MINUTES)
+    _sweeper.start()
+    return _sweeper
+
+
+def stop() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.stop()
+        _sweeper = None
+
+
+def sweeper_stats() -> Optional[dict]:
+    """Resultado de la última pasada del hilo (None si no corre en este worker)"""
+    if _sweeper is None:
+        return None
+    return {"interval_minutes": settings.CART_SWEEP_INTERVAL_MINUTES, "last_run": _sweeper.last_run}
@@ -0,0 +1,374 @@
+"""
+Servicio de catálogo de productos
+
+Consultas de lectura sobre la tabla 'productos':
+- Paginación keyset (seek) con cursor opaco
+- Filtros del catálogo (categoría, texto, precio, rating) compilados a SQL
+- Conversión de filas ORM al formato de ProductResponse
+- Caché en memoria de detalle y listados, invalidada por eventos ORM
+- ETags de detalle y listados calculados sin cargar entidades ORM
+- JSON serializado de detalle y listados cacheado por ETag
+
+La paginación keyset evita OFFSET: cada página continúa desde la última
+clave vista (id_producto o (precio, id_producto)), por lo que la página
+10.000 cuesta lo mismo que la página 1.
+"""
+
+import base64
+import hashlib
+import json
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import event, tuple_
+from sqlalchemy.orm import Query, Session
+
+from ..config import settings
+from ..models import Producto
+from ..schemas import ProductFilters, ProductUpdate
+from . import search as search_service
+from .cache import TTLCache
+
+
+# Ordenamientos soportados → columnas de la clave keyset
+SORT_KEYS = {
+    "id": (Producto.id_producto,),
+    "price": (Producto.precio, Producto.id_producto),
+}
+
+
+# Cachés del catálogo: detalle por id_producto y páginas por parámetros
+product_cache = TTLCache(
+    "catalog_products",
+    maxsize=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+list_cache = TTLCache(
+    "catalog_lists",
+    maxsize=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+# JSON ya serializado de detalle y listados, por ETag (ver app/responses.py)
+json_cache = TTLCache(
+    "catalog_json",
+    maxsize=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+
+# Campos de ProductUpdate → columnas de Producto
+UPDATE_FIELDS = {
+    "title": "titulo",
+    "description": "descripcion",
+    "price": "precio",
+    "category": "categoria",
+    "image": "imagen",
+    "stock": "stock",
+}
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no es válido o no corresponde al ordenamiento pedido"""
+
+
+def encode_cursor(sort: str, producto: Producto) -> str:
+    """Codifica la clave del último producto de la página como cursor opaco"""
+    if sort == "price":
+        key = [str(producto.precio), producto.id_producto]
+    else:
+        key = [producto.id_producto]
+    raw = json.dumps({"s": sort, "k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> tuple:
+    """Decodifica un cursor y retorna la tupla de clave keyset"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if data["s"] != sort:
+            raise InvalidCursorError("El cursor corresponde a otro ordenamiento")
+        key = data["k"]
+        if sort == "price":
+            return (Decimal(key[0]), int(key[1]))
+        return (int(key[0]),)
+    except InvalidCursorError:
+        raise
+    except Exception as exc:
+        raise InvalidCursorError("Cursor inválido") from exc
+
+
+def apply_filters(query: Query, filters: Optional[ProductFilters]) -> Query:
+    """
+    Agrega los filtros del catálogo a una consulta sobre Producto.
+
+    Todos los filtros se combinan en el WHERE de una única consulta:
+    - category → ix_productos_categoria / ix_productos_categoria_precio_id
+    - min_price / max_price → rango sobre ix_productos_precio_id
+    - min_rating → rating_rate >= :min_rating
+    - search → índice de texto completo (ver services/search.py)
+    """
+    if filters is None:
+        return query
+    if filters.category:
+        query = query.filter(Producto.categoria == filters.category)
+    if filters.min_price is not None:
+        query = query.filter(Producto.precio >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.filter(Producto.precio <= filters.max_price)
+    if filters.min_rating:
+        query = query.filter(Producto.rating_rate >= filters.min_rating)
+    if filters.search:
+        condition = search_service.match_clause(query.session, filters.search)
+        if condition is not None:
+            query = query.filter(condition)
+    return query
+
+
+def product_to_dict(producto: Producto) -> dict:
+    """Mapea un Producto ORM a los campos de ProductResponse"""
+    return {
+        "id": producto.id_producto,
+        "title": producto.titulo,
+        "description": producto.descripcion,
+        "price": float(producto.precio),
+        "category": producto.categoria,
+        "image": producto.imagen,
+        "stock": producto.stock,
+        "rating": producto.rating,
+        "created_at": producto.created_at,
+        "updated_at": producto.updated_at,
+    }
+
+
+def _cached(cache: TTLCache, key, loader, cache_none: bool = True):
+    """Consulta la caché (si está habilitada) o ejecuta el loader"""
+    if not settings.CATALOG_CACHE_ENABLED:
+        return loader()
+    return cache.get_or_load(key, loader, cache_none=cache_none)
+
+
+def list_cache_key(page_size: int, cursor: Optional[str], filters: Optional[ProductFilters], sort: str) -> tuple:
+    """
+    Clave normalizada de un listado: mismos filtros → misma clave, sin
+    importar el orden de los query params o mayúsculas/espacios en la búsqueda.
+    """
+    normalized = ()
+    if filters is not None:
+        values = filters.model_dump()
+        if values.get("search"):
+            values["search"] = " ".join(values["search"].lower().split())
+        normalized = tuple(sorted((k, v) for k, v in values.items() if v not in (None, "", 0)))
+    return (sort, page_size, cursor or "", normalized)
+
+
+def list_products_keyset(
+    db: Session,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    filters: Optional[ProductFilters] = None,
+    sort: str = "id",
+) -> dict:
+    """
+    Retorna una página de productos activos usando paginación keyset.
+
+    - **cursor**: cursor opaco retornado por la página anterior (None = primera página)
+    - **filters**: filtros del catálogo (ver apply_filters)
+    - **sort**: "id" (id_producto) o "price" (precio, id_producto)
+
+    Se pide una fila extra para saber si existe una página siguiente sin
+    ejecutar un COUNT(*). El resultado se guarda en list_cache.
+    """
+    if sort not in SORT_KEYS:
+        raise InvalidCursorError(f"Ordenamiento no soportado: {sort}")
+    if cursor:
+        # Validar antes de consultar la caché para no cachear errores
+        decode_cursor(sort, cursor)
+
+    key = list_cache_key(page_size, cursor, filters, sort)
+    return _cached(list_cache, key, lambda: _query_page(db, page_size, cursor, filters, sort))
+
+
+def _page_query(db: Session, entities: tuple, cursor: Optional[str], filters: Optional[ProductFilters], sort: str) -> Query:
+    """Consulta keyset (sin LIMIT) sobre las entidades/columnas pedidas"""
+    key_columns = SORT_KEYS[sort]
+
+    query = db.query(*entities).filter(Producto.is_active == True)  # noqa: E712
+    query = apply_filters(query, filters)
+
+    if cursor:
+        last_key = decode_cursor(sort, cursor)
+        if len(key_columns) == 1:
+            query = query.filter(key_columns[0] > last_key[0])
+        else:
+            query = query.filter(tuple_(*key_columns) > tuple_(*last_key))
+
+    return query.order_by(*key_columns)
+
+
+def _query_page(db: Session, page_size: int, cursor: Optional[str], filters: Optional[ProductFilters], sort: str) -> dict:
+    rows = _page_query(db, (Producto,), cursor, filters, sort).limit(page_size + 1).all()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(sort, rows[-1]) if has_more else None
+
+    return {
+        "products": [product_to_dict(p) for p in rows],
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+# ==================== ETAGS ====================
+# La versión de un producto es (id_producto, updated_at, precio, stock):
+# cambia con cualquier UPDATE ORM (onupdate=func.now()) y, aunque updated_at
+# tenga resolución de segundos (SQLite), con cambios de precio o stock.
+
+VERSION_COLUMNS = (Producto.id_producto, Producto.updated_at, Producto.precio, Producto.stock)
+
+
+def _etag(parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def list_etag(
+    db: Session,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    filters: Optional[ProductFilters] = None,
+    sort: str = "id",
+) -> str:
+    """
+    ETag fuerte de una página del catálogo.
+
+    Consulta solo la versión de las filas de la página,
+    como tuplas (sin entidades ORM ni Pydantic), y la cachea junto al listado.
+    """
+    if sort not in SORT_KEYS:
+        raise InvalidCursorError(f"Ordenamiento no soportado: {sort}")
+    if cursor:
+        decode_cursor(sort, cursor)
+
+    key = ("etag",) + list_cache_key(page_size, cursor, filters, sort)
+
+    def load():
+        columns = VERSION_COLUMNS
+        rows = _page_query(db, columns, cursor, filters, sort).limit(page_size + 1).all()
+        return _etag((key, [tuple(row) for row in rows]))
+
+    return _cached(list_cache, key, load)
+
+
+def product_etag(db: Session, product_id: int) -> Optional[str]:
+    """ETag fuerte del detalle de un producto (None si no existe/inactivo)"""
+    def load():
+        row = (
+            db.query(*VERSION_COLUMNS)
+            .filter(Producto.id_producto == product_id, Producto.is_active == True)  # noqa: E712
+            .first()
+        )
+        return _etag(tuple(row)) if row is not None else None
+
+    return _cached(product_cache, ("etag", product_id), load, cache_none=False)
+
+
+def list_categories(db: Session) -> list:
+    """Retorna las categorías con productos activos, ordenadas"""
+    rows = (
+        db.query(Producto.categoria)
+        .filter(Producto.is_active == True)  # noqa: E712
+        .distinct()
+        .order_by(Producto.categoria)
+        .all()
+    )
+    return [categoria for (categoria,) in rows]
+
+
+def get_product_detail(db: Session, product_id: int) -> Optional[dict]:
+    """
+    Detalle de un producto activo en formato ProductResponse (cacheado).
+    Retorna None si no existe; los "no encontrado" no se cachean.
+    """
+    def load():
+        producto = get_product(db, product_id)
+        return product_to_dict(producto) if producto is not None else None
+
+    return _cached(product_cache, product_id, load, cache_none=False)
+
+
+def update_product(db: Session, product_id: int, changes: ProductUpdate) -> Optional[Producto]:
+    """
+    Actualiza solo los campos enviados (partial update).
+    Retorna None si el producto no existe. La caché se invalida al commit
+    por los eventos registrados abajo.
+    """
+    producto = get_product(db, product_id)
+    if producto is None:
+        return None
+    for field, value in changes.model_dump(exclude_unset=True).items():
+        if field == "image" and value is not None:
+            value = str(value)
+        setattr(producto, UPDATE_FIELDS[field], value)
+    db.commit()
+    db.refresh(producto)
+    return producto
+
+
+def invalidate_product(product_id: Optional[int] = None, lists: bool = True) -> None:
+    """
+    Invalida el detalle de un producto y todos los listados cacheados.
+    Usar también tras UPDATEs masivos (Core) que no disparan eventos ORM.
+    Con lists=False solo se invalida el detalle (ej: cambios de stock).
+    """
+    if product_id is not None:
+        product_cache.invalidate(product_id)
+        product_cache.invalidate(("etag", product_id))
+    if lists:
+        list_cache.clear()
+        json_cache.clear()
+
+
+def cache_stats() -> list:
+    """Contadores de las cachés del catálogo"""
+    return [product_cache.stats(), list_cache.stats(), json_cache.stats()]
+
+
+# Event listeners: cualquier escritura ORM sobre Producto invalida la caché
+@event.listens_for(Session, "after_flush")
+def _mark_changed_products(session, flush_context):
+    """Registra los productos escritos en el flush; la caché se invalida al commit"""
+    changed = [
+        instance.id_producto
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, Producto)
+    ]
+    if changed:
+        session.info.setdefault("catalog_changed", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidar_cache_producto(session):
+    """
+    Invalida detalle y listados de los productos escritos, DESPUÉS del
+    commit: antes, una lectura concurrente podría volver a cachear la fila
+    vieja, y un rollback habría invalidado cambios que nunca existieron.
+    """
+    changed = session.info.pop("catalog_changed", None)
+    for producto_id in changed or ():
+        invalidate_product(producto_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_products(session):
+    session.info.pop("catalog_changed", None)
+
+
+def get_product(db: Session, product_id: int) -> Optional[Producto]:
+    """Obtiene un producto activo por ID (None si no existe)"""
+    return (
+        db.query(Producto)
+        .filter(Producto.id_producto == product_id, Producto.is_active == True)  # noqa: E712
+        .first()
+    )
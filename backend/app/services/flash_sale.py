@@ -0,0 +1,542 @@
+"""
+Modo flash sale: stock en un contador en memoria con escritura por lotes
+
+Durante una promo miles de requests descuentan stock de la MISMA fila de
+'productos' y cada reserva atómica (services/stock.py) hace cola por el
+lock de esa fila. Para los productos en FLASH_SALE_PRODUCT_IDS:
+
+1. Asignación: el worker toma un bloque de stock de la base con el mismo
+   UPDATE condicional de la reserva normal y lo anota en un lote
+   ('flash_sale_lotes', asignado += n). La fila caliente se toca una vez
+   por bloque, no una vez por pedido.
+2. Reserva: se descuenta del contador en memoria del worker (un lock por
+   producto, que nunca se tiene durante I/O: la asignación de un bloque
+   la hace un solo request fuera del lock), sin tocar la fila caliente.
+3. Escritura (group commit): la venta se suma a la tanda abierta y
+   reserve() espera a que se escriba. Una transacción escribe toda la
+   tanda (items en los carritos + vendido de cada lote); mientras corre,
+   las ventas nuevas se juntan en la tanda siguiente, que escribe el
+   primero de sus requests en tomar el lock. Así cada venta queda en la
+   base ANTES de confirmarse al cliente, con una transacción por tanda (a
+   lo sumo FLASH_SALE_FLUSH_BATCH ventas) y no por pedido. Si la escritura
+   falla, las reservas de la tanda fallan y sus unidades vuelven al
+   contador.
+4. Reconciliación: productos.stock nunca incluye lo asignado, así que una
+   caída no puede vender de más. Al arrancar (y cada cierto tiempo) se
+   cierran los lotes sin heartbeat en FLASH_SALE_LEASE_SECONDS y su resto
+   (asignado - vendido) vuelve a productos.stock. Una caída solo pierde
+   ventas que todavía no se habían confirmado.
+
+Un hilo de fondo renueva el lease de los lotes cada
+FLASH_SALE_FLUSH_INTERVAL_MS (a lo sumo) y reconcilia los de otros workers.
+
+Uso:
+    flash_sale.start(SessionLocal)         # al iniciar la app
+    flash_sale.reserve(user_id, producto_id, cantidad)
+    flash_sale.stop()                      # flush + devolver el resto
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import LoteFlashSale, Producto
+from . import cart as cart_service
+from . import stock as stock_service
+
+logger = logging.getLogger(__name__)
+
+# Tras agotarse un producto, segundos antes de volver a consultar la base
+# (sin esto, cada request de una promo agotada haría un SELECT en serie)
+EXHAUSTED_RECHECK_SECONDS = 1.0
+
+# Venta reservada en memoria, pendiente de escritura
+Sale = namedtuple("Sale", "usuario_id producto_id cantidad precio lote_id")
+
+
+class _Batch:
+    """Tanda de ventas que se escriben en la misma transacción"""
+
+    def __init__(self):
+        self.sales: List[Sale] = []
+        self.written = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.lost: set = set()  # id() de las ventas descartadas al escribir
+        self.units = 0
+
+
+class _Shard:
+    """Stock asignado a este worker para un producto"""
+
+    def __init__(self, producto_id: int):
+        self.producto_id = producto_id
+        self.lock = threading.Lock()
+        self.lote_id: Optional[int] = None
+        self.remaining = 0
+        self.precio: Optional[Decimal] = None
+        self.exhausted_until = 0.0
+        # Asignación en curso (la hace un solo request, sin el lock): los
+        # que no alcanzan con `remaining` esperan este evento
+        self.allocating: Optional[threading.Event] = None
+
+
+class FlashSaleCounter:
+    """
+    Contadores de stock en memoria de un worker con escritura por lotes.
+
+    - **session_factory**: sessionmaker de la app (SessionLocal)
+    - **allocation_size**: unidades máximas por asignación; cerca del final
+      se asigna menos (un cuarto de lo disponible) para no dejar stock
+      varado en workers que ya no venden
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        product_ids: Iterable[int],
+        allocation_size: int = 100,
+        flush_interval_ms: int = 200,
+        flush_batch: int = 500,
+        lease_seconds: int = 30,
+        worker_id: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.product_ids = frozenset(product_ids)
+        self.allocation_size = allocation_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_batch = flush_batch
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._shards = {producto_id: _Shard(producto_id) for producto_id in self.product_ids}
+        self._batch = _Batch()
+        self._full: deque = deque()  # tandas con flush_batch ventas, en orden
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_heartbeat = 0.0
+        self._last_reconcile = 0.0
+        self.reserved = 0
+        self.flushed = 0
+        self.allocations = 0
+        self.flushes = 0
+        self.lost = 0
+
+    def handles(self, producto_id: int) -> bool:
+        return producto_id in self.product_ids
+
+    # ------------------------------------------------------------------
+    # Reserva (camino caliente)
+    # ------------------------------------------------------------------
+
+    def reserve(self, usuario_id: int, producto_id: int, cantidad: int) -> Decimal:
+        """
+        Reserva `cantidad` unidades desde el contador del worker (va a la
+        base por stock solo si hay que asignar un bloque nuevo) y retorna el
+        precio una vez que la venta está escrita en el carrito.
+
+        Raises:
+            stock.InsufficientStockError / stock.ProductNotFoundError
+            El error de la base si falló la escritura (la venta no existe)
+        """
+        shard = self._shards[producto_id]
+        while True:
+            with shard.lock:
+                if shard.remaining >= cantidad:
+                    shard.remaining -= cantidad
+                    sale = Sale(usuario_id, producto_id, cantidad, shard.precio, shard.lote_id)
+                    break
+                if time.monotonic() < shard.exhausted_until:
+                    raise stock_service.InsufficientStockError(producto_id, cantidad, shard.remaining)
+                allocating = shard.allocating
+                owner = allocating is None
+                if owner:
+                    allocating = shard.allocating = threading.Event()
+                    needed, lote_id = cantidad - shard.remaining, shard.lote_id
+            if not owner:
+                # Otro request está asignando: esperar su bloque y volver a mirar
+                allocating.wait()
+                continue
+            try:
+                self._allocate(shard, cantidad, needed, lote_id)
+            finally:
+                with shard.lock:
+                    shard.allocating = None
+                allocating.set()
+        with self._pending_lock:
+            batch = self._batch
+            batch.sales.append(sale)
+            self.reserved += cantidad
+            if len(batch.sales) >= self.flush_batch:
+                self._full.append(batch)
+                self._batch = _Batch()
+        with self._flush_lock:
+            while not batch.written.is_set():
+                self._write_next()
+        if batch.error is not None:
+            raise batch.error
+        if id(sale) in batch.lost:
+            raise stock_service.InsufficientStockError(producto_id, cantidad, 0)
+        return sale.precio
+
+    def _allocate(self, shard: _Shard, cantidad: int, needed: int, current_lote_id: Optional[int]) -> None:
+        """
+        Toma al menos `needed` unidades de productos.stock (lo que le falta
+        al contador para una venta de `cantidad`) para el lote del worker
+        (`current_lote_id`, el del shard al decidir la asignación).
+
+        Corre SIN shard.lock: mientras tanto los demás requests siguen
+        vendiendo lo que queda en el contador. El contador solo cambia
+        después del commit (bajo el lock); si la escritura falla no hay
+        nada que deshacer.
+        """
+        db = self.session_factory()
+        try:
+            while True:
+                row = db.execute(
+                    select(Producto.stock, Producto.precio)
+                    .where(Producto.id_producto == shard.producto_id, Producto.is_active == True)  # noqa: E712
+                ).one_or_none()
+                if row is None:
+                    raise stock_service.ProductNotFoundError(shard.producto_id)
+                if row.stock < needed:
+                    with shard.lock:
+                        shard.exhausted_until = time.monotonic() + EXHAUSTED_RECHECK_SECONDS
+                        available = shard.remaining + row.stock
+                    raise stock_service.InsufficientStockError(shard.producto_id, cantidad, available)
+                take = min(row.stock, max(needed, min(self.allocation_size, row.stock // 4)))
+                try:
+                    precio = stock_service.reserve(db, shard.producto_id, take)
+                except stock_service.InsufficientStockError:
+                    db.rollback()  # otro worker asignó entre el SELECT y el UPDATE
+                    continue
+                lote_id = current_lote_id
+                if lote_id is not None and db.execute(
+                    update(LoteFlashSale)
+                    .where(LoteFlashSale.id_lote == lote_id, LoteFlashSale.cerrado == False)  # noqa: E712
+                    .values(asignado=LoteFlashSale.asignado + take, updated_at=func.now())
+                ).rowcount == 0:
+                    lote_id = None  # reclamado por la reconciliación: abrir uno nuevo
+                if lote_id is None:
+                    lote = LoteFlashSale(producto_id=shard.producto_id, worker_id=self.worker_id, asignado=take)
+                    db.add(lote)
+                    db.flush()
+                    lote_id = lote.id_lote
+                db.commit()
+                break
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with shard.lock:
+            shard.precio = precio
+            if lote_id != current_lote_id:
+                # Lote nuevo: lo que quedaba en el contador era del anterior
+                shard.lote_id = lote_id
+                shard.remaining = take
+            elif shard.lote_id == lote_id:
+                shard.remaining += take
+            # Si no, la reconciliación cerró el lote durante la escritura y
+            # su asignado (con `take`) ya volvió a productos.stock
+            self.allocations += 1
+
+    # ------------------------------------------------------------------
+    # Escritura (group commit)
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Escribe todas las ventas pendientes. Retorna las unidades escritas"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._write_next()
+                if batch is None:
+                    return written
+                if batch.error is not None:
+                    raise batch.error
+                written += batch.units
+
+    def _write_next(self) -> Optional[_Batch]:
+        """
+        Escribe la tanda más antigua (items de carrito + vendido de cada
+        lote) en una transacción y despierta a sus requests. Si falla, sus
+        unidades vuelven al contador. Con self._flush_lock. Retorna la
+        tanda, o None si no había ventas pendientes.
+        """
+        with self._pending_lock:
+            if self._full:
+                batch = self._full.popleft()
+            elif self._batch.sales:
+                batch, self._batch = self._batch, _Batch()
+            else:
+                return None
+        try:
+            db = self.session_factory()
+            try:
+                sales = self._settle_lotes(db, batch)
+                cart_service.add_reserved_items(
+                    db, [(s.usuario_id, s.producto_id, s.cantidad, s.precio) for s in sales]
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            batch.units = sum(sale.cantidad for sale in sales)
+            self.flushed += batch.units
+            self.flushes += 1
+            self._last_heartbeat = time.monotonic()
+        except Exception as error:
+            batch.error = error
+            self._return_units(batch.sales)
+            logger.exception("Flash sale: falló la escritura de %s ventas; se rechazan", len(batch.sales))
+        finally:
+            batch.written.set()
+        return batch
+
+    def _return_units(self, sales: List[Sale]) -> None:
+        """
+        Devuelve al contador las unidades de ventas no escritas. Las de un
+        lote que ya no es el del worker quedan en su 'asignado' y vuelven a
+        productos.stock al cerrarse ese lote.
+        """
+        for sale in sales:
+            shard = self._shards[sale.producto_id]
+            with shard.lock:
+                if shard.lote_id == sale.lote_id:
+                    shard.remaining += sale.cantidad
+        with self._pending_lock:
+            self.reserved -= sum(sale.cantidad for sale in sales)
+
+    def _settle_lotes(self, db: Session, batch: _Batch) -> List[Sale]:
+        """
+        Suma lo vendido a cada lote (solo si sigue abierto). Si otro worker
+        cerró el lote por falta de heartbeat (este worker estuvo pausado más
+        que el lease), su resto ya volvió al stock: esas ventas se reservan
+        de nuevo con el UPDATE condicional y, si ya no hay stock, se
+        rechazan (batch.lost).
+        """
+        sold = {}
+        for sale in batch.sales:
+            sold[sale.lote_id] = sold.get(sale.lote_id, 0) + sale.cantidad
+        closed = set()
+        for lote_id, cantidad in sold.items():
+            result = db.execute(
+                update(LoteFlashSale)
+                .where(LoteFlashSale.id_lote == lote_id, LoteFlashSale.cerrado == False)  # noqa: E712
+                .values(vendido=LoteFlashSale.vendido + cantidad, updated_at=func.now())
+            )
+            if result.rowcount == 0:
+                closed.add(lote_id)
+        if not closed:
+            return batch.sales
+
+        self._forget_lotes(closed)
+        sales = []
+        for sale in batch.sales:
+            if sale.lote_id not in closed:
+                sales.append(sale)
+                continue
+            try:
+                with db.begin_nested():
+                    stock_service.reserve(db, sale.producto_id, sale.cantidad)
+                sales.append(sale)
+            except stock_service.InsufficientStockError:
+                batch.lost.add(id(sale))
+                self.lost += sale.cantidad
+                logger.warning(
+                    "Flash sale: venta rechazada (lote %s reclamado, sin stock): usuario %s, producto %s x%s",
+                    sale.lote_id, sale.usuario_id, sale.producto_id, sale.cantidad
+                )
+        return sales
+
+    def _forget_lotes(self, lote_ids: set) -> None:
+        """Descarta el stock en memoria de lotes que ya no son de este worker"""
+        for shard in self._shards.values():
+            with shard.lock:
+                if shard.lote_id in lote_ids:
+                    shard.lote_id = None
+                    shard.remaining = 0
+
+    def heartbeat(self) -> None:
+        """Renueva el lease de los lotes abiertos del worker"""
+        lote_ids = [shard.lote_id for shard in self._shards.values() if shard.lote_id is not None]
+        if lote_ids:
+            db = self.session_factory()
+            try:
+                db.execute(
+                    update(LoteFlashSale)
+                    .where(LoteFlashSale.id_lote.in_(lote_ids), LoteFlashSale.cerrado == False)  # noqa: E712
+                    .values(updated_at=func.now())
+                )
+                db.commit()
+            finally:
+                db.close()
+        self._last_heartbeat = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Reconciliación y ciclo de vida
+    # ------------------------------------------------------------------
+
+    def release_remaining(self) -> int:
+        """Devuelve a productos.stock lo asignado y no vendido, y cierra los lotes"""
+        self.flush()
+        lote_ids = []
+        for shard in self._shards.values():
+            with shard.lock:
+                if shard.lote_id is not None:
+                    lote_ids.append(shard.lote_id)
+                shard.lote_id = None
+                shard.remaining = 0
+        if not lote_ids:
+            return 0
+        db = self.session_factory()
+        try:
+            return close_lotes(db, LoteFlashSale.id_lote.in_(lote_ids))
+        finally:
+            db.close()
+
+    def reconcile(self) -> int:
+        """Cierra los lotes de workers caídos (sin heartbeat en el lease)"""
+        self._last_reconcile = time.monotonic()
+        db = self.session_factory()
+        try:
+            return reconcile_stale_lotes(db, self.lease_seconds)
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Reconcilia lotes huérfanos e inicia el hilo de heartbeat"""
+        self.reconcile()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="flash-sale-heartbeat", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo de heartbeat, escribe lo pendiente y devuelve el resto"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.release_remaining()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                now = time.monotonic()
+                if now - self._last_heartbeat > self.lease_seconds / 3:
+                    self.heartbeat()
+                if now - self._last_reconcile > self.lease_seconds:
+                    self.reconcile()
+            except Exception:
+                logger.exception("Flash sale: heartbeat o reconciliación fallidos, se reintenta en el próximo ciclo")
+
+    def stats(self) -> dict:
+        with self._pending_lock:
+            pending = sum(sale.cantidad for batch in (*self._full, self._batch) for sale in batch.sales)
+        return {
+            "worker_id": self.worker_id,
+            "products": sorted(self.product_ids),
+            "in_memory": {shard.producto_id: shard.remaining for shard in self._shards.values()},
+            "pending_flush": pending,
+            "reserved": self.reserved,
+            "flushed": self.flushed,
+            "allocations": self.allocations,
+            "flushes": self.flushes,
+            "lost": self.lost,
+        }
+
+
+def close_lotes(db: Session, condition) -> int:
+    """
+    Cierra los lotes abiertos que cumplen `condition` y devuelve su resto
+    (asignado - vendido) a productos.stock en la misma transacción.
+    Retorna la cantidad de lotes cerrados.
+    """
+    try:
+        lotes = db.execute(
+            select(LoteFlashSale.id_lote, LoteFlashSale.producto_id, LoteFlashSale.asignado, LoteFlashSale.vendido)
+            .where(condition, LoteFlashSale.cerrado == False)  # noqa: E712
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not lotes:
+            db.rollback()
+            return 0
+        db.execute(
+            update(LoteFlashSale)
+            .where(LoteFlashSale.id_lote.in_([lote.id_lote for lote in lotes]))
+            .values(cerrado=True, updated_at=func.now())
+        )
+        stock_service.release_many(
+            db, [(lote.producto_id, lote.asignado - lote.vendido) for lote in lotes if lote.asignado > lote.vendido]
+        )
+        db.commit()
+        return len(lotes)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def reconcile_stale_lotes(db: Session, lease_seconds: int) -> int:
+    """Cierra los lotes sin heartbeat en `lease_seconds` (worker caído)"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+    return close_lotes(db, LoteFlashSale.updated_at < cutoff)
+
+
+# Contador del worker (None = modo flash sale desactivado)
+_counter: Optional[FlashSaleCounter] = None
+
+
+def start(session_factory: Callable[[], Session]) -> Optional[FlashSaleCounter]:
+    """Activa el modo flash sale si FLASH_SALE_PRODUCT_IDS no está vacío"""
+    global _counter
+    if not settings.FLASH_SALE_PRODUCT_IDS:
+        return None
+    _counter = FlashSaleCounter(
+        session_factory,
+        settings.FLASH_SALE_PRODUCT_IDS,
+        allocation_size=settings.FLASH_SALE_ALLOCATION_SIZE,
+        flush_interval_ms=settings.FLASH_SALE_FLUSH_INTERVAL_MS,
+        flush_batch=settings.FLASH_SALE_FLUSH_BATCH,
+        lease_seconds=settings.FLASH_SALE_LEASE_SECONDS,
+    )
+    _counter.start()
+    return _counter
+
+
+def stop() -> None:
+    global _counter
+    if _counter is not None:
+        _counter.stop()
+        _counter = None
+
+
+def handles(producto_id: int) -> bool:
+    """¿El producto se vende desde el contador en memoria?"""
+    return _counter is not None and _counter.handles(producto_id)
+
+
+def reserve(usuario_id: int, producto_id: int, cantidad: int) -> Decimal:
+    return _counter.reserve(usuario_id, producto_id, cantidad)
+
+
+def flash_sale_stats() -> Optional[dict]:
+    return _counter.stats() if _counter is not None else None
@@ -0,0 +1,196 @@
+"""
+Servicio de carrito de invitado: token firmado en una cookie
+
+Los visitantes anónimos no crean filas en 'carritos': su carrito viaja en
+una cookie compacta firmada con HMAC-SHA256 (settings.SECRET_KEY), así
+navegar y agregar productos sin sesión no escribe en la base. El stock
+NO se reserva mientras el carrito es de invitado; se reserva al fusionarlo
+con el carrito del usuario en el login o registro (merge_into_cart).
+
+Formato del token: "<items>~<emitido>~<firma>"
+- items: "producto-cantidad" separados por "." (ej.: "5-2.17-1")
+- emitido: epoch en segundos, base 36 (expira a GUEST_CART_TTL_DAYS)
+- firma: HMAC-SHA256 de "<items>~<emitido>" truncado a 16 bytes, base64url
+
+Todos los caracteres son válidos en una cookie sin comillas. Un token
+alterado, vencido o mal formado se trata como carrito vacío.
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from . import cart as cart_service
+from . import catalog
+from . import stock as stock_service
+
+# Bytes de la firma HMAC que viajan en el token
+SIGNATURE_BYTES = 16
+
+# Cantidad máxima por producto en el carrito de invitado
+MAX_QUANTITY = 99
+
+
+class GuestCartLimitError(ValueError):
+    """El carrito de invitado superaría GUEST_CART_MAX_ITEMS productos"""
+
+
+def _sign(body: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:SIGNATURE_BYTES]).decode("ascii").rstrip("=")
+
+
+def _base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        value, rest = divmod(value, 36)
+        out = digits[rest] + out
+        if value == 0:
+            return out
+
+
+def encode(items: Dict[int, int], issued_at: Optional[int] = None) -> str:
+    """Codifica {producto_id: cantidad} como token firmado"""
+    issued_at = int(time.time()) if issued_at is None else issued_at
+    body = ".".join(f"{producto_id}-{cantidad}" for producto_id, cantidad in items.items())
+    body = f"{body}~{_base36(issued_at)}"
+    return f"{body}~{_sign(body)}"
+
+
+def decode(token: Optional[str]) -> Dict[int, int]:
+    """
+    Items de un token válido ({producto_id: cantidad}, en orden de
+    inserción). Token ausente, alterado, vencido o mal formado → {}.
+    """
+    if not token:
+        return {}
+    try:
+        body, signature = token.rsplit("~", 1)
+        if not hmac.compare_digest(signature, _sign(body)):
+            return {}
+        raw_items, issued = body.split("~")
+        if time.time() - int(issued, 36) > settings.GUEST_CART_TTL_DAYS * 86400:
+            return {}
+        items = {}
+        for pair in raw_items.split(".") if raw_items else ():
+            producto_id, cantidad = pair.split("-")
+            items[int(producto_id)] = min(int(cantidad), MAX_QUANTITY)
+        return {producto_id: cantidad for producto_id, cantidad in items.items() if cantidad > 0}
+    except (ValueError, TypeError):  # TypeError: compare_digest con caracteres no ASCII
+        return {}
+
+
+def set_quantity(items: Dict[int, int], producto_id: int, cantidad: int) -> Dict[int, int]:
+    """Copia de `items` con la cantidad del producto reemplazada (0 = quitar)"""
+    updated = dict(items)
+    if cantidad <= 0:
+        updated.pop(producto_id, None)
+        return updated
+    if producto_id not in updated and len(updated) >= settings.GUEST_CART_MAX_ITEMS:
+        raise GuestCartLimitError(
+            f"El carrito de invitado admite hasta {settings.GUEST_CART_MAX_ITEMS} productos"
+        )
+    updated[producto_id] = min(cantidad, MAX_QUANTITY)
+    return updated
+
+
+def check_product(db: Session, producto_id: int, cantidad: int) -> None:
+    """
+    Valida contra el detalle cacheado del catálogo (sin escribir) que el
+    producto exista y tenga stock para `cantidad`. Es orientativo: la
+    reserva real ocurre al fusionar.
+
+    Raises:
+        stock.ProductNotFoundError / stock.InsufficientStockError
+    """
+    producto = catalog.get_product_detail(db, producto_id)
+    if producto is None:
+        raise stock_service.ProductNotFoundError(producto_id)
+    if producto["stock"] < cantidad:
+        raise stock_service.InsufficientStockError(producto_id, cantidad, producto["stock"])
+
+
+def guest_cart_response(db: Session, items: Dict[int, int]) -> dict:
+    """
+    CartResponse del carrito de invitado (user_id 0; el id de cada item es
+    el id del producto) con precios actuales del catálogo cacheado.
+    Los productos que ya no existen se omiten.
+    """
+    lines = []
+    subtotal = Decimal("0")
+    total_quantity = 0
+    for producto_id, cantidad in items.items():
+        producto = catalog.get_product_detail(db, producto_id)
+        if producto is None:
+            continue
+        precio = Decimal(str(producto["price"]))
+        lines.append({
+            "id": producto_id,
+            "product_id": producto_id,
+            "quantity": cantidad,
+            "product_title": producto["title"],
+            "product_price": round(float(precio), 2),
+            "product_image": producto["image"],
+            "subtotal": round(float(precio * cantidad), 2),
+        })
+        subtotal += precio * cantidad
+        total_quantity += cantidad
+    now = datetime.now(timezone.utc)
+    return {
+        "user_id": 0,
+        "items": lines,
+        "total_items": total_quantity,
+        "subtotal": round(float(subtotal), 2),
+        "tax": 0.0,
+        "shipping": 0.0,
+        "total": round(float(subtotal), 2),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def merge_into_cart(db: Session, usuario_id: int, items: Dict[int, int]) -> List[int]:
+    """
+    Fusiona el carrito de invitado con el carrito activo del usuario en una
+    transacción: lock_active_cart, reserve_many y UN upsert_items (suma las
+    cantidades a los productos que ya estaban).
+
+    Un producto sin stock suficiente se agrega con lo disponible; uno
+    inexistente o agotado se omite (se reintenta la transacción sin él, a
+    lo sumo una vez por producto). Retorna los ids omitidos.
+    """
+    pending = dict(items)
+    skipped = []
+    while pending:
+        try:
+            carrito_id = cart_service.lock_active_cart(db, usuario_id)
+            precios = stock_service.reserve_many(db, pending.items())
+            cart_service.upsert_items(db, [
+                (carrito_id, producto_id, cantidad, precios[producto_id])
+                for producto_id, cantidad in pending.items()
+            ])
+            db.commit()
+            return skipped
+        except stock_service.InsufficientStockError as error:
+            db.rollback()
+            if error.available:
+                pending[error.producto_id] = error.available
+            else:
+                pending.pop(error.producto_id)
+                skipped.append(error.producto_id)
+        except stock_service.ProductNotFoundError as error:
+            db.rollback()
+            pending.pop(error.producto_id)
+            skipped.append(error.producto_id)
+        except Exception:
+            db.rollback()
+            raise
+    return skipped
@@ -0,0 +1,285 @@
+"""
+Limitador de intentos de login: ventana deslizante por cuenta y por IP
+
+Cada intento de login cuesta un bcrypt (~250 ms de CPU, ver
+services/passwords.py): sin límite, un atacante satura los workers con
+logins fallidos. Antes de buscar el Usuario o tocar bcrypt, cada intento
+pasa por dos contadores:
+
+- "cuenta:<email>": LOGIN_MAX_ATTEMPTS_PER_ACCOUNT por ventana (fuerza
+  bruta sobre una cuenta); un login exitoso lo reinicia
+- "ip:<dirección>": LOGIN_MAX_ATTEMPTS_PER_IP por ventana (credential
+  stuffing desde una IP sobre muchas cuentas); un login exitoso devuelve
+  su intento, así que solo cuentan los fallidos y muchos usuarios
+  legítimos detrás de una misma IP (NAT, oficina) no se bloquean entre sí
+
+El intento se cuenta antes de bcrypt (así una ráfaga simultánea no pasa
+entera la verificación) y se devuelve al confirmar la contraseña. La IP
+es la de rate_limit.client_ip (X-Forwarded-For solo desde proxies de
+confianza).
+
+Ventana deslizante aproximada con dos contadores fijos por clave (la
+ventana actual y la anterior): intentos estimados = anterior · (fracción
+de la ventana actual que falta) + actual. Memoria constante por clave y
+sin picos en el borde de cada ventana. Los intentos rechazados no
+cuentan: un cliente que respeta Retry-After vuelve a entrar.
+
+Backends (LOGIN_LIMITER_BACKEND):
+- "memory": dict por worker (más rápido; cada worker cuenta aparte)
+- "database": tabla 'intentos_login' compartida entre workers (una
+  lectura y un upsert por intento). La verificación y el incremento no
+  son atómicos entre workers: en una ráfaga simultánea pueden pasar unos
+  pocos intentos de más.
+
+Memoria acotada: cada LOGIN_LIMITER_COMPACT_SECONDS se descartan las
+claves sin intentos en las dos últimas ventanas; el backend en memoria
+además nunca guarda más de LOGIN_LIMITER_MAX_KEYS (expulsa la menos
+reciente). En memoria las claves están en orden de último intento, así
+que la compactación solo recorre las viejas del principio, y como mucho
+COMPACT_BATCH por llamada: corre en el event loop dentro de un login.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import ON_CONFLICT_INSERTS
+from ..models import IntentoLogin
+
+# Claves descartadas como mucho por compactación en memoria (el resto, en la siguiente)
+COMPACT_BATCH = 1000
+
+
+class LoginThrottledError(Exception):
+    """Demasiados intentos de login para la cuenta o la IP"""
+
+    def __init__(self, scope: str, retry_after: int):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(f"Demasiados intentos de login ({scope}); reintenta en {retry_after} s")
+
+
+def _roll(stored_window: int, actual: int, anterior: int, window: int) -> Tuple[int, int]:
+    """(actual, anterior) de una clave llevados a la ventana `window`"""
+    if stored_window == window:
+        return actual, anterior
+    if stored_window == window - 1:
+        return 0, actual
+    return 0, 0
+
+
+def _retry_after(actual: int, anterior: int, limit: int, elapsed: float, window_seconds: float) -> int:
+    """Segundos hasta que la estimación deje lugar para un intento más"""
+    room = limit - 1
+    if actual <= room and anterior:
+        wait = window_seconds * (1 - (room - actual) / anterior) - elapsed
+    else:
+        wait = (window_seconds - elapsed) + window_seconds * max(0.0, 1 - room / actual)
+    return max(1, math.ceil(wait))
+
+
+class LoginLimiter:
+    """
+    Contadores de ventana deslizante con backend en memoria o en la base.
+
+    hit(db, ip, cuenta) registra un intento o lanza LoginThrottledError;
+    succeeded(db, ip, cuenta) reinicia el contador de la cuenta y devuelve
+    el intento de la IP. `db` se ignora con el backend en memoria.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        window_seconds: float,
+        account_limit: int,
+        ip_limit: int,
+        max_keys: int,
+        compact_seconds: float,
+        clock=time.time,
+    ):
+        self.backend = backend
+        self.window_seconds = window_seconds
+        self.account_limit = account_limit
+        self.ip_limit = ip_limit
+        self.max_keys = max_keys
+        self.compact_seconds = compact_seconds
+        self._clock = clock
+        self._data: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._compacted_at = clock()
+        self.allowed = 0
+        self.throttled = 0
+        self.compactions = 0
+        self.evictions = 0
+
+    @property
+    def uses_database(self) -> bool:
+        return self.backend == "database"
+
+    def _keys(self, ip: str, account: str) -> List[Tuple[str, str, int]]:
+        return [
+            ("cuenta", f"cuenta:{account.strip().lower()}", self.account_limit),
+            ("ip", f"ip:{ip}", self.ip_limit),
+        ]
+
+    def _check(self, counters: dict, keys, elapsed: float) -> None:
+        """Lanza LoginThrottledError si alguna clave ya no admite otro intento"""
+        fraction = elapsed / self.window_seconds
+        for scope, key, limit in keys:
+            actual, anterior = counters.get(key, (0, 0))
+            if anterior * (1 - fraction) + actual + 1 > limit:
+                self.throttled += 1
+                raise LoginThrottledError(
+                    scope, _retry_after(actual, anterior, limit, elapsed, self.window_seconds)
+                )
+
+    def hit(self, db: Optional[Session], ip: str, account: str) -> None:
+        """
+        Registra un intento de login de `ip` sobre `account`.
+
+        Raises:
+            LoginThrottledError: la cuenta o la IP superaron su límite
+        """
+        now = self._clock()
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+        keys = self._keys(ip, account)
+        if self.uses_database:
+            self._hit_database(db, keys, window, elapsed)
+        else:
+            self._hit_memory(keys, window, elapsed)
+        self.allowed += 1
+        if now - self._compacted_at >= self.compact_seconds:
+            self.compact(db)
+
+    def _hit_memory(self, keys, window: int, elapsed: float) -> None:
+        with self._lock:
+            counters = {}
+            for _, key, _ in keys:
+                entry = self._data.get(key)
+                if entry is not None:
+                    counters[key] = _roll(*entry, window)
+            self._check(counters, keys, elapsed)
+            for _, key, _ in keys:
+                actual, anterior = counters.get(key, (0, 0))
+                self._data[key] = [window, actual + 1, anterior]
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _hit_database(self, db: Session, keys, window: int, elapsed: float) -> None:
+        claves = [key for _, key, _ in keys]
+        rows = db.execute(
+            select(IntentoLogin.clave, IntentoLogin.ventana, IntentoLogin.actual, IntentoLogin.anterior)
+            .where(IntentoLogin.clave.in_(claves))
+        ).all()
+        counters = {clave: _roll(ventana, actual, anterior, window) for clave, ventana, actual, anterior in rows}
+        self._check(counters, keys, elapsed)
+        table = IntentoLogin.__table__
+        values = [{"clave": clave, "ventana": window, "actual": 1, "anterior": 0} for clave in claves]
+        anterior = case(
+            (table.c.ventana == window, table.c.anterior),
+            (table.c.ventana == window - 1, table.c.actual),
+            else_=0
+        )
+        actual = case((table.c.ventana == window, table.c.actual + 1), else_=1)
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            # MySQL asigna en orden y ve los valores ya actualizados: ventana al final
+            statement = mysql_insert(table).values(values).on_duplicate_key_update([
+                ("anterior", anterior), ("actual", actual), ("ventana", window),
+            ])
+        else:
+            statement = ON_CONFLICT_INSERTS[dialect](table).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.clave],
+                set_={"anterior": anterior, "actual": actual, "ventana": window}
+            )
+        db.execute(statement)
+        db.commit()
+
+    def succeeded(self, db: Optional[Session], ip: str, account: str) -> None:
+        """
+        Login exitoso: la cuenta vuelve a tener todos sus intentos y la IP
+        recupera el que gastó hit (si no se descartó con la compactación)
+        """
+        (_, account_key, _), (_, ip_key, _) = self._keys(ip, account)
+        # hit guardó el intento en la ventana actual o, si cambió desde
+        # entonces, en la anterior: en ambos casos está en `actual`
+        oldest = int(self._clock() // self.window_seconds) - 1
+        if self.uses_database:
+            db.execute(delete(IntentoLogin).where(IntentoLogin.clave == account_key))
+            db.execute(
+                update(IntentoLogin)
+                .where(IntentoLogin.clave == ip_key, IntentoLogin.ventana >= oldest, IntentoLogin.actual > 0)
+                .values(actual=IntentoLogin.actual - 1)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        else:
+            with self._lock:
+                self._data.pop(account_key, None)
+                entry = self._data.get(ip_key)
+                if entry is not None and entry[0] >= oldest and entry[1] > 0:
+                    entry[1] -= 1
+
+    def compact(self, db: Optional[Session] = None) -> int:
+        """Descarta las claves sin intentos en las dos últimas ventanas; retorna cuántas"""
+        now = self._clock()
+        oldest = int(now // self.window_seconds) - 1
+        self._compacted_at = now
+        self.compactions += 1
+        if self.uses_database:
+            removed = db.execute(
+                delete(IntentoLogin)
+                .where(IntentoLogin.ventana < oldest)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            return removed
+        removed = 0
+        with self._lock:
+            # Orden LRU por intento (hit hace move_to_end): las viejas están al principio
+            while removed < COMPACT_BATCH and self._data:
+                key, entry = next(iter(self._data.items()))
+                if entry[0] >= oldest:
+                    break
+                del self._data[key]
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "window_seconds": self.window_seconds,
+            "account_limit": self.account_limit,
+            "ip_limit": self.ip_limit,
+            "keys": len(self._data) if not self.uses_database else None,
+            "max_keys": self.max_keys,
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+            "compactions": self.compactions,
+            "evictions": self.evictions,
+        }
+
+
+limiter = LoginLimiter(
+    settings.LOGIN_LIMITER_BACKEND,
+    settings.LOGIN_WINDOW_SECONDS,
+    settings.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT,
+    settings.LOGIN_MAX_ATTEMPTS_PER_IP,
+    settings.LOGIN_LIMITER_MAX_KEYS,
+    settings.LOGIN_LIMITER_COMPACT_SECONDS,
+)
+
+
+def limiter_stats() -> dict:
+    return limiter.stats()
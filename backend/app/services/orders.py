@@ -0,0 +1,158 @@
+"""
+Servicio de pedidos: checkout del carrito activo
+
+El checkout convierte el carrito activo en un pedido en UNA transacción
+con una cantidad constante de sentencias, sin importar cuántos items
+tenga el carrito:
+
+1. SELECT ... FOR UPDATE del carrito activo (bloquea cambios concurrentes
+   del carrito y la liberación de reservas vencidas)
+2. INSERT INTO pedidos ... SELECT: totales calculados por la base
+3. INSERT INTO pedidos_items ... SELECT: copia los items con el título y
+   precio del momento
+4. UPDATE carritos SET is_active = false
+
+El stock no se descuenta aquí: ya quedó reservado al agregar cada item al
+carrito (services/stock.py). Desactivar el carrito convierte esas
+reservas en venta (release_expired_reservations solo mira carritos
+activos).
+"""
+
+from typing import Optional
+
+from sqlalchemy import Integer, func, insert, literal, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from ..database import commit_or_flush
+from ..models import Carrito, ItemCarrito, Pedido, PedidoItem, Producto
+
+
+class CartNotFoundError(LookupError):
+    """El usuario no tiene carrito activo"""
+
+
+class EmptyCartError(ValueError):
+    """El carrito activo no tiene items"""
+
+
+def _insert_order(db: Session, carrito_id: int) -> Optional[int]:
+    """INSERT INTO pedidos ... SELECT con los totales del carrito; None si está vacío"""
+    subtotal = func.sum(ItemCarrito.subtotal)
+    totals = (
+        select(
+            Carrito.usuario_id,
+            Carrito.id_carrito,
+            literal("pendiente"),
+            func.sum(ItemCarrito.cantidad),
+            subtotal,
+            Carrito.impuesto,
+            Carrito.envio,
+            subtotal + Carrito.impuesto + Carrito.envio,
+        )
+        .join(ItemCarrito, ItemCarrito.carrito_id == Carrito.id_carrito)
+        .where(Carrito.id_carrito == carrito_id)
+        .group_by(Carrito.id_carrito, Carrito.usuario_id, Carrito.impuesto, Carrito.envio)
+    )
+    statement = insert(Pedido).from_select(
+        ["usuario_id", "carrito_id", "estado", "total_items", "subtotal", "impuesto", "envio", "total"],
+        totals
+    )
+    if db.get_bind().dialect.insert_returning:
+        return db.execute(statement.returning(Pedido.id_pedido)).scalar_one_or_none()
+    result = db.execute(statement)  # MySQL: sin RETURNING
+    return result.lastrowid if result.rowcount else None
+
+
+def checkout(db: Session, usuario_id: int, commit: bool = True) -> int:
+    """
+    Convierte el carrito activo del usuario en un pedido (4 sentencias +
+    commit; con commit=False no confirma la transacción). Retorna el id
+    del pedido.
+
+    Raises:
+        CartNotFoundError: si no hay carrito activo
+        EmptyCartError: si el carrito no tiene items
+    """
+    try:
+        carrito_id = db.execute(
+            select(Carrito.id_carrito)
+            .where(Carrito.usuario_id == usuario_id, Carrito.is_active == True)  # noqa: E712
+            .with_for_update()
+        ).scalar_one_or_none()
+        if carrito_id is None:
+            raise CartNotFoundError("El usuario no tiene un carrito activo")
+
+        pedido_id = _insert_order(db, carrito_id)
+        if pedido_id is None:
+            raise EmptyCartError("El carrito está vacío")
+
+        db.execute(
+            insert(PedidoItem).from_select(
+                ["pedido_id", "producto_id", "titulo", "cantidad", "precio_unitario", "subtotal"],
+                select(
+                    literal(pedido_id, Integer),
+                    ItemCarrito.producto_id,
+                    Producto.titulo,
+                    ItemCarrito.cantidad,
+                    ItemCarrito.precio_unitario,
+                    ItemCarrito.subtotal,
+                )
+                .join(Producto, Producto.id_producto == ItemCarrito.producto_id)
+                .where(ItemCarrito.carrito_id == carrito_id)
+                .order_by(ItemCarrito.id_item)
+            )
+        )
+        db.execute(
+            update(Carrito)
+            .where(Carrito.id_carrito == carrito_id)
+            .values(is_active=False, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        commit_or_flush(db, commit)
+        return pedido_id
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _money(value) -> float:
+    """Normaliza Decimal/None de la BD a float con 2 decimales"""
+    if value is None:
+        return 0.0
+    return round(float(value), 2)
+
+
+def order_to_response(pedido: Pedido) -> dict:
+    """Mapea un Pedido (con items cargados) a OrderResponse"""
+    return {
+        "id": pedido.id_pedido,
+        "user_id": pedido.usuario_id,
+        "status": pedido.estado,
+        "items": [
+            {
+                "product_id": item.producto_id,
+                "product_title": item.titulo,
+                "quantity": item.cantidad,
+                "unit_price": _money(item.precio_unitario),
+                "subtotal": _money(item.subtotal),
+            }
+            for item in pedido.items
+        ],
+        "total_items": pedido.total_items,
+        "subtotal": _money(pedido.subtotal),
+        "tax": _money(pedido.impuesto),
+        "shipping": _money(pedido.envio),
+        "total": _money(pedido.total),
+        "created_at": pedido.created_at,
+    }
+
+
+def get_order_response(db: Session, usuario_id: int, pedido_id: int) -> Optional[dict]:
+    """Pedido del usuario con sus items (2 queries: pedido + selectin de items)"""
+    pedido = (
+        db.query(Pedido)
+        .options(selectinload(Pedido.items))
+        .filter(Pedido.id_pedido == pedido_id, Pedido.usuario_id == usuario_id)
+        .first()
+    )
+    return order_to_response(pedido) if pedido is not None else None
@@ -0,0 +1,169 @@
+"""
+Servicio de contraseñas: bcrypt fuera del event loop
+
+bcrypt es lento a propósito (~250 ms con costo 12) y libera el GIL solo
+en parte: llamado desde una ruta async def congela el event loop y todos
+los demás requests del worker esperan. Acá hash y verify corren en un
+ProcessPoolExecutor acotado (PASSWORD_POOL_WORKERS procesos) y la ruta
+solo espera el resultado con await.
+
+Control de admisión: si ya hay PASSWORD_QUEUE_MAX operaciones en curso
+(en los procesos o en su cola) la siguiente falla de inmediato con
+PasswordServiceBusyError (la ruta responde 503 + Retry-After) en vez de
+encolar trabajo que terminaría después del timeout del cliente.
+
+Uso:
+    password_hash = await passwords.hash_password(password)
+    ok = await passwords.verify_password(password, usuario.password_hash)
+    passwords.stop()                       # al cerrar la app
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from ..config import settings
+
+# bcrypt solo usa los primeros 72 bytes; bcrypt>=4.1 rechaza los más largos
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordServiceBusyError(Exception):
+    """Hay PASSWORD_QUEUE_MAX operaciones de bcrypt en curso"""
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_password_sync(password: str, rounds: Optional[int] = None) -> str:
+    """bcrypt en el hilo actual (scripts y procesos del pool)"""
+    rounds = settings.PASSWORD_BCRYPT_ROUNDS if rounds is None else rounds
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def verify_password_sync(password: str, password_hash: str) -> bool:
+    """Compara en tiempo constante; un hash mal formado cuenta como no válido"""
+    try:
+        return bcrypt.checkpw(_encode(password), password_hash.encode("ascii"))
+    except (ValueError, UnicodeEncodeError):
+        return False
+
+
+class PasswordHasher:
+    """
+    Pool de procesos para bcrypt con un tope de operaciones en curso.
+    Los contadores se tocan solo desde el event loop; el lock cubre la
+    creación perezosa del pool.
+    """
+
+    def __init__(self, workers: int, queue_max: int, rounds: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_max = queue_max
+        self.rounds = rounds
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._dummy_hash: Optional[str] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: un fork del worker copiaría hilos (flush, sweeper) y locks tomados
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.queue_max:
+            self.rejected += 1
+            raise PasswordServiceBusyError(
+                f"Hay {self.in_flight} operaciones de contraseña en curso; reintenta en unos segundos"
+            )
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        """
+        `password_hash` None (usuario inexistente) verifica contra un hash
+        de relleno con el mismo costo, para que la latencia no delate si
+        el email está registrado.
+        """
+        if password_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = await self.hash("dummy-password")
+            await self._run(verify_password_sync, password, self._dummy_hash)
+            return False
+        return await self._run(verify_password_sync, password, password_hash)
+
+    def warm_up(self) -> None:
+        """Levanta los procesos del pool (evita pagar el spawn en el primer login)"""
+        pool = self._pool()
+        for future in [pool.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "queue_max": self.queue_max,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.busy_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+        }
+
+
+hasher = PasswordHasher(
+    settings.PASSWORD_POOL_WORKERS, settings.PASSWORD_QUEUE_MAX, settings.PASSWORD_BCRYPT_ROUNDS
+)
+
+
+async def hash_password(password: str) -> str:
+    """Hash bcrypt en el pool. Raises: PasswordServiceBusyError"""
+    return await hasher.hash(password)
+
+
+async def verify_password(password: str, password_hash: Optional[str]) -> bool:
+    """Verifica en el pool. Raises: PasswordServiceBusyError"""
+    return await hasher.verify(password, password_hash)
+
+
+def start() -> None:
+    hasher.warm_up()
+
+
+def stop() -> None:
+    hasher.shutdown()
+
+
+def password_stats() -> dict:
+    return hasher.stats()
@@ -0,0 +1,188 @@
+"""
+Métricas del pool de conexiones de SQLAlchemy
+
+Uso:
+    engine = create_engine(url, poolclass=TimedQueuePool, ...)
+    instrument(engine, "sync", ping="idle", ping_idle_seconds=30)
+    pool_stats()  # → lista de dicts para /internal/metrics
+
+Los contadores se alimentan con eventos del pool (connect, checkout,
+checkin, invalidate). La espera de checkout (cuánto tarda un request en
+obtener conexión, incluyendo esperar a que otro la devuelva) no tiene
+evento propio: la miden TimedQueuePool/TimedAsyncQueuePool alrededor de
+Pool.connect().
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Estrategias de verificación de conexiones al hacer checkout
+PING_STRATEGIES = ("always", "idle", "never")
+
+# Últimas esperas de checkout usadas para los percentiles
+WAIT_SAMPLES = 2048
+
+# Pools instrumentados en este worker (nombre → (engine, métricas))
+_engines = {}
+
+
+class PoolMetrics:
+    """Contadores de un pool (thread-safe)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.peak_in_use = 0
+        self.max_wait_ms = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            self._waits.append(wait_ms)
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+
+    def record_checkout(self, pool: Pool) -> None:
+        in_use = pool.checkedout() if isinstance(pool, QueuePool) else 0
+        with self._lock:
+            self.checkouts += 1
+            if isinstance(pool, QueuePool) and in_use > pool.size():
+                self.overflow_checkouts += 1
+            if in_use > self.peak_in_use:
+                self.peak_in_use = in_use
+
+    def stats(self, pool: Optional[Pool] = None) -> dict:
+        """Contadores + estado actual del pool para el endpoint de métricas"""
+        with self._lock:
+            waits = sorted(self._waits)
+        data = {
+            "name": self.name,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "overflow_checkouts": self.overflow_checkouts,
+            "timeouts": self.timeouts,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "peak_in_use": self.peak_in_use,
+            "wait_p50_ms": round(statistics.median(waits), 3) if waits else 0.0,
+            "wait_p99_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))], 3) if waits else 0.0,
+            "wait_max_ms": round(self.max_wait_ms, 3),
+        }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+
+class _TimedPoolMixin:
+    """Mide la espera de Pool.connect() y la registra en `self.metrics`"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.timeouts += 1
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # dispose()/recreate() crea un pool nuevo: conservar los contadores
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool (engine sync) con medición de espera de checkout"""
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool (engine async) con medición de espera de checkout"""
+
+
+def instrument(engine: Engine, name: str, ping: str = "never", ping_idle_seconds: float = 30.0) -> PoolMetrics:
+    """
+    Registra los eventos de métricas en el pool de `engine` (para un engine
+    async pasar `async_engine.sync_engine`).
+
+    - **ping**: "idle" verifica la conexión en el checkout solo si estuvo
+      inactiva más de `ping_idle_seconds`; "always" lo hace
+      create_engine(pool_pre_ping=True); "never" confía en pool_recycle y
+      en la invalidación automática ante errores de desconexión.
+    """
+    if ping not in PING_STRATEGIES:
+        raise ValueError(f"Estrategia de ping inválida: {ping}")
+    metrics = PoolMetrics(name)
+    engine.pool.metrics = metrics
+    _engines[name] = (engine, metrics)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if ping == "idle":
+            _ping_if_idle(engine, metrics, dbapi_connection, connection_record, ping_idle_seconds)
+        metrics.record_checkout(engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    return metrics
+
+
+def _ping_if_idle(engine: Engine, metrics: PoolMetrics, dbapi_connection, connection_record, idle_seconds: float):
+    """
+    Ping solo a conexiones que estuvieron inactivas más de `idle_seconds`.
+    Si falla, DisconnectionError hace que el pool descarte la conexión y
+    reintente con otra (receta "pessimistic disconnect" de SQLAlchemy).
+    """
+    checked_in_at = connection_record.info.get("checked_in_at")
+    if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+        return
+    metrics.pings += 1
+    try:
+        engine.dialect.do_ping(dbapi_connection)
+    except Exception as error:
+        metrics.ping_failures += 1
+        raise exc.DisconnectionError() from error
+
+
+def pool_stats() -> list:
+    """Métricas de todos los pools instrumentados en este worker"""
+    return [metrics.stats(engine.pool) for engine, metrics in _engines.values()]
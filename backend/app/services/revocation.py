@@ -0,0 +1,261 @@
+"""
+Revocación de tokens: tabla 'tokens_revocados' + filtro de Bloom por worker
+
+Logout revoca el token guardando su 'jti'. Consultar la tabla en cada
+request duplicaría el costo de autenticar, así que cada worker refleja
+los jti revocados en un filtro de Bloom en memoria:
+
+- jti fuera del filtro → el token no está revocado (sin falsos negativos),
+  sin ir a la base: es el caso de casi todos los requests
+- jti dentro del filtro → se confirma con un SELECT por jti; si no hay
+  fila fue un falso positivo (tasa objetivo REVOCATION_BLOOM_FP_RATE)
+
+Actualización incremental: cada REVOCATION_SYNC_SECONDS el worker lee
+solo las filas con revocado_at dentro de REVOCATION_SYNC_OVERLAP_SECONDS
+antes del mayor revocado_at ya visto, y las agrega (re-agregar no cambia
+el filtro). El solape por tiempo cubre las filas que se confirman tarde:
+revocado_at lo pone la base al insertar, así que una fila confirmada
+después de otras más nuevas aparece mientras su transacción dure menos
+que el solape (revoke() confirma enseguida). Las revocaciones de este
+worker entran al filtro de inmediato; las de otros workers, en a lo sumo
+REVOCATION_SYNC_SECONDS.
+Un filtro no admite borrar: si se llena (o tras purgar las revocaciones
+vencidas) se reconstruye desde la tabla con capacidad suficiente.
+
+Uso:
+    if revocation.needs_sync(): revocation.sync(db)
+    if revocation.might_be_revoked(jti) and revocation.is_revoked(db, jti): ...
+    revocation.revoke(db, claims)          # logout
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import TokenRevocado
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un bytearray: m bits y k posiciones por
+    elemento (doble hashing sobre BLAKE2b de 128 bits), dimensionado para
+    `capacity` elementos con tasa de falsos positivos `fp_rate`.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(1, capacity)
+        self.bits = max(8, math.ceil(-self.capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value: str) -> None:
+        """Agrega `value`; count solo sube si no estaba (re-agregar no cambia los bits)"""
+        new = False
+        for position in self._positions(value):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self._array[byte] & bit:
+                self._array[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        array = self._array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._array)
+
+    def expected_fp_rate(self) -> float:
+        """(1 - e^(-k·n/m))^k con los elementos cargados"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+
+class RevocationList:
+    """
+    Filtro de Bloom del worker + posición de lectura en la tabla y
+    contadores. El filtro se reemplaza entero al reconstruirlo, así las
+    lecturas concurrentes nunca ven uno a medio cargar.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float, sync_seconds: float, overlap_seconds: float = 60.0):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_seconds = sync_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.bloom = BloomFilter(capacity, fp_rate)
+        # Mayor revocado_at visto, en el formato que devuelve la base
+        self.high_water: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._rebuild = True
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.filter_hits = 0
+        self.db_checks = 0
+        self.false_positives = 0
+        self.syncs = 0
+        self.rebuilds = 0
+
+    def needs_sync(self) -> bool:
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_seconds
+
+    def _advance(self, rows) -> None:
+        if rows:
+            newest = max(revocado_at for revocado_at, _ in rows)
+            if self.high_water is None or newest > self.high_water:
+                self.high_water = newest
+
+    def _load_all(self, db: Session) -> None:
+        rows = db.execute(
+            select(TokenRevocado.revocado_at, TokenRevocado.jti)
+            .where(TokenRevocado.expires_at > datetime.now(timezone.utc))
+        ).all()
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.fp_rate)
+        for _, jti in rows:
+            bloom.add(jti)
+        self.bloom = bloom
+        self._advance(rows)
+        self._rebuild = False
+        self.rebuilds += 1
+
+    def sync(self, db: Session) -> int:
+        """Agrega al filtro las revocaciones nuevas; retorna cuántas agregó"""
+        with self._lock:
+            if self._rebuild:
+                self._load_all(db)
+                added = self.bloom.count
+            else:
+                query = select(TokenRevocado.revocado_at, TokenRevocado.jti)
+                if self.high_water is not None:
+                    query = query.where(TokenRevocado.revocado_at >= self.high_water - self.overlap)
+                rows = db.execute(query).all()
+                before = self.bloom.count
+                for _, jti in rows:
+                    self.bloom.add(jti)
+                self._advance(rows)
+                added = self.bloom.count - before
+                if self.bloom.count > self.bloom.capacity:
+                    self._load_all(db)
+            self._synced_at = time.monotonic()
+            self.syncs += 1
+            return added
+
+    def might_be_revoked(self, jti: str) -> bool:
+        """Solo memoria: False = seguro no revocado"""
+        self.checks += 1
+        if jti in self.bloom:
+            self.filter_hits += 1
+            return True
+        return False
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        """Confirma en la tabla un positivo del filtro"""
+        self.db_checks += 1
+        found = db.execute(select(TokenRevocado.id_revocacion).where(TokenRevocado.jti == jti)).first()
+        if found is None:
+            self.false_positives += 1
+            return False
+        return True
+
+    def revoke(self, db: Session, claims: dict) -> bool:
+        """
+        Guarda el jti del token (con su 'exp') y lo agrega al filtro.
+        Retorna False si ya estaba revocado.
+        """
+        db.add(TokenRevocado(
+            jti=claims["jti"],
+            usuario_id=int(claims["sub"]),
+            expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
+        ))
+        try:
+            db.commit()
+            revoked = True
+        except IntegrityError:
+            db.rollback()
+            revoked = False
+        with self._lock:
+            self.bloom.add(claims["jti"])
+        return revoked
+
+    def purge_expired(self, db: Session) -> int:
+        """Borra las revocaciones de tokens ya vencidos y reconstruye el filtro en el próximo sync"""
+        deleted = db.execute(
+            delete(TokenRevocado)
+            .where(TokenRevocado.expires_at <= datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if deleted:
+            with self._lock:
+                self._rebuild = True
+                self._synced_at = None
+        return deleted
+
+    def stats(self) -> dict:
+        valid_checks = self.checks - (self.db_checks - self.false_positives)
+        return {
+            "entries": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "bits": self.bloom.bits,
+            "hashes": self.bloom.hashes,
+            "memory_bytes": self.bloom.memory_bytes,
+            "target_fp_rate": self.fp_rate,
+            "expected_fp_rate": round(self.bloom.expected_fp_rate(), 6),
+            "observed_fp_rate": round(self.false_positives / valid_checks, 6) if valid_checks > 0 else 0.0,
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "db_checks": self.db_checks,
+            "false_positives": self.false_positives,
+            "syncs": self.syncs,
+            "rebuilds": self.rebuilds,
+        }
+
+
+revocation_list = RevocationList(
+    settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_FP_RATE, settings.REVOCATION_SYNC_SECONDS,
+    settings.REVOCATION_SYNC_OVERLAP_SECONDS,
+)
+
+
+def needs_sync() -> bool:
+    return revocation_list.needs_sync()
+
+
+def sync(db: Session) -> int:
+    return revocation_list.sync(db)
+
+
+def might_be_revoked(jti: str) -> bool:
+    return revocation_list.might_be_revoked(jti)
+
+
+def is_revoked(db: Session, jti: str) -> bool:
+    return revocation_list.is_revoked(db, jti)
+
+
+def revoke(db: Session, claims: dict) -> bool:
+    return revocation_list.revoke(db, claims)
+
+
+def purge_expired(db: Session) -> int:
+    return revocation_list.purge_expired(db)
+
+
+def revocation_stats() -> dict:
+    return revocation_list.stats()
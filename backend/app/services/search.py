@@ -0,0 +1,159 @@
+"""
+Servicio de búsqueda de texto completo sobre productos
+
+Usa el motor nativo de cada base de datos:
+- PostgreSQL: to_tsvector/ts_rank con los índices GIN
+  idx_productos_titulo_busqueda e idx_productos_descripcion_busqueda
+- SQLite: tabla virtual FTS5 'productos_fts' (external content) que se
+  mantiene sincronizada con 'productos' mediante triggers (DDL en
+  models/producto.py)
+- Otros (MySQL): LIKE sobre titulo/descripcion, sin ranking
+
+Los resultados se ordenan por relevancia: una coincidencia en el título
+pesa más que una en la descripción.
+"""
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import and_, func, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+from ..models import Producto
+from ..models.producto import PG_TS_CONFIG, SQLITE_FTS_REBUILD
+
+
+# Literales SQL (no bind params) para que las expresiones coincidan con las
+# de los índices GIN y el planner de PostgreSQL pueda usarlos
+_PG_CONFIG = literal_column(f"'{PG_TS_CONFIG}'")
+_PG_EMPTY = literal_column("''")
+
+# Pesos de bm25 en FTS5: (titulo, descripcion)
+FTS5_WEIGHTS = (10.0, 1.0)
+
+# Palabras: letras/dígitos Unicode (descarta operadores y comillas de la query)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Máximo de términos considerados por búsqueda
+MAX_TERMS = 8
+
+
+# ==================== CONSULTAS ====================
+
+def tokenize(query: str) -> List[str]:
+    """Extrae los términos buscables de la query del usuario"""
+    return _TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def _fts5_query(terms: List[str]) -> str:
+    """Query FTS5: todos los términos, cada uno como prefijo ("lap"* "dell"*)"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms: List[str]) -> str:
+    """Query tsquery: todos los términos, cada uno como prefijo (lap:* & dell:*)"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def match_clause(db: Session, query: str):
+    """
+    Retorna una condición WHERE sobre Producto que filtra por texto usando
+    el índice de búsqueda del motor (o None si la query no tiene términos).
+
+    Se usa desde catalog.apply_filters para el filtro `search` del catálogo.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        fts_ids = select(literal_column("rowid")).select_from(text("productos_fts")).where(
+            text("productos_fts MATCH :fts_query").bindparams(fts_query=_fts5_query(terms))
+        )
+        return Producto.id_producto.in_(fts_ids)
+
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery(_PG_CONFIG, _tsquery(terms))
+        return or_(
+            func.to_tsvector(_PG_CONFIG, Producto.titulo).op("@@")(ts_query),
+            func.to_tsvector(_PG_CONFIG, func.coalesce(Producto.descripcion, _PG_EMPTY)).op("@@")(ts_query),
+        )
+
+    conditions = []
+    for term in terms:
+        pattern = f"%{term}%"
+        conditions.append(or_(Producto.titulo.ilike(pattern), Producto.descripcion.ilike(pattern)))
+    return and_(*conditions)
+
+
+def search_products(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    category: Optional[str] = None
+) -> List[Producto]:
+    """
+    Busca productos activos por texto en titulo y descripcion.
+
+    - **query**: texto libre; cada palabra se busca como prefijo
+    - **limit**: máximo de resultados
+    - **category**: restringe a una categoría (opcional)
+
+    Retorna los productos ordenados por relevancia (más relevante primero).
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    dialect = _dialect(db)
+    base = db.query(Producto).filter(Producto.is_active == True)  # noqa: E712
+    if category:
+        base = base.filter(Producto.categoria == category)
+
+    if dialect == "sqlite":
+        weights = ", ".join(str(w) for w in FTS5_WEIGHTS)
+        ranked = text(
+            "SELECT rowid AS id_producto, "
+            f"bm25(productos_fts, {weights}) AS rank "
+            "FROM productos_fts WHERE productos_fts MATCH :fts_query"
+        ).bindparams(fts_query=_fts5_query(terms)).columns(
+            id_producto=Producto.id_producto.type
+        ).subquery("fts")
+        # bm25: menor = más relevante
+        return (
+            base.join(ranked, ranked.c.id_producto == Producto.id_producto)
+            .order_by(literal_column("fts.rank"), Producto.id_producto)
+            .limit(limit)
+            .all()
+        )
+
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery(_PG_CONFIG, _tsquery(terms))
+        document = func.setweight(func.to_tsvector(_PG_CONFIG, Producto.titulo), "A").op("||")(
+            func.setweight(func.to_tsvector(_PG_CONFIG, func.coalesce(Producto.descripcion, _PG_EMPTY)), "B")
+        )
+        return (
+            base.filter(match_clause(db, query))
+            .order_by(func.ts_rank(document, ts_query).desc(), Producto.id_producto)
+            .limit(limit)
+            .all()
+        )
+
+    return (
+        base.filter(match_clause(db, query))
+        .order_by(Producto.id_producto)
+        .limit(limit)
+        .all()
+    )
+
+
+def rebuild_index(db: Session) -> None:
+    """Reconstruye el índice FTS5 completo (solo SQLite; no-op en otros motores)"""
+    if _dialect(db) == "sqlite":
+        db.execute(text(SQLITE_FTS_REBUILD))
+        db.commit()
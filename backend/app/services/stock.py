@@ -0,0 +1,239 @@
+"""
+Servicio de stock: reservas atómicas al agregar al carrito
+
+Agregar un producto al carrito RESERVA stock: 'productos.stock' es el
+stock disponible (no reservado). La reserva es un solo UPDATE condicional:
+
+    UPDATE productos SET stock = stock - :n
+    WHERE id_producto = :id AND is_active AND stock >= :n
+
+Si rowcount = 0 no había stock suficiente. No hay SELECT previo (la
+comprobación y el descuento son la misma sentencia) ni locks explícitos:
+funciona igual en PostgreSQL, MySQL y SQLite y nunca vende de más.
+Reemplaza al trigger 'validar_stock_disponible' (solo PostgreSQL, con un
+SELECT separado y por lo tanto con carrera).
+
+La reserva se libera al quitar el item, al bajar su cantidad o cuando el
+carrito expira (release_expired_reservations).
+
+Las funciones no hacen commit: la reserva y el cambio en items_carrito
+van en la misma transacción del caller.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, event, func, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Carrito, ItemCarrito, Producto
+from . import catalog
+
+# Items liberados por expiración en cada lote
+RELEASE_BATCH_SIZE = 500
+
+
+class InsufficientStockError(ValueError):
+    """No hay stock disponible para la cantidad pedida"""
+
+    def __init__(self, producto_id: int, requested: int, available: Optional[int] = None):
+        self.producto_id = producto_id
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Stock insuficiente. Disponible: {available if available is not None else 0}, "
+            f"Solicitado: {requested}"
+        )
+
+
+class ProductNotFoundError(LookupError):
+    """El producto no existe o está inactivo"""
+
+    def __init__(self, producto_id: int):
+        self.producto_id = producto_id
+        super().__init__(f"Producto con ID {producto_id} no encontrado")
+
+
+def _mark_changed(db: Session, producto_ids: Iterable[int]) -> None:
+    """Registra productos cuyo stock cambió; la caché se invalida al commit"""
+    db.info.setdefault("stock_changed", set()).update(producto_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_stock(session):
+    """
+    Invalida el detalle cacheado de los productos tocados, DESPUÉS del
+    commit (antes, una lectura concurrente podría volver a cachear el stock
+    viejo). Los listados no se limpian en cada reserva: su stock es
+    informativo y lo acota el TTL; la reserva atómica es la fuente de verdad.
+    """
+    changed = session.info.pop("stock_changed", None)
+    for producto_id in changed or ():
+        catalog.invalidate_product(producto_id, lists=False)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_stock(session):
+    session.info.pop("stock_changed", None)
+
+
+def available_stock(db: Session, producto_id: int) -> Optional[int]:
+    """Stock disponible de un producto activo (None si no existe)"""
+    return db.execute(
+        select(Producto.stock).where(Producto.id_producto == producto_id, Producto.is_active == True)  # noqa: E712
+    ).scalar_one_or_none()
+
+
+def reserve(db: Session, producto_id: int, cantidad: int) -> Decimal:
+    """
+    Reserva `cantidad` unidades con un UPDATE condicional.
+
+    Retorna el precio del producto (con RETURNING en el mismo UPDATE donde
+    el motor lo soporta: PostgreSQL y SQLite; en MySQL, un SELECT aparte).
+
+    Raises:
+        InsufficientStockError: si no hay stock suficiente
+        ProductNotFoundError: si el producto no existe o está inactivo
+    """
+    statement = (
+        update(Producto)
+        .where(
+            Producto.id_producto == producto_id,
+            Producto.is_active == True,  # noqa: E712
+            Producto.stock >= cantidad,
+        )
+        .values(stock=Producto.stock - cantidad, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        precio = db.execute(statement.returning(Producto.precio)).scalar_one_or_none()
+        reserved = precio is not None
+    else:
+        reserved = db.execute(statement).rowcount == 1
+        precio = None
+    if not reserved:
+        available = available_stock(db, producto_id)
+        if available is None:
+            raise ProductNotFoundError(producto_id)
+        raise InsufficientStockError(producto_id, cantidad, available)
+    if precio is None:
+        precio = db.execute(select(Producto.precio).where(Producto.id_producto == producto_id)).scalar_one()
+    _mark_changed(db, (producto_id,))
+    return precio
+
+
+def reserve_many(db: Session, items: Iterable[Tuple[int, int]]) -> Dict[int, Decimal]:
+    """
+    Reserva varias cantidades [(producto_id, cantidad), ...] en UN UPDATE
+    condicional (CASE por producto), todo o nada: si a algún producto le
+    falta stock lanza el error de ese producto y el caller hace rollback.
+
+    Retorna {producto_id: precio}. En MySQL (sin RETURNING) el UPDATE va
+    en un SAVEPOINT para poder informar qué producto falló.
+
+    Raises:
+        InsufficientStockError / ProductNotFoundError
+    """
+    totals = {}
+    for producto_id, cantidad in items:
+        totals[producto_id] = totals.get(producto_id, 0) + cantidad
+    if not totals:
+        return {}
+    requested = case(totals, value=Producto.id_producto)
+    statement = (
+        update(Producto)
+        .where(
+            Producto.id_producto.in_(totals),
+            Producto.is_active == True,  # noqa: E712
+            Producto.stock >= requested,
+        )
+        .values(stock=Producto.stock - requested, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        precios = dict(db.execute(statement.returning(Producto.id_producto, Producto.precio)).all())
+    else:
+        savepoint = db.begin_nested()
+        if db.execute(statement).rowcount == len(totals):
+            savepoint.commit()
+            precios = dict(db.execute(
+                select(Producto.id_producto, Producto.precio).where(Producto.id_producto.in_(totals))
+            ).all())
+        else:
+            savepoint.rollback()
+            precios = {}
+    if len(precios) < len(totals):
+        missing = [producto_id for producto_id in totals if producto_id not in precios]
+        available = dict(db.execute(
+            select(Producto.id_producto, Producto.stock)
+            .where(Producto.id_producto.in_(missing), Producto.is_active == True)  # noqa: E712
+        ).all())
+        for producto_id in missing:
+            if producto_id not in available:
+                raise ProductNotFoundError(producto_id)
+            if available[producto_id] < totals[producto_id]:
+                raise InsufficientStockError(producto_id, totals[producto_id], available[producto_id])
+        # El stock se liberó entre el UPDATE y esta lectura: igual se rechaza
+        raise InsufficientStockError(missing[0], totals[missing[0]], available[missing[0]])
+    _mark_changed(db, totals)
+    return precios
+
+
+def release(db: Session, producto_id: int, cantidad: int) -> None:
+    """Devuelve `cantidad` unidades reservadas al stock disponible"""
+    release_many(db, [(producto_id, cantidad)])
+
+
+def release_many(db: Session, items: Iterable[Tuple[int, int]]) -> None:
+    """
+    Libera varias reservas [(producto_id, cantidad), ...] en UN UPDATE
+    (CASE por producto), sin importar cuántos items sean.
+    """
+    totals = {}
+    for producto_id, cantidad in items:
+        totals[producto_id] = totals.get(producto_id, 0) + cantidad
+    if not totals:
+        return
+    db.execute(
+        update(Producto)
+        .where(Producto.id_producto.in_(totals))
+        .values(
+            stock=Producto.stock + case(totals, value=Producto.id_producto, else_=0),
+            updated_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    _mark_changed(db, totals)
+
+
+def release_expired_reservations(db: Session, ttl_minutes: int, batch_size: int = RELEASE_BATCH_SIZE) -> int:
+    """
+    Libera la reserva de los items de carritos activos sin actividad en
+    `ttl_minutes` (carritos abandonados): borra esos items y devuelve sus
+    cantidades al stock. Procesa en lotes, un commit por lote. Bloquea
+    items y carritos con SKIP LOCKED: un carrito en checkout se salta.
+
+    Retorna la cantidad de items liberados.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=ttl_minutes)
+    released = 0
+    while True:
+        rows = db.execute(
+            select(ItemCarrito.id_item, ItemCarrito.producto_id, ItemCarrito.cantidad)
+            .join(Carrito, Carrito.id_carrito == ItemCarrito.carrito_id)
+            .where(Carrito.is_active == True, Carrito.updated_at < cutoff)  # noqa: E712
+            .order_by(ItemCarrito.id_item)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return released
+        db.execute(
+            delete(ItemCarrito)
+            .where(ItemCarrito.id_item.in_([row.id_item for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        release_many(db, [(row.producto_id, row.cantidad) for row in rows])
+        db.commit()
+        released += len(rows)
@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento del backend
+
+Cada módulo es un script ejecutable desde la carpeta backend/:
+    python -m benchmarks.bench_catalog_pagination --rows 1000000
+"""
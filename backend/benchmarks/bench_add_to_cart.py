@@ -0,0 +1,166 @@
+"""
+Benchmark + verificación: add-to-cart con upsert vs ORM
+
+Compara el add-to-cart "de ORM" (SELECT del carrito, SELECT del item,
+reserva, INSERT o UPDATE vía flush con el listener
+calcular_subtotal_automatico y UPDATE de carritos.updated_at) contra
+services/cart.add_item: UPDATE carritos ... RETURNING, reserva y UN
+INSERT ... ON CONFLICT DO UPDATE con el subtotal calculado en SQL.
+
+Mide sentencias y latencia para agregar un producto nuevo y para sumar
+unidades de uno que ya está en el carrito. Verifica que el subtotal quede
+igual a precio_unitario × cantidad, que se conserve el precio del item
+aunque cambie el del producto, que se bumpee carritos.updated_at y que
+el stock se reserve una sola vez por llamada.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_add_to_cart --repeat 300
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.models import Carrito, ItemCarrito, Producto
+from app.services import cart as cart_service
+from app.services import stock as stock_service
+from benchmarks.common import (
+    count_queries, make_engine, make_session_factory, print_header, seed_cart, seed_products
+)
+
+
+def orm_add_item(db, usuario_id: int, producto_id: int, cantidad: int) -> None:
+    """add-to-cart leyendo el item y escribiendo con el ORM (camino anterior)"""
+    try:
+        carrito = cart_service.get_or_create_active_cart(db, usuario_id)
+        item = (
+            db.query(ItemCarrito)
+            .filter(ItemCarrito.carrito_id == carrito.id_carrito, ItemCarrito.producto_id == producto_id)
+            .with_for_update()
+            .first()
+        )
+        precio = stock_service.reserve(db, producto_id, cantidad)
+        if item is None:
+            db.add(ItemCarrito(
+                carrito_id=carrito.id_carrito,
+                producto_id=producto_id,
+                cantidad=cantidad,
+                precio_unitario=precio
+            ))
+        else:
+            item.cantidad += cantidad
+        db.query(Carrito).filter(Carrito.id_carrito == carrito.id_carrito).update(
+            {Carrito.updated_at: func.now()},
+            synchronize_session=False
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def run(add, engine, SessionLocal, producto_ids, repeat: int) -> dict:
+    """
+    `repeat` usuarios: cada uno agrega un producto nuevo y luego suma
+    unidades del mismo producto. Retorna sentencias y mediana por caso.
+    """
+    samples = {"nuevo": [], "existente": []}
+    statements = {}
+    db = SessionLocal()
+    for i in range(repeat):
+        usuario_id = seed_cart(SessionLocal, 0)
+        producto_id = producto_ids[i % len(producto_ids)]
+        for case in ("nuevo", "existente"):
+            with count_queries(engine) as counter:
+                start = time.perf_counter()
+                add(db, usuario_id, producto_id, 1)
+                samples[case].append((time.perf_counter() - start) * 1000)
+            statements[case] = counter["count"]
+    db.close()
+    return {
+        case: {"statements": statements[case], "median_ms": statistics.median(values)}
+        for case, values in samples.items()
+    }
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+
+    print_header("🛒 ADD-TO-CART: UPSERT vs ORM")
+    engine = make_engine()
+    seed_products(engine, 500)
+    SessionLocal = make_session_factory(engine)
+    with engine.begin() as conn:
+        conn.execute(update(Producto).values(stock=1_000_000, is_active=True))
+        producto_ids = list(conn.execute(select(Producto.id_producto).order_by(Producto.id_producto)).scalars())
+
+    results = {
+        "ORM": run(orm_add_item, engine, SessionLocal, producto_ids, args.repeat),
+        "upsert": run(cart_service.add_item, engine, SessionLocal, producto_ids, args.repeat),
+    }
+    print(f"\n{'camino':>7} | {'caso':>9} | {'sentencias':>10} | {'mediana (ms)':>12}")
+    for name, result in results.items():
+        for case, row in result.items():
+            print(f"{name:>7} | {case:>9} | {row['statements']:>10} | {row['median_ms']:>12.3f}")
+
+    passed = True
+    for case in ("nuevo", "existente"):
+        orm, upsert = results["ORM"][case], results["upsert"][case]
+        passed &= check(
+            f"{case}: upsert en 3 sentencias (ORM: {orm['statements']})",
+            upsert["statements"] == 3 and upsert["statements"] < orm["statements"]
+        )
+        print(f"   {case}: {orm['median_ms'] / upsert['median_ms']:.2f}x más rápido")
+
+    # Correctitud: subtotal en SQL, precio conservado, updated_at y stock
+    usuario_id = seed_cart(SessionLocal, 0)
+    producto_id = producto_ids[0]
+    db = SessionLocal()
+    cart_service.add_item(db, usuario_id, producto_id, 2)
+    old = datetime.now(timezone.utc) - timedelta(days=1)
+    db.execute(update(Carrito).where(Carrito.usuario_id == usuario_id).values(updated_at=old))
+    precio = db.execute(select(Producto.precio).where(Producto.id_producto == producto_id)).scalar_one()
+    db.execute(update(Producto).where(Producto.id_producto == producto_id).values(precio=precio + 1))
+    db.commit()
+    stock_antes = stock_service.available_stock(db, producto_id)
+    cart_service.add_item(db, usuario_id, producto_id, 3)
+    item = db.execute(
+        select(ItemCarrito.cantidad, ItemCarrito.precio_unitario, ItemCarrito.subtotal)
+        .join(Carrito, Carrito.id_carrito == ItemCarrito.carrito_id)
+        .where(Carrito.usuario_id == usuario_id)
+    ).one()
+    updated_at = db.execute(select(Carrito.updated_at).where(Carrito.usuario_id == usuario_id)).scalar_one()
+    passed &= check(
+        "incremento: cantidad 5, precio del item conservado, subtotal = precio × cantidad",
+        item.cantidad == 5 and Decimal(str(item.precio_unitario)) == Decimal(str(precio))
+        and Decimal(str(item.subtotal)) == Decimal(str(precio)) * 5
+    )
+    passed &= check("carritos.updated_at bumpeado", updated_at.replace(tzinfo=timezone.utc) > old)
+    passed &= check("stock reservado una vez (3 unidades)", stock_service.available_stock(db, producto_id) == stock_antes - 3)
+
+    inconsistentes = db.execute(
+        select(func.count()).select_from(ItemCarrito)
+        .where(func.abs(ItemCarrito.subtotal - ItemCarrito.precio_unitario * ItemCarrito.cantidad) > 0.001)
+    ).scalar_one()
+    passed &= check("todos los items con subtotal = precio_unitario × cantidad", inconsistentes == 0)
+    db.close()
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
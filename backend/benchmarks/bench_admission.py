@@ -0,0 +1,326 @@
+"""
+Prueba de carga: control de admisión y descarte bajo sobrecarga
+
+Mezcla de tráfico sobre la app real (httpx + ASGITransport, un worker):
+catálogo (GET /api/products/ con filtros y búsquedas al azar, caché del
+catálogo desactivada para que toque la base), carrito
+(GET /api/cart/summary) y checkout (POST /api/orders/checkout de usuarios
+con carrito). El pool de conexiones se achica (--pool-size, sin overflow)
+para que se sature como en producción.
+
+1. Capacidad: carga cerrada con --concurrency clientes, sin admisión →
+   requests por segundo que el worker sostiene (X)
+2. Sobrecarga: llegadas abiertas (Poisson) a --overload · X durante
+   --seconds, sin y con control de admisión (app/admission.py)
+
+Goodput = respuestas 2xx dentro del SLO (--slo-ms) por segundo. Verifica
+que con admisión el goodput no caiga por debajo del de sin admisión, que
+los checkouts se completen dentro del SLO, que se descarte primero el
+catálogo (503 con Retry-After) y, con un reloj falso, el AIMD del límite
+y que al liberarse un lugar entre primero el checkout en cola.
+Cada request lleva X-Request-Start con su hora de llegada, como lo haría
+el proxy: con un solo proceso la cola de la sobrecarga se forma en el
+event loop, antes del middleware.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_admission --seconds 5 --overload 3
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from app import admission
+from app.admission import AdmissionController
+from app.config import settings
+from app.main import app
+from benchmarks.common import CATEGORIAS, PALABRAS, make_engine, override_app_db, percentile, print_header, seed_cart, seed_products
+
+# perf_counter() → epoch, para X-Request-Start
+EPOCH_OFFSET = time.time() - time.perf_counter()
+
+# Header del "proxy" simulado (ADMISSION_REQUEST_START_HEADER viene desactivado)
+REQUEST_START_HEADER = "X-Request-Start"
+
+# Fracción de cada clase en la mezcla de tráfico
+MIX = (("catalog", 0.80), ("cart", 0.15), ("checkout", 0.05))
+
+
+class Traffic:
+    """Genera requests de la mezcla; los checkouts consumen usuarios con carrito"""
+
+    def __init__(self, cart_users: list, checkout_users: list):
+        self.cart_users = cart_users
+        self.checkout_users = checkout_users
+
+    def pick(self) -> str:
+        value = random.random()
+        for name, share in MIX:
+            if value < share:
+                return name
+            value -= share
+        return MIX[-1][0]
+
+    async def send(self, client, kind: str, headers: dict):
+        if kind == "checkout" and self.checkout_users:
+            return await client.post(f"/api/orders/checkout?user_id={self.checkout_users.pop()}", headers=headers)
+        if kind in ("cart", "checkout"):
+            return await client.get(f"/api/cart/summary?user_id={random.choice(self.cart_users)}", headers=headers)
+        params = {"page_size": 50, "sort": "price", "minPrice": random.randint(0, 500)}
+        if random.random() < 0.5:
+            params["category"] = random.choice(CATEGORIAS)
+        else:
+            params["search"] = random.choice(PALABRAS)
+        return await client.get("/api/products/", params=params, headers=headers)
+
+
+async def timed(client, traffic: Traffic, kind: str, results: list, start: float = None):
+    """
+    Latencia desde `start` (el momento en que tocaba enviarlo en carga
+    abierta), que también viaja en X-Request-Start como lo pondría el proxy
+    """
+    start = start if start is not None else time.perf_counter()
+    headers = {REQUEST_START_HEADER: f"t={start + EPOCH_OFFSET:.3f}"}
+    response = await traffic.send(client, kind, headers)
+    results.append((kind, response.status_code, (time.perf_counter() - start) * 1000))
+
+
+async def closed_loop(client, traffic: Traffic, concurrency: int, seconds: float) -> float:
+    """Requests por segundo con `concurrency` clientes en carga cerrada"""
+    results = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await timed(client, traffic, traffic.pick(), results)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(results) / (time.perf_counter() - start)
+
+
+async def open_loop(client, traffic: Traffic, rate: float, seconds: float) -> dict:
+    """Llegadas de Poisson a `rate` req/s durante `seconds`; espera a que terminen"""
+    results = []
+    tasks = []
+    start = time.perf_counter()
+    due = start
+    while due - start < seconds:
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        tasks.append(asyncio.create_task(timed(client, traffic, traffic.pick(), results, due)))
+        due += random.expovariate(rate)
+    await asyncio.gather(*tasks)
+    return {"results": results, "offered": len(tasks), "seconds": seconds, "elapsed": time.perf_counter() - start}
+
+
+def summarize(run: dict, slo_ms: float) -> dict:
+    """Por clase; goodput sobre el tiempo hasta la última respuesta (incluye drenar la cola)"""
+    by_class = defaultdict(lambda: {"sent": 0, "ok": 0, "good": 0, "shed": 0, "errors": 0, "latencies": []})
+    for kind, status_code, latency in run["results"]:
+        row = by_class[kind]
+        row["sent"] += 1
+        if status_code < 300:
+            row["ok"] += 1
+            row["latencies"].append(latency)
+            row["good"] += latency <= slo_ms
+        elif status_code == 503:
+            row["shed"] += 1
+        else:
+            row["errors"] += 1
+    good = sum(row["good"] for row in by_class.values())
+    return {
+        "by_class": by_class,
+        "goodput": good / run["elapsed"],
+        "offered": run["offered"] / run["seconds"],
+        "elapsed": run["elapsed"],
+    }
+
+
+def print_run(name: str, summary: dict) -> None:
+    print(f"\n{name}: ofrecido {summary['offered']:.0f} req/s → goodput {summary['goodput']:.0f} req/s "
+          f"(última respuesta a los {summary['elapsed']:.1f} s)")
+    print(f"{'clase':>9} | {'enviados':>8} | {'2xx':>5} | {'en SLO':>6} | {'503':>5} | {'otros':>5} | "
+          f"{'p50 ms':>7} | {'p99 ms':>7}")
+    for kind, _ in MIX:
+        row = summary["by_class"][kind]
+        print(f"{kind:>9} | {row['sent']:>8} | {row['ok']:>5} | {row['good']:>6} | {row['shed']:>5} | "
+              f"{row['errors']:>5} | {percentile(row['latencies'], 50):>7.1f} | {percentile(row['latencies'], 99):>7.1f}")
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+async def run(args) -> bool:
+    print_header("🚦 CONTROL DE ADMISIÓN BAJO SOBRECARGA")
+    settings.CATALOG_CACHE_ENABLED = False
+    engine = make_engine(pool_size=args.pool_size, max_overflow=0, pool_timeout=args.pool_timeout)
+    seed_products(engine, 2000)
+    SessionLocal = override_app_db(app, engine)
+    cart_users = [seed_cart(SessionLocal, 3) for _ in range(50)]
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    passed = True
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        traffic = Traffic(cart_users, [seed_cart(SessionLocal, 2) for _ in range(200)])
+        await closed_loop(client, traffic, args.concurrency, 1.0)  # calentamiento
+        capacity = await closed_loop(client, traffic, args.concurrency, args.calibrate_seconds)
+        rate = capacity * args.overload
+        print(f"\ncapacidad (carga cerrada, {args.concurrency} clientes): {capacity:.0f} req/s → "
+              f"sobrecarga a {rate:.0f} req/s ({args.overload:g}x) durante {args.seconds:g} s, "
+              f"pool de {args.pool_size} conexiones, SLO {args.slo_ms:g} ms")
+
+        checkouts_needed = int(rate * args.seconds * dict(MIX)["checkout"] * 1.5) + 10
+        summaries = {}
+        for name, enabled in (("sin admisión", False), ("con admisión", True)):
+            traffic = Traffic(cart_users, [seed_cart(SessionLocal, 2) for _ in range(checkouts_needed)])
+            admission.controller = AdmissionController(
+                settings.ADMISSION_ROUTE_CLASSES,
+                settings.ADMISSION_CLASSES,
+                settings.ADMISSION_INITIAL_LIMIT,
+                settings.ADMISSION_MIN_LIMIT,
+                settings.ADMISSION_MAX_LIMIT,
+                settings.ADMISSION_TARGET_LATENCY_MS,
+                settings.ADMISSION_DECREASE_FACTOR,
+                settings.ADMISSION_MAX_QUEUE,
+                enabled,
+            )
+            set_controller(admission.controller)
+            summaries[name] = summarize(await open_loop(client, traffic, rate, args.seconds), args.slo_ms)
+            print_run(name, summaries[name])
+        stats = admission.controller.stats()
+
+    before, after = summaries["sin admisión"], summaries["con admisión"]
+    print(f"\nlímite adaptativo: {settings.ADMISSION_INITIAL_LIMIT} → {stats['limit']} "
+          f"({stats['decreases']} bajadas, {stats['increases']} subidas, pico {stats['peak_in_flight']} en curso)")
+    for row in stats["classes"]:
+        print(f"   {row['name']:>8}: admitidos {row['admitted']}, encolados {row['queued']}, descartados {row['shed']}, "
+              f"espera p50 {row['wait_p50_ms']} ms / p99 {row['wait_p99_ms']} ms")
+
+    passed &= check(
+        f"goodput con admisión {after['goodput']:.0f} req/s ≥ sin admisión {before['goodput']:.0f} req/s",
+        after["goodput"] >= before["goodput"]
+    )
+    checkout = after["by_class"]["checkout"]
+    passed &= check(
+        f"checkout con admisión: {checkout['good']}/{checkout['sent']} dentro del SLO (≥ 90%)",
+        checkout["sent"] > 0 and checkout["good"] >= 0.9 * checkout["sent"]
+    )
+    shed = {kind: after["by_class"][kind]["shed"] / max(1, after["by_class"][kind]["sent"]) for kind, _ in MIX}
+    passed &= check(
+        f"se descarta primero el catálogo ({shed['catalog']:.0%}) que el checkout ({shed['checkout']:.0%})",
+        shed["catalog"] > 0 and shed["catalog"] >= shed["checkout"]
+    )
+    passed &= await aimd_checks()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        blocked = AdmissionController({"/api/products": "catalog"}, {"catalog": [0.5, 0]}, 1, 1, 1, 250, 0.9, 8)
+        blocked.in_flight = 1
+        set_controller(blocked)
+        response = await client.get("/api/products/")
+        set_controller(admission.controller)
+    passed &= check(
+        f"request descartado → 503 con Retry-After ({response.headers.get('retry-after')} s)",
+        response.status_code == 503 and response.headers.get("retry-after") == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+    )
+    return passed
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def aimd_checks() -> bool:
+    """Límite adaptativo y prioridad de las colas con un reloj falso"""
+    clock = FakeClock()
+    classes = {"checkout": [1.0, 1000], "catalog": [0.5, 1000]}
+    controller = AdmissionController({}, classes, 10, 2, 20, 100, 0.5, 8, clock=clock)
+    checkout, catalog = controller.classes["checkout"], controller.classes["catalog"]
+    for _ in range(3):
+        await controller.acquire(checkout)
+    for _ in range(3):
+        controller.release(checkout, 0.2)
+    after_burst = controller.limit
+    clock.now += 0.1
+    await controller.acquire(checkout)
+    controller.release(checkout, 0.2)
+    after_second = controller.limit
+    for _ in range(2):
+        await controller.acquire(checkout)
+    controller.release(checkout, 0.01)
+    passed = check(
+        f"AIMD: 3 respuestas lentas juntas bajan el límite una vez (10 → {after_burst:g}), "
+        f"otra más tarde lo baja a {after_second:g} y una rápida al tope lo sube a {controller.limit:.2f}",
+        after_burst == 5 and after_second == 2.5 and controller.limit > after_second
+    )
+
+    controller = AdmissionController({}, classes, 2, 2, 2, 100, 0.5, 8, clock=clock)
+    checkout, catalog = controller.classes["checkout"], controller.classes["catalog"]
+    await controller.acquire(catalog)
+    await controller.acquire(checkout)
+    order = []
+
+    async def wait_for_slot(route_class):
+        await controller.acquire(route_class)
+        order.append(route_class.name)
+        controller.release(route_class, 0.01)
+
+    waiters = [asyncio.create_task(wait_for_slot(route_class)) for route_class in (catalog, checkout)]
+    await asyncio.sleep(0)
+    controller.release(catalog, 0.01)
+    await asyncio.sleep(0)
+    controller.release(checkout, 0.01)
+    await asyncio.gather(*waiters)
+    passed &= check(f"al liberarse un lugar entra primero el checkout en cola ({' → '.join(order)})",
+                    order == ["checkout", "catalog"])
+
+    controller = AdmissionController({"/api/orders": "checkout"}, classes, 2, 2, 2, 100, 0.5, 8, clock=clock)
+    checkout = controller.classes["checkout"]
+    passed &= check("la clase se elige por segmentos: /api/orders/… sí, /api/ordersX no",
+                    controller.class_for("/api/orders") is checkout
+                    and controller.class_for("/api/orders/checkout") is checkout
+                    and controller.class_for("/api/ordersX") is None)
+    return passed
+
+
+def set_controller(controller: AdmissionController) -> None:
+    """
+    Reemplaza el controlador del middleware ya montado en la app y activa
+    REQUEST_START_HEADER, como si la app corriera detrás del proxy
+    """
+    stack = app.middleware_stack or app.build_middleware_stack()
+    app.middleware_stack = stack
+    layer = stack
+    while not isinstance(layer, admission.AdmissionMiddleware):
+        layer = layer.app
+    layer.controller = controller
+    layer.request_start_header = REQUEST_START_HEADER.lower().encode("latin-1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duración de cada corrida en sobrecarga")
+    parser.add_argument("--overload", type=float, default=3.0, help="múltiplo de la capacidad medida")
+    parser.add_argument("--concurrency", type=int, default=64, help="clientes de la carga cerrada de calibración")
+    parser.add_argument("--calibrate-seconds", type=float, default=3.0)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--slo-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+    passed = asyncio.run(run(args))
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark: stack sync (def + Session) vs async (async def + AsyncSession)
+
+Lanza N requests concurrentes (listado, detalle y carrito mezclados)
+contra apps ASGI en el mismo proceso:
+- sync: las mismas rutas como `def` con get_db (threadpool de FastAPI)
+- async/driver: la app real con DB_ASYNC_MODE=driver (aiosqlite)
+- async/threadpool: la app real con DB_ASYNC_MODE=threadpool (el modo
+  "auto" en SQLite)
+
+Compara p50/p99 de latencia y throughput. La caché del catálogo se
+desactiva para que cada request llegue a la base de datos.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_async_concurrency --concurrency 500
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import Depends, FastAPI, Request, Response
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.responses import fast_response
+from app.routes import products
+from app.schemas import ProductFilters
+from app.services import cart as cart_service
+from benchmarks.common import make_engine, override_app_db, percentile, print_header, seed_cart, seed_products
+
+
+def sync_stack() -> FastAPI:
+    """Las rutas calientes como `def` sobre Session (como antes del engine async)"""
+    api = FastAPI()
+
+    @api.get("/api/products/")
+    def list_products(
+        request: Request,
+        response: Response,
+        page_size: int = 20,
+        sort: str = "id",
+        db: Session = Depends(get_db)
+    ):
+        return products.list_products_response(
+            db, request, response, ProductFilters(), page_size=page_size, sort=sort
+        )
+
+    @api.get("/api/products/{product_id}")
+    def get_product(product_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+        return products.get_product_response(db, product_id, request, response)
+
+    @api.get("/api/cart/")
+    def get_cart(user_id: int = 1, db: Session = Depends(get_db)):
+        return fast_response(cart_service.get_cart_response(db, user_id))
+
+    return api
+
+
+def build_urls(n: int, rows: int, user_ids: list, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    urls = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            urls.append(f"/api/products/?page_size=20&sort={rng.choice(['id', 'price'])}")
+        elif kind == 1:
+            urls.append(f"/api/products/{rng.randint(1, rows)}")
+        else:
+            urls.append(f"/api/cart/?user_id={rng.choice(user_ids)}")
+    return urls
+
+
+async def run_load(asgi_app, urls: list, concurrency: int) -> dict:
+    """Dispara `urls` con a lo más `concurrency` requests en vuelo"""
+    transport = httpx.ASGITransport(app=asgi_app)
+    latencies = []
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(url):
+            nonlocal errors
+            async with gate:
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 500:
+                    errors += 1
+
+        await client.get(urls[0])  # calentar pool y conexiones
+        start = time.perf_counter()
+        await asyncio.gather(*(one(url) for url in urls))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "rps": len(urls) / elapsed,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+
+    print_header(f"🔀 SYNC vs ASYNC ({args.concurrency} requests concurrentes)")
+    engine = make_engine()
+    seed_products(engine, args.rows)
+    SessionLocal = override_app_db(app, engine)
+    user_ids = [seed_cart(SessionLocal, 10) for _ in range(20)]
+    urls = build_urls(args.requests, args.rows, user_ids)
+
+    sync_app = sync_stack()
+    sync_app.dependency_overrides = app.dependency_overrides
+
+    print(f"\n{'stack':>16} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'req/s':>7} | errores")
+    for name, asgi_app, mode in (
+        ("sync", sync_app, None),
+        ("async/driver", app, "driver"),
+        ("async/threadpool", app, "threadpool"),
+    ):
+        settings.DB_ASYNC_MODE = mode or "auto"
+        result = asyncio.run(run_load(asgi_app, urls, args.concurrency))
+        print(
+            f"{name:>16} | {result['p50_ms']:>9.1f} | {result['p99_ms']:>9.1f} | "
+            f"{result['rps']:>7.0f} | {result['errors']}"
+        )
+
+    settings.DB_ASYNC_MODE = "auto"
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark + verificación: caché de autenticación (claims JWT + principal)
+
+Mide el costo de autenticar cada request de dos formas:
+
+- ingenua: jwt.decode (verifica la firma HMAC) + SELECT del usuario por PK
+- caché: claims por digest del token + principal en memoria
+  (services/auth.py, app/security.py)
+
+Primero como microbenchmark (µs por resolución, sin HTTP) y luego de
+punta a punta con GET /api/cart/summary: sin token (?user_id=), con token
+y caché desactivada, y con token y caché caliente. Verifica que con la
+caché caliente el request no consulte 'usuarios', que desactivar al
+usuario por el ORM invalide su principal de inmediato y que un token
+vencido, alterado o ausente (con AUTH_ALLOW_USER_ID_PARAM=False) dé 401.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_auth_cache --calls 5000 --requests 300
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.config import settings
+from app.main import app
+from app.models import Usuario
+from app.services import auth as auth_service
+from app.services.cache import MISSING
+from benchmarks.common import count_queries, make_engine, measure, override_app_db, print_header, seed_cart, seed_products
+
+
+def naive_resolve(SessionLocal, token: str):
+    """Lo que haría un get_current_user sin caché"""
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    db = SessionLocal()
+    try:
+        return auth_service.load_principal(db, int(claims["sub"]))
+    finally:
+        db.close()
+
+
+def cached_resolve(SessionLocal, token: str):
+    claims = auth_service.decode_access_token(token)
+    principal = auth_service.cached_principal(int(claims["sub"]))
+    if principal is MISSING:
+        db = SessionLocal()
+        try:
+            principal = auth_service.fetch_principal(db, int(claims["sub"]))
+        finally:
+            db.close()
+    return principal
+
+
+def user_queries(counter) -> int:
+    return sum(1 for statement in counter["statements"] if "FROM usuarios" in statement)
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000, help="resoluciones en el microbenchmark")
+    parser.add_argument("--requests", type=int, default=300, help="requests por modo de punta a punta")
+    args = parser.parse_args()
+
+    print_header("🔑 CACHÉ DE AUTENTICACIÓN (JWT + PRINCIPAL)")
+    engine = make_engine()
+    seed_products(engine, 20)
+    SessionLocal = override_app_db(app, engine)
+    usuario_id = seed_cart(SessionLocal, 5, email="auth@test.com")
+    db = SessionLocal()
+    usuario = db.get(Usuario, usuario_id)
+    token = auth_service.create_access_token(usuario)
+    db.close()
+    headers = {"Authorization": f"Bearer {token}"}
+    passed = True
+
+    print(f"\n{'resolución':>10} | {'µs/llamada':>10}")
+    timings = {}
+    for name, resolve in (("ingenua", naive_resolve), ("caché", cached_resolve)):
+        resolve(SessionLocal, token)
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            resolve(SessionLocal, token)
+        timings[name] = (time.perf_counter() - start) / args.calls * 1e6
+        print(f"{name:>10} | {timings[name]:>10.1f}")
+    passed &= check(
+        f"resolución con caché {timings['ingenua'] / timings['caché']:.0f}x más rápida",
+        timings["caché"] < timings["ingenua"]
+    )
+
+    client = TestClient(app)
+    modes = (
+        ("sin token", {}, True),
+        ("token, sin caché", headers, False),
+        ("token + caché", headers, True),
+    )
+    print(f"\n{'modo':>16} | {'p50 ms':>7} | {'p99 ms':>7} | {'SELECT usuarios/req':>19}")
+    medians = {}
+    per_request = {}
+    for name, request_headers, cache_enabled in modes:
+        settings.AUTH_CACHE_ENABLED = cache_enabled
+        url = f"/api/cart/summary?user_id={usuario_id}" if not request_headers else "/api/cart/summary"
+        assert client.get(url, headers=request_headers).status_code == 200
+        with count_queries(engine) as counter:
+            stats = measure(lambda: client.get(url, headers=request_headers), repeat=args.requests)
+        medians[name] = stats["median_ms"]
+        per_request[name] = user_queries(counter) / args.requests
+        print(f"{name:>16} | {stats['median_ms']:>7.2f} | {stats['p99_ms']:>7.2f} | {per_request[name]:>19.2f}")
+    passed &= check("token + caché caliente: 0 consultas a 'usuarios'", per_request["token + caché"] == 0)
+    passed &= check("token sin caché: 1 consulta a 'usuarios' por request", per_request["token, sin caché"] == 1)
+    print(f"   costo de autenticar por request: {medians['token + caché'] - medians['sin token']:+.2f} ms con caché, "
+          f"{medians['token, sin caché'] - medians['sin token']:+.2f} ms sin caché")
+
+    same_user = client.get("/api/cart/summary", headers=headers).json() == \
+        client.get(f"/api/cart/summary?user_id={usuario_id}").json()
+    passed &= check("el token resuelve al mismo carrito que ?user_id=", same_user)
+
+    db = SessionLocal()
+    db.get(Usuario, usuario_id).is_active = False
+    db.commit()
+    db.close()
+    response = client.get("/api/cart/summary", headers=headers)
+    passed &= check("usuario desactivado por el ORM → 401 en el siguiente request", response.status_code == 401)
+    db = SessionLocal()
+    db.get(Usuario, usuario_id).is_active = True
+    db.commit()
+    db.close()
+
+    expired = jwt.encode(
+        {"sub": str(usuario_id), "exp": datetime.now(timezone.utc) - timedelta(minutes=1)},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    passed &= check(
+        "token vencido o alterado → 401",
+        client.get("/api/cart/summary", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+        and client.get("/api/cart/summary", headers={"Authorization": f"Bearer {tampered}"}).status_code == 401
+    )
+    settings.AUTH_ALLOW_USER_ID_PARAM = False
+    passed &= check(
+        "sin token y AUTH_ALLOW_USER_ID_PARAM=False → 401",
+        client.get(f"/api/cart/summary?user_id={usuario_id}").status_code == 401
+        and client.get("/api/cart/summary", headers=headers).status_code == 200
+    )
+    settings.AUTH_ALLOW_USER_ID_PARAM = True
+
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
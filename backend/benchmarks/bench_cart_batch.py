@@ -0,0 +1,156 @@
+"""
+Benchmark + verificación: PATCH /api/cart/items:batch vs un request por item
+
+Simula una sesión de edición del carrito con `n` cambios (la mitad
+cambia cantidades, un cuarto quita items y un cuarto agrega productos)
+aplicada de dos formas sobre dos usuarios con el mismo carrito:
+
+- uno a uno: un PUT/DELETE/POST por cambio (lo que hace hoy el frontend)
+- batch: un solo PATCH /api/cart/items:batch
+
+Reporta requests HTTP, sentencias SQL y tiempo total. Verifica que ambos
+carritos terminen iguales, que el stock quede igual en ambos casos y que
+el batch use una cantidad constante de sentencias. También verifica que
+un batch con una operación inválida no aplique ninguna.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_cart_batch --sizes 8 40 100
+"""
+
+import argparse
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.main import app
+from app.models import Producto
+from benchmarks.common import count_queries, make_engine, override_app_db, print_header, seed_cart, seed_products
+
+
+def edit_session(items: list, n: int, first_new_product: int) -> list:
+    """Operaciones de una sesión de edición con `n` cambios"""
+    operations = []
+    for i in range(n):
+        if i % 4 == 3:
+            operations.append({"op": "add", "product_id": first_new_product + i, "quantity": 1 + i % 3})
+        elif i % 4 == 2:
+            operations.append({"op": "remove", "item_id": items[i]["id"]})
+        else:
+            operations.append({"op": "update", "item_id": items[i]["id"], "quantity": 2 + i % 5})
+    return operations
+
+
+def one_by_one(client, usuario_id: int, operations: list) -> int:
+    for operation in operations:
+        if operation["op"] == "add":
+            body = {"product_id": operation["product_id"], "quantity": operation["quantity"]}
+            response = client.post(f"/api/cart/items?user_id={usuario_id}", json=body)
+        elif operation["op"] == "update":
+            response = client.put(
+                f"/api/cart/items/{operation['item_id']}?user_id={usuario_id}",
+                json={"quantity": operation["quantity"]}
+            )
+        else:
+            response = client.delete(f"/api/cart/items/{operation['item_id']}?user_id={usuario_id}")
+        assert response.status_code < 300, response.text
+    return len(operations)
+
+
+def batch(client, usuario_id: int, operations: list) -> int:
+    response = client.patch(f"/api/cart/items:batch?user_id={usuario_id}", json={"operations": operations})
+    assert response.status_code == 200, response.text
+    return 1
+
+
+def cart_state(client, usuario_id: int) -> list:
+    cart = client.get(f"/api/cart/?user_id={usuario_id}").json()
+    return sorted((item["product_id"], item["quantity"], item["subtotal"]) for item in cart["items"])
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 40, 100])
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+
+    print_header("📦 BATCH DEL CARRITO vs UN REQUEST POR ITEM")
+    max_n = max(args.sizes)
+    engine = make_engine()
+    seed_products(engine, 2 * max_n + 10)
+    with engine.begin() as conn:
+        conn.execute(update(Producto).values(stock=100_000, is_active=True))
+    SessionLocal = override_app_db(app, engine)
+    client = TestClient(app)
+
+    def stock_of(producto_ids):
+        with engine.connect() as conn:
+            return dict(conn.execute(
+                select(Producto.id_producto, Producto.stock).where(Producto.id_producto.in_(producto_ids))
+            ).all())
+
+    passed = True
+    batch_statements = set()
+    print(f"\n{'cambios':>7} | {'modo':>10} | {'requests':>8} | {'sentencias':>10} | {'ms':>8}")
+    for n in args.sizes:
+        results = {}
+        for name, apply in (("uno a uno", one_by_one), ("batch", batch)):
+            usuario_id = seed_cart(SessionLocal, n)
+            items = client.get(f"/api/cart/?user_id={usuario_id}").json()["items"]
+            operations = edit_session(items, n, first_new_product=max_n + 1)
+            before = stock_of(range(1, 2 * max_n + 10))
+            with count_queries(engine) as counter:
+                start = time.perf_counter()
+                requests = apply(client, usuario_id, operations)
+                elapsed = (time.perf_counter() - start) * 1000
+            after = stock_of(range(1, 2 * max_n + 10))
+            results[name] = {
+                "cart": cart_state(client, usuario_id),
+                "stock_delta": {p: after[p] - before[p] for p in after if after[p] != before[p]},
+            }
+            if name == "batch":
+                batch_statements.add(counter["count"])
+            print(f"{n:>7} | {name:>10} | {requests:>8} | {counter['count']:>10} | {elapsed:>8.1f}")
+        passed &= check(
+            f"{n} cambios: mismo carrito y mismo movimiento de stock en ambos modos",
+            results["uno a uno"]["cart"] == results["batch"]["cart"]
+            and results["uno a uno"]["stock_delta"] == results["batch"]["stock_delta"]
+        )
+
+    passed &= check(f"batch con sentencias constantes: {sorted(batch_statements)}", len(batch_statements) == 1)
+
+    usuario_id = seed_cart(SessionLocal, 4)
+    items = client.get(f"/api/cart/?user_id={usuario_id}").json()["items"]
+    before_cart, before_stock = cart_state(client, usuario_id), stock_of(range(1, 20))
+    response = client.patch(f"/api/cart/items:batch?user_id={usuario_id}", json={"operations": [
+        {"op": "update", "item_id": items[0]["id"], "quantity": 9},
+        {"op": "add", "product_id": 12, "quantity": 1},
+        {"op": "add", "product_id": 13, "quantity": 10**9},
+    ]})
+    passed &= check(
+        "batch con una operación sin stock → 409 y no se aplica ninguna",
+        response.status_code == 409 and cart_state(client, usuario_id) == before_cart
+        and stock_of(range(1, 20)) == before_stock
+    )
+    response = client.patch(f"/api/cart/items:batch?user_id={usuario_id}", json={"operations": [
+        {"op": "remove", "item_id": items[1]["id"]},
+        {"op": "update", "item_id": items[1]["id"], "quantity": 2},
+    ]})
+    passed &= check(
+        "update de un item quitado en el mismo batch → 404 y no se aplica ninguna",
+        response.status_code == 404 and cart_state(client, usuario_id) == before_cart
+    )
+
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: carga del detalle del carrito (N+1 vs eager loading)
+
+Compara, para un carrito de 200 items, la cantidad de queries y la
+latencia de:
+- antes: Carrito + lazy load de ItemCarrito.producto por cada item
+- selectinload: carrito, items y productos en queries separadas (IN)
+- después: cart.load_active_cart (joinedload, 1 query)
+
+Uso (desde backend/):
+    python -m benchmarks.bench_cart_detail --items 200
+"""
+
+import argparse
+
+from sqlalchemy.orm import selectinload
+
+from app.models import Carrito, ItemCarrito
+from app.services import cart as cart_service
+from benchmarks.common import (
+    count_queries,
+    make_engine,
+    make_session_factory,
+    measure,
+    print_header,
+    seed_cart,
+    seed_products,
+)
+
+
+def load_lazy(db, usuario_id):
+    carrito = db.query(Carrito).filter(Carrito.usuario_id == usuario_id, Carrito.is_active == True).first()  # noqa: E712
+    return [(item.id_item, item.producto.titulo, item.producto.imagen) for item in carrito.items]
+
+
+def load_selectin(db, usuario_id):
+    carrito = (
+        db.query(Carrito)
+        .options(selectinload(Carrito.items_detalle).selectinload(ItemCarrito.producto))
+        .filter(Carrito.usuario_id == usuario_id, Carrito.is_active == True)  # noqa: E712
+        .first()
+    )
+    return cart_service.cart_to_response(carrito)
+
+
+def load_joined(db, usuario_id):
+    return cart_service.cart_to_response(cart_service.load_active_cart(db, usuario_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print_header(f"🛒 DETALLE DE CARRITO ({args.items} items)")
+    engine = make_engine()
+    seed_products(engine, args.items + 10)
+    SessionLocal = make_session_factory(engine)
+    usuario_id = seed_cart(SessionLocal, args.items)
+
+    print(f"{'estrategia':>14} | {'queries':>7} | {'mediana (ms)':>12} | {'p99 (ms)':>9}")
+    for name, loader in (("lazy (antes)", load_lazy), ("selectinload", load_selectin), ("joinedload", load_joined)):
+        db = SessionLocal()
+        with count_queries(engine) as counter:
+            loader(db, usuario_id)
+        db.close()
+
+        def run():
+            session = SessionLocal()
+            loader(session, usuario_id)
+            session.close()
+
+        stats = measure(run, args.repeat)
+        print(f"{name:>14} | {counter['count']:>7} | {stats['median_ms']:>12.3f} | {stats['p99_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
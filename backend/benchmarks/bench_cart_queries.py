@@ -0,0 +1,112 @@
+"""
+Benchmark + verificación: queries por CartResponse
+
+Compara la forma ingenua de construir un CartResponse (propiedades del
+modelo Carrito + lazy load de ItemCarrito.producto por item) contra
+services/cart.py, y verifica que el servicio use como máximo 2 queries
+sin importar la cantidad de items.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_cart_queries
+"""
+
+import argparse
+import sys
+
+from app.models import Carrito
+from app.services import cart as cart_service
+from benchmarks.common import (
+    count_queries,
+    make_engine,
+    make_session_factory,
+    measure,
+    print_header,
+    seed_cart,
+    seed_products,
+)
+
+MAX_QUERIES = 2
+
+
+def naive_cart_response(db, usuario_id):
+    """Construcción 'de manual' usando las propiedades del modelo"""
+    carrito = db.query(Carrito).filter(Carrito.usuario_id == usuario_id, Carrito.is_active == True).first()  # noqa: E712
+    items = [
+        {
+            "id": item.id_item,
+            "product_id": item.producto_id,
+            "quantity": item.cantidad,
+            "product_title": item.producto.titulo,
+            "product_price": float(item.precio_unitario),
+            "product_image": item.producto.imagen,
+            "subtotal": float(item.subtotal),
+        }
+        for item in carrito.items
+    ]
+    return {
+        "user_id": carrito.usuario_id,
+        "items": items,
+        "total_items": carrito.total_productos,
+        "subtotal": float(carrito.subtotal),
+        "tax": float(carrito.impuesto),
+        "shipping": float(carrito.envio),
+        "total": carrito.total,
+        "item_count": carrito.total_items,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1, 10, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print_header("🛒 QUERIES POR CartResponse")
+    engine = make_engine()
+    seed_products(engine, max(args.sizes) + 10)
+    SessionLocal = make_session_factory(engine)
+
+    failures = 0
+    print(f"{'items':>6} | {'naive q':>8} | {'naive ms':>9} | {'svc q':>6} | {'svc ms':>7} | check")
+    for n_items in args.sizes:
+        usuario_id = seed_cart(SessionLocal, n_items)
+
+        db = SessionLocal()
+        with count_queries(engine) as naive_q:
+            naive_cart_response(db, usuario_id)
+        db.close()
+
+        db = SessionLocal()
+        with count_queries(engine) as svc_q:
+            response = cart_service.get_cart_response(db, usuario_id)
+        db.close()
+        assert len(response["items"]) == n_items
+
+        def run_naive():
+            session = SessionLocal()
+            naive_cart_response(session, usuario_id)
+            session.close()
+
+        def run_service():
+            session = SessionLocal()
+            cart_service.get_cart_response(session, usuario_id)
+            session.close()
+
+        naive_t = measure(run_naive, args.repeat)
+        svc_t = measure(run_service, args.repeat)
+        ok = svc_q["count"] <= MAX_QUERIES
+        failures += 0 if ok else 1
+        print(
+            f"{n_items:>6} | {naive_q['count']:>8} | {naive_t['median_ms']:>9.3f} | "
+            f"{svc_q['count']:>6} | {svc_t['median_ms']:>7.3f} | {'✅' if ok else '❌'}"
+        )
+
+    print()
+    if failures:
+        print(f"❌ {failures} tamaño(s) superaron {MAX_QUERIES} queries")
+        sys.exit(1)
+    print(f"✅ CartResponse en <= {MAX_QUERIES} queries para todos los tamaños")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark + verificación: sweeper de carritos abandonados
+
+Siembra carritos en tres grupos, todos con items:
+
+- abandonados: activos, sin actividad hace 60 días, con stock reservado
+- con pedido: inactivos, de hace 60 días (pedidos.carrito_id los referencia)
+- recientes: activos, de hoy
+
+Corre cart_sweeper.sweep con distintos tamaños de lote y reporta filas
+por segundo, lotes, sentencias por lote y duración del lote más largo
+(el tiempo máximo que se retienen locks). Verifica que se archiven solo
+los carritos viejos, que el stock reservado vuelva a productos, que los
+carritos con pedido conserven su fila (solo se archivan sus items) y que
+una segunda pasada no archive nada.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_cart_sweeper --carts 5000 --batch-sizes 100 500 2000
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select, update
+
+from app.models import (
+    Carrito, CarritoArchivado, ItemCarrito, ItemCarritoArchivado, Pedido, Producto, Usuario
+)
+from app.services import cart_sweeper
+from benchmarks.common import count_queries, make_engine, make_session_factory, print_header, seed_products
+
+ITEMS_PER_CART = 4
+PRODUCTS = 200
+INITIAL_STOCK = 1_000_000
+
+
+def seed(engine, carts: int) -> dict:
+    """
+    `carts` abandonados, `carts // 4` con pedido y `carts // 4` recientes.
+    Descuenta de productos.stock lo reservado por los items activos.
+    Retorna los ids de cada grupo.
+    """
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    now = datetime.now(timezone.utc)
+    groups = {"abandonados": carts, "con pedido": carts // 4, "recientes": carts // 4}
+    ids = {}
+    reserved = {}
+    with engine.begin() as conn:
+        next_user = 1
+        for group, count in groups.items():
+            user_ids = list(range(next_user, next_user + count))
+            next_user += count
+            conn.execute(insert(Usuario.__table__), [
+                {"id_usuario": uid, "email": f"sweep_{uid}@test.com", "password_hash": "x"} for uid in user_ids
+            ])
+            stamp = now if group == "recientes" else old
+            conn.execute(insert(Carrito.__table__), [{
+                "id_carrito": uid, "usuario_id": uid, "impuesto": Decimal("0"), "envio": Decimal("0"),
+                "is_active": group != "con pedido", "created_at": stamp, "updated_at": stamp,
+            } for uid in user_ids])
+            items = []
+            for uid in user_ids:
+                for k in range(ITEMS_PER_CART):
+                    producto_id = 1 + (uid * 7 + k) % PRODUCTS
+                    cantidad = 1 + k % 3
+                    items.append({
+                        "carrito_id": uid, "producto_id": producto_id, "cantidad": cantidad,
+                        "precio_unitario": Decimal("10.00"), "subtotal": Decimal("10.00") * cantidad,
+                        "created_at": stamp, "updated_at": stamp,
+                    })
+                    if group != "con pedido":
+                        reserved[producto_id] = reserved.get(producto_id, 0) + cantidad
+            conn.execute(insert(ItemCarrito.__table__), items)
+            if group == "con pedido":
+                conn.execute(insert(Pedido.__table__), [{
+                    "usuario_id": uid, "carrito_id": uid, "total_items": ITEMS_PER_CART,
+                    "subtotal": Decimal("40.00"), "total": Decimal("40.00"),
+                } for uid in user_ids])
+            ids[group] = user_ids
+        for producto_id, cantidad in reserved.items():
+            conn.execute(
+                update(Producto).where(Producto.id_producto == producto_id)
+                .values(stock=Producto.stock - cantidad)
+            )
+    return ids
+
+
+def reset(engine):
+    with engine.begin() as conn:
+        for table in (ItemCarritoArchivado, CarritoArchivado, Pedido, ItemCarrito, Carrito, Usuario):
+            conn.execute(table.__table__.delete())
+        conn.execute(update(Producto).values(stock=INITIAL_STOCK))
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--carts", type=int, default=5000, help="carritos abandonados a sembrar")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    args = parser.parse_args()
+
+    print_header("🧹 SWEEPER DE CARRITOS ABANDONADOS")
+    engine = make_engine()
+    seed_products(engine, PRODUCTS)
+    SessionLocal = make_session_factory(engine)
+
+    def scalar(statement):
+        with engine.connect() as conn:
+            return conn.execute(statement).scalar()
+
+    passed = True
+    print(f"\n{'lote':>6} | {'carritos':>8} | {'items':>7} | {'lotes':>5} | {'sent./lote':>10} | "
+          f"{'filas/s':>9} | {'lote máx ms':>11}")
+    for batch_size in args.batch_sizes:
+        reset(engine)
+        ids = seed(engine, args.carts)
+        db = SessionLocal()
+        try:
+            with count_queries(engine) as counter:
+                result = cart_sweeper.sweep(db, max_age_days=30, batch_size=batch_size)
+            again = cart_sweeper.sweep(db, max_age_days=30, batch_size=batch_size)
+        finally:
+            db.close()
+        # +2: el lote vacío que cierra cada fase
+        per_batch = counter["count"] / (result["batches"] + 2)
+        print(f"{batch_size:>6} | {result['archived_carts']:>8} | {result['archived_items']:>7} | "
+              f"{result['batches']:>5} | {per_batch:>10.1f} | {result['rows_per_second']:>9.0f} | "
+              f"{result['max_batch_ms']:>11.1f}")
+
+        expected_items = (len(ids["abandonados"]) + len(ids["con pedido"])) * ITEMS_PER_CART
+        passed &= check(
+            f"lote {batch_size}: archiva los {len(ids['abandonados'])} carritos abandonados "
+            f"y {expected_items} items",
+            result["archived_carts"] == len(ids["abandonados"]) and result["archived_items"] == expected_items
+            and scalar(select(func.count()).select_from(CarritoArchivado)) == len(ids["abandonados"])
+            and scalar(select(func.count()).select_from(ItemCarritoArchivado)) == expected_items
+        )
+        recent = ids["recientes"]
+        passed &= check(
+            f"lote {batch_size}: carritos recientes intactos",
+            scalar(select(func.count()).select_from(Carrito).where(Carrito.id_carrito.in_(recent))) == len(recent)
+            and scalar(select(func.count()).select_from(ItemCarrito)) == len(recent) * ITEMS_PER_CART
+        )
+        checked_out = ids["con pedido"]
+        passed &= check(
+            f"lote {batch_size}: carritos con pedido conservan su fila",
+            scalar(select(func.count()).select_from(Carrito).where(Carrito.id_carrito.in_(checked_out)))
+            == len(checked_out)
+        )
+        reserved_now = scalar(select(func.coalesce(func.sum(ItemCarrito.cantidad), 0)))
+        stock_total = scalar(select(func.sum(Producto.stock)))
+        passed &= check(
+            f"lote {batch_size}: stock liberado (stock + reservado de recientes = inicial)",
+            stock_total + reserved_now == INITIAL_STOCK * PRODUCTS
+        )
+        passed &= check(
+            f"lote {batch_size}: segunda pasada no archiva nada",
+            again["archived_carts"] == 0 and again["archived_items"] == 0 and again["batches"] == 0
+        )
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: paginación keyset vs OFFSET en el catálogo
+
+Mide la latencia de pedir una página de 20 productos a distintas
+profundidades. Con keyset la latencia debe mantenerse constante; con
+OFFSET crece linealmente con la profundidad.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_catalog_pagination --rows 1000000
+"""
+
+import argparse
+
+from app.config import settings
+from app.models import Producto
+from app.services import catalog
+from benchmarks.common import make_engine, make_session_factory, measure, print_header, seed_products
+
+PAGE_SIZE = 20
+
+
+def cursor_at_depth(db, sort, depth):
+    """Construye el cursor que apunta al final de la página `depth - 1`"""
+    if depth <= 1:
+        return None
+    columns = catalog.SORT_KEYS[sort]
+    last = (
+        db.query(Producto)
+        .filter(Producto.is_active == True)  # noqa: E712
+        .order_by(*columns)
+        .offset((depth - 1) * PAGE_SIZE - 1)
+        .first()
+    )
+    return catalog.encode_cursor(sort, last) if last else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    # Medir la base de datos, no la caché del catálogo
+    settings.CATALOG_CACHE_ENABLED = False
+
+    print_header(f"📊 KEYSET vs OFFSET ({args.rows:,} productos)")
+    engine = make_engine()
+    seed_products(engine, args.rows)
+    SessionLocal = make_session_factory(engine)
+    db = SessionLocal()
+
+    max_page = args.rows // PAGE_SIZE // 2
+    depths = [d for d in (1, 10, 100, 1_000, 10_000, max_page) if d <= max_page]
+
+    for sort in ("id", "price"):
+        print(f"\nsort={sort}")
+        print(f"{'página':>10} | {'keyset (ms)':>12} | {'offset (ms)':>12}")
+        for depth in depths:
+            cursor = cursor_at_depth(db, sort, depth)
+            keyset = measure(
+                lambda: catalog.list_products_keyset(db, PAGE_SIZE, cursor, sort=sort),
+                args.repeat
+            )
+            offset = measure(
+                lambda: (
+                    db.query(Producto)
+                    .filter(Producto.is_active == True)  # noqa: E712
+                    .order_by(*catalog.SORT_KEYS[sort])
+                    .offset((depth - 1) * PAGE_SIZE)
+                    .limit(PAGE_SIZE)
+                    .all()
+                ),
+                args.repeat
+            )
+            print(f"{depth:>10,} | {keyset['median_ms']:>12.3f} | {offset['median_ms']:>12.3f}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
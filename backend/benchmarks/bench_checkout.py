@@ -0,0 +1,145 @@
+"""
+Benchmark + verificación: sentencias SQL por checkout
+
+Compara un checkout ingenuo con el ORM (un INSERT por línea del pedido)
+contra services/orders.py. Verifica que el servicio use una cantidad
+constante de sentencias (CHECKOUT_STATEMENTS) sin importar la cantidad de
+items, que el pedido copie los totales del carrito y que el usuario pueda
+abrir un carrito nuevo después del checkout.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_checkout
+"""
+
+import argparse
+import sys
+import time
+
+from app.models import Carrito, Pedido, PedidoItem
+from app.services import cart as cart_service
+from app.services import orders as order_service
+from benchmarks.common import count_queries, make_engine, make_session_factory, print_header, seed_cart, seed_products
+
+# SELECT FOR UPDATE + INSERT pedidos + INSERT pedidos_items + UPDATE carritos
+CHECKOUT_STATEMENTS = 4
+
+
+def naive_checkout(db, usuario_id: int) -> int:
+    """Checkout 'de manual': cargar items y crear cada línea con el ORM"""
+    carrito = (
+        db.query(Carrito)
+        .filter(Carrito.usuario_id == usuario_id, Carrito.is_active == True)  # noqa: E712
+        .with_for_update()
+        .first()
+    )
+    items = carrito.items.all()
+    subtotal = sum(item.subtotal for item in items)
+    pedido = Pedido(
+        usuario_id=usuario_id,
+        carrito_id=carrito.id_carrito,
+        total_items=sum(item.cantidad for item in items),
+        subtotal=subtotal,
+        impuesto=carrito.impuesto,
+        envio=carrito.envio,
+        total=subtotal + carrito.impuesto + carrito.envio,
+    )
+    db.add(pedido)
+    db.flush()
+    for item in items:
+        db.add(PedidoItem(
+            pedido_id=pedido.id_pedido,
+            producto_id=item.producto_id,
+            titulo=item.producto.titulo,
+            cantidad=item.cantidad,
+            precio_unitario=item.precio_unitario,
+            subtotal=item.subtotal,
+        ))
+        db.flush()
+    carrito.is_active = False
+    db.commit()
+    return pedido.id_pedido
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 500])
+    args = parser.parse_args()
+
+    print_header("🧾 SENTENCIAS POR CHECKOUT")
+    engine = make_engine()
+    seed_products(engine, max(args.sizes) + 10)
+    SessionLocal = make_session_factory(engine)
+
+    passed = True
+    print(f"{'items':>6} | {'naive q':>8} | {'naive ms':>9} | {'svc q':>6} | {'svc ms':>7} | check")
+    for n_items in args.sizes:
+        naive_user = seed_cart(SessionLocal, n_items)
+        svc_user = seed_cart(SessionLocal, n_items)
+
+        db = SessionLocal()
+        with count_queries(engine) as naive_q:
+            _, naive_ms = timed(naive_checkout, db, naive_user)
+        db.close()
+
+        db = SessionLocal()
+        summary = cart_service.get_cart_summary(db, svc_user)
+        db.rollback()
+        with count_queries(engine) as svc_q:
+            pedido_id, svc_ms = timed(order_service.checkout, db, svc_user)
+        order = order_service.get_order_response(db, svc_user, pedido_id)
+        db.close()
+
+        ok = svc_q["count"] == CHECKOUT_STATEMENTS
+        ok &= len(order["items"]) == n_items and order["total"] == summary["total"]
+        ok &= order["total_items"] == summary["total_quantity"]
+        passed &= ok
+        print(
+            f"{n_items:>6} | {naive_q['count']:>8} | {naive_ms:>9.2f} | "
+            f"{svc_q['count']:>6} | {svc_ms:>7.2f} | {'✅' if ok else '❌'}"
+        )
+
+    print()
+    passed &= check(
+        f"checkout en {CHECKOUT_STATEMENTS} sentencias para todos los tamaños, con los totales del carrito", passed
+    )
+
+    # Después del checkout: carrito inactivo, sin segundo checkout, carrito nuevo posible
+    db = SessionLocal()
+    usuario_id = seed_cart(SessionLocal, 3)
+    order_service.checkout(db, usuario_id)
+    try:
+        order_service.checkout(db, usuario_id)
+        second = False
+    except order_service.CartNotFoundError:
+        second = True
+    passed &= check("un segundo checkout sin carrito activo responde CartNotFoundError", second)
+    cart_service.get_or_create_active_cart(db, usuario_id)
+    db.commit()
+    reopened = cart_service.get_cart_summary(db, usuario_id) is not None
+    passed &= check("el usuario puede abrir un carrito nuevo después del checkout", reopened)
+
+    usuario_id = seed_cart(SessionLocal, 0)
+    try:
+        order_service.checkout(db, usuario_id)
+        empty = False
+    except order_service.EmptyCartError:
+        empty = True
+    passed &= check("checkout de un carrito vacío responde EmptyCartError", empty)
+    db.close()
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark + verificación: GET condicional (ETag / If-None-Match)
+
+Verifica que una respuesta 304 no cargue entidades ORM de Producto ni
+serialice ProductResponse (Pydantic), y compara la latencia 200 vs 304
+del listado y del detalle, con y sin caché del catálogo.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_conditional_get
+"""
+
+import argparse
+import sys
+
+import fastapi.routing
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.config import settings
+from app.main import app
+from app.models import Producto
+from app.schemas import ProductUpdate
+from app.services import catalog
+from benchmarks.common import make_engine, measure, override_app_db, print_header, seed_products
+
+
+class Probe:
+    """Cuenta entidades ORM cargadas y serializaciones de respuesta"""
+
+    def __init__(self):
+        self.orm_loads = 0
+        self.serializations = 0
+        self._serialize = fastapi.routing.serialize_response
+
+    def install(self):
+        event.listen(Producto, "load", self._on_load)
+        fastapi.routing.serialize_response = self._counting_serialize
+
+    def uninstall(self):
+        event.remove(Producto, "load", self._on_load)
+        fastapi.routing.serialize_response = self._serialize
+
+    def reset(self):
+        self.orm_loads = 0
+        self.serializations = 0
+
+    def _on_load(self, target, context):
+        self.orm_loads += 1
+
+    async def _counting_serialize(self, *args, **kwargs):
+        self.serializations += 1
+        return await self._serialize(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print_header("🏷️  GET CONDICIONAL (ETag)")
+    engine = make_engine()
+    seed_products(engine, args.rows)
+    SessionLocal = override_app_db(app, engine)
+    client = TestClient(app)
+    probe = Probe()
+    probe.install()
+
+    failures = 0
+    endpoints = {
+        "listado (100)": "/api/products/?page_size=100&sort=price",
+        "detalle": "/api/products/42",
+    }
+    for cache_enabled in (False, True):
+        settings.CATALOG_CACHE_ENABLED = cache_enabled
+        catalog.invalidate_product()
+        print(f"\ncaché del catálogo: {'ON' if cache_enabled else 'OFF'}")
+        print(f"{'endpoint':>14} | {'200 (ms)':>9} | {'304 (ms)':>9} | ORM 304 | Pydantic 304")
+        for name, url in endpoints.items():
+            first = client.get(url)
+            etag = first.headers["etag"]
+            headers = {"If-None-Match": etag}
+
+            probe.reset()
+            second = client.get(url, headers=headers)
+            orm_loads, serializations = probe.orm_loads, probe.serializations
+            ok = second.status_code == 304 and orm_loads == 0 and serializations == 0
+            failures += 0 if ok else 1
+
+            full = measure(lambda: client.get(url), args.repeat)
+            cond = measure(lambda: client.get(url, headers=headers), args.repeat)
+            print(
+                f"{name:>14} | {full['median_ms']:>9.3f} | {cond['median_ms']:>9.3f} | "
+                f"{orm_loads:>7} | {serializations:>12} {'✅' if ok else '❌'}"
+            )
+
+    # Una edición cambia el ETag del detalle
+    db = SessionLocal()
+    catalog.update_product(db, 42, ProductUpdate(price=1.5))
+    db.close()
+    changed = client.get(endpoints["detalle"], headers={"If-None-Match": etag})
+    ok = changed.status_code == 200
+    failures += 0 if ok else 1
+    print(f"\n{'✅' if ok else '❌'} tras editar el producto, If-None-Match viejo → {changed.status_code}")
+
+    probe.uninstall()
+    app.dependency_overrides.clear()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
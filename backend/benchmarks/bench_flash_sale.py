@@ -0,0 +1,265 @@
+"""
+Benchmark: flash sale sobre UN producto caliente (pedidos/segundo)
+
+`--threads` hilos hacen `--orders` add-to-cart (un usuario distinto por
+pedido) del mismo producto, con `--stock` unidades:
+
+- directo: reserva atómica por pedido (services/stock.py vía
+  cart.add_item): cada pedido actualiza la fila caliente
+- flash: contador en memoria (services/flash_sale.py) con escritura por
+  tandas (group commit): cada pedido se confirma ya escrito
+- flash x4: cuatro contadores (simulan cuatro workers) repartiéndose el
+  stock mediante asignaciones de la base
+
+Reporta pedidos confirmados por segundo, p50/p99 de la confirmación y el
+tiempo hasta que todo queda escrito. Verifica que no haya sobreventa
+(confirmados = min(pedidos, stock)), que stock final + unidades en
+carritos = stock inicial y que todos los lotes queden cerrados.
+
+Luego simula una caída: toda venta confirmada sobrevive, y la
+reconciliación devuelve el stock asignado y no vendido. Y una escritura
+fallida: la reserva falla (no se confirma) y sus unidades vuelven al
+contador.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_flash_sale --orders 5000 --stock 4000 --threads 32
+"""
+
+import argparse
+import sys
+import threading
+import time
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, insert, select
+
+from app.config import settings
+from app.database import configure_sqlite, create_sqlite_writer, make_session_factory
+from app.models import ItemCarrito, LoteFlashSale, Producto, Usuario
+from app.services import cart as cart_service
+from app.services import stock as stock_service
+from app.services.flash_sale import FlashSaleCounter
+from benchmarks.common import make_engine, percentile, print_header
+
+
+def setup(users: int, stock: int):
+    """Base nueva con un producto caliente y `users` usuarios sin carrito"""
+    seed_engine = make_engine()
+    url = seed_engine.url.render_as_string(hide_password=False)
+    with seed_engine.begin() as conn:
+        conn.execute(insert(Producto.__table__), [{
+            "titulo": "Audífonos promo",
+            "precio": Decimal("14990.00"),
+            "stock": stock,
+            "categoria": "Electrónicos",
+        }])
+        conn.execute(insert(Usuario.__table__), [
+            {"email": f"flash_{i}@test.com", "password_hash": "x", "nombre": "Bench"} for i in range(users)
+        ])
+        producto_id = conn.execute(select(Producto.id_producto)).scalar_one()
+        user_ids = list(conn.execute(select(Usuario.id_usuario)).scalars())
+    seed_engine.dispose()
+
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False}, pool_size=40, max_overflow=0, pool_timeout=120
+    )
+    configure_sqlite(engine)
+    writer = create_sqlite_writer(url)
+    return engine, writer, make_session_factory(engine, writer=writer), producto_id, user_ids
+
+
+def run(reserve, producto_id: int, user_ids: list, threads: int) -> dict:
+    """Reparte los usuarios entre `threads` hilos; cada uno pide 1 unidad"""
+    latencies, ok, rejected, errors = [], [], [], []
+    chunks = [user_ids[i::threads] for i in range(threads)]
+
+    def worker(index, chunk):
+        for usuario_id in chunk:
+            start = time.perf_counter()
+            try:
+                reserve(index, usuario_id, producto_id)
+                ok.append(usuario_id)
+            except stock_service.InsufficientStockError:
+                rejected.append(usuario_id)
+            except Exception as error:
+                errors.append(repr(error))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=worker, args=(i, chunk)) for i, chunk in enumerate(chunks)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "ok": len(ok),
+        "rejected": len(rejected),
+        "errors": errors,
+        "elapsed": elapsed,
+        "orders_per_s": len(user_ids) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def state(SessionLocal, producto_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        return {
+            "stock": db.execute(select(Producto.stock).where(Producto.id_producto == producto_id)).scalar_one(),
+            "in_carts": db.execute(
+                select(func.coalesce(func.sum(ItemCarrito.cantidad), 0)).where(ItemCarrito.producto_id == producto_id)
+            ).scalar_one(),
+            "open_lotes": db.execute(
+                select(func.count()).select_from(LoteFlashSale).where(LoteFlashSale.cerrado == False)  # noqa: E712
+            ).scalar_one(),
+        }
+    finally:
+        db.close()
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def direct_mode(SessionLocal):
+    local = threading.local()
+
+    def reserve(index, usuario_id, producto_id):
+        if not hasattr(local, "db"):
+            local.db = SessionLocal()
+        cart_service.add_item(local.db, usuario_id, producto_id, 1)
+
+    return reserve, lambda: None
+
+
+def flash_mode(SessionLocal, producto_id: int, workers: int):
+    counters = [
+        FlashSaleCounter(SessionLocal, [producto_id], worker_id=f"bench-{i}", lease_seconds=30)
+        for i in range(workers)
+    ]
+    for counter in counters:
+        counter.start()
+
+    def reserve(index, usuario_id, producto_id):
+        counters[index % workers].reserve(usuario_id, producto_id, 1)
+
+    def finish():
+        for counter in counters:
+            counter.stop()
+
+    return reserve, finish
+
+
+class FailingCommits:
+    """session_factory cuyas sesiones fallan al hacer commit mientras `failing`"""
+
+    def __init__(self, SessionLocal):
+        self.SessionLocal = SessionLocal
+        self.failing = False
+
+    def __call__(self):
+        db = self.SessionLocal()
+        if self.failing:
+            def commit():
+                raise RuntimeError("caída de la base simulada")
+            db.commit = commit
+        return db
+
+
+def crash_test(stock: int) -> bool:
+    """Confirma ventas, 'mata' el worker sin stop() y reconcilia"""
+    engine, writer, SessionLocal, producto_id, user_ids = setup(400, stock)
+    counter = FlashSaleCounter(SessionLocal, [producto_id], allocation_size=100, worker_id="bench-caido")
+    for usuario_id in user_ids[:350]:
+        counter.reserve(usuario_id, producto_id, 1)
+    before = state(SessionLocal, producto_id)
+    del counter  # caída: lote abierto con stock asignado y no vendido
+
+    restarted = FlashSaleCounter(SessionLocal, [producto_id], worker_id="bench-nuevo", lease_seconds=0)
+    reclaimed = restarted.reconcile()
+    after = state(SessionLocal, producto_id)
+    print(
+        f"\n💥 Caída: stock antes de reconciliar {before['stock']}, en carritos {before['in_carts']}, "
+        f"lotes abiertos {before['open_lotes']} → reconciliados {reclaimed}, stock {after['stock']}"
+    )
+    passed = check("reconciliación: stock + carritos = stock inicial", after["stock"] + after["in_carts"] == stock)
+    passed &= check("reconciliación: sin lotes abiertos", after["open_lotes"] == 0)
+    passed &= check("ventas confirmadas antes de la caída conservadas (350)", after["in_carts"] == 350)
+
+    factory = FailingCommits(SessionLocal)
+    counter = FlashSaleCounter(factory, [producto_id], worker_id="bench-falla")
+    counter.reserve(user_ids[350], producto_id, 1)
+    remaining = counter.stats()["in_memory"][producto_id]
+    factory.failing = True
+    try:
+        counter.reserve(user_ids[351], producto_id, 1)
+        rejected = False
+    except RuntimeError:
+        rejected = True
+    factory.failing = False
+    final = state(SessionLocal, producto_id)
+    passed &= check(
+        "escritura fallida: la reserva falla, no llega al carrito y sus unidades vuelven al contador",
+        rejected and final["in_carts"] == 351 and counter.stats()["in_memory"][producto_id] == remaining
+    )
+    counter.stop()
+    engine.dispose()
+    writer.dispose()
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=5_000)
+    parser.add_argument("--stock", type=int, default=4_000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+    expected_ok = min(args.orders, args.stock)
+
+    print_header(f"⚡ FLASH SALE ({args.orders} pedidos, stock {args.stock}, {args.threads} hilos)")
+    print(
+        f"\n{'modo':>9} | {'confirm.':>8} | {'sin stock':>9} | {'pedidos/s':>9} | {'p50':>8} | {'p99':>8} | "
+        f"{'hasta escrito':>13}"
+    )
+    passed = True
+    results = {}
+    for name in ("directo", "flash", "flash x4"):
+        engine, writer, SessionLocal, producto_id, user_ids = setup(args.orders, args.stock)
+        if name == "directo":
+            reserve, finish = direct_mode(SessionLocal)
+        else:
+            reserve, finish = flash_mode(SessionLocal, producto_id, 4 if name == "flash x4" else 1)
+        result = run(reserve, producto_id, user_ids, args.threads)
+        start = time.perf_counter()
+        finish()
+        durable = result["elapsed"] + time.perf_counter() - start
+        final = state(SessionLocal, producto_id)
+        results[name] = result
+        print(
+            f"{name:>9} | {result['ok']:>8} | {result['rejected']:>9} | {result['orders_per_s']:>9.0f} | "
+            f"{result['p50_ms']:>6.3f}ms | {result['p99_ms']:>6.1f}ms | {durable:>12.2f}s"
+        )
+        passed &= check(f"{name}: {expected_ok} confirmados, sin sobreventa", result["ok"] == expected_ok)
+        passed &= check(f"{name}: sin errores", not result["errors"])
+        passed &= check(
+            f"{name}: stock final + carritos = stock inicial y sin lotes abiertos",
+            final["stock"] + final["in_carts"] == args.stock and final["in_carts"] == result["ok"]
+            and final["open_lotes"] == 0
+        )
+        if result["errors"]:
+            print(f"   primer error: {result['errors'][0]}")
+        engine.dispose()
+        writer.dispose()
+
+    speedup = results["flash"]["orders_per_s"] / results["directo"]["orders_per_s"]
+    print(f"\nflash vs directo: {speedup:.1f}x pedidos/s")
+    passed &= crash_test(args.stock)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
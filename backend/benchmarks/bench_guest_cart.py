@@ -0,0 +1,148 @@
+"""
+Benchmark + verificación: carrito de invitado en cookie firmada
+
+`--visitors` visitantes anónimos agregan `--items` productos cada uno:
+
+- en la base: un usuario/carrito por visitante y add_item por producto
+  (lo que cuesta hoy dar carrito a un anónimo)
+- cookie: POST /api/cart/guest/items (token firmado, services/guest_cart.py)
+
+Cuenta las sentencias de escritura (INSERT/UPDATE/DELETE) de cada modo:
+el modo cookie debe hacer cero. Luego fusiona carritos de invitado de
+distintos tamaños con el carrito de un usuario (POST /api/cart/guest/merge)
+y verifica que use una cantidad constante de sentencias, que sume las
+cantidades a los productos que ya estaban y que reserve el stock.
+También verifica que un token alterado o vencido se lea como vacío.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_guest_cart --visitors 200 --items 5
+"""
+
+import argparse
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.main import app
+from app.models import Producto
+from app.services import cart as cart_service
+from app.services import guest_cart
+from benchmarks.common import count_queries, make_engine, override_app_db, print_header, seed_cart, seed_products
+
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+def writes(statements) -> int:
+    return sum(1 for statement in statements if statement.lstrip().upper().startswith(WRITES))
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--visitors", type=int, default=200)
+    parser.add_argument("--items", type=int, default=5)
+    args = parser.parse_args()
+
+    print_header("🍪 CARRITO DE INVITADO (cookie firmada)")
+    engine = make_engine()
+    seed_products(engine, 200)
+    with engine.begin() as conn:
+        conn.execute(update(Producto).values(stock=1_000_000, is_active=True))
+    SessionLocal = override_app_db(app, engine)
+    client = TestClient(app)
+    passed = True
+
+    print(f"\n{args.visitors} visitantes × {args.items} productos")
+    print(f"{'modo':>8} | {'sentencias':>10} | {'escrituras':>10} | {'s':>6}")
+    db = SessionLocal()
+    with count_queries(engine) as counter:
+        start = time.perf_counter()
+        for visitor in range(args.visitors):
+            usuario_id = seed_cart(SessionLocal, 0, email=f"anon_{visitor}@test.com")
+            for i in range(args.items):
+                cart_service.add_item(db, usuario_id, 1 + (visitor + i) % 150, 1)
+        elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{'base':>8} | {counter['count']:>10} | {writes(counter['statements']):>10} | {elapsed:>6.2f}")
+
+    with count_queries(engine) as counter:
+        start = time.perf_counter()
+        for visitor in range(args.visitors):
+            client.cookies.clear()
+            for i in range(args.items):
+                response = client.post("/api/cart/guest/items", json={"product_id": 1 + (visitor + i) % 150, "quantity": 1})
+                assert response.status_code == 200, response.text
+        elapsed = time.perf_counter() - start
+    guest_writes = writes(counter["statements"])
+    print(f"{'cookie':>8} | {counter['count']:>10} | {guest_writes:>10} | {elapsed:>6.2f}")
+    passed &= check("carritos de invitado: cero escrituras en la base", guest_writes == 0)
+
+    token = client.cookies.get(settings.GUEST_CART_COOKIE_NAME)
+    full = guest_cart.encode({producto_id: 99 for producto_id in range(1000, 1000 + settings.GUEST_CART_MAX_ITEMS)})
+    print(f"\ntoken con {args.items} productos: {len(token)} bytes; con {settings.GUEST_CART_MAX_ITEMS}: {len(full)} bytes")
+    passed &= check("token lleno cabe en una cookie (< 4096 bytes)", len(full) < 4096)
+    tampered = token.replace(token.split("~")[0], token.split("~")[0] + "0", 1)
+    expired = guest_cart.encode({1: 1}, issued_at=int(time.time()) - settings.GUEST_CART_TTL_DAYS * 86400 - 1)
+    passed &= check(
+        "token alterado, vencido o basura → carrito vacío",
+        guest_cart.decode(tampered) == {} and guest_cart.decode(expired) == {} and guest_cart.decode("ñ~~") == {}
+    )
+
+    # Fusión al iniciar sesión: sentencias constantes y cantidades sumadas
+    print(f"\n{'items':>6} | {'sentencias':>10} | {'ms':>6}")
+    merge_statements = set()
+    for size in (1, 10, 50):
+        usuario_id = seed_cart(SessionLocal, 3)
+        before = {item["product_id"]: item["quantity"] for item in client.get(f"/api/cart/?user_id={usuario_id}").json()["items"]}
+        items = {producto_id: 2 for producto_id in range(1, size + 1)}
+        with engine.connect() as conn:
+            stock_before = dict(conn.execute(select(Producto.id_producto, Producto.stock)).all())
+        client.cookies.set(settings.GUEST_CART_COOKIE_NAME, guest_cart.encode(items))
+        with count_queries(engine) as counter:
+            start = time.perf_counter()
+            response = client.post(f"/api/cart/guest/merge?user_id={usuario_id}")
+            elapsed = (time.perf_counter() - start) * 1000
+        # Sin la lectura final del carrito (get_cart_response)
+        merge_statements.add(counter["count"] - 1)
+        print(f"{size:>6} | {counter['count'] - 1:>10} | {elapsed:>6.1f}")
+        merged = {item["product_id"]: item["quantity"] for item in response.json()["items"]}
+        expected = dict(before)
+        for producto_id, cantidad in items.items():
+            expected[producto_id] = expected.get(producto_id, 0) + cantidad
+        with engine.connect() as conn:
+            stock_after = dict(conn.execute(select(Producto.id_producto, Producto.stock)).all())
+        passed &= check(
+            f"merge de {size}: cantidades sumadas, stock reservado y cookie borrada",
+            response.status_code == 200 and merged == expected
+            and all(stock_before[p] - stock_after[p] == items[p] for p in items)
+            and "Max-Age=0" in response.headers.get("set-cookie", "")
+        )
+        client.cookies.clear()
+    passed &= check(f"merge en sentencias constantes: {sorted(merge_statements)}", len(merge_statements) == 1)
+
+    # Productos agotados o inexistentes se omiten; con poco stock se agrega lo disponible
+    with engine.begin() as conn:
+        conn.execute(update(Producto).where(Producto.id_producto == 160).values(stock=0))
+        conn.execute(update(Producto).where(Producto.id_producto == 161).values(stock=1))
+    usuario_id = seed_cart(SessionLocal, 0)
+    client.cookies.set(settings.GUEST_CART_COOKIE_NAME, guest_cart.encode({160: 1, 161: 5, 162: 1, 10**6: 1}))
+    response = client.post(f"/api/cart/guest/merge?user_id={usuario_id}")
+    merged = {item["product_id"]: item["quantity"] for item in response.json()["items"]}
+    passed &= check(
+        "merge con agotados/inexistentes: se omiten (X-Guest-Cart-Skipped) y se agrega lo disponible",
+        merged == {161: 1, 162: 1} and response.headers.get("X-Guest-Cart-Skipped") == f"160,{10**6}"
+    )
+
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
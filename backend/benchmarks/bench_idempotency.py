@@ -0,0 +1,186 @@
+"""
+Benchmark + verificación: Idempotency-Key en el carrito y el checkout
+
+Un reintento con la misma Idempotency-Key debe repetir la respuesta
+original (mismo status y body, header Idempotent-Replayed) sin volver a
+escribir: cero sentencias sobre carritos/items_carrito y el stock
+reservado una sola vez. Verifica también:
+
+- el reintento servido por el LRU en memoria no ejecuta queries
+- la misma clave con otro body responde 422
+- un request con la clave todavía en proceso responde 409
+- un request fallido libera la clave (se puede reintentar)
+- el checkout repetido devuelve el mismo pedido en lugar de 404
+
+Reporta la latencia del request original vs el reintento (tabla y LRU).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_idempotency
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import idempotency
+from app.config import settings
+from app.main import app
+from app.models import ClaveIdempotencia, Pedido, Producto
+from benchmarks.common import count_queries, make_engine, override_app_db, print_header, seed_cart, seed_products
+
+CART_TABLES = re.compile(r"\b(carritos|items_carrito)\b", re.IGNORECASE)
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def touches_cart(statements) -> list:
+    return [s for s in statements if CART_TABLES.search(s)]
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+
+    print_header("🔁 IDEMPOTENCY-KEY (carrito y checkout)")
+    engine = make_engine()
+    seed_products(engine, 200)
+    SessionLocal = override_app_db(app, engine)
+    client = TestClient(app)
+
+    with engine.connect() as conn:
+        producto_id, stock_inicial = conn.execute(
+            select(Producto.id_producto, Producto.stock)
+            .where(Producto.is_active == True, Producto.stock >= 100)  # noqa: E712
+            .order_by(Producto.id_producto)
+        ).first()
+
+    def stock():
+        with engine.connect() as conn:
+            return conn.execute(select(Producto.stock).where(Producto.id_producto == producto_id)).scalar_one()
+
+    passed = True
+    usuario_id = seed_cart(SessionLocal, 0)
+    url = f"/api/cart/items?user_id={usuario_id}"
+    body = {"product_id": producto_id, "quantity": 2}
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post(url, json=body, headers=headers)
+    idempotency.response_cache.clear()
+    with count_queries(engine) as replay_q:
+        retry = client.post(url, json=body, headers=headers)
+    passed &= check(
+        "reintento (tabla): mismo status y body, header Idempotent-Replayed",
+        first.status_code == 201 and retry.status_code == 201 and retry.content == first.content
+        and retry.headers.get(idempotency.REPLAY_HEADER) == "true"
+    )
+    cart_statements = touches_cart(replay_q["statements"])
+    passed &= check(
+        f"reintento (tabla): {replay_q['count']} queries, 0 sobre carritos/items_carrito",
+        not cart_statements
+    )
+    passed &= check("stock reservado una sola vez", stock() == stock_inicial - 2)
+
+    with count_queries(engine) as lru_q:
+        retry = client.post(url, json=body, headers=headers)
+    passed &= check(
+        f"reintento (LRU): {lru_q['count']} queries",
+        lru_q["count"] == 0 and retry.content == first.content
+    )
+
+    other = client.post(url, json={"product_id": producto_id, "quantity": 5}, headers=headers)
+    passed &= check("misma clave con otro body → 422", other.status_code == 422)
+
+    # Reclamo "en proceso" de otro worker: todavía no hay respuesta guardada
+    pending_key = str(uuid.uuid4())
+    pending_request = Request({"type": "http", "method": "POST", "path": "/api/cart/items", "headers": []})
+    db = SessionLocal()
+    db.add(ClaveIdempotencia(
+        usuario_id=usuario_id,
+        clave=pending_key,
+        huella=idempotency.fingerprint(pending_request, body),
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
+    ))
+    db.commit()
+    db.close()
+    busy = client.post(url, json=body, headers={"Idempotency-Key": pending_key})
+    passed &= check("clave en proceso en otro request → 409", busy.status_code == 409)
+
+    failed_key = {"Idempotency-Key": str(uuid.uuid4())}
+    missing = client.post(url, json={"product_id": 10**9, "quantity": 1}, headers=failed_key)
+    with engine.connect() as conn:
+        leftover = conn.execute(
+            select(func.count()).select_from(ClaveIdempotencia)
+            .where(ClaveIdempotencia.clave == failed_key["Idempotency-Key"])
+        ).scalar_one()
+    passed &= check("un 404 no se guarda: la clave queda libre", missing.status_code == 404 and leftover == 0)
+
+    item_id = first.json()["items"][0]["id"]
+    delete_key = {"Idempotency-Key": str(uuid.uuid4())}
+    deleted = client.delete(f"/api/cart/items/{item_id}?user_id={usuario_id}", headers=delete_key)
+    idempotency.response_cache.clear()
+    deleted_again = client.delete(f"/api/cart/items/{item_id}?user_id={usuario_id}", headers=delete_key)
+    passed &= check(
+        "DELETE repetido → 204 (no 404) y el stock se libera una vez",
+        deleted.status_code == 204 and deleted_again.status_code == 204 and stock() == stock_inicial
+    )
+
+    checkout_user = seed_cart(SessionLocal, 3)
+    checkout_key = {"Idempotency-Key": str(uuid.uuid4())}
+    order = client.post(f"/api/orders/checkout?user_id={checkout_user}", headers=checkout_key)
+    idempotency.response_cache.clear()
+    order_again = client.post(f"/api/orders/checkout?user_id={checkout_user}", headers=checkout_key)
+    with engine.connect() as conn:
+        orders = conn.execute(
+            select(func.count()).select_from(Pedido).where(Pedido.usuario_id == checkout_user)
+        ).scalar_one()
+    passed &= check(
+        "checkout repetido → mismo pedido (201), un solo pedido creado",
+        order.status_code == 201 and order_again.status_code == 201
+        and order_again.json()["id"] == order.json()["id"] and orders == 1
+    )
+
+    # Latencia: request original vs reintento desde la tabla vs desde el LRU
+    original, from_table, from_lru = [], [], []
+    for _ in range(args.repeat):
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        payload = {"product_id": producto_id, "quantity": 1}
+        original.append(timed_ms(lambda: client.post(url, json=payload, headers=headers)))
+        idempotency.response_cache.clear()
+        from_table.append(timed_ms(lambda: client.post(url, json=payload, headers=headers)))
+        from_lru.append(timed_ms(lambda: client.post(url, json=payload, headers=headers)))
+        client.delete(f"/api/cart/items/{item_id}?user_id={usuario_id}")  # mantiene el carrito chico
+
+    print(f"\n{'request':>16} | {'mediana (ms)':>12}")
+    for name, samples in (("original", original), ("reintento tabla", from_table), ("reintento LRU", from_lru)):
+        print(f"{name:>16} | {statistics.median(samples):>12.3f}")
+    passed &= check(
+        "el reintento cuesta menos que el request original",
+        statistics.median(from_table) < statistics.median(original)
+        and statistics.median(from_lru) < statistics.median(from_table)
+    )
+
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
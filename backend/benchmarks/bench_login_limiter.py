@@ -0,0 +1,206 @@
+"""
+Benchmark + verificación: limitador de intentos de login
+
+Mide el costo por intento de LoginLimiter.hit (services/login_limiter.py)
+con el backend en memoria y con el de base de datos (tabla
+'intentos_login'), sobre `--keys` cuentas distintas.
+
+Verifica de punta a punta con POST /api/auth/login que, superado
+LOGIN_MAX_ATTEMPTS_PER_ACCOUNT, la respuesta sea 429 con Retry-After sin
+consultar 'usuarios' ni correr bcrypt, que un login exitoso reinicie el
+contador de la cuenta, y con un reloj falso: el límite por IP sobre
+muchas cuentas, que los logins exitosos no cuenten para la IP, la
+ventana deslizante, la compactación y el tope de claves en memoria.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_login_limiter --calls 20000 --keys 1000
+"""
+
+import argparse
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models import IntentoLogin, Usuario
+from app.services import login_limiter, passwords
+from app.services.login_limiter import LoginLimiter, LoginThrottledError
+from benchmarks.common import count_queries, make_engine, override_app_db, print_header
+
+EMAIL = "limit@test.com"
+PASSWORD = "secret-password"
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_020.0):  # inicio de una ventana de 60 s
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_limiter(backend: str = "memory", clock=time.time, **overrides) -> LoginLimiter:
+    options = {
+        "window_seconds": 60,
+        "account_limit": 5,
+        "ip_limit": 20,
+        "max_keys": 100_000,
+        "compact_seconds": 3600,
+    }
+    options.update(overrides)
+    return LoginLimiter(backend, clock=clock, **options)
+
+
+def hit_cost_us(limiter: LoginLimiter, db, calls: int, keys: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        limiter.hit(db, f"10.0.{i % 250}.{i % keys % 250}", f"user{i % keys}@test.com")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000, help="intentos en el microbenchmark en memoria")
+    parser.add_argument("--keys", type=int, default=1000, help="cuentas distintas en el microbenchmark")
+    args = parser.parse_args()
+
+    print_header("🔒 LIMITADOR DE INTENTOS DE LOGIN")
+    engine = make_engine()
+    SessionLocal = override_app_db(app, engine)
+    passed = True
+
+    # Límites altos: el microbenchmark mide el costo, no los rechazos
+    print(f"\n{'backend':>8} | {'µs/intento':>10}")
+    timings = {}
+    db = SessionLocal()
+    for backend, calls in (("memory", args.calls), ("database", max(1, args.calls // 10))):
+        limiter = make_limiter(backend, account_limit=10**9, ip_limit=10**9)
+        hit_cost_us(limiter, db, min(calls, args.keys), args.keys)
+        timings[backend] = hit_cost_us(limiter, db, calls, args.keys)
+        print(f"{backend:>8} | {timings[backend]:>10.1f}")
+    db.close()
+    passed &= check(f"backend en memoria: {timings['memory']:.1f} µs por intento (< 50 µs)", timings["memory"] < 50)
+    print(f"   un bcrypt de {settings.PASSWORD_BCRYPT_ROUNDS} rondas cuesta ~"
+          f"{2 ** (settings.PASSWORD_BCRYPT_ROUNDS - 12) * 250:.0f} ms: el limitador es despreciable frente a él")
+
+    # Punta a punta con el limitador del proceso (backend en memoria)
+    passwords.hasher.rounds = 4
+    db = SessionLocal()
+    db.add(Usuario(email=EMAIL, password_hash=passwords.hash_password_sync(PASSWORD, rounds=4)))
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    limit = login_limiter.limiter.account_limit
+    wrong = {"username": EMAIL, "password": "wrong-password"}
+    statuses = [client.post("/api/auth/login", json=wrong).status_code for _ in range(limit)]
+    completed = passwords.hasher.completed
+    with count_queries(engine) as counter:
+        response = client.post("/api/auth/login", json=wrong)
+    user_queries = sum(1 for statement in counter["statements"] if "FROM usuarios" in statement)
+    passed &= check(f"{limit} intentos fallidos → 401; el siguiente → 429 con Retry-After "
+                    f"({response.headers.get('retry-after')} s)",
+                    statuses == [401] * limit and response.status_code == 429
+                    and int(response.headers.get("retry-after", 0)) >= 1)
+    passed &= check("el intento rechazado no consulta 'usuarios' ni corre bcrypt",
+                    user_queries == 0 and passwords.hasher.completed == completed)
+
+    login_limiter.limiter.succeeded(None, "testclient", EMAIL)
+    for _ in range(limit - 1):
+        client.post("/api/auth/login", json=wrong)
+    ok = client.post("/api/auth/login", json={"username": EMAIL, "password": PASSWORD}).status_code
+    again = [client.post("/api/auth/login", json=wrong).status_code for _ in range(limit - 1)]
+    passed &= check("un login exitoso reinicia el contador de la cuenta",
+                    ok == 200 and again == [401] * (limit - 1))
+
+    # Reloj falso: límite por IP, ventana deslizante, compactación y tope
+    clock = FakeClock()
+    limiter = make_limiter(clock=clock, account_limit=5, ip_limit=20)
+    admitted = 0
+    try:
+        for i in range(100):
+            limiter.hit(None, "203.0.113.7", f"victim{i}@test.com")
+            admitted += 1
+    except LoginThrottledError as error:
+        scope = error.scope
+    passed &= check(f"credential stuffing desde una IP: {admitted} cuentas antes del 429 ({scope})",
+                    admitted == 20 and scope == "ip")
+
+    shared_ip = make_limiter(clock=clock, account_limit=5, ip_limit=20)
+    try:
+        for i in range(100):
+            shared_ip.hit(None, "192.0.2.50", f"office{i}@test.com")
+            shared_ip.succeeded(None, "192.0.2.50", f"office{i}@test.com")
+        behind_nat = True
+    except LoginThrottledError:
+        behind_nat = False
+    passed &= check("100 logins exitosos desde una IP (NAT) no consumen su límite de 20", behind_nat)
+
+    clock.now += 60
+    try:
+        limiter.hit(None, "203.0.113.7", "victim0@test.com")
+        early = True
+    except LoginThrottledError as error:
+        early, retry_after = False, error.retry_after
+    clock.now += retry_after
+    try:
+        limiter.hit(None, "203.0.113.7", "victim0@test.com")
+        later = True
+    except LoginThrottledError:
+        later = False
+    passed &= check(f"ventana deslizante: rechazado al empezar la ventana siguiente, "
+                    f"admitido tras Retry-After ({retry_after} s)", not early and later)
+
+    clock.now += 180
+    removed = limiter.compact()
+    passed &= check(f"compactación: {removed} claves viejas descartadas, quedan {limiter.stats()['keys']}",
+                    limiter.stats()["keys"] == 0 and removed == 21)
+
+    bounded = make_limiter(clock=clock, max_keys=500, account_limit=10**9, ip_limit=10**9)
+    for i in range(5000):
+        bounded.hit(None, f"198.51.100.{i % 250}", f"spray{i}@test.com")
+    passed &= check(f"tope de claves en memoria: {bounded.stats()['keys']} (máx 500, "
+                    f"{bounded.evictions} expulsadas)", bounded.stats()["keys"] <= 500)
+
+    # Backend en base: compartido entre dos "workers" (dos instancias)
+    db = SessionLocal()
+    db.query(IntentoLogin).delete()  # filas del microbenchmark (reloj real)
+    db.commit()
+    first = make_limiter("database", clock=clock)
+    second = make_limiter("database", clock=clock)
+    for limiter in (first, second, first, second, first):
+        limiter.hit(db, "192.0.2.1", "shared@test.com")
+    try:
+        second.hit(db, "192.0.2.1", "shared@test.com")
+        shared = False
+    except LoginThrottledError as error:
+        shared = error.scope == "cuenta"
+    refunded = make_limiter("database", clock=clock, ip_limit=3)
+    try:
+        for i in range(10):
+            refunded.hit(db, "192.0.2.60", f"db{i}@test.com")
+            refunded.succeeded(db, "192.0.2.60", f"db{i}@test.com")
+        refunded_ok = True
+    except LoginThrottledError:
+        refunded_ok = False
+    clock.now += 180
+    removed = first.compact(db)
+    left = db.query(IntentoLogin).count()
+    db.close()
+    passed &= check(f"backend 'database': el límite se comparte entre workers, los logins exitosos "
+                    f"no cuentan para la IP y la compactación borra las filas viejas ({left} restantes)",
+                    shared and refunded_ok and left == 0 and removed >= 2)
+
+    print(f"\nmétricas: {login_limiter.limiter_stats()}")
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark + verificación: bcrypt en el pool de procesos vs en el event loop
+
+Simula una tormenta de logins mientras una sonda pide GET /health cada
+10 ms sobre el mismo event loop (httpx + ASGITransport, sin lifespan):
+
+- en el loop: cada login llama a bcrypt directamente desde una corrutina
+  (lo que haría un handler async def con seed_data.hash_password)
+- pool: POST /api/auth/login real, bcrypt en services/passwords.py
+
+Reporta logins por segundo y la latencia de la sonda (p50/p99/máx).
+Verifica que con el pool la sonda no espere a bcrypt, que los logins
+válidos e inválidos respondan 200/401 y que, pasado PASSWORD_QUEUE_MAX,
+los logins excedentes reciban 503 con Retry-After sin tocar bcrypt.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_password_pool --logins 40 --rounds 10
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.main import app
+from app.models import Usuario
+from app.services import login_limiter, passwords
+from benchmarks.common import make_engine, override_app_db, percentile, print_header
+
+EMAIL = "storm@test.com"
+PASSWORD = "secret-password"
+
+
+async def probe(client, stop: asyncio.Event, samples: list):
+    """
+    GET /health cada 10 ms hasta `stop`. La latencia se mide desde el
+    momento en que tocaba enviarlo: incluye el tiempo que el event loop
+    estuvo bloqueado sin poder atender la sonda.
+    """
+    due = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        response = await client.get("/health")
+        assert response.status_code == 200
+        samples.append((time.perf_counter() - due) * 1000)
+        due = max(due + 0.01, time.perf_counter())
+
+
+async def storm(client, logins: int, mode: str, password_hash: str) -> dict:
+    samples = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(client, stop, samples))
+    await asyncio.sleep(0.05)
+
+    async def inline_login():
+        await asyncio.sleep(0)  # el handler cede el loop (leer el body, buscar el usuario) y luego bcrypt
+        return passwords.verify_password_sync(PASSWORD, password_hash)
+
+    async def pool_login():
+        response = await client.post("/api/auth/login", json={"username": EMAIL, "password": PASSWORD})
+        return response.status_code
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(inline_login() if mode == "loop" else pool_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return {"results": results, "elapsed": elapsed, "probe": samples}
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+async def run(args) -> bool:
+    passwords.hasher.rounds = args.rounds
+    if args.workers:
+        passwords.hasher.workers = args.workers
+    engine = make_engine()
+    SessionLocal = override_app_db(app, engine)
+    password_hash = passwords.hash_password_sync(PASSWORD, args.rounds)
+    db = SessionLocal()
+    db.add(Usuario(email=EMAIL, password_hash=password_hash))
+    db.commit()
+    db.close()
+    passwords.hasher.warm_up()
+    # La tormenta repite la misma cuenta e IP: sin esto el limitador de
+    # intentos (services/login_limiter.py) la corta con 429 antes de bcrypt
+    login_limiter.limiter.account_limit = login_limiter.limiter.ip_limit = 10**9
+
+    single = time.perf_counter()
+    passwords.verify_password_sync(PASSWORD, password_hash)
+    bcrypt_ms = (time.perf_counter() - single) * 1000
+    print(f"\nbcrypt costo {args.rounds}: {bcrypt_ms:.0f} ms por verificación, "
+          f"{passwords.hasher.workers} procesos en el pool")
+
+    passed = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'modo':>8} | {'logins/s':>8} | {'sonda p50':>9} | {'sonda p99':>9} | {'sonda máx':>9}")
+        stats = {}
+        for mode in ("loop", "pool"):
+            result = await storm(client, args.logins, mode, password_hash)
+            stats[mode] = result
+            print(f"{mode:>8} | {args.logins / result['elapsed']:>8.1f} | "
+                  f"{percentile(result['probe'], 50):>9.1f} | {percentile(result['probe'], 99):>9.1f} | "
+                  f"{max(result['probe']):>9.1f}")
+        passed &= check(
+            "logins correctos en el pool (200)",
+            all(status == 200 for status in stats["pool"]["results"])
+        )
+        passed &= check(
+            f"con el pool la sonda no espera a bcrypt (p99 < {bcrypt_ms:.0f} ms; en el loop "
+            f"p99 {percentile(stats['loop']['probe'], 99):.0f} ms)",
+            percentile(stats["pool"]["probe"], 99) < bcrypt_ms < percentile(stats["loop"]["probe"], 99)
+        )
+
+        response = await client.post("/api/auth/login", json={"username": EMAIL, "password": "wrong-password"})
+        passed &= check("contraseña incorrecta → 401", response.status_code == 401)
+        response = await client.post("/api/auth/login", json={"username": "nobody@test.com", "password": PASSWORD})
+        passed &= check("email inexistente → 401 (verifica contra hash de relleno)", response.status_code == 401)
+
+        passwords.hasher.queue_max = args.queue_max
+        rejected_before = passwords.hasher.rejected
+        responses = await asyncio.gather(*(
+            client.post("/api/auth/login", json={"username": EMAIL, "password": PASSWORD})
+            for _ in range(args.queue_max * 3)
+        ))
+        ok = sum(1 for response in responses if response.status_code == 200)
+        busy = [response for response in responses if response.status_code == 503]
+        print(f"\nlímite {args.queue_max} en curso, {len(responses)} logins simultáneos: "
+              f"{ok} aceptados, {len(busy)} con 503")
+        passed &= check(
+            "pasado PASSWORD_QUEUE_MAX → 503 con Retry-After, el resto 200",
+            ok == args.queue_max and len(busy) == len(responses) - ok
+            and all(response.headers.get("retry-after") for response in busy)
+            and passwords.hasher.rejected - rejected_before == len(busy)
+        )
+    passwords.stop()
+    app.dependency_overrides.clear()
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=0, help="procesos del pool (0 = PASSWORD_POOL_WORKERS)")
+    parser.add_argument("--queue-max", type=int, default=8)
+    args = parser.parse_args()
+    print_header("🔐 BCRYPT: POOL DE PROCESOS vs EVENT LOOP")
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: dimensionamiento del pool de conexiones y estrategia de pre-ping
+
+1. Contención: N hilos (el threadpool de FastAPI usa 40) piden conexión y
+   la retienen `--hold-ms` (simula la latencia de red de una query).
+   Para cada (pool_size, max_overflow) reporta la espera de checkout
+   p50/p99, checkouts en overflow y timeouts: los mismos contadores que
+   expone /internal/metrics.
+2. Pre-ping: costo del checkout con DB_POOL_PRE_PING always/idle/never
+   (en una BD remota cada ping es un round-trip extra).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_pool --threads 40 --hold-ms 5
+"""
+
+import argparse
+import threading
+import time
+
+from app.services import pool_metrics
+from benchmarks.common import make_engine, measure, print_header
+
+POOL_CONFIGS = ((5, 10), (10, 10), (20, 20), (40, 0))
+
+
+def run_contention(pool_size: int, max_overflow: int, threads: int, per_thread: int, hold_ms: float) -> dict:
+    engine = make_engine(
+        poolclass=pool_metrics.TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=5,
+    )
+    metrics = pool_metrics.instrument(engine, f"bench_{pool_size}_{max_overflow}")
+
+    def worker():
+        for _ in range(per_thread):
+            try:
+                with engine.connect() as conn:
+                    conn.exec_driver_sql("SELECT 1")
+                    time.sleep(hold_ms / 1000)
+            except Exception:
+                pass  # los timeouts quedan en metrics.timeouts
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = metrics.stats(engine.pool)
+    stats["ops_per_s"] = threads * per_thread / elapsed
+    engine.dispose()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--per-thread", type=int, default=50)
+    parser.add_argument("--hold-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print_header(f"🏊 POOL DE CONEXIONES ({args.threads} hilos, {args.hold_ms} ms por query)")
+    print(
+        f"\n{'size+overflow':>13} | {'ops/s':>7} | {'espera p50':>10} | {'espera p99':>10} | "
+        f"{'pico en uso':>11} | {'overflow':>8} | timeouts"
+    )
+    for pool_size, max_overflow in POOL_CONFIGS:
+        stats = run_contention(pool_size, max_overflow, args.threads, args.per_thread, args.hold_ms)
+        print(
+            f"{f'{pool_size}+{max_overflow}':>13} | {stats['ops_per_s']:>7.0f} | "
+            f"{stats['wait_p50_ms']:>8.2f}ms | {stats['wait_p99_ms']:>8.2f}ms | "
+            f"{stats['peak_in_use']:>11} | {stats['overflow_checkouts']:>8} | {stats['timeouts']}"
+        )
+
+    print(f"\n{'pre-ping':>8} | {'checkout+SELECT 1 (ms)':>22}")
+    for strategy in pool_metrics.PING_STRATEGIES:
+        engine = make_engine(poolclass=pool_metrics.TimedQueuePool, pool_pre_ping=strategy == "always")
+        # idle_seconds=0: en "idle" todo checkout cuenta como inactivo (peor caso)
+        pool_metrics.instrument(engine, f"bench_ping_{strategy}", ping=strategy, ping_idle_seconds=0)
+
+        def checkout():
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+
+        checkout()
+        result = measure(checkout, 2_000)
+        print(f"{strategy:>8} | {result['median_ms']:>22.4f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
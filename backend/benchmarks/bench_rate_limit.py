@@ -0,0 +1,159 @@
+"""
+Benchmark + verificación: token buckets por cliente y prefijo de ruta
+
+Mide el costo del middleware de app/rate_limit.py por request, llamándolo
+directamente sobre una app ASGI vacía (sin HTTP ni FastAPI): ruta sin
+presupuesto, cliente por IP y cliente por Bearer token (claims en caché).
+El costo es la diferencia contra la app vacía sola; objetivo < 20 µs.
+
+Verifica de punta a punta que, agotada la ráfaga, las rutas respondan 429
+con Retry-After (y headers de CORS), que cada usuario y cada prefijo tenga
+su propio bucket y que /health no se limite; con un reloj falso, la
+recarga perezosa y el tope de clientes por prefijo.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_rate_limit --calls 50000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app import rate_limit
+from app.main import app
+from app.models import Usuario
+from app.rate_limit import RateLimiter, RateLimitMiddleware
+from app.services import auth as auth_service
+from benchmarks.common import make_engine, override_app_db, print_header, seed_cart, seed_products
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def empty_app(scope, receive, send):
+    pass
+
+
+async def per_call_us(handler, scope: dict, calls: int) -> float:
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    for _ in range(1000):
+        await handler(scope, receive, send)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await handler(scope, receive, send)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def make_scope(path: str, headers=()) -> dict:
+    return {"type": "http", "method": "GET", "path": path, "headers": list(headers), "client": ("10.0.0.1", 5000)}
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50_000, help="requests por modo en el microbenchmark")
+    args = parser.parse_args()
+
+    print_header("🪣 TOKEN BUCKETS POR RUTA (MIDDLEWARE ASGI)")
+    engine = make_engine()
+    seed_products(engine, 20)
+    SessionLocal = override_app_db(app, engine)
+    usuario_ids = [seed_cart(SessionLocal, 3, email=f"bucket{i}@test.com") for i in range(2)]
+    db = SessionLocal()
+    tokens = [auth_service.create_access_token(db.get(Usuario, usuario_id)) for usuario_id in usuario_ids]
+    db.close()
+    passed = True
+
+    # Microbenchmark: presupuesto enorme, el costo medido es el camino admitido
+    limiter = RateLimiter({"/api/products": [1e9, 1e9], "/api/cart": [1e9, 1e9]}, max_keys=100_000)
+    middleware = RateLimitMiddleware(empty_app, limiter)
+    bearer = (b"authorization", f"Bearer {tokens[0]}".encode())
+    modes = (
+        ("sin presupuesto", make_scope("/health")),
+        ("cliente por IP", make_scope("/api/products/search")),
+        ("cliente por token", make_scope("/api/cart/summary", [(b"accept", b"*/*"), bearer])),
+    )
+    baseline = asyncio.run(per_call_us(empty_app, make_scope("/health"), args.calls))
+    print(f"\n{'modo':>17} | {'µs/request':>10} | {'overhead µs':>11}")
+    print(f"{'app vacía':>17} | {baseline:>10.2f} | {'':>11}")
+    overheads = {}
+    for name, scope in modes:
+        total = asyncio.run(per_call_us(middleware, scope, args.calls))
+        overheads[name] = total - baseline
+        print(f"{name:>17} | {total:>10.2f} | {overheads[name]:>11.2f}")
+    passed &= check(
+        f"overhead del middleware < 20 µs por request (peor caso {max(overheads.values()):.2f} µs)",
+        max(overheads.values()) < 20
+    )
+
+    # Punta a punta con el limitador de la app y presupuestos chicos
+    rate_limit.limiter.enabled = True
+    app_limiter = RateLimiter({"/api/products": [1, 5], "/api/cart": [1, 3]}, max_keys=1000)
+    rate_limit.limiter.budgets = app_limiter.budgets
+    client = TestClient(app)
+    statuses = [client.get("/api/products/").status_code for _ in range(6)]
+    response = client.get("/api/products/", headers={"Origin": "http://localhost:5173"})
+    passed &= check(
+        f"ráfaga de 5 en /api/products → 200, luego 429 con Retry-After ({response.headers.get('retry-after')} s)",
+        statuses == [200] * 5 + [429] and response.status_code == 429
+        and int(response.headers.get("retry-after", 0)) >= 1
+    )
+    passed &= check("el 429 lleva los headers de CORS",
+                    response.headers.get("access-control-allow-origin") == "http://localhost:5173")
+    passed &= check("otro prefijo (/api/cart) y rutas sin presupuesto (/health) siguen respondiendo",
+                    client.get("/api/cart/summary", headers={"Authorization": f"Bearer {tokens[0]}"}).status_code == 200
+                    and all(client.get("/health").status_code == 200 for _ in range(20)))
+
+    users = [[client.get("/api/cart/summary", headers={"Authorization": f"Bearer {token}"}).status_code
+              for _ in range(4)] for token in tokens]
+    passed &= check(
+        "cada usuario tiene su bucket: el primero se agota y el segundo conserva su ráfaga",
+        users[0] == [200, 200, 429, 429] and users[1] == [200, 200, 200, 429]
+    )
+    print(f"\nmétricas: {rate_limit.rate_limit_stats()}")
+
+    # Reloj falso: recarga perezosa y tope de clientes
+    clock = FakeClock()
+    fake = RateLimiter({"/api/orders": [0.5, 2]}, max_keys=100, clock=clock)
+    budget = fake.budget_for("/api/orders/checkout")
+    first = [budget.take("u:1") for _ in range(3)]
+    clock.now += first[2]
+    refilled = budget.take("u:1")
+    passed &= check(
+        f"recarga perezosa: sin tokens espera {first[2]:.1f} s y tras ese tiempo vuelve a pasar",
+        first[:2] == [0.0, 0.0] and first[2] == 2.0 and refilled == 0.0
+    )
+    for i in range(1000):
+        budget.take(f"ip:192.0.2.{i}")
+        budget.take("u:1")
+        clock.now += 0.01
+    passed &= check(f"tope de clientes por prefijo: {len(budget._buckets)} (máx 100, {budget.evictions} descartados)",
+                    len(budget._buckets) <= 100)
+    passed &= check("se descartan los de uso menos reciente: el cliente activo desde el inicio conserva su bucket",
+                    "u:1" in budget._buckets and budget.take("u:1") > 0)
+    passed &= check("el prefijo coincide por segmentos: /api/orders/… sí, /api/ordersX no",
+                    fake.budget_for("/api/orders") is budget and fake.budget_for("/api/ordersX") is None)
+
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: búsqueda de texto completo (FTS5) vs escaneo LIKE
+
+Mide la latencia de search.search_products contra el equivalente a
+`toLowerCase().includes` (LIKE '%texto%' sobre titulo y descripcion) con
+100k y 1M productos.
+
+En PostgreSQL el mismo servicio usa los índices GIN; este script corre
+sobre SQLite para no requerir un servidor.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_search --sizes 100000 1000000
+"""
+
+import argparse
+
+from sqlalchemy import and_, case, or_
+
+from app.models import Producto
+from app.services import search
+from benchmarks.common import make_engine, make_session_factory, measure, print_header, seed_products
+
+# Términos frecuentes (~15% de las filas) y selectivos (código de modelo)
+QUERIES = ["laptop", "café termo", "calcu", "xk4321", "mochila xk12"]
+
+
+def like_scan(db, query, limit=20):
+    """
+    Equivalente SQL del filtro O(n) que hacía el frontend, con el mismo
+    criterio de relevancia (coincidencia en título primero)
+    """
+    conditions = []
+    in_title = []
+    for term in query.lower().split():
+        pattern = f"%{term}%"
+        conditions.append(or_(Producto.titulo.ilike(pattern), Producto.descripcion.ilike(pattern)))
+        in_title.append(Producto.titulo.ilike(pattern))
+    return (
+        db.query(Producto)
+        .filter(Producto.is_active == True, *conditions)  # noqa: E712
+        .order_by(case((and_(*in_title), 0), else_=1), Producto.id_producto)
+        .limit(limit)
+        .all()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        print_header(f"🔍 BÚSQUEDA ({rows:,} productos)")
+        engine = make_engine()
+        seed_products(engine, rows)
+        db = make_session_factory(engine)()
+
+        print(f"{'query':>28} | {'FTS5 (ms)':>10} | {'LIKE (ms)':>10}")
+        for query in QUERIES:
+            fts = measure(lambda: search.search_products(db, query), args.repeat)
+            like = measure(lambda: like_scan(db, query), args.repeat)
+            print(f"{query:>28} | {fts['median_ms']:>10.3f} | {like['median_ms']:>10.3f}")
+
+        db.close()
+        engine.dispose()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: serialización de respuestas (camino estándar vs FastJSONResponse)
+
+1. Micro: serializa una página de 100 productos con
+   - el camino estándar de FastAPI (validar response_model + dump + json.dumps)
+   - TypeAdapter.validate_python + dump_json (Pydantic en Rust)
+   - orjson directo sobre el dict (app/responses.py)
+   - bytes cacheados por ETag (catalog.json_cache)
+   y verifica que todos produzcan el mismo JSON.
+2. End-to-end: requests/s de listado, detalle y carrito con
+   FAST_JSON_RESPONSES en False y en True (informativo: en respuestas
+   chicas domina el overhead de TestClient).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.main import app
+from app.responses import FastJSONResponse, dumps
+from app.schemas import ProductPage
+from app.services import catalog
+from benchmarks.common import (
+    make_engine,
+    make_session_factory,
+    override_app_db,
+    print_header,
+    seed_cart,
+    seed_products,
+)
+
+
+def throughput(fn, seconds: float) -> float:
+    """Llamadas por segundo de fn durante ~`seconds`"""
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print_header("⚡ SERIALIZACIÓN DE RESPUESTAS")
+    engine = make_engine()
+    seed_products(engine, args.rows)
+    SessionLocal = make_session_factory(engine)
+    user_id = seed_cart(SessionLocal, 20)
+
+    db = SessionLocal()
+    page = catalog.list_products_keyset(db, page_size=100)
+    db.close()
+
+    field = create_response_field(name="response", type_=ProductPage)
+    adapter = TypeAdapter(ProductPage)
+    loop = asyncio.new_event_loop()
+
+    def standard():
+        content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+        return JSONResponse(content).body
+
+    def type_adapter():
+        return FastJSONResponse(adapter.dump_json(adapter.validate_python(page))).body
+
+    def fast():
+        return FastJSONResponse(page).body
+
+    cached = dumps(page)
+
+    def cached_bytes():
+        return FastJSONResponse(cached).body
+
+    failures = 0
+    reference = json.loads(standard())
+    print("\nMicro: página de 100 productos")
+    print(f"{'camino':>28} | {'ops/s':>9} | {'x':>6}")
+    base = None
+    speedups = {}
+    for name, fn in (
+        ("estándar FastAPI", standard),
+        ("TypeAdapter.dump_json", type_adapter),
+        ("orjson (FastJSONResponse)", fast),
+        ("bytes cacheados por ETag", cached_bytes),
+    ):
+        same = json.loads(fn()) == reference
+        failures += 0 if same else 1
+        ops = throughput(fn, args.seconds)
+        base = base or ops
+        speedups[name] = ops / base
+        print(f"{name:>28} | {ops:>9,.0f} | {ops / base:>5.1f}x {'✅' if same else '❌ JSON distinto'}")
+    loop.close()
+    ok = speedups["orjson (FastJSONResponse)"] >= 2.0
+    failures += 0 if ok else 1
+    print(f"{'✅' if ok else '❌'} orjson al menos 2x más rápido que el camino estándar")
+
+    override_app_db(app, engine)
+    client = TestClient(app)
+    endpoints = {
+        "listado (100)": "/api/products/?page_size=100&sort=price",
+        "detalle": "/api/products/42",
+        "carrito (20)": f"/api/cart/?user_id={user_id}",
+    }
+    print("\nEnd-to-end (TestClient, caché del catálogo ON)")
+    print(f"{'endpoint':>14} | {'estándar req/s':>14} | {'rápido req/s':>12} | {'x':>5}")
+    for name, url in endpoints.items():
+        results = {}
+        for fast_enabled in (False, True):
+            settings.FAST_JSON_RESPONSES = fast_enabled
+            catalog.invalidate_product()
+            client.get(url)
+            results[fast_enabled] = throughput(lambda: client.get(url), args.seconds)
+        print(
+            f"{name:>14} | {results[False]:>14,.0f} | {results[True]:>12,.0f} | "
+            f"{results[True] / results[False]:>4.1f}x"
+        )
+
+    settings.FAST_JSON_RESPONSES = True
+    app.dependency_overrides.clear()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: SQLite con carga mixta lectura/escritura (antes vs modo producción)
+
+- antes: un solo pool para todo, journal por defecto (rollback journal)
+- WAL + writer: PRAGMAs de producción (WAL, synchronous=NORMAL, mmap,
+  cache, busy_timeout) y escrituras por la conexión writer única
+  (app.database.RoutingSession)
+
+Cada hilo ejecuta, durante `--seconds`, lecturas (carrito completo y
+página del catálogo) y escrituras (cambiar cantidades de un carrito) con
+probabilidad `--write-ratio`. Reporta throughput, p99 y errores
+"database is locked".
+
+Uso (desde backend/):
+    python -m benchmarks.bench_sqlite_mixed --threads 16 --write-ratio 0.2
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.database import configure_sqlite, create_sqlite_writer, make_session_factory
+from app.models import ItemCarrito
+from app.services import cart as cart_service
+from app.services import catalog
+from benchmarks.common import make_engine, percentile, print_header, seed_cart, seed_products
+
+
+def setup(production: bool, rows: int, carts: int):
+    """Base nueva (archivo temporal) con productos y carritos"""
+    seed_engine = make_engine()
+    url = seed_engine.url.render_as_string(hide_password=False)
+    seed_products(seed_engine, rows)
+    user_ids = [seed_cart(make_session_factory(seed_engine), 10) for _ in range(carts)]
+    seed_engine.dispose()
+
+    engine = create_engine(url, connect_args={"check_same_thread": False}, pool_size=20, max_overflow=0)
+    writer = None
+    if production:
+        configure_sqlite(engine)
+        writer = create_sqlite_writer(url)
+    return engine, writer, make_session_factory(engine, writer=writer), user_ids
+
+
+def run(SessionLocal, user_ids: list, threads: int, seconds: float, write_ratio: float) -> dict:
+    reads, writes, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        db = SessionLocal()
+        while time.perf_counter() < deadline:
+            user_id = rng.choice(user_ids)
+            start = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    (
+                        db.query(ItemCarrito)
+                        .filter(ItemCarrito.carrito_id == user_id)
+                        .update({ItemCarrito.cantidad: rng.randint(1, 5)}, synchronize_session=False)
+                    )
+                    db.commit()
+                    writes.append((time.perf_counter() - start) * 1000)
+                else:
+                    if rng.random() < 0.5:
+                        cart_service.get_cart_response(db, user_id)
+                    else:
+                        catalog.list_products_keyset(db, page_size=20, sort="price")
+                    db.rollback()
+                    reads.append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                db.rollback()
+                errors.append(1)
+        db.close()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return {
+        "ops_per_s": (len(reads) + len(writes)) / seconds,
+        "writes_per_s": len(writes) / seconds,
+        "read_p99_ms": percentile(reads, 99),
+        "write_p99_ms": percentile(writes, 99),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--carts", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+
+    print_header(f"🪶 SQLITE MIXTO ({args.threads} hilos, {args.write_ratio:.0%} escrituras)")
+    print(f"\n{'modo':>13} | {'ops/s':>7} | {'escrit/s':>8} | {'lect p99':>9} | {'escr p99':>9} | errores")
+    for name, production in (("antes", False), ("WAL + writer", True)):
+        engine, writer, SessionLocal, user_ids = setup(production, args.rows, args.carts)
+        result = run(SessionLocal, user_ids, args.threads, args.seconds, args.write_ratio)
+        print(
+            f"{name:>13} | {result['ops_per_s']:>7.0f} | {result['writes_per_s']:>8.0f} | "
+            f"{result['read_p99_ms']:>7.1f}ms | {result['write_p99_ms']:>7.1f}ms | {result['errors']}"
+        )
+        engine.dispose()
+        if writer is not None:
+            writer.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark: reserva de stock con N add-to-cart concurrentes sobre UN producto
+
+`--calls` usuarios distintos (1.000 por defecto, un hilo cada uno, todos
+liberados a la vez con una barrera) agregan `--quantity` unidades del
+mismo producto, que tiene `--stock` unidades.
+
+- atómico: app.services.cart.add_item (UPDATE condicional de
+  app/services/stock.py) sobre SQLite en modo producción (WAL + writer)
+- ingenuo: lo que hacía el trigger (SELECT stock, comparar, luego
+  escribir) para mostrar la sobreventa
+
+Verifica que nunca se reserve más que el stock: exactamente
+stock // quantity éxitos, stock final >= 0 y stock final + unidades en
+carritos = stock inicial. Después quita la mitad de los items y libera el
+resto por expiración para verificar que todo el stock vuelve.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_stock_reservation --calls 1000 --stock 300
+"""
+
+import argparse
+import sys
+import threading
+import time
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, insert, select, update
+
+from app.config import settings
+from app.database import configure_sqlite, create_sqlite_writer, make_session_factory
+from app.models import Carrito, ItemCarrito, Producto, Usuario
+from app.services import cart as cart_service
+from app.services import stock as stock_service
+from benchmarks.common import make_engine, percentile, print_header
+
+
+def setup(calls: int, stock: int):
+    """Base nueva con un producto caliente y `calls` usuarios sin carrito"""
+    seed_engine = make_engine()
+    url = seed_engine.url.render_as_string(hide_password=False)
+    with seed_engine.begin() as conn:
+        conn.execute(insert(Producto.__table__), [{
+            "titulo": "Producto caliente",
+            "precio": Decimal("9990.00"),
+            "stock": stock,
+            "categoria": "Electrónicos",
+        }])
+        conn.execute(insert(Usuario.__table__), [
+            {"email": f"stock_{i}@test.com", "password_hash": "x", "nombre": "Bench"}
+            for i in range(calls)
+        ])
+        producto_id = conn.execute(select(Producto.id_producto)).scalar_one()
+        user_ids = list(conn.execute(select(Usuario.id_usuario)).scalars())
+    seed_engine.dispose()
+
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False}, pool_size=40, max_overflow=0, pool_timeout=120
+    )
+    configure_sqlite(engine)
+    writer = create_sqlite_writer(url)
+    return engine, writer, make_session_factory(engine, writer=writer), producto_id, user_ids
+
+
+def naive_add(db, usuario_id: int, producto_id: int, cantidad: int) -> None:
+    """Read-check-write: la carrera del trigger validar_stock_disponible"""
+    disponible = db.execute(select(Producto.stock).where(Producto.id_producto == producto_id)).scalar_one()
+    if disponible < cantidad:
+        raise stock_service.InsufficientStockError(producto_id, cantidad, disponible)
+    time.sleep(0)  # cede el GIL entre la lectura y la escritura, como lo haría la red
+    db.execute(
+        update(Producto)
+        .where(Producto.id_producto == producto_id)
+        .values(stock=disponible - cantidad)
+    )
+    carrito = cart_service.get_or_create_active_cart(db, usuario_id)
+    db.add(ItemCarrito(
+        carrito_id=carrito.id_carrito, producto_id=producto_id, cantidad=cantidad, precio_unitario=Decimal("9990.00")
+    ))
+    db.commit()
+
+
+def run(SessionLocal, add, producto_id: int, user_ids: list, quantity: int) -> dict:
+    latencies, ok, rejected, errors = [], [], [], []
+    barrier = threading.Barrier(len(user_ids))
+
+    def worker(usuario_id):
+        db = SessionLocal()
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            add(db, usuario_id, producto_id, quantity)
+            ok.append(usuario_id)
+        except stock_service.InsufficientStockError:
+            db.rollback()
+            rejected.append(usuario_id)
+        except Exception as error:
+            db.rollback()
+            errors.append(repr(error))
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.close()
+
+    threads = [threading.Thread(target=worker, args=(usuario_id,)) for usuario_id in user_ids]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "ok": len(ok),
+        "rejected": len(rejected),
+        "errors": errors,
+        "ops_per_s": len(user_ids) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def stock_state(SessionLocal, producto_id: int) -> tuple:
+    """(stock disponible, unidades en carritos activos)"""
+    db = SessionLocal()
+    try:
+        disponible = db.execute(select(Producto.stock).where(Producto.id_producto == producto_id)).scalar_one()
+        reservado = db.execute(
+            select(func.coalesce(func.sum(ItemCarrito.cantidad), 0))
+            .join(Carrito, Carrito.id_carrito == ItemCarrito.carrito_id)
+            .where(ItemCarrito.producto_id == producto_id, Carrito.is_active == True)  # noqa: E712
+        ).scalar_one()
+        return disponible, reservado
+    finally:
+        db.close()
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def release_all(SessionLocal, producto_id: int, user_ids: list) -> None:
+    """Quita la mitad de los items a mano y expira el resto"""
+    db = SessionLocal()
+    try:
+        items = db.execute(
+            select(ItemCarrito.id_item, Carrito.usuario_id)
+            .join(Carrito, Carrito.id_carrito == ItemCarrito.carrito_id)
+            .where(ItemCarrito.producto_id == producto_id)
+            .order_by(ItemCarrito.id_item)
+        ).all()
+        for item in items[: len(items) // 2]:
+            cart_service.remove_item(db, item.usuario_id, item.id_item)
+        # Carritos "abandonados": sin actividad desde hace más que el TTL
+        db.execute(update(Carrito).values(updated_at=func.datetime("now", "-1 day")))
+        db.commit()
+        stock_service.release_expired_reservations(db, settings.CART_RESERVATION_TTL_MINUTES, batch_size=64)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1_000)
+    parser.add_argument("--stock", type=int, default=300)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+    settings.CATALOG_CACHE_ENABLED = False
+    expected_ok = min(args.calls, args.stock // args.quantity)
+
+    print_header(f"📦 RESERVA DE STOCK ({args.calls} add-to-cart concurrentes, stock {args.stock})")
+    print(f"\n{'modo':>9} | {'éxitos':>6} | {'sin stock':>9} | {'errores':>7} | {'stock final':>11} | "
+          f"{'en carritos':>11} | {'ops/s':>6} | {'p50':>8} | {'p99':>8}")
+    passed = True
+    for name, add in (("ingenuo", naive_add), ("atómico", cart_service.add_item)):
+        engine, writer, SessionLocal, producto_id, user_ids = setup(args.calls, args.stock)
+        result = run(SessionLocal, add, producto_id, user_ids, args.quantity)
+        disponible, reservado = stock_state(SessionLocal, producto_id)
+        print(
+            f"{name:>9} | {result['ok']:>6} | {result['rejected']:>9} | {len(result['errors']):>7} | "
+            f"{disponible:>11} | {reservado:>11} | {result['ops_per_s']:>6.0f} | "
+            f"{result['p50_ms']:>6.1f}ms | {result['p99_ms']:>6.1f}ms"
+        )
+        if name == "atómico":
+            print()
+            passed &= check(f"{expected_ok} reservas exitosas (sin sobreventa)", result["ok"] == expected_ok)
+            passed &= check("sin errores inesperados", not result["errors"])
+            passed &= check("stock final nunca negativo", disponible >= 0)
+            passed &= check(
+                "stock final + unidades en carritos = stock inicial",
+                disponible + reservado == args.stock
+            )
+            release_all(SessionLocal, producto_id, user_ids)
+            disponible, reservado = stock_state(SessionLocal, producto_id)
+            passed &= check(
+                "quitar items y expirar carritos devuelve todo el stock",
+                disponible == args.stock and reservado == 0
+            )
+            if result["errors"]:
+                print(f"   primer error: {result['errors'][0]}")
+        engine.dispose()
+        writer.dispose()
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
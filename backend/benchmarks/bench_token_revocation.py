@@ -0,0 +1,191 @@
+"""
+Benchmark + verificación: revocación de tokens con filtro de Bloom
+
+Carga `--revoked` jti revocados en 'tokens_revocados' y mide:
+
+- memoria del filtro, bits, funciones hash y tasa de falsos positivos
+  esperada vs observada sobre `--checks` tokens válidos (también con el
+  filtro al 25/50/100% de su capacidad)
+- costo por verificación: filtro en memoria vs SELECT por jti
+- sync incremental: cuántas filas lee tras nuevas revocaciones, y que
+  una revocación confirmada tarde (revocado_at anterior al último sync,
+  dentro del solape) también entre al filtro
+- crecimiento: un filtro chico que se llena se reconstruye más grande
+
+Verifica que no haya falsos negativos (todo jti revocado da positivo),
+que casi ningún token válido toque la base, que otro worker vea el
+logout tras su sync y, de punta a punta, que POST /api/auth/logout deje
+el token en 401 sin afectar otros tokens del mismo usuario.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_token_revocation --revoked 20000 --checks 50000
+"""
+
+import argparse
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.config import settings
+from app.main import app
+from app.models import TokenRevocado, Usuario
+from app.services import auth as auth_service
+from app.services import revocation
+from app.services.revocation import BloomFilter, RevocationList
+from benchmarks.common import count_queries, make_engine, override_app_db, print_header
+
+
+def insert_revoked(engine, usuario_id: int, n: int, revocado_at=None) -> list:
+    """revocado_at None = el de la base (ahora)"""
+    expires = datetime.now(timezone.utc) + timedelta(minutes=30)
+    jtis = [secrets.token_urlsafe(16) for _ in range(n)]
+    rows = [{"jti": jti, "usuario_id": usuario_id, "expires_at": expires} for jti in jtis]
+    if revocado_at is not None:
+        for row in rows:
+            row["revocado_at"] = revocado_at
+    with engine.begin() as conn:
+        conn.execute(insert(TokenRevocado.__table__), rows)
+    return jtis
+
+
+def revocation_queries(counter) -> int:
+    return sum(1 for statement in counter["statements"] if "tokens_revocados" in statement)
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, default=20_000)
+    parser.add_argument("--checks", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print_header("🚫 REVOCACIÓN DE TOKENS (FILTRO DE BLOOM)")
+    engine = make_engine()
+    SessionLocal = override_app_db(app, engine)
+    db = SessionLocal()
+    usuario = Usuario(email="revoke@test.com", password_hash="x")
+    db.add(usuario)
+    db.commit()
+    usuario_id = usuario.id_usuario
+    revoked = insert_revoked(engine, usuario_id, args.revoked, revocado_at=datetime.now(timezone.utc) - timedelta(hours=1))
+    passed = True
+
+    worker = RevocationList(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_FP_RATE, 3600)
+    start = time.perf_counter()
+    worker.sync(db)
+    load_ms = (time.perf_counter() - start) * 1000
+    stats = worker.stats()
+    print(f"\nfiltro: {stats['entries']} jti, capacidad {stats['capacity']}, {stats['bits']} bits, "
+          f"k={stats['hashes']}, {stats['memory_bytes'] / 1024:.1f} KiB (carga inicial {load_ms:.0f} ms)")
+    passed &= check("sin falsos negativos: todos los jti revocados dan positivo",
+                    all(worker.might_be_revoked(jti) for jti in revoked))
+
+    valid = [secrets.token_urlsafe(16) for _ in range(args.checks)]
+    worker.checks = worker.filter_hits = 0
+    start = time.perf_counter()
+    hits = [jti for jti in valid if worker.might_be_revoked(jti)]
+    filter_us = (time.perf_counter() - start) / len(valid) * 1e6
+    for jti in hits:
+        worker.is_revoked(db, jti)
+    sample = valid[:2000]
+    start = time.perf_counter()
+    for jti in sample:
+        worker.is_revoked(db, jti)
+    db_us = (time.perf_counter() - start) / len(sample) * 1e6
+    observed = len(hits) / len(valid)
+    print(f"\n{len(valid)} tokens válidos: {len(hits)} positivos del filtro → tasa observada {observed:.5f} "
+          f"(esperada {worker.bloom.expected_fp_rate():.5f}, objetivo {settings.REVOCATION_BLOOM_FP_RATE})")
+    print(f"costo por verificación: filtro {filter_us:.1f} µs, SELECT por jti {db_us:.1f} µs")
+    passed &= check(
+        f"tasa de falsos positivos dentro de 3x del objetivo ({observed:.5f})",
+        observed <= 3 * settings.REVOCATION_BLOOM_FP_RATE
+    )
+    passed &= check("verificar en el filtro es más barato que consultar la base", filter_us < db_us)
+
+    print(f"\n{'ocupación':>9} | {'KiB':>7} | {'FP esperada':>11} | {'FP observada':>12}")
+    for load in (0.25, 0.5, 1.0):
+        bloom = BloomFilter(int(args.revoked / load), settings.REVOCATION_BLOOM_FP_RATE)
+        for jti in revoked:
+            bloom.add(jti)
+        rate = sum(1 for jti in valid if jti in bloom) / len(valid)
+        print(f"{load:>9.0%} | {bloom.memory_bytes / 1024:>7.1f} | {bloom.expected_fp_rate():>11.5f} | {rate:>12.5f}")
+    passed &= check(
+        f"filtro lleno: FP observada {rate:.5f} cerca del objetivo {settings.REVOCATION_BLOOM_FP_RATE}",
+        rate <= 3 * settings.REVOCATION_BLOOM_FP_RATE
+    )
+
+    more = insert_revoked(engine, usuario_id, 500)
+    with count_queries(engine) as counter:
+        added = worker.sync(db)
+    passed &= check(
+        f"sync incremental: 1 consulta, {added} jti nuevos agregados",
+        counter["count"] == 1 and added == 500 and all(worker.might_be_revoked(jti) for jti in more)
+    )
+
+    # Fila con revocado_at anterior a las ya vistas (su transacción confirmó tarde)
+    late = insert_revoked(engine, usuario_id, 1, revocado_at=worker.high_water - timedelta(seconds=10))
+    added = worker.sync(db)
+    passed &= check(
+        "revocación confirmada tarde (dentro del solape) entra en el próximo sync",
+        added == 1 and worker.might_be_revoked(late[0])
+    )
+
+    small = RevocationList(1000, settings.REVOCATION_BLOOM_FP_RATE, 3600)
+    small.sync(db)
+    small_hits = sum(1 for jti in valid[:10_000] if small.might_be_revoked(jti))
+    passed &= check(
+        f"filtro chico lleno se reconstruye (capacidad {small.bloom.capacity}, "
+        f"FP {small_hits / 10_000:.5f})",
+        small.bloom.capacity >= args.revoked + 500 and small_hits / 10_000 <= 3 * settings.REVOCATION_BLOOM_FP_RATE
+    )
+    db.close()
+
+    # Punta a punta con el filtro del proceso (revocation.revocation_list)
+    client = TestClient(app)
+    token = auth_service.create_access_token(usuario)
+    other = auth_service.create_access_token(usuario)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    revocation.revocation_list.sync_seconds = 3600
+    with count_queries(engine) as counter:
+        for _ in range(200):
+            assert client.get("/api/auth/me", headers=headers).status_code == 200
+    passed &= check(
+        f"token válido: {revocation_queries(counter)} consultas a tokens_revocados en 200 requests",
+        revocation_queries(counter) <= 1
+    )
+
+    peer = RevocationList(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_FP_RATE, 3600)
+    db = SessionLocal()
+    peer.sync(db)
+    jti = auth_service.decode_access_token(token)["jti"]
+    response = client.post("/api/auth/logout", headers=headers)
+    passed &= check(
+        "logout → 204 y el token queda en 401; otro token del usuario sigue en 200",
+        response.status_code == 204
+        and client.get("/api/auth/me", headers=headers).status_code == 401
+        and client.get("/api/auth/me", headers={"Authorization": f"Bearer {other}"}).status_code == 200
+    )
+    before_sync = peer.might_be_revoked(jti)
+    peer.sync(db)
+    passed &= check(
+        "otro worker ve el logout en su próximo sync",
+        not before_sync and peer.might_be_revoked(jti) and peer.is_revoked(db, jti)
+    )
+    db.close()
+    print(f"\nmétricas: {revocation.revocation_stats()}")
+
+    app.dependency_overrides.clear()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Utilidades compartidas por los benchmarks
+
+- Base de datos SQLite temporal con el esquema de los modelos ORM
+- Sesiones sync/async de la app apuntando a esa base
+- Seed masivo de productos
+- Medición de latencia y conteo de queries
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import admission, rate_limit
+from app.config import settings
+from app.database import Base, ThreadpoolSession, async_database_url, get_async_db, get_db, use_async_driver
+from app.models import Carrito, ItemCarrito, Producto, Usuario
+
+CATEGORIAS = ["Electrónicos", "Librería", "Alimentos", "Deportes", "Hogar", "Ropa"]
+PALABRAS = [
+    "laptop", "mouse", "teclado", "cuaderno", "mochila", "café", "galletas",
+    "pelota", "lámpara", "polera", "auriculares", "monitor", "bolígrafo",
+    "calculadora", "termo", "zapatillas", "cargador", "agenda", "silla", "mesa",
+]
+
+
+def make_engine(path: str = None, **kwargs):
+    """Crea un engine SQLite en un archivo temporal con todas las tablas"""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="bench_", suffix=".db")
+        os.close(fd)
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        **kwargs
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_session_factory(engine):
+    """sessionmaker con la misma configuración que app.database"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def make_async_session_factory(engine, **kwargs):
+    """async_sessionmaker (aiosqlite) sobre el mismo archivo que `engine`"""
+    url = async_database_url(engine.url.render_as_string(hide_password=False))
+    async_engine = create_async_engine(url, **kwargs)
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def override_app_db(app, engine):
+    """
+    Apunta get_db y get_async_db de la app a la base de `engine`
+    (get_async_db respeta settings.DB_ASYNC_MODE como la app).
+    Retorna el SessionLocal sync. Limpiar con app.dependency_overrides.clear().
+    Desactiva el límite de requests de app/rate_limit.py y el control de
+    admisión de app/admission.py: los benchmarks mandan miles de requests
+    como un solo cliente y miden la ruta, no el descarte.
+    """
+    rate_limit.limiter.enabled = False
+    # Los benchmarks eligen el usuario con ?user_id= en vez de emitir tokens
+    settings.AUTH_ALLOW_USER_ID_PARAM = True
+    admission.controller.enabled = False
+    SessionLocal = make_session_factory(engine)
+    AsyncSessionLocal = make_async_session_factory(engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        if not use_async_driver(str(engine.url)):
+            db = SessionLocal()
+            try:
+                yield ThreadpoolSession(db)
+            finally:
+                db.close()
+            return
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return SessionLocal
+
+
+def seed_products(engine, rows: int, chunk: int = 50_000, seed: int = 42):
+    """Inserta `rows` productos aleatorios en lotes con INSERT multi-fila"""
+    rng = random.Random(seed)
+    inserted = 0
+    with engine.begin() as conn:
+        while inserted < rows:
+            batch = []
+            for _ in range(min(chunk, rows - inserted)):
+                words = rng.sample(PALABRAS, 3)
+                batch.append({
+                    "titulo": " ".join(words).capitalize(),
+                    "descripcion": (
+                        f"Producto de {words[0]} con {words[1]} y {words[2]}, "
+                        f"modelo XK{rng.randint(1000, 9999)}"
+                    ),
+                    "precio": Decimal(rng.randint(100, 500_000)) / 100,
+                    "stock": rng.randint(0, 500),
+                    "categoria": rng.choice(CATEGORIAS),
+                    "rating_rate": Decimal(rng.randint(0, 500)) / 100,
+                    "rating_count": rng.randint(0, 1000),
+                    "is_active": rng.random() > 0.05,
+                })
+            conn.execute(insert(Producto.__table__), batch)
+            inserted += len(batch)
+    # Estadísticas para que el planner elija los índices compuestos
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return inserted
+
+
+def seed_cart(SessionLocal, n_items: int, email: str = None) -> int:
+    """
+    Crea un usuario con un carrito activo de `n_items` productos distintos.
+    Requiere que existan al menos `n_items` productos. Retorna el usuario_id.
+    """
+    db = SessionLocal()
+    try:
+        usuario = Usuario(
+            email=email or f"bench_{n_items}_{random.randint(0, 10**9)}@test.com",
+            password_hash="x",
+            nombre="Bench",
+        )
+        db.add(usuario)
+        db.flush()
+        carrito = Carrito(usuario_id=usuario.id_usuario, impuesto=Decimal("19.00"), envio=Decimal("5.00"))
+        db.add(carrito)
+        db.flush()
+        productos = db.query(Producto).order_by(Producto.id_producto).limit(n_items).all()
+        for i, producto in enumerate(productos):
+            db.add(ItemCarrito(
+                carrito_id=carrito.id_carrito,
+                producto_id=producto.id_producto,
+                cantidad=1 + i % 3,
+                precio_unitario=producto.precio,
+            ))
+        db.commit()
+        return usuario.id_usuario
+    finally:
+        db.close()
+
+
+def measure(fn, repeat: int = 20) -> dict:
+    """Ejecuta fn `repeat` veces y retorna estadísticas de latencia en ms"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "min_ms": samples[0],
+    }
+
+
+def percentile(samples, pct: float) -> float:
+    """Percentil simple (samples en cualquier orden)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    Cuenta las sentencias SQL ejecutadas sobre `engine`.
+
+    Uso:
+        with count_queries(engine) as counter:
+            ...
+        print(counter["count"])
+    """
+    counter = {"count": 0, "statements": []}
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+        counter["statements"].append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def print_header(title: str):
+    print("=" * 60)
+    print(title)
+    print("=" * 60)
@@ -100,6 +100,7 @@ CREATE INDEX idx_productos_categoria ON productos(categoria);
 CREATE INDEX idx_productos_precio ON productos(precio);
 CREATE INDEX idx_productos_active ON productos(is_active) WHERE is_active = TRUE;
 CREATE INDEX idx_productos_titulo_busqueda ON productos USING gin(to_tsvector('spanish', titulo));
+CREATE INDEX idx_productos_descripcion_busqueda ON productos USING gin(to_tsvector('spanish', coalesce(descripcion, '')));
 
 -- Comentarios
 COMMENT ON TABLE productos IS 'Catálogo maestro de productos del mini market';
@@ -212,6 +213,278 @@ COMMENT ON COLUMN items_carrito.subtotal IS 'Calculado: precio_unitario × canti
 COMMENT ON CONSTRAINT fk_items_producto ON items_carrito IS 'RESTRICT: no permitir borrar productos con items en carritos';
 
 
+-- ============================================================================
+-- TABLA: pedidos
+-- Descripción: Snapshot de un carrito confirmado en el checkout
+-- (backend/app/services/orders.py). El carrito queda is_active = FALSE.
+-- ============================================================================
+CREATE TABLE pedidos (
+    id_pedido SERIAL PRIMARY KEY,
+    
+    -- Relaciones
+    usuario_id INTEGER NOT NULL,
+    carrito_id INTEGER NOT NULL UNIQUE,
+    
+    -- Estado
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    
+    -- Montos (copiados del carrito al confirmar)
+    total_items INTEGER NOT NULL,
+    subtotal NUMERIC(12,2) NOT NULL,
+    impuesto NUMERIC(10,2) NOT NULL DEFAULT 0.00,
+    envio NUMERIC(10,2) NOT NULL DEFAULT 0.00,
+    total NUMERIC(12,2) NOT NULL,
+    
+    -- Auditoría
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    
+    -- Constraints
+    CONSTRAINT ck_pedidos_con_items CHECK (total_items >= 1),
+    CONSTRAINT ck_pedidos_montos_no_negativos CHECK (subtotal >= 0 AND impuesto >= 0 AND envio >= 0),
+    CONSTRAINT ck_pedidos_estado_valido CHECK (estado IN ('pendiente', 'pagado', 'entregado', 'cancelado')),
+    
+    -- Foreign Keys
+    CONSTRAINT fk_pedidos_usuario 
+        FOREIGN KEY (usuario_id) 
+        REFERENCES usuarios(id_usuario) 
+        ON DELETE RESTRICT
+        ON UPDATE CASCADE,
+    
+    CONSTRAINT fk_pedidos_carrito 
+        FOREIGN KEY (carrito_id) 
+        REFERENCES carritos(id_carrito) 
+        ON DELETE RESTRICT
+        ON UPDATE CASCADE
+);
+
+CREATE INDEX ix_pedidos_usuario_id ON pedidos(usuario_id);
+
+COMMENT ON TABLE pedidos IS 'Pedidos: carritos confirmados (montos congelados al checkout)';
+
+
+-- ============================================================================
+-- TABLA: pedidos_items
+-- Descripción: Líneas de cada pedido (histórico de compras)
+-- ============================================================================
+CREATE TABLE pedidos_items (
+    id_item_pedido SERIAL PRIMARY KEY,
+    
+    -- Relaciones
+    pedido_id INTEGER NOT NULL,
+    producto_id INTEGER NOT NULL,
+    
+    -- Snapshot del producto al comprar
+    titulo VARCHAR(200) NOT NULL,
+    cantidad INTEGER NOT NULL,
+    precio_unitario NUMERIC(10,2) NOT NULL,
+    subtotal NUMERIC(12,2) NOT NULL,
+    
+    -- Auditoría
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    
+    -- Constraints
+    CONSTRAINT ck_pedidos_items_cantidad_positiva CHECK (cantidad >= 1),
+    CONSTRAINT ck_pedidos_items_precio_no_negativo CHECK (precio_unitario >= 0),
+    
+    -- Foreign Keys
+    CONSTRAINT fk_pedidos_items_pedido 
+        FOREIGN KEY (pedido_id) 
+        REFERENCES pedidos(id_pedido) 
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    
+    CONSTRAINT fk_pedidos_items_producto 
+        FOREIGN KEY (producto_id) 
+        REFERENCES productos(id_producto) 
+        ON DELETE RESTRICT
+        ON UPDATE CASCADE
+);
+
+CREATE INDEX ix_pedidos_items_pedido_id ON pedidos_items(pedido_id);
+CREATE INDEX ix_pedidos_items_producto_id ON pedidos_items(producto_id);
+
+COMMENT ON TABLE pedidos_items IS 'Líneas de pedido con título y precio del momento de la compra';
+
+
+-- ============================================================================
+-- TABLA: flash_sale_lotes
+-- Descripción: Stock tomado de productos por cada worker durante una flash
+-- sale (backend/app/services/flash_sale.py). Lo asignado y no vendido de
+-- lotes sin heartbeat vuelve a productos.stock al reconciliar.
+-- ============================================================================
+CREATE TABLE flash_sale_lotes (
+    id_lote SERIAL PRIMARY KEY,
+    
+    -- Relaciones
+    producto_id INTEGER NOT NULL,
+    worker_id VARCHAR(100) NOT NULL,
+    
+    -- Unidades asignadas al worker y vendidas (escritas por el flush)
+    asignado INTEGER NOT NULL DEFAULT 0,
+    vendido INTEGER NOT NULL DEFAULT 0,
+    cerrado BOOLEAN NOT NULL DEFAULT FALSE,
+    
+    -- Auditoría (updated_at = heartbeat del worker)
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    
+    -- Constraints
+    CONSTRAINT ck_flash_lotes_vendido_rango CHECK (vendido >= 0 AND vendido <= asignado),
+    
+    -- Foreign Keys
+    CONSTRAINT fk_flash_lotes_producto 
+        FOREIGN KEY (producto_id) 
+        REFERENCES productos(id_producto) 
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Reconciliación: lotes abiertos sin heartbeat reciente
+CREATE INDEX ix_flash_lotes_abiertos ON flash_sale_lotes(cerrado, updated_at);
+
+COMMENT ON TABLE flash_sale_lotes IS 'Bloques de stock asignados a cada worker en una flash sale';
+
+
+-- ============================================================================
+-- TABLA: claves_idempotencia
+-- Descripción: Respuesta guardada de cada request del carrito/checkout
+-- enviado con el header Idempotency-Key (backend/app/idempotency.py).
+-- status_code NULL = el request original sigue en proceso.
+-- ============================================================================
+CREATE TABLE claves_idempotencia (
+    id_clave SERIAL PRIMARY KEY,
+    
+    -- Relaciones
+    usuario_id INTEGER NOT NULL,
+    
+    -- Clave enviada por el cliente y SHA-256 del request original
+    clave VARCHAR(255) NOT NULL,
+    huella CHAR(64) NOT NULL,
+    
+    -- Respuesta guardada (JSON serializado)
+    status_code INTEGER,
+    respuesta BYTEA,
+    
+    -- Auditoría y expiración
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    
+    -- Constraints
+    CONSTRAINT ux_claves_idempotencia_usuario_clave UNIQUE (usuario_id, clave),
+    
+    -- Foreign Keys
+    CONSTRAINT fk_claves_idempotencia_usuario 
+        FOREIGN KEY (usuario_id) 
+        REFERENCES usuarios(id_usuario) 
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Purga de claves vencidas
+CREATE INDEX ix_claves_idempotencia_expires_at ON claves_idempotencia(expires_at);
+
+COMMENT ON TABLE claves_idempotencia IS 'Respuestas guardadas por Idempotency-Key para repetir reintentos';
+
+
+-- ============================================================================
+-- TABLAS: carritos_archivados / items_carrito_archivados
+-- Descripción: Carritos abandonados e items de carritos ya convertidos en
+-- pedido, movidos por lotes por el sweeper (backend/app/services/
+-- cart_sweeper.py) para que carritos/items_carrito y sus índices solo
+-- tengan filas vigentes. Conservan los ids originales; sin foreign keys.
+-- Con mucho volumen pueden particionarse por rango de archivado_at
+-- (PARTITION BY RANGE) y descartar meses completos con DROP PARTITION.
+-- ============================================================================
+CREATE TABLE carritos_archivados (
+    id_carrito INTEGER PRIMARY KEY,
+    usuario_id INTEGER NOT NULL,
+    impuesto NUMERIC(10,2) NOT NULL,
+    envio NUMERIC(10,2) NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    archivado_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX ix_carritos_archivados_usuario_id ON carritos_archivados(usuario_id);
+
+CREATE TABLE items_carrito_archivados (
+    id_item INTEGER PRIMARY KEY,
+    carrito_id INTEGER NOT NULL,
+    producto_id INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    precio_unitario NUMERIC(10,2) NOT NULL,
+    subtotal NUMERIC(12,2) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    archivado_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX ix_items_carrito_archivados_carrito_id ON items_carrito_archivados(carrito_id);
+
+COMMENT ON TABLE carritos_archivados IS 'Carritos abandonados archivados por el sweeper';
+COMMENT ON TABLE items_carrito_archivados IS 'Items de carritos abandonados o con pedido, archivados por el sweeper';
+
+
+-- ============================================================================
+-- TABLA: tokens_revocados
+-- Descripción: jti de los JWT revocados por logout (backend/app/services/
+-- revocation.py). Cada worker los refleja en un filtro de Bloom y solo
+-- consulta esta tabla cuando el filtro da positivo. id_revocacion creciente:
+-- los workers leen solo las filas nuevas.
+-- ============================================================================
+CREATE TABLE tokens_revocados (
+    id_revocacion SERIAL PRIMARY KEY,
+    
+    -- Claim 'jti' del token revocado
+    jti VARCHAR(64) NOT NULL,
+    
+    -- Relaciones
+    usuario_id INTEGER NOT NULL,
+    
+    -- Auditoría y expiración ('exp' del token)
+    revocado_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    
+    -- Constraints
+    CONSTRAINT tokens_revocados_jti_key UNIQUE (jti),
+    
+    -- Foreign Keys
+    CONSTRAINT fk_tokens_revocados_usuario 
+        FOREIGN KEY (usuario_id) 
+        REFERENCES usuarios(id_usuario) 
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+-- Purga de revocaciones vencidas
+CREATE INDEX ix_tokens_revocados_expires_at ON tokens_revocados(expires_at);
+
+COMMENT ON TABLE tokens_revocados IS 'JWT revocados por logout (jti), espejados en un filtro de Bloom por worker';
+
+
+-- ============================================================================
+-- TABLA: intentos_login
+-- Descripción: contadores de ventana deslizante del limitador de login
+-- (backend/app/services/login_limiter.py) con LOGIN_LIMITER_BACKEND =
+-- 'database'. Una fila por clave ('cuenta:<email>' o 'ip:<dirección>'),
+-- sin foreign keys: la cuenta puede no existir.
+-- ============================================================================
+CREATE TABLE intentos_login (
+    clave VARCHAR(320) PRIMARY KEY,
+    
+    -- Ventana (epoch / LOGIN_WINDOW_SECONDS) e intentos en ella y en la anterior
+    ventana INTEGER NOT NULL,
+    actual INTEGER NOT NULL DEFAULT 0,
+    anterior INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX ix_intentos_login_ventana ON intentos_login(ventana);
+
+COMMENT ON TABLE intentos_login IS 'Intentos de login por cuenta e IP (ventana deslizante), compartidos entre workers';
+
+
 -- ============================================================================
 -- TABLA: categorias (normalización recomendada)
 -- Descripción: Catálogo de categorías de productos
@@ -291,32 +564,13 @@ CREATE TRIGGER tr_items_calcular_subtotal
     EXECUTE FUNCTION calcular_subtotal_item();
 
 
--- Función: validar stock disponible antes de agregar/actualizar item
-CREATE OR REPLACE FUNCTION validar_stock_disponible()
-RETURNS TRIGGER AS $$
-DECLARE
-    stock_actual INTEGER;
-BEGIN
-    -- Obtener stock actual del producto
-    SELECT stock INTO stock_actual 
-    FROM productos 
-    WHERE id_producto = NEW.producto_id;
-    
-    -- Validar stock suficiente
-    IF stock_actual < NEW.cantidad THEN
-        RAISE EXCEPTION 'Stock insuficiente. Disponible: %, Solicitado: %', 
-            stock_actual, NEW.cantidad;
-    END IF;
-    
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
--- Trigger para validar stock
-CREATE TRIGGER tr_items_validar_stock
-    BEFORE INSERT OR UPDATE OF cantidad ON items_carrito
-    FOR EACH ROW
-    EXECUTE FUNCTION validar_stock_disponible();
+-- Stock: la validación vive en la aplicación (backend/app/services/stock.py).
+-- Agregar al carrito RESERVA stock con un UPDATE condicional atómico
+--   UPDATE productos SET stock = stock - :n
+--   WHERE id_producto = :id AND stock >= :n
+-- que reemplaza al antiguo trigger 'tr_items_validar_stock' (SELECT separado,
+-- con carrera y solo en PostgreSQL). Ese trigger además rechazaría items
+-- válidos: tras la reserva, productos.stock ya no incluye esas unidades.
 
 
 -- ============================================================================
@@ -470,12 +724,13 @@ RESTRICCIONES (CONSTRAINTS):
 TRIGGERS IMPLEMENTADOS:
 ✓ Auto-actualización de updated_at
 ✓ Cálculo automático de subtotal
-✓ Validación de stock disponible
+✓ Validación de stock: reserva atómica en la aplicación (ver services/stock.py)
+
+PEDIDOS:
+✓ Tablas 'pedidos' y 'pedidos_items' (snapshot del carrito en el checkout)
 
 PRÓXIMOS PASOS RECOMENDADOS:
-1. Implementar tabla 'pedidos' (orders) para snapshot de carritos completados
-2. Tabla 'pedidos_items' para histórico de compras
-3. Tabla 'calificaciones_productos' para reviews por usuario
-4. Implementar audit log para trazabilidad
-5. Añadir soft-delete en todas las entidades si se requiere
+1. Tabla 'calificaciones_productos' para reviews por usuario
+2. Implementar audit log para trazabilidad
+3. Añadir soft-delete en todas las entidades si se requiere
 */
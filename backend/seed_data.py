@@ -9,16 +9,13 @@ Crea:
 
 from app.database import SessionLocal
 from app.models import Usuario, Producto, Carrito, ItemCarrito
-import bcrypt
+from app.services.passwords import hash_password_sync
 from decimal import Decimal
 
 
 def hash_password(password: str) -> str:
-    """Helper para hashear contraseñas de forma segura con bcrypt"""
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    """Helper para hashear contraseñas con bcrypt (costo PASSWORD_BCRYPT_ROUNDS)"""
+    return hash_password_sync(password)
 
 
 def seed_usuarios(db):
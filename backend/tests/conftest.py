@@ -0,0 +1,120 @@
+"""
+Fixtures compartidas de los tests
+
+Cada test usa una base SQLite nueva en tmp_path con el esquema de los
+modelos ORM y PRODUCTS productos activos.
+
+Uso (desde backend/):
+    python -m pytest -q tests
+"""
+
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, ThreadpoolSession, get_async_db, get_db
+from app.main import app
+from app.models import Carrito, ItemCarrito, Producto, Usuario
+from app.services import catalog
+
+# Productos sembrados en cada base de prueba
+PRODUCTS = 210
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Producto.__table__), [
+            {
+                "titulo": f"Producto {i}",
+                "precio": Decimal(1000 + 10 * i) / 100,
+                "stock": 100,
+                "categoria": "Librería",
+            }
+            for i in range(1, PRODUCTS + 1)
+        ])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def statements(engine):
+    """
+    Sentencias SQL ejecutadas sobre `engine` durante el test. Vaciar con
+    statements.clear() justo antes de la parte que se quiere contar.
+    """
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def make_cart(SessionLocal):
+    """make_cart(n_items): usuario nuevo con un carrito activo de n_items productos; retorna su id"""
+    created = []
+
+    def make_cart(n_items: int) -> int:
+        db = SessionLocal()
+        try:
+            usuario = Usuario(email=f"test_{len(created)}@test.com", password_hash="x", nombre="Test")
+            db.add(usuario)
+            db.flush()
+            carrito = Carrito(usuario_id=usuario.id_usuario, impuesto=Decimal("19.00"), envio=Decimal("5.00"))
+            db.add(carrito)
+            db.flush()
+            productos = db.query(Producto).order_by(Producto.id_producto).limit(n_items).all()
+            for i, producto in enumerate(productos):
+                db.add(ItemCarrito(
+                    carrito_id=carrito.id_carrito,
+                    producto_id=producto.id_producto,
+                    cantidad=1 + i % 3,
+                    precio_unitario=producto.precio,
+                ))
+            db.commit()
+            created.append(usuario.id_usuario)
+            return usuario.id_usuario
+        finally:
+            db.close()
+
+    return make_cart
+
+
+@pytest.fixture
+def client(SessionLocal):
+    """TestClient de la app sobre la base del test, con las cachés del catálogo vacías"""
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        # SQLite: la app usa el modo threadpool (DB_ASYNC_MODE=auto)
+        db = SessionLocal()
+        try:
+            yield ThreadpoolSession(db)
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    catalog.invalidate_product()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    catalog.invalidate_product()
@@ -0,0 +1,30 @@
+"""Queries por CartResponse: constantes sin importar la cantidad de items"""
+
+import pytest
+
+from app.services import cart as cart_service
+
+
+@pytest.mark.parametrize("n_items", [0, 1, 10, 200])
+def test_cart_response_in_two_queries(SessionLocal, statements, make_cart, n_items):
+    """Resumen agregado + items con sus productos"""
+    usuario_id = make_cart(n_items)
+    db = SessionLocal()
+    statements.clear()
+    response = cart_service.get_cart_response(db, usuario_id)
+    db.close()
+    assert len(response["items"]) == n_items
+    assert len(statements) <= 2
+
+
+@pytest.mark.parametrize("n_items", [1, 200])
+def test_cart_detail_in_one_query(SessionLocal, statements, make_cart, n_items):
+    """load_active_cart trae carrito, items y productos en un solo JOIN"""
+    usuario_id = make_cart(n_items)
+    db = SessionLocal()
+    statements.clear()
+    response = cart_service.cart_to_response(cart_service.load_active_cart(db, usuario_id))
+    db.close()
+    assert len(response["items"]) == n_items
+    assert all(item["product_title"] for item in response["items"])
+    assert len(statements) == 1
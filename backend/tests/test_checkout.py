@@ -0,0 +1,40 @@
+"""Checkout en una cantidad constante de sentencias SQL"""
+
+import pytest
+
+from app.services import cart as cart_service
+from app.services import orders as order_service
+
+
+@pytest.mark.parametrize("n_items", [1, 10, 200])
+def test_checkout_in_four_statements(SessionLocal, statements, make_cart, n_items):
+    """SELECT FOR UPDATE + INSERT pedidos + INSERT pedidos_items + UPDATE carritos"""
+    usuario_id = make_cart(n_items)
+    db = SessionLocal()
+    summary = cart_service.get_cart_summary(db, usuario_id)
+    db.rollback()
+    statements.clear()
+    pedido_id = order_service.checkout(db, usuario_id)
+    assert len(statements) == 4
+    order = order_service.get_order_response(db, usuario_id, pedido_id)
+    db.close()
+    assert len(order["items"]) == n_items
+    assert order["total"] == summary["total"]
+    assert order["total_items"] == summary["total_quantity"]
+
+
+def test_second_checkout_without_active_cart(SessionLocal, make_cart):
+    usuario_id = make_cart(3)
+    db = SessionLocal()
+    order_service.checkout(db, usuario_id)
+    with pytest.raises(order_service.CartNotFoundError):
+        order_service.checkout(db, usuario_id)
+    db.close()
+
+
+def test_checkout_empty_cart(SessionLocal, make_cart):
+    usuario_id = make_cart(0)
+    db = SessionLocal()
+    with pytest.raises(order_service.EmptyCartError):
+        order_service.checkout(db, usuario_id)
+    db.close()
@@ -0,0 +1,57 @@
+"""GET condicional del catálogo: ETag / If-None-Match → 304"""
+
+import fastapi.routing
+import pytest
+from sqlalchemy import event
+
+from app.config import settings
+from app.models import Producto
+from app.schemas import ProductUpdate
+from app.services import catalog
+
+LIST_URL = "/api/products/?page_size=100&sort=price"
+DETAIL_URL = "/api/products/42"
+
+
+@pytest.fixture
+def work(monkeypatch):
+    """Cuenta entidades Producto cargadas y respuestas serializadas por FastAPI"""
+    counts = {"orm_loads": 0, "serializations": 0}
+    serialize = fastapi.routing.serialize_response
+
+    def on_load(target, context):
+        counts["orm_loads"] += 1
+
+    async def counting_serialize(*args, **kwargs):
+        counts["serializations"] += 1
+        return await serialize(*args, **kwargs)
+
+    monkeypatch.setattr(fastapi.routing, "serialize_response", counting_serialize)
+    event.listen(Producto, "load", on_load)
+    yield counts
+    event.remove(Producto, "load", on_load)
+
+
+@pytest.mark.parametrize("cache_enabled", [False, True])
+@pytest.mark.parametrize("url", [LIST_URL, DETAIL_URL])
+def test_if_none_match_returns_304_without_loading_products(client, work, monkeypatch, url, cache_enabled):
+    """Un 304 no carga entidades ORM de Producto ni serializa ProductResponse"""
+    monkeypatch.setattr(settings, "CATALOG_CACHE_ENABLED", cache_enabled)
+    first = client.get(url)
+    assert first.status_code == 200
+    work.update(orm_loads=0, serializations=0)
+    response = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert work == {"orm_loads": 0, "serializations": 0}
+
+
+def test_etag_changes_after_product_update(client, SessionLocal):
+    etag = client.get(DETAIL_URL).headers["etag"]
+    db = SessionLocal()
+    catalog.update_product(db, 42, ProductUpdate(price=1.5))
+    db.close()
+    response = client.get(DETAIL_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["price"] == 1.5
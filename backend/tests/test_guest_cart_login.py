@@ -0,0 +1,34 @@
+"""Login con la cookie del carrito de invitado: se fusiona con el carrito del usuario"""
+
+from app.config import settings
+from app.models import Usuario
+from app.services import passwords
+from app.services import cart as cart_service
+
+
+def test_login_merges_guest_cart(client, SessionLocal):
+    db = SessionLocal()
+    usuario = Usuario(
+        email="guest_login@test.com", password_hash=passwords.hash_password_sync("secreto123", rounds=4), nombre="Test"
+    )
+    db.add(usuario)
+    db.commit()
+    usuario_id = usuario.id_usuario
+    db.close()
+
+    for product_id, quantity in ((1, 2), (2, 1)):
+        response = client.post("/api/cart/guest/items", json={"product_id": product_id, "quantity": quantity})
+        assert response.status_code == 200
+    assert settings.GUEST_CART_COOKIE_NAME in client.cookies
+
+    response = client.post("/api/auth/login", json={"username": "guest_login@test.com", "password": "secreto123"})
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+    assert settings.GUEST_CART_COOKIE_NAME not in client.cookies
+
+    db = SessionLocal()
+    try:
+        items = {item["product_id"]: item["quantity"] for item in cart_service.get_cart_response(db, usuario_id)["items"]}
+    finally:
+        db.close()
+    assert items == {1: 2, 2: 1}
@@ -0,0 +1,32 @@
+"""GET /internal/metrics: solo con el token de un administrador"""
+
+import pytest
+
+from app.models import Usuario
+from app.services import auth as auth_service
+
+
+@pytest.fixture
+def token(SessionLocal):
+    """token(is_admin): token de un usuario nuevo"""
+    def token(is_admin: bool) -> str:
+        db = SessionLocal()
+        try:
+            usuario = Usuario(email=f"metrics_{is_admin}@test.com", password_hash="x", nombre="Test", is_admin=is_admin)
+            db.add(usuario)
+            db.commit()
+            return auth_service.create_access_token(usuario)
+        finally:
+            db.close()
+
+    return token
+
+
+def test_metrics_require_admin(client, token):
+    assert client.get("/internal/metrics").status_code == 401
+    headers = {"Authorization": f"Bearer {token(False)}"}
+    assert client.get("/internal/metrics", headers=headers).status_code == 403
+
+    response = client.get("/internal/metrics", headers={"Authorization": f"Bearer {token(True)}"})
+    assert response.status_code == 200
+    assert "pools" in response.json()
@@ -0,0 +1,34 @@
+"""IP del cliente para el rate limit: X-Forwarded-For solo desde proxies de confianza"""
+
+import pytest
+
+from app import rate_limit
+
+
+def scope(peer: str, forwarded: str = None) -> dict:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"type": "http", "client": (peer, 50000), "headers": headers}
+
+
+@pytest.fixture
+def trusted(monkeypatch):
+    monkeypatch.setattr(rate_limit, "trusted_proxies", rate_limit.parse_networks(["10.0.0.0/8"]))
+
+
+def test_without_trusted_proxies_ignores_forwarded_for():
+    assert rate_limit.client_ip(scope("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_forwarded_for_from_untrusted_peer_is_ignored(trusted):
+    assert rate_limit.client_ip(scope("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_trusted_proxy_uses_last_untrusted_forwarded_address(trusted):
+    # El cliente inventa 1.2.3.4; el proxy agrega la IP real y otro proxy interno
+    request = scope("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.9")
+    assert rate_limit.client_ip(request) == "198.51.100.1"
+    assert rate_limit.client_key(request) == "ip:198.51.100.1"
+
+
+def test_trusted_proxy_without_forwarded_for_uses_peer(trusted):
+    assert rate_limit.client_ip(scope("10.0.0.2")) == "10.0.0.2"
@@ -0,0 +1,51 @@
+"""SQLite en modo producción: RoutingSession manda las escrituras al writer"""
+
+import pytest
+from sqlalchemy import create_engine, select, text, update
+
+from app.database import Base, _is_write, configure_sqlite, create_sqlite_writer, make_session_factory
+from app.models import Producto, Usuario
+
+
+@pytest.fixture
+def routed(tmp_path):
+    """(SessionLocal, lectores, writer) sobre un archivo SQLite con el esquema"""
+    url = f"sqlite:///{tmp_path / 'routing.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    configure_sqlite(engine)
+    writer = create_sqlite_writer(url)
+    yield make_session_factory(engine, writer=writer), engine, writer
+    engine.dispose()
+    writer.dispose()
+
+
+@pytest.mark.parametrize("statement, writes", [
+    (select(Producto.id_producto), False),
+    (select(Producto.id_producto).with_for_update(), True),
+    (update(Producto).values(stock=0), True),
+    (text("SELECT id_producto FROM productos"), False),
+    (text("  insert into productos (titulo) values ('x')"), True),
+    (text("WITH viejos AS (SELECT 1) DELETE FROM productos WHERE id_producto IN viejos"), True),
+    (text("SELECT rowid FROM productos_fts WHERE productos_fts MATCH :q"), False),
+])
+def test_is_write(statement, writes):
+    assert _is_write(statement) is writes
+
+
+def test_flush_and_rest_of_transaction_use_writer(routed):
+    SessionLocal, engine, writer = routed
+    db = SessionLocal()
+    assert db.connection().engine is engine
+    db.rollback()
+
+    db.add(Usuario(email="routing@test.com", password_hash="x", nombre="Test"))
+    db.flush()
+    assert db.writing
+    # La lectura siguiente ve la fila sin confirmar: misma conexión writer
+    assert db.connection().engine is writer
+    assert db.execute(select(Usuario.email)).scalar_one() == "routing@test.com"
+    db.commit()
+    assert not db.writing
+    assert db.connection().engine is engine
+    db.close()
@@ -0,0 +1,84 @@
+"""Reserva de stock: add-to-cart concurrentes sobre un producto no sobrevenden"""
+
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+
+from app.config import settings
+from app.database import Base, configure_sqlite, create_sqlite_writer, make_session_factory
+from app.models import ItemCarrito, Producto, Usuario
+from app.services import cart as cart_service
+from app.services import stock as stock_service
+
+CALLS = 200
+STOCK = 61
+QUANTITY = 2
+
+
+@pytest.fixture
+def hot_product(tmp_path, monkeypatch):
+    """
+    Un producto con STOCK unidades y CALLS usuarios sin carrito, sobre
+    SQLite en modo producción (WAL + writer único).
+    Retorna (SessionLocal, producto_id, user_ids).
+    """
+    monkeypatch.setattr(settings, "CATALOG_CACHE_ENABLED", False)
+    url = f"sqlite:///{tmp_path / 'stock.db'}"
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False}, pool_size=40, max_overflow=0, pool_timeout=120
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Producto.__table__), [{
+            "titulo": "Producto caliente", "precio": Decimal("9990.00"), "stock": STOCK, "categoria": "Electrónicos",
+        }])
+        conn.execute(insert(Usuario.__table__), [
+            {"email": f"stock_{i}@test.com", "password_hash": "x", "nombre": "Test"} for i in range(CALLS)
+        ])
+        producto_id = conn.execute(select(Producto.id_producto)).scalar_one()
+        user_ids = list(conn.execute(select(Usuario.id_usuario)).scalars())
+    configure_sqlite(engine)
+    writer = create_sqlite_writer(url)
+    yield make_session_factory(engine, writer=writer), producto_id, user_ids
+    engine.dispose()
+    writer.dispose()
+
+
+def test_concurrent_add_to_cart_never_oversells(hot_product):
+    """CALLS usuarios liberados a la vez: exactamente STOCK // QUANTITY reservas"""
+    SessionLocal, producto_id, user_ids = hot_product
+    ok, rejected, errors = [], [], []
+    barrier = threading.Barrier(len(user_ids))
+
+    def worker(usuario_id):
+        db = SessionLocal()
+        barrier.wait()
+        try:
+            cart_service.add_item(db, usuario_id, producto_id, QUANTITY)
+            ok.append(usuario_id)
+        except stock_service.InsufficientStockError:
+            rejected.append(usuario_id)
+        except Exception as error:
+            errors.append(repr(error))
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker, args=(usuario_id,)) for usuario_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = SessionLocal()
+    disponible = db.execute(select(Producto.stock).where(Producto.id_producto == producto_id)).scalar_one()
+    reservado = db.execute(
+        select(func.coalesce(func.sum(ItemCarrito.cantidad), 0)).where(ItemCarrito.producto_id == producto_id)
+    ).scalar_one()
+    db.close()
+    assert errors == []
+    assert len(ok) == STOCK // QUANTITY
+    assert len(rejected) == CALLS - STOCK // QUANTITY
+    assert disponible == STOCK % QUANTITY
+    assert disponible + reservado == STOCK
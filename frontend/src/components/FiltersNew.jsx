@@ -2,19 +2,20 @@ import React, { useEffect, useState } from 'react';
 import { useProducts } from '../contexts/ProductsContext';
 
 export default function Filters() {
-  const { filters, categories, updateFilters, resetFilters, getCategories, getPriceRange } = useProducts();
+  const { filters, categories, updateFilters, resetFilters } = useProducts();
   const [localMinPrice, setLocalMinPrice] = useState(filters.minPrice);
-  const [localMaxPrice, setLocalMaxPrice] = useState(filters.maxPrice);
+  const [localMaxPrice, setLocalMaxPrice] = useState(filters.maxPrice ?? '');
 
-  const localCategories = getCategories();
-  const apiCategories = categories || []; // Categorías de la API
-  const allCategories = [...localCategories, ...apiCategories]; // Combinar ambas fuentes
-  const priceRange = getPriceRange();
+  const apiCategories = categories || []; // Categorías de la API (catálogo completo)
+  const hasPriceFilter = filters.minPrice > 0 || filters.maxPrice != null;
+  const priceLabel = `$${filters.minPrice.toLocaleString()} - ${
+    filters.maxPrice != null ? `$${filters.maxPrice.toLocaleString()}` : 'sin límite'
+  }`;
 
   // Sincronizar precios locales con filtros globales
   useEffect(() => {
     setLocalMinPrice(filters.minPrice);
-    setLocalMaxPrice(filters.maxPrice);
+    setLocalMaxPrice(filters.maxPrice ?? '');
   }, [filters.minPrice, filters.maxPrice]);
 
   const handleCategoryChange = (e) => {
@@ -31,29 +32,30 @@ export default function Filters() {
   };
 
   const handleMaxPriceChange = (e) => {
-    const value = parseInt(e.target.value) || priceRange.max;
-    setLocalMaxPrice(value);
+    // Vacío = sin tope de precio
+    const value = parseInt(e.target.value);
+    setLocalMaxPrice(Number.isNaN(value) ? '' : value);
   };
 
   const applyPriceFilter = () => {
     const minPrice = Math.max(0, localMinPrice);
-    const maxPrice = Math.max(minPrice, localMaxPrice);
+    const maxPrice = localMaxPrice === '' ? null : Math.max(minPrice, localMaxPrice);
     
     updateFilters({ 
       minPrice, 
       maxPrice 
     });
     
-    console.log(`🧪 Filtro de precio aplicado: $${minPrice.toLocaleString()} - $${maxPrice.toLocaleString()}`);
+    console.log(`🧪 Filtro de precio aplicado: $${minPrice.toLocaleString()} - ${maxPrice ?? 'sin límite'}`);
   };
 
   const clearPriceFilter = () => {
-    const defaultMax = priceRange.max || 200000;
+    // Quitar el tope: el máximo de los productos cargados ocultaría los más caros
     setLocalMinPrice(0);
-    setLocalMaxPrice(defaultMax);
+    setLocalMaxPrice('');
     updateFilters({ 
       minPrice: 0, 
-      maxPrice: defaultMax 
+      maxPrice: null 
     });
   };
 
@@ -120,12 +122,6 @@ export default function Filters() {
               {category.name}
             </option>
           ))}
-          {/* Categorías locales como fallback */}
-          {localCategories.map(category => (
-            <option key={category} value={category}>
-              {category}
-            </option>
-          ))}
         </select>
       </div>
 
@@ -147,7 +143,7 @@ export default function Filters() {
           id="price-range-label" 
           className="price-range-label"
         >
-          Rango actual: ${filters.minPrice.toLocaleString()} - ${filters.maxPrice.toLocaleString()}
+          Rango actual: {priceLabel}
         </div>
         
         <div className="price-range">
@@ -158,7 +154,6 @@ export default function Filters() {
                 type="number" 
                 id="min-price" 
                 min="0" 
-                max={priceRange.max}
                 value={localMinPrice} 
                 onChange={handleMinPriceChange}
                 onKeyPress={handleKeyPress}
@@ -175,7 +170,7 @@ export default function Filters() {
                 value={localMaxPrice} 
                 onChange={handleMaxPriceChange}
                 onKeyPress={handleKeyPress}
-                placeholder={priceRange.max?.toString() || "200000"}
+                placeholder="Sin límite"
               />
             </div>
           </div>
@@ -236,9 +231,9 @@ export default function Filters() {
               <button onClick={() => updateFilters({ search: '' })}>×</button>
             </span>
           )}
-          {(filters.minPrice > 0 || filters.maxPrice < priceRange.max) && (
+          {hasPriceFilter && (
             <span className="filter-tag">
-              Precio: ${filters.minPrice.toLocaleString()} - ${filters.maxPrice.toLocaleString()}
+              Precio: {priceLabel}
               <button onClick={clearPriceFilter}>×</button>
             </span>
           )}
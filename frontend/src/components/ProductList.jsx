@@ -3,7 +3,7 @@ import ProductCardNew from './ProductCardNew'
 import { useProducts } from '../contexts/ProductsContext'
 
 export default function ProductList({ onProductClick }){
-  const { filteredProducts, loading, error } = useProducts()
+  const { filteredProducts, loading, error, hasMore, loadingMore, loadMore } = useProducts()
   
   console.log('🏪 ProductList renderizado:', { 
     filteredProducts: filteredProducts?.length || 0, 
@@ -42,17 +42,28 @@ export default function ProductList({ onProductClick }){
   console.log('🛍️ Renderizando productos:', filteredProducts.length)
   
   return (
-    <div className="products-grid">
-      {filteredProducts.map(product => {
-        console.log('🏷️ Renderizando producto:', product.id, product.title)
-        return (
-          <ProductCardNew 
-            key={product.id}
-            product={product} 
-            onOpenModal={onProductClick} 
-          />
-        )
-      })}
-    </div>
+    <>
+      <div className="products-grid">
+        {filteredProducts.map(product => {
+          console.log('🏷️ Renderizando producto:', product.id, product.title)
+          return (
+            <ProductCardNew 
+              key={product.id}
+              product={product} 
+              onOpenModal={onProductClick} 
+            />
+          )
+        })}
+      </div>
+
+      {/* Siguiente página del catálogo (cursor del backend) */}
+      {hasMore && (
+        <div className="load-more" style={{ padding: '20px', textAlign: 'center' }}>
+          <button className="btn-primary" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? '🔄 Cargando...' : 'Cargar más productos'}
+          </button>
+        </div>
+      )}
+    </>
   )
 }
@@ -4,7 +4,7 @@ import ProductModalNew from './ProductModalNew'
 import { useProducts } from '../contexts/ProductsContext'
 
 export default function ProductListNew(){
-  const { filteredProducts, loading, error } = useProducts()
+  const { filteredProducts, loading, error, hasMore, loadingMore, loadMore } = useProducts()
   const [selectedProduct, setSelectedProduct] = useState(null)
   const [isModalOpen, setIsModalOpen] = useState(false)
   
@@ -66,11 +66,12 @@ export default function ProductListNew(){
       <div className="products-grid">
         {filteredProducts.map((product, index) => {
           console.log('🏷️ Renderizando producto:', product.id, product.title)
+          // Escalonar la animación dentro de cada página de 40 (máx. 1s)
           return (
             <div 
               key={product.id} 
               className="animate-fade-in"
-              style={{ animationDelay: `${index * 0.1}s` }}
+              style={{ animationDelay: `${Math.min(index % 40, 10) * 0.1}s` }}
             >
               <ProductCardNew 
                 product={product}
@@ -81,6 +82,15 @@ export default function ProductListNew(){
         })}
       </div>
 
+      {/* Siguiente página del catálogo (cursor del backend) */}
+      {hasMore && (
+        <div className="load-more animate-fade-in" style={{ padding: '20px', textAlign: 'center' }}>
+          <button className="btn-primary" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? '🔄 Cargando...' : 'Cargar más productos'}
+          </button>
+        </div>
+      )}
+
       <ProductModalNew
         product={selectedProduct}
         isOpen={isModalOpen}
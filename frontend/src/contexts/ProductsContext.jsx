@@ -1,5 +1,5 @@
-import React, { createContext, useContext, useEffect, useState } from 'react';
-import { getTransformedProducts, getTransformedCategories } from '../services';
+import React, { createContext, useContext, useEffect, useRef, useState } from 'react';
+import { getTransformedProductPage, getTransformedCategories } from '../services';
 
 const ProductsContext = createContext();
 
@@ -11,15 +11,20 @@ export function useProducts() {
   return context;
 }
 
-// Estado inicial de filtros
+// Estado inicial de filtros (maxPrice null = sin tope de precio)
 const initialFilters = {
   category: '',
   search: '',
   minPrice: 0,
-  maxPrice: 200000,
+  maxPrice: null,
   minRating: 0
 };
 
+// Productos por página pedidos al backend
+const PAGE_SIZE = 40;
+// Espera antes de consultar mientras el usuario escribe/ajusta filtros
+const FILTER_DEBOUNCE_MS = 250;
+
 export function ProductsProvider({ children }) {
   const [allProducts, setAllProducts] = useState([]);
   const [filteredProducts, setFilteredProducts] = useState([]);
@@ -27,19 +32,25 @@ export function ProductsProvider({ children }) {
   const [filters, setFilters] = useState(initialFilters);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Id de la última consulta: las respuestas de consultas anteriores se descartan
+  const requestIdRef = useRef(0);
 
-  // Cargar productos al inicializar
+  // Cargar categorías al inicializar
   useEffect(() => {
-    loadProducts();
     loadCategories();
   }, []);
 
-  // Aplicar filtros cuando cambien los productos o filtros
+  // Consultar al backend cuando cambien los filtros (filtrado en el servidor)
   useEffect(() => {
-    applyFilters();
-  }, [allProducts, filters]);
+    const timeoutId = setTimeout(() => loadProducts(), FILTER_DEBOUNCE_MS);
+    return () => clearTimeout(timeoutId);
+  }, [filters]);
 
   const loadProducts = async () => {
+    const requestId = ++requestIdRef.current;
     try {
       setLoading(true);
       setError(null);
@@ -52,27 +63,22 @@ export function ProductsProvider({ children }) {
       }
       
       console.log('🔄 Cargando productos desde backend API...');
-      console.log('📞 Llamando a getTransformedProducts()...');
+      console.log('🔍 Filtros enviados al servidor:', filters);
       
-      const products = await getTransformedProducts();
+      const page = await getTransformedProductPage(filters, { pageSize: PAGE_SIZE });
       
-      console.log('📦 Productos recibidos de la API:', products);
-      console.log('📊 Tipo de datos:', typeof products, Array.isArray(products));
+      // Llegó después de una consulta más nueva (filtros cambiados): descartar
+      if (requestId !== requestIdRef.current) return;
       
-      if (!Array.isArray(products)) {
+      if (!Array.isArray(page.products)) {
         throw new Error('Los datos de productos no tienen el formato esperado');
       }
       
-      console.log('✅ Productos cargados desde API:', products.length);
-      console.log('📦 Primer producto:', products[0]);
-      setAllProducts(products);
-      
-      // Actualizar filtro de precio máximo basado en productos
-      if (products.length > 0) {
-        const maxPrice = Math.max(...products.map(p => p.price || 0));
-        const roundedMax = Math.ceil(maxPrice / 10) * 10;
-        setFilters(prev => ({ ...prev, maxPrice: roundedMax }));
-      }
+      console.log('✅ Productos cargados desde API:', page.products.length);
+      setAllProducts(page.products);
+      setFilteredProducts(page.products);
+      setNextCursor(page.nextCursor);
+      setHasMore(page.hasMore);
       
       // Disparar evento de productos cargados
       if (typeof CustomEvent !== 'undefined' && typeof document !== 'undefined') {
@@ -82,10 +88,14 @@ export function ProductsProvider({ children }) {
       }
       
     } catch (error) {
+      if (requestId !== requestIdRef.current) return;
       console.error('❌ Error cargando productos desde API:', error);
       setError(error.message);
     } finally {
-      setLoading(false);
+      if (requestId === requestIdRef.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
     }
   };
 
@@ -100,49 +110,30 @@ export function ProductsProvider({ children }) {
     }
   };
 
-  const applyFilters = () => {
-    console.log('🔍 Aplicando filtros:', filters);
-    console.log('📦 Total productos disponibles:', allProducts.length);
-    
-    let filtered = [...allProducts];
-    
-    // Filtro por categoría
-    if (filters.category && filters.category !== '') {
-      filtered = filtered.filter(product => 
-        product.category && product.category.toLowerCase().includes(filters.category.toLowerCase())
-      );
-    }
-    
-    // Filtro por búsqueda
-    if (filters.search && filters.search !== '') {
-      const searchTerm = filters.search.toLowerCase();
-      filtered = filtered.filter(product => 
-        (product.title && product.title.toLowerCase().includes(searchTerm)) ||
-        (product.name && product.name.toLowerCase().includes(searchTerm)) ||
-        (product.description && product.description.toLowerCase().includes(searchTerm)) ||
-        (product.category && product.category.toLowerCase().includes(searchTerm))
-      );
-    }
-    
-    // Filtro por precio
-    filtered = filtered.filter(product => 
-      product.price >= filters.minPrice && 
-      product.price <= filters.maxPrice
-    );
+  // Pedir la siguiente página (paginación por cursor del backend)
+  const loadMore = async () => {
+    if (!hasMore || !nextCursor || loadingMore) return;
     
-    // Filtro por rating
-    if (filters.minRating > 0) {
-      filtered = filtered.filter(product => 
-        product.rating && product.rating.rate >= filters.minRating
-      );
-    }
-    
-    console.log(`📋 Productos filtrados: ${filtered.length} de ${allProducts.length}`);
-    console.log('🔍 Filtros aplicados:', filters);
-    if (filtered.length > 0) {
-      console.log('📦 Primer producto filtrado:', filtered[0]);
+    const requestId = requestIdRef.current;
+    try {
+      setLoadingMore(true);
+      const page = await getTransformedProductPage(filters, {
+        cursor: nextCursor,
+        pageSize: PAGE_SIZE
+      });
+      // Los filtros cambiaron mientras tanto: la página ya no corresponde
+      if (requestId !== requestIdRef.current) return;
+      setAllProducts(prev => [...prev, ...page.products]);
+      setFilteredProducts(prev => [...prev, ...page.products]);
+      setNextCursor(page.nextCursor);
+      setHasMore(page.hasMore);
+    } catch (error) {
+      if (requestId !== requestIdRef.current) return;
+      console.error('❌ Error cargando más productos:', error);
+      setError(error.message);
+    } finally {
+      if (requestId === requestIdRef.current) setLoadingMore(false);
     }
-    setFilteredProducts(filtered);
   };
 
   const updateFilters = (newFilters) => {
@@ -151,30 +142,20 @@ export function ProductsProvider({ children }) {
 
   const resetFilters = () => {
     console.log('🔄 Reseteando filtros...');
-    
-    // Calcular precio máximo actual
-    let maxPrice = 200000;
-    if (allProducts.length > 0) {
-      const prices = allProducts.map(p => p.precio);
-      const maxProductPrice = Math.max(...prices);
-      maxPrice = Math.ceil(maxProductPrice / 10000) * 10000;
-    }
-    
-    setFilters({
-      ...initialFilters,
-      maxPrice
-    });
+    // Sin tope de precio: el máximo de la página cargada ocultaría productos más caros
+    setFilters(initialFilters);
   };
 
   const getProductById = (id) => {
     return allProducts.find(product => product.id === id);
   };
 
+  // Categorías del catálogo completo (GET /products/categories), no solo de la página cargada
   const getCategories = () => {
-    const categories = [...new Set(allProducts.map(p => p.categoria))];
-    return categories.sort();
+    return categories.map(category => category.value).sort();
   };
 
+  // Rango de precios de los productos cargados (solo informativo, no sirve de filtro)
   const getPriceRange = () => {
     if (allProducts.length === 0) return { min: 0, max: 200000 };
     
@@ -249,7 +230,10 @@ export function ProductsProvider({ children }) {
     filters,
     loading,
     error,
+    hasMore,
+    loadingMore,
     loadProducts,
+    loadMore,
     loadCategories,
     updateFilters,
     resetFilters,
@@ -35,24 +35,49 @@ async function apiRequest(endpoint, options = {}) {
 // ============================================================================
 
 /**
- * Obtiene todos los productos
+ * Construye los query params del catálogo a partir de los filtros del frontend
+ * (category, search, minPrice, maxPrice, minRating) y la paginación por cursor
  */
-export async function getAllProducts(params = {}) {
+function buildProductQuery(filters = {}, { cursor, pageSize, sort } = {}) {
   const queryParams = new URLSearchParams();
-  
-  if (params.categoria) queryParams.append('categoria', params.categoria);
-  if (params.limit) queryParams.append('limit', params.limit);
-  if (params.skip) queryParams.append('skip', params.skip);
-  
-  const query = queryParams.toString();
-  return apiRequest(`/productos${query ? '?' + query : ''}`);
+
+  if (filters.category) queryParams.append('category', filters.category);
+  if (filters.search) queryParams.append('search', filters.search);
+  if (filters.minPrice) queryParams.append('minPrice', filters.minPrice);
+  if (filters.maxPrice) queryParams.append('maxPrice', filters.maxPrice);
+  if (filters.minRating) queryParams.append('minRating', filters.minRating);
+  if (cursor) queryParams.append('cursor', cursor);
+  if (pageSize) queryParams.append('page_size', pageSize);
+  if (sort) queryParams.append('sort', sort);
+
+  return queryParams.toString();
+}
+
+/**
+ * Consulta una página del catálogo filtrada en el servidor
+ * Retorna { products, page_size, next_cursor, has_more }
+ */
+export async function queryProducts(filters = {}, options = {}) {
+  const query = buildProductQuery(filters, options);
+  return apiRequest(`/products/${query ? '?' + query : ''}`);
+}
+
+/**
+ * Obtiene la primera página de productos (compatibilidad)
+ */
+export async function getAllProducts(params = {}) {
+  const page = await queryProducts(
+    { category: params.categoria || params.category },
+    { pageSize: params.limit }
+  );
+  return page.products;
 }
 
 /**
  * Obtiene un producto por ID
  */
 export async function getProductById(id) {
-  return apiRequest(`/productos/${id}`);
+  return apiRequest(`/products/${id}`);
 }
 
 /**
@@ -66,14 +91,14 @@ export async function getProductsByCategory(categoria) {
  * Obtiene todas las categorías disponibles
  */
 export async function getCategories() {
-  return apiRequest('/productos/categorias');
+  return apiRequest('/products/categories');
 }
 
 /**
- * Busca productos por texto
+ * Busca productos por texto (ordenados por relevancia en el servidor)
  */
-export async function searchProducts(query) {
-  return apiRequest(`/productos/buscar?q=${encodeURIComponent(query)}`);
+export async function searchProducts(query, limit = 20) {
+  return apiRequest(`/products/search?q=${encodeURIComponent(query)}&limit=${limit}`);
 }
 
 // ============================================================================
@@ -131,20 +156,24 @@ export async function clearCart() {
 
 /**
  * Inicia sesión
+ * Envía la cookie del carrito de invitado (credentials: 'include'): el
+ * backend lo fusiona con el carrito del usuario y borra la cookie
  */
 export async function login(email, password) {
   return apiRequest('/auth/login', {
     method: 'POST',
-    body: JSON.stringify({ email, password }),
+    credentials: 'include',
+    body: JSON.stringify({ username: email, password }),
   });
 }
 
 /**
- * Registra un nuevo usuario
+ * Registra un nuevo usuario (también fusiona el carrito de invitado)
  */
 export async function register(userData) {
   return apiRequest('/auth/register', {
     method: 'POST',
+    credentials: 'include',
     body: JSON.stringify(userData),
   });
 }
@@ -167,21 +196,30 @@ export async function logout() {
  * (si es necesario mapear campos del backend a formato frontend)
  */
 export function transformProduct(product) {
+  // El backend responde con ProductResponse (id, title, price, ...);
+  // se mantienen los nombres en español como respaldo
+  const title = product.title ?? product.titulo;
+  const category = product.category ?? product.categoria;
+  const rating = product.rating || {
+    rate: product.rating_rate ? parseFloat(product.rating_rate) : 0,
+    count: product.rating_count || 0,
+  };
+
   return {
-    id: product.id_producto,
-    title: product.titulo,
-    name: product.titulo,
-    price: parseFloat(product.precio),
-    description: product.descripcion,
-    category: product.categoria,
-    image: product.imagen,
+    id: product.id ?? product.id_producto,
+    title,
+    name: title,
+    price: parseFloat(product.price ?? product.precio),
+    description: product.description ?? product.descripcion,
+    category,
+    image: product.image ?? product.imagen,
     stock: product.stock,
     rating: {
-      rate: product.rating_rate ? parseFloat(product.rating_rate) : 0,
-      count: product.rating_count || 0,
+      rate: rating.rate || 0,
+      count: rating.count || 0,
     },
     featured: false, // Puedes agregar este campo en el backend si lo necesitas
-    tags: [product.categoria],
+    tags: [category],
   };
 }
 
@@ -193,6 +231,19 @@ export async function getTransformedProducts(params = {}) {
   return Array.isArray(products) ? products.map(transformProduct) : [];
 }
 
+/**
+ * Obtiene una página filtrada en el servidor con productos transformados
+ * Retorna { products, nextCursor, hasMore }
+ */
+export async function getTransformedProductPage(filters = {}, options = {}) {
+  const page = await queryProducts(filters, options);
+  return {
+    products: (page.products || []).map(transformProduct),
+    nextCursor: page.next_cursor,
+    hasMore: page.has_more,
+  };
+}
+
 /**
  * Obtiene categorías transformadas
  */